@@ -5,6 +5,7 @@ Prevents queue burn when LLM API is down by opening the circuit after N consecut
 Circuit automatically closes after a timeout period to allow recovery.
 """
 
+import threading
 import time
 import logging
 from typing import Any, Callable, TypeVar
@@ -39,6 +40,8 @@ class CircuitBreaker:
         self.total_calls = 0
         self.total_failures = 0
         self.total_successes = 0
+        # Compilation segments call through one breaker from several threads.
+        self._lock = threading.RLock()
 
     def call(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
         """
@@ -74,56 +77,59 @@ class CircuitBreaker:
 
     def is_open(self) -> bool:
         """Check if circuit is currently open."""
-        if self.opened_at is None:
-            return False
-
-        # Check if timeout has elapsed
-        if time.time() - self.opened_at > self.timeout_seconds:
-            logger.info(
-                "circuit_breaker_timeout_elapsed",
-                extra={
-                    "opened_at": self.opened_at,
-                    "timeout_seconds": self.timeout_seconds,
-                    "resetting": True,
-                }
-            )
-            self.opened_at = None
-            self.failure_count = 0
-            return False
-
-        return True
+        with self._lock:
+            if self.opened_at is None:
+                return False
+
+            # Check if timeout has elapsed
+            if time.time() - self.opened_at > self.timeout_seconds:
+                logger.info(
+                    "circuit_breaker_timeout_elapsed",
+                    extra={
+                        "opened_at": self.opened_at,
+                        "timeout_seconds": self.timeout_seconds,
+                        "resetting": True,
+                    }
+                )
+                self.opened_at = None
+                self.failure_count = 0
+                return False
+
+            return True
 
     def on_success(self) -> None:
         """Record successful call."""
-        self.total_successes += 1
-        if self.failure_count > 0:
-            logger.info(
-                "circuit_breaker_recovered",
-                extra={
-                    "previous_failures": self.failure_count,
-                    "total_calls": self.total_calls,
-                }
-            )
-        self.failure_count = 0
-        self.opened_at = None
+        with self._lock:
+            self.total_successes += 1
+            if self.failure_count > 0:
+                logger.info(
+                    "circuit_breaker_recovered",
+                    extra={
+                        "previous_failures": self.failure_count,
+                        "total_calls": self.total_calls,
+                    }
+                )
+            self.failure_count = 0
+            self.opened_at = None
 
     def on_failure(self) -> None:
         """Record failed call and open circuit if threshold exceeded."""
-        self.failure_count += 1
-        self.total_failures += 1
-
-        if self.failure_count >= self.failure_threshold:
-            self.opened_at = time.time()
-            logger.error(
-                "circuit_breaker_opened",
-                extra={
-                    "failure_count": self.failure_count,
-                    "failure_threshold": self.failure_threshold,
-                    "timeout_seconds": self.timeout_seconds,
-                    "total_calls": self.total_calls,
-                    "total_failures": self.total_failures,
-                }
-            )
+        with self._lock:
+            self.failure_count += 1
+            self.total_failures += 1
+
+            if self.failure_count >= self.failure_threshold:
+                self.opened_at = time.time()
+                logger.error(
+                    "circuit_breaker_opened",
+                    extra={
+                        "failure_count": self.failure_count,
+                        "failure_threshold": self.failure_threshold,
+                        "timeout_seconds": self.timeout_seconds,
+                        "total_calls": self.total_calls,
+                        "total_failures": self.total_failures,
+                    }
+                )
 
     def _time_remaining(self) -> float:
         """Calculate time remaining until circuit closes."""
@@ -5,10 +5,11 @@ import asyncio
 import logging
 import os
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from telethon import TelegramClient
 
+from collection.backfill_scheduler import DONE, FAILED, BackfillScheduler, ChannelState, FloodGate, SharedClient, channel_lag_seconds
 from collection.backoff import retry_with_backoff
 from collection.channels import channel_link_from_entity, normalize_channel_ref, parse_channels_arg, parse_channels_from_env
 from collection.config import MissingTelegramCredentials, build_client, enqueue_enabled, pipeline_version
@@ -79,23 +80,67 @@ async def backfill_channel(
     force_enqueue: bool = False,
     message_timeout_seconds: float = DEFAULT_MESSAGE_TIMEOUT_SECONDS,
     max_message_id: Optional[int] = None,
+    entity: Any = None,
+    on_checkpoint: Optional[Callable[[Counters], None]] = None,
 ) -> Counters:
+    """Backfill one channel from `until` (or `max_message_id`, exclusive) back to `since`.
+
+    With `on_checkpoint`, the callback receives a `Counters` whose `last_message_id` is the oldest message scanned so far
+    whose row is durably stored, after every successful batch upsert; a batch that is not fully written raises instead
+    of being skipped, so the caller can resume from the last checkpoint (`max_message_id=int(last_message_id)`) without
+    a gap. Progress is then the caller's job; without a callback the channel's progress row is written at the end.
+    """
     counters = Counters()
 
-    entity = await retry_with_backoff(client.get_entity, channel_ref)
+    if entity is None:
+        entity = await retry_with_backoff(client.get_entity, channel_ref)
     channel_id = str(getattr(entity, "id", "") or "") or None
     channel_link = channel_link_from_entity(entity, normalize_channel_ref(channel_ref))
     title = getattr(entity, "title", None) or None
 
-    store.upsert_channel(
+    await asyncio.to_thread(
+        store.upsert_channel,
         channel_link=channel_link,
         channel_id=channel_id,
         agency_telegram_channel_name=str(title) if title else None,
     )
 
     rows: List[Dict[str, Any]] = []
+    # Oldest message scanned so far (id, date); everything scanned up to it is durable once `rows` is flushed.
+    scanned_through: Optional[tuple[str, Optional[str]]] = None
     t0 = timed()
 
+    async def _flush() -> None:
+        # Supabase calls are blocking; run them off the event loop so concurrent channels keep fetching.
+        attempted, ok_rows = await asyncio.to_thread(store.upsert_messages_batch, rows=rows)
+        counters.written += ok_rows
+        try:
+            if ok_rows:
+                collector_messages_upserted_total.labels(
+                    channel=channel_link, pipeline_version=ctx.version.pipeline_version, schema_version=ctx.version.schema_version
+                ).inc(ok_rows)
+        except Exception:
+            # Metrics must never break runtime
+            pass
+        if ok_rows:
+            msg_ids = [str(r.get("message_id") or "").strip() for r in rows if str(r.get("message_id") or "").strip()]
+            await asyncio.to_thread(enqueue_extraction_jobs, store, cfg=ctx.cfg, channel_link=channel_link, message_ids=msg_ids, force=bool(force_enqueue))
+        if on_checkpoint is not None and ok_rows < attempted and store.enabled():
+            raise RuntimeError(f"raw upsert stored {ok_rows}/{attempted} rows for {channel_link}")
+
+    def _checkpoint() -> None:
+        if on_checkpoint is None or scanned_through is None:
+            return
+        on_checkpoint(
+            Counters(
+                scanned=counters.scanned,
+                written=counters.written,
+                errors=counters.errors,
+                last_message_id=scanned_through[0],
+                last_message_date_iso=scanned_through[1],
+            )
+        )
+
     async for msg in iter_messages_with_timeout(
         client=client,
         entity=entity,
@@ -136,25 +181,17 @@ async def backfill_channel(
         row = build_raw_row(channel_link=channel_link, channel_id=channel_id, msg=msg)
         if row:
             rows.append(row)
+        msg_id = str(getattr(msg, "id", "") or "")
+        if msg_id:
+            scanned_through = (msg_id, iso(dt_utc) if isinstance(dt_utc, datetime) else None)
 
         if max_messages is not None and counters.scanned >= int(max_messages):
             break
 
         if len(rows) >= int(batch_size):
-            attempted, ok_rows = store.upsert_messages_batch(rows=rows)
-            counters.written += ok_rows
-            try:
-                if ok_rows:
-                    collector_messages_upserted_total.labels(
-                        channel=channel_link, pipeline_version=ctx.version.pipeline_version, schema_version=ctx.version.schema_version
-                    ).inc(ok_rows)
-            except Exception:
-                # Metrics must never break runtime
-                pass
-            if ok_rows:
-                msg_ids = [str(r.get("message_id") or "").strip() for r in rows if str(r.get("message_id") or "").strip()]
-                enqueue_extraction_jobs(store, cfg=ctx.cfg, channel_link=channel_link, message_ids=msg_ids, force=bool(force_enqueue))
+            await _flush()
             rows = []
+            _checkpoint()
 
         counters.last_message_id = str(getattr(msg, "id", "") or "") or counters.last_message_id
         counters.last_message_date_iso = iso(dt_utc) if isinstance(dt_utc, datetime) else counters.last_message_date_iso
@@ -175,143 +212,52 @@ async def backfill_channel(
             )
 
     if rows:
-        attempted, ok_rows = store.upsert_messages_batch(rows=rows)
-        counters.written += ok_rows
-        try:
-            if ok_rows:
-                collector_messages_upserted_total.labels(channel=channel_link, pipeline_version=ctx.version.pipeline_version, schema_version=ctx.version.schema_version).inc(
-                    ok_rows
-                )
-        except Exception:
-            # Metrics must never break runtime
-            pass
-        if ok_rows:
-            msg_ids = [str(r.get("message_id") or "").strip() for r in rows if str(r.get("message_id") or "").strip()]
-            enqueue_extraction_jobs(store, cfg=ctx.cfg, channel_link=channel_link, message_ids=msg_ids, force=bool(force_enqueue))
+        await _flush()
+    _checkpoint()
 
-    store.upsert_progress(
-        run_id=run_id,
-        channel_link=channel_link,
-        last_message_id=counters.last_message_id,
-        last_message_date_iso=counters.last_message_date_iso,
-        scanned=counters.scanned,
-        inserted=0,
-        updated=0,
-        errors=counters.errors,
-    )
-    return counters
-
-
-async def backfill_channel_with_retries(
-    *,
-    ctx: CollectorContext,
-    client: TelegramClient,
-    store: SupabaseRawStore,
-    run_id: int,
-    channel_ref: str,
-    since: Optional[datetime],
-    until: Optional[datetime],
-    batch_size: int,
-    max_messages: Optional[int],
-    force_enqueue: bool,
-    message_timeout_seconds: float,
-    channel_retries: int,
-    retry_delay_seconds: float,
-    max_message_id: Optional[int] = None,
-) -> tuple[TelegramClient, Counters]:
-    """Run one channel with fresh-client retries after Telethon stalls/fails."""
-    active_client = client
-    last_error: Optional[BaseException] = None
-    attempts = max(1, int(channel_retries))
-    for attempt in range(1, attempts + 1):
-        try:
-            result = await backfill_channel(
-                ctx=ctx,
-                client=active_client,
-                store=store,
-                run_id=run_id,
-                channel_ref=channel_ref,
-                since=since,
-                until=until,
-                batch_size=batch_size,
-                max_messages=max_messages,
-                force_enqueue=force_enqueue,
-                message_timeout_seconds=message_timeout_seconds,
-                max_message_id=max_message_id,
-            )
-            return active_client, result
-        except asyncio.CancelledError:
-            task = asyncio.current_task()
-            if task is not None and task.cancelling():
-                raise
-            last_error = RuntimeError("Telethon cancelled a message fetch")
-        except Exception as exc:
-            last_error = exc
-
-        log_event(
-            ctx.logger,
-            logging.WARNING,
-            "raw_backfill_channel_retry",
+    if on_checkpoint is None:
+        await asyncio.to_thread(
+            store.upsert_progress,
             run_id=run_id,
-            channel=channel_ref,
-            attempt=attempt,
-            max_attempts=attempts,
-            error=str(last_error),
+            channel_link=channel_link,
+            last_message_id=counters.last_message_id,
+            last_message_date_iso=counters.last_message_date_iso,
+            scanned=counters.scanned,
+            inserted=0,
+            updated=0,
+            errors=counters.errors,
         )
-        try:
-            await active_client.disconnect()
-        except Exception:
-            pass
-        if attempt < attempts:
-            await asyncio.sleep(max(0.0, float(retry_delay_seconds)))
-            active_client = build_client(ctx.cfg)
-            await active_client.connect()
-
-    assert last_error is not None
-    raise last_error
+    return counters
 
 
-async def backfill_channel_windowed(
-    *,
-    ctx: CollectorContext,
-    client: TelegramClient,
-    store: SupabaseRawStore,
-    run_id: Optional[int],
-    channel_ref: str,
-    since: Optional[datetime],
-    until: Optional[datetime],
-    batch_size: int,
-    window_size: int,
-    force_enqueue: bool,
-    message_timeout_seconds: float,
-    channel_retries: int,
-    retry_delay_seconds: float,
-) -> tuple[TelegramClient, Counters]:
-    total = Counters()
-    cursor: Optional[int] = None
-    while True:
-        client, window = await backfill_channel_with_retries(
-            ctx=ctx, client=client, store=store, run_id=run_id,
-            channel_ref=channel_ref, since=since, until=until,
-            batch_size=batch_size, max_messages=window_size,
-            force_enqueue=force_enqueue,
-            message_timeout_seconds=message_timeout_seconds,
-            channel_retries=channel_retries,
-            retry_delay_seconds=retry_delay_seconds,
-            max_message_id=cursor,
-        )
-        total.scanned += window.scanned
-        total.written += window.written
-        total.errors += window.errors
-        total.last_message_id = window.last_message_id or total.last_message_id
-        total.last_message_date_iso = window.last_message_date_iso or total.last_message_date_iso
-        log_event(ctx.logger, logging.INFO, "raw_backfill_window_done", run_id=run_id, channel=channel_ref, scanned=window.scanned, last_message_id=window.last_message_id)
-        if window.scanned < window_size or not window.last_message_id:
-            return client, total
-        next_cursor = int(window.last_message_id) - 1
-        if cursor is not None and next_cursor >= cursor:
-            raise RuntimeError(f"non-decreasing Telegram window cursor for {channel_ref}: {cursor} -> {next_cursor}")
-        cursor = next_cursor
+def load_resume_state(store: SupabaseRawStore, *, run_id: int, channels: List[str]) -> List[ChannelState]:
+    """Channel states for `channels` from a previous run's checkpoints (finished channels are marked done)."""
+    by_link = {str(p.get("channel_link") or "").strip().lower(): p for p in store.list_progress(run_id=run_id)}
+    states: List[ChannelState] = []
+    for ch in channels:
+        state = ChannelState(channel_ref=ch)
+        prog = by_link.get(normalize_channel_ref(ch).lower())
+        if prog:
+            state.channel_link = str(prog.get("channel_link") or "") or None
+            state.scanned = int(prog.get("scanned_count") or 0)
+            state.errors = int(prog.get("error_count") or 0)
+            last_id = str(prog.get("last_message_id") or "").strip()
+            state.cursor = int(last_id) if last_id.isdigit() else None
+            state.cursor_date_iso = prog.get("last_message_date") or None
+            if prog.get("done"):
+                state.status = DONE
+        states.append(state)
+    return states
+
+
+def _resume_run_id(store: SupabaseRawStore, value: str) -> int:
+    if str(value).strip().lower() == "latest":
+        run_id = store.get_latest_run_id(run_type="backfill")
+    else:
+        run_id = int(value)
+    if not run_id or not store.get_run(run_id=int(run_id)):
+        raise SystemExit(f"Backfill run to resume not found: {value}")
+    return int(run_id)
 
 
 async def run_backfill(ctx: CollectorContext, args: argparse.Namespace) -> int:
@@ -335,6 +281,18 @@ async def run_backfill(ctx: CollectorContext, args: argparse.Namespace) -> int:
         },
     )
 
+    resume_run_id: Optional[int] = None
+    resume_meta: Dict[str, Any] = {}
+    if getattr(args, "resume_run", None):
+        resume_run_id = _resume_run_id(store, args.resume_run)
+        run = store.get_run(run_id=resume_run_id) or {}
+        resume_meta = run.get("meta") if isinstance(run.get("meta"), dict) else {}
+        # The resumed run keeps its original window and channel list unless overridden on the command line.
+        args.since = args.since or resume_meta.get("since")
+        args.until = args.until or resume_meta.get("until")
+        if not args.channels and run.get("channels"):
+            args.channels = ",".join(str(c) for c in run["channels"])
+
     channels = parse_channels_arg(args.channels) or [normalize_channel_ref(x) for x in parse_channels_from_env(ctx.cfg)]
     channels = [c for c in channels if c]
     if not channels:
@@ -349,6 +307,8 @@ async def run_backfill(ctx: CollectorContext, args: argparse.Namespace) -> int:
     channel_retries = max(1, int(getattr(args, "channel_retries", DEFAULT_CHANNEL_RETRIES) or DEFAULT_CHANNEL_RETRIES))
     retry_delay_seconds = DEFAULT_RETRY_DELAY_SECONDS
     window_size = max(0, int(getattr(args, "window_size", 0) or 0))
+    slice_messages = window_size or max(1, int(ctx.cfg.backfill_slice_messages or 1000))
+    concurrency = max(1, int(getattr(args, "concurrency", None) or ctx.cfg.backfill_concurrency or 1))
 
     base_meta = {
         "since": args.since,
@@ -364,7 +324,11 @@ async def run_backfill(ctx: CollectorContext, args: argparse.Namespace) -> int:
         "channel_retries": channel_retries,
         "retry_delay_seconds": retry_delay_seconds,
         "window_size": window_size,
+        "slice_messages": slice_messages,
+        "concurrency": concurrency,
     }
+    if resume_run_id is not None:
+        base_meta["resumed_at"] = utc_now().isoformat()
     t0 = timed()
     while True:
         try:
@@ -377,62 +341,75 @@ async def run_backfill(ctx: CollectorContext, args: argparse.Namespace) -> int:
                 continue
             raise SystemExit(str(e))
 
-    run_id = store.create_run(run_type="backfill", channels=channels, meta=base_meta)
+    if resume_run_id is not None:
+        run_id: Optional[int] = resume_run_id
+        states = load_resume_state(store, run_id=resume_run_id, channels=channels)
+    else:
+        run_id = store.create_run(run_type="backfill", channels=channels, meta=base_meta)
+        states = [ChannelState(channel_ref=ch) for ch in channels]
+    now = utc_now()
+    lags = await asyncio.gather(*(asyncio.to_thread(channel_lag_seconds, store, s.channel_link or s.channel_ref, now=now) for s in states))
+    for state, lag in zip(states, lags):
+        state.lag_s = lag
+
+    shared = SharedClient(client, build=lambda: build_client(ctx.cfg))
     await client.connect()
     try:
-        total_scanned = 0
-        total_written = 0
-        for ch in channels:
-            with bind_log_context(
-                step="raw.backfill",
-                channel=ch,
-                component="collector",
-                pipeline_version=ctx.version.pipeline_version,
-                schema_version=ctx.version.schema_version,
-            ):
-                log_event(ctx.logger, logging.INFO, "raw_backfill_channel_start", channel=ch, run_id=run_id)
-                if window_size > 0:
-                    client, res = await backfill_channel_windowed(
-                        ctx=ctx, client=client, store=store, run_id=run_id,
-                        channel_ref=ch, since=since, until=until,
-                        batch_size=batch_size, window_size=window_size,
-                        force_enqueue=bool(getattr(args, "force_enqueue", False)),
-                        message_timeout_seconds=message_timeout_seconds,
-                        channel_retries=channel_retries,
-                        retry_delay_seconds=retry_delay_seconds,
-                    )
-                else:
-                    client, res = await backfill_channel_with_retries(
-                        ctx=ctx, client=client, store=store, run_id=run_id,
-                        channel_ref=ch, since=since, until=until,
-                        batch_size=batch_size, max_messages=max_messages,
-                        force_enqueue=bool(getattr(args, "force_enqueue", False)),
-                        message_timeout_seconds=message_timeout_seconds,
-                        channel_retries=channel_retries,
-                        retry_delay_seconds=retry_delay_seconds,
-                    )
-                log_event(
-                    ctx.logger,
-                    logging.INFO,
-                    "raw_backfill_channel_done",
-                    channel=ch,
-                    run_id=run_id,
-                    scanned=res.scanned,
-                    written=res.written,
-                    errors=res.errors,
-                )
-                total_scanned += res.scanned
-                total_written += res.written
-
-        final_meta = dict(base_meta)
+        log_event(
+            ctx.logger,
+            logging.INFO,
+            "raw_backfill_start",
+            run_id=run_id,
+            resumed=resume_run_id is not None,
+            channels=len(states),
+            pending=sum(1 for s in states if s.status != DONE),
+            concurrency=concurrency,
+            slice_messages=slice_messages,
+        )
+        scheduler = BackfillScheduler(
+            ctx=ctx,
+            client=shared,
+            store=store,
+            run_id=run_id,
+            channels=states,
+            since=since,
+            until=until,
+            batch_size=batch_size,
+            backfill_fn=backfill_channel,
+            slice_messages=slice_messages,
+            max_messages=max_messages,
+            force_enqueue=bool(getattr(args, "force_enqueue", False)),
+            message_timeout_seconds=message_timeout_seconds,
+            channel_retries=channel_retries,
+            retry_delay_seconds=retry_delay_seconds,
+            concurrency=concurrency,
+            checkpoint_interval_s=float(ctx.cfg.backfill_checkpoint_interval_seconds or 5.0),
+            gate=FloodGate(global_after_channels=int(ctx.cfg.backfill_flood_global_after_channels or 3)),
+        )
+        with bind_log_context(
+            step="raw.backfill",
+            component="collector",
+            pipeline_version=ctx.version.pipeline_version,
+            schema_version=ctx.version.schema_version,
+        ):
+            await scheduler.run()
+
+        failed = {s.channel_ref: s.error for s in states if s.status == FAILED}
+        final_meta = dict(resume_meta)
+        final_meta.update(base_meta)
         final_meta.update(
             {
                 "finished_at": utc_now().isoformat(),
-                "total_scanned": total_scanned,
-                "total_written": total_written,
+                "total_scanned": sum(s.scanned for s in states),
+                "total_written": sum(s.written for s in states),
                 "total_ms": round((timed() - t0) * 1000.0, 2),
             }
         )
+        if failed:
+            # Failed channels keep their last checkpoint; `--resume-run` picks them up where they stopped.
+            final_meta["failed_channels"] = failed
+            store.finish_run(run_id=run_id, status="error", meta_patch=final_meta)
+            return 1
         store.finish_run(run_id=run_id, status="ok", meta_patch=final_meta)
         return 0
     except asyncio.CancelledError:
@@ -456,4 +433,4 @@ async def run_backfill(ctx: CollectorContext, args: argparse.Namespace) -> int:
         store.finish_run(run_id=run_id, status="error", meta_patch=err_meta)
         raise
     finally:
-        await client.disconnect()
+        await shared.client.disconnect()
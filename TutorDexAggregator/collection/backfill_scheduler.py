@@ -0,0 +1,470 @@
+"""
+Concurrent multi-channel backfill on one Telethon client.
+
+- Channels are cut into slices of `slice_messages` (message-ID windows, newest to oldest) and run by `concurrency`
+  workers. Between slices a channel goes back into a queue ordered by lag (seconds since its newest stored raw message,
+  never-stored channels first), so the channels furthest behind get workers first.
+- Flood waits are handled here, not by sleeping inside Telethon (`flood_sleep_threshold=0`):
+  - a `FloodWaitError` while reading history pauses only that channel; its worker moves on to another channel
+  - a flood while resolving a channel (account-wide), or floods on `global_after_channels` distinct channels within
+    `FLOOD_WINDOW_SECONDS`, pauses every worker until it expires
+- Checkpoints (`ingestion_run_progress`) are written behind the work by `CheckpointWriter`. A checkpoint only ever
+  names a message whose row (and every newer one in the channel) is already stored, so resuming with
+  `max_id=<checkpoint>` (exclusive) continues at the next older message: nothing is skipped, and at most the rows
+  stored after the last persisted checkpoint are upserted again (idempotent on `channel_link,message_id`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from telethon.errors import FloodWaitError, SlowModeWaitError
+
+from collection.channels import channel_link_from_entity, normalize_channel_ref
+from collection.counters import Counters
+from collection.types import CollectorContext
+from collection.utils import parse_iso_dt, utc_now
+from logging_setup import bind_log_context, log_event
+from observability_metrics import (
+    collector_backfill_channels,
+    collector_backfill_checkpoints_total,
+    collector_backfill_flood_waits_total,
+)
+
+FLOOD_WINDOW_SECONDS = 60.0
+
+QUEUED = "queued"
+ACTIVE = "active"
+PAUSED = "paused"
+DONE = "done"
+FAILED = "failed"
+CHANNEL_STATES = (QUEUED, ACTIVE, PAUSED, DONE, FAILED)
+
+
+@dataclass
+class ChannelState:
+    channel_ref: str
+    lag_s: float = math.inf
+    # Exclusive `max_id` for the next slice (the oldest durably stored message); None starts at `until`.
+    cursor: Optional[int] = None
+    cursor_date_iso: Optional[str] = None
+    channel_link: Optional[str] = None
+    entity: Any = None
+    scanned: int = 0
+    written: int = 0
+    errors: int = 0
+    attempts: int = 0
+    ready_at: float = 0.0
+    status: str = QUEUED
+    error: Optional[str] = None
+
+
+def channel_lag_seconds(store: Any, channel_link: str, *, now: Optional[datetime] = None) -> float:
+    """Seconds since the newest stored raw message of a channel (`inf` when nothing is stored yet)."""
+    date_iso, _ = store.get_latest_message_cursor(channel_link=channel_link)
+    latest = parse_iso_dt(date_iso)
+    if latest is None:
+        return math.inf
+    return max(0.0, ((now or utc_now()) - latest).total_seconds())
+
+
+def _flood_seconds(exc: BaseException) -> float:
+    return max(1.0, float(getattr(exc, "seconds", 0) or 0))
+
+
+class FloodGate:
+    """Per-channel and global pauses derived from Telegram flood waits."""
+
+    def __init__(self, *, global_after_channels: int = 3, window_s: float = FLOOD_WINDOW_SECONDS, clock: Callable[[], float] = time.monotonic):
+        self.global_after_channels = max(1, int(global_after_channels))
+        self.window_s = float(window_s)
+        self._clock = clock
+        self._global_until = 0.0
+        self._channel_until: Dict[str, float] = {}
+        self._recent: Dict[str, float] = {}
+
+    def flood(self, channel: str, seconds: float, *, account_wide: bool = False) -> str:
+        """Record a flood wait for `channel`; returns the scope applied ("channel" or "global")."""
+        now = self._clock()
+        until = now + float(seconds)
+        self._recent = {ch: t for ch, t in self._recent.items() if now - t <= self.window_s}
+        self._recent[channel] = now
+        self._channel_until[channel] = max(self._channel_until.get(channel, 0.0), until)
+        scope = "channel"
+        if account_wide or len(self._recent) >= self.global_after_channels:
+            self._global_until = max(self._global_until, until)
+            scope = "global"
+        try:
+            collector_backfill_flood_waits_total.labels(scope=scope).inc()
+        except Exception:
+            # Metrics must never break runtime
+            pass
+        return scope
+
+    def ready_at(self, channel: str) -> float:
+        return max(self._global_until, self._channel_until.get(channel, 0.0))
+
+    def global_pause_s(self) -> float:
+        return max(0.0, self._global_until - self._clock())
+
+    async def wait_global(self) -> None:
+        while True:
+            remaining = self.global_pause_s()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(remaining)
+
+
+class LagQueue:
+    """Channels waiting for a worker: ready ones (by `ready_at`) leave most-lagging first, in insertion order on ties."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._items: List[tuple[int, ChannelState]] = []
+        self._seq = 0
+        self._inflight = 0
+        self._cond = asyncio.Condition()
+
+    def put_nowait(self, state: ChannelState) -> None:
+        self._seq += 1
+        self._items.append((self._seq, state))
+
+    async def get(self) -> Optional[ChannelState]:
+        """Next ready channel, or None once the queue is empty and nothing is in flight (all work finished)."""
+        async with self._cond:
+            while True:
+                now = self._clock()
+                ready = [item for item in self._items if item[1].ready_at <= now]
+                if ready:
+                    item = max(ready, key=lambda it: (it[1].lag_s, -it[0]))
+                    self._items.remove(item)
+                    self._inflight += 1
+                    return item[1]
+                if not self._items and self._inflight == 0:
+                    return None
+                timeout = (min(s.ready_at for _, s in self._items) - now) if self._items else None
+                try:
+                    await asyncio.wait_for(self._cond.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def done(self, state: ChannelState, *, requeue: bool) -> None:
+        async with self._cond:
+            self._inflight -= 1
+            if requeue:
+                self.put_nowait(state)
+            self._cond.notify_all()
+
+
+class CheckpointWriter:
+    """
+    Write-behind for `ingestion_run_progress`: workers `submit` a channel's latest checkpoint and carry on; a background
+    task upserts the newest one per channel every `interval_s` (immediately for a finished channel). A failed write
+    stays pending unless a newer checkpoint for the channel has replaced it.
+    """
+
+    def __init__(self, store: Any, *, run_id: Optional[int], interval_s: float = 5.0):
+        self.store = store
+        self.run_id = run_id
+        self.interval_s = max(0.05, float(interval_s))
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._closed = False
+        self._task: Optional[asyncio.Task] = None
+
+    def submit(self, row: Dict[str, Any]) -> None:
+        self._pending[row["channel_link"]] = row
+        if row.get("done"):
+            self._wake.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval_s)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        async with self._lock:
+            pending, self._pending = self._pending, {}
+            written = 0
+            for channel_link, row in pending.items():
+                ok = await asyncio.to_thread(self.store.upsert_progress, run_id=self.run_id, **row)
+                try:
+                    collector_backfill_checkpoints_total.labels(outcome="ok" if ok else "failed").inc()
+                except Exception:
+                    # Metrics must never break runtime
+                    pass
+                if ok:
+                    written += 1
+                elif self.run_id and self.store.enabled():
+                    self._pending.setdefault(channel_link, row)
+            return written
+
+    async def close(self) -> None:
+        self._closed = True
+        self._wake.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.flush()
+
+
+class SharedClient:
+    """The Telethon client shared by all workers; rebuilt once per disconnect (a stall watchdog disconnects it)."""
+
+    def __init__(self, client: Any, build: Optional[Callable[[], Any]] = None):
+        self.client = client
+        self.generation = 0
+        self._build = build
+        self._lock = asyncio.Lock()
+        _disable_flood_sleep(client)
+
+    async def recover(self, generation: int) -> None:
+        async with self._lock:
+            if generation != self.generation or self.client.is_connected():
+                return
+            try:
+                await self.client.disconnect()
+            except Exception:
+                pass
+            if self._build is not None:
+                self.client = self._build()
+                _disable_flood_sleep(self.client)
+            await self.client.connect()
+            self.generation += 1
+
+
+def _disable_flood_sleep(client: Any) -> None:
+    # Surface every flood wait to the scheduler instead of sleeping inside the request (which would hold a worker).
+    try:
+        client.flood_sleep_threshold = 0
+    except Exception:
+        pass
+
+
+class BackfillScheduler:
+    def __init__(
+        self,
+        *,
+        ctx: CollectorContext,
+        client: SharedClient,
+        store: Any,
+        run_id: Optional[int],
+        channels: List[ChannelState],
+        since: Optional[datetime],
+        until: Optional[datetime],
+        batch_size: int,
+        backfill_fn: Callable[..., Any],
+        slice_messages: int = 1000,
+        max_messages: Optional[int] = None,
+        force_enqueue: bool = False,
+        message_timeout_seconds: float = 180.0,
+        channel_retries: int = 3,
+        retry_delay_seconds: float = 5.0,
+        concurrency: int = 4,
+        checkpoint_interval_s: float = 5.0,
+        gate: Optional[FloodGate] = None,
+    ):
+        self.ctx = ctx
+        self.client = client
+        self.store = store
+        self.run_id = run_id
+        self.channels = channels
+        self.since = since
+        self.until = until
+        self.batch_size = batch_size
+        self.backfill_fn = backfill_fn
+        self.slice_messages = max(1, int(slice_messages))
+        self.max_messages = int(max_messages) if max_messages else None
+        self.force_enqueue = bool(force_enqueue)
+        self.message_timeout_seconds = float(message_timeout_seconds)
+        self.channel_retries = max(1, int(channel_retries))
+        self.retry_delay_seconds = max(0.0, float(retry_delay_seconds))
+        self.concurrency = max(1, int(concurrency))
+        self.gate = gate or FloodGate()
+        self.writer = CheckpointWriter(store, run_id=run_id, interval_s=checkpoint_interval_s)
+        self.queue = LagQueue()
+
+    async def run(self) -> List[ChannelState]:
+        for state in self.channels:
+            if state.status != DONE:
+                state.status = QUEUED
+                self.queue.put_nowait(state)
+        self._publish()
+        self.writer.start()
+        try:
+            workers = [asyncio.create_task(self._worker()) for _ in range(min(self.concurrency, len(self.channels)) or 1)]
+            try:
+                await asyncio.gather(*workers)
+            except BaseException:
+                for w in workers:
+                    w.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                raise
+        finally:
+            await self.writer.close()
+        return self.channels
+
+    async def _worker(self) -> None:
+        while True:
+            state = await self.queue.get()
+            if state is None:
+                return
+            requeue = False
+            try:
+                await self.gate.wait_global()
+                with bind_log_context(step="raw.backfill", channel=state.channel_ref, component="collector"):
+                    requeue = await self._run_slice(state)
+            finally:
+                await self.queue.done(state, requeue=requeue)
+                self._publish()
+
+    def _progress_row(self, state: ChannelState, *, done: bool = False) -> Dict[str, Any]:
+        return {
+            "channel_link": state.channel_link or state.channel_ref,
+            "last_message_id": str(state.cursor) if state.cursor is not None else None,
+            "last_message_date_iso": state.cursor_date_iso,
+            "scanned": state.scanned,
+            "inserted": 0,
+            "updated": 0,
+            "errors": state.errors,
+            "done": done,
+        }
+
+    async def _run_slice(self, state: ChannelState) -> bool:
+        """Run one slice of `state`; returns True when the channel goes back into the queue."""
+        state.status = ACTIVE
+        self._publish()
+        holder = self.client
+        client, generation = holder.client, holder.generation
+        limit = self.slice_messages
+        if self.max_messages is not None:
+            limit = max(0, min(limit, self.max_messages - state.scanned))
+        base = (state.scanned, state.written, state.errors)
+
+        def _checkpoint(c: Counters) -> None:
+            state.cursor = int(c.last_message_id)
+            state.cursor_date_iso = c.last_message_date_iso
+            state.scanned, state.written, state.errors = base[0] + c.scanned, base[1] + c.written, base[2] + c.errors
+            self.writer.submit(self._progress_row(state))
+
+        try:
+            if state.entity is None:
+                try:
+                    state.entity = await client.get_entity(state.channel_ref)
+                except (FloodWaitError, SlowModeWaitError) as e:
+                    return self._paused(state, e, account_wide=True)
+                state.channel_link = channel_link_from_entity(state.entity, normalize_channel_ref(state.channel_ref))
+            res = None
+            if limit > 0:
+                res = await self.backfill_fn(
+                    ctx=self.ctx,
+                    client=client,
+                    store=self.store,
+                    run_id=self.run_id,
+                    channel_ref=state.channel_ref,
+                    since=self.since,
+                    until=self.until,
+                    batch_size=self.batch_size,
+                    max_messages=limit,
+                    force_enqueue=self.force_enqueue,
+                    message_timeout_seconds=self.message_timeout_seconds,
+                    max_message_id=state.cursor,
+                    entity=state.entity,
+                    on_checkpoint=_checkpoint,
+                )
+        except (FloodWaitError, SlowModeWaitError) as e:
+            return self._paused(state, e, account_wide=False)
+        except asyncio.CancelledError:
+            task = asyncio.current_task()
+            if task is not None and task.cancelling():
+                raise
+            error: BaseException = RuntimeError("Telethon cancelled a message fetch")
+        except Exception as e:
+            error = e
+        else:
+            state.attempts = 0
+            reached_cap = self.max_messages is not None and state.scanned >= self.max_messages
+            if res is None or res.scanned < limit or reached_cap:
+                state.status = DONE
+                self.writer.submit(self._progress_row(state, done=True))
+                log_event(
+                    self.ctx.logger,
+                    logging.INFO,
+                    "raw_backfill_channel_done",
+                    channel=state.channel_ref,
+                    run_id=self.run_id,
+                    scanned=state.scanned,
+                    written=state.written,
+                    errors=state.errors,
+                )
+                return False
+            state.status = QUEUED
+            state.ready_at = 0.0
+            return True
+
+        state.attempts += 1
+        state.errors += 1
+        state.error = str(error)
+        log_event(
+            self.ctx.logger,
+            logging.WARNING,
+            "raw_backfill_channel_retry",
+            run_id=self.run_id,
+            channel=state.channel_ref,
+            attempt=state.attempts,
+            max_attempts=self.channel_retries,
+            cursor=state.cursor,
+            error=str(error),
+        )
+        if state.channel_link is not None:
+            self.writer.submit(self._progress_row(state))
+        try:
+            await holder.recover(generation)
+        except Exception as e:
+            log_event(self.ctx.logger, logging.WARNING, "raw_backfill_client_reconnect_failed", error=str(e))
+        if state.attempts >= self.channel_retries:
+            state.status = FAILED
+            return False
+        state.status = QUEUED
+        state.ready_at = time.monotonic() + self.retry_delay_seconds
+        return True
+
+    def _paused(self, state: ChannelState, exc: BaseException, *, account_wide: bool) -> bool:
+        seconds = _flood_seconds(exc)
+        scope = self.gate.flood(state.channel_ref, seconds, account_wide=account_wide)
+        state.status = PAUSED
+        state.ready_at = self.gate.ready_at(state.channel_ref)
+        log_event(
+            self.ctx.logger,
+            logging.WARNING,
+            "raw_backfill_flood_wait",
+            run_id=self.run_id,
+            channel=state.channel_ref,
+            scope=scope,
+            seconds=seconds,
+            cursor=state.cursor,
+        )
+        return True
+
+    def _publish(self) -> None:
+        try:
+            for name in CHANNEL_STATES:
+                collector_backfill_channels.labels(state=name).set(sum(1 for s in self.channels if s.status == name))
+        except Exception:
+            # Metrics must never break runtime
+            pass
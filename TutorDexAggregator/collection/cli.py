@@ -25,7 +25,9 @@ def main() -> None:
     p_backfill.add_argument("--max-messages", type=int, help="Optional cap per channel (useful for dry smoke runs).")
     p_backfill.add_argument("--message-timeout-seconds", type=float, default=180.0, help="Bound each Telegram message fetch request (default: 180).")
     p_backfill.add_argument("--channel-retries", type=int, default=3, help="Retry a failed channel with a fresh Telegram client (default: 3).")
-    p_backfill.add_argument("--window-size", type=int, default=0, help="Partition each channel into message-ID windows; 0 keeps legacy whole-channel mode.")
+    p_backfill.add_argument("--window-size", type=int, default=0, help="Messages per scheduler slice (message-ID window); 0 uses BACKFILL_SLICE_MESSAGES.")
+    p_backfill.add_argument("--concurrency", type=int, help="Channels backfilled at once on the shared Telegram client (default: BACKFILL_CONCURRENCY).")
+    p_backfill.add_argument("--resume-run", help="Resume a crashed/failed backfill run from its checkpoints: run id or 'latest'.")
     p_backfill.add_argument(
         "--force-enqueue",
         action="store_true",
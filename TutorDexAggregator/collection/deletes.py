@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, Optional, Set
+
+from logging_setup import log_event
+from observability_metrics import collector_delete_assignments_closed_total, collector_deleted_messages_total
+
+
+class DeleteCoalescer:
+    """
+    Buffers Telegram delete events per channel and marks them in bulk (`SupabaseRawStore.mark_deleted`).
+
+    A channel purge arrives as many `MessageDeleted` events; instead of one store call per event, ids are merged and
+    flushed every `flush_interval_s`, or as soon as `max_pending` ids are waiting. Store calls run in a thread so the
+    Telethon loop keeps ingesting. Ids from a failed flush are kept for the next one (marking is idempotent).
+
+    With a `spool`, ids whose row is still spooled are held back until the drainer has pushed it: marking first
+    would find no row, and the later upsert would bring the deleted post back. Ids left pending at `close` are
+    parked in the spool and reloaded by the next `start`.
+    """
+
+    def __init__(
+        self,
+        store: Any,
+        *,
+        spool: Any = None,
+        flush_interval_s: float = 1.0,
+        max_pending: int = 500,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.store = store
+        self.spool = spool
+        self.flush_interval_s = max(0.01, float(flush_interval_s))
+        self.max_pending = max(1, int(max_pending))
+        self.logger = logger or logging.getLogger("collector")
+        self._pending: Dict[str, Set[str]] = {}
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._closed = False
+        self._task: Optional[asyncio.Task] = None
+
+    def pending(self) -> int:
+        return sum(len(v) for v in self._pending.values())
+
+    def add(self, channel_link: str, message_ids: Iterable[Any]) -> None:
+        ids = {str(x).strip() for x in message_ids if str(x).strip()}
+        if not ids:
+            return
+        self._pending.setdefault(channel_link, set()).update(ids)
+        if self.pending() >= self.max_pending:
+            self._wake.set()
+
+    def start(self) -> None:
+        if self.spool is not None:
+            for channel_link, ids in self.spool.take_parked_deletes().items():
+                self.add(channel_link, ids)
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval_s)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self) -> Dict[str, int]:
+        total = {"requested": 0, "marked": 0, "closed": 0, "failed": 0, "held": 0}
+        async with self._lock:
+            pending, self._pending = self._pending, {}
+            for channel_link, ids in pending.items():
+                if self.spool is not None:
+                    held = await asyncio.to_thread(self.spool.spooled_ids, channel_link, ids)
+                    if held:
+                        self._pending.setdefault(channel_link, set()).update(held)
+                        total["held"] += len(held)
+                        ids = ids - held
+                        if not ids:
+                            continue
+                try:
+                    res = await asyncio.to_thread(self.store.mark_deleted, channel_link=channel_link, message_ids=sorted(ids))
+                except Exception as e:
+                    res = {"requested": len(ids), "failed": len(ids)}
+                    log_event(self.logger, logging.WARNING, "raw_tail_delete_failed", channel=channel_link, ids=len(ids), error=str(e))
+                if res.get("failed"):
+                    # Keep the ids for the next flush; anything already marked is a no-op the second time.
+                    self._pending.setdefault(channel_link, set()).update(ids)
+                for k in total:
+                    total[k] += int(res.get(k) or 0)
+                marked = int(res.get("marked") or 0)
+                try:
+                    collector_deleted_messages_total.labels(outcome="marked").inc(marked)
+                    collector_deleted_messages_total.labels(outcome="unchanged").inc(max(0, len(ids) - marked - int(res.get("failed") or 0)))
+                    collector_deleted_messages_total.labels(outcome="failed").inc(int(res.get("failed") or 0))
+                    collector_delete_assignments_closed_total.inc(int(res.get("closed") or 0))
+                except Exception:
+                    # Metrics must never break runtime
+                    pass
+                log_event(self.logger, logging.DEBUG, "raw_tail_delete_ok", channel=channel_link, **res)
+        return total
+
+    async def close(self) -> None:
+        self._closed = True
+        self._wake.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.flush()
+        if self._pending and self.spool is not None:
+            parked = self.spool.park_deletes(self._pending)
+            self._pending = {}
+            log_event(self.logger, logging.WARNING, "raw_tail_delete_parked", ids=parked)
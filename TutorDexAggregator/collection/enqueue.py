@@ -4,12 +4,33 @@ from typing import Any, List
 
 from collection.config import enqueue_enabled, pipeline_version
 
+try:
+    from services.job_wakeup import notify_jobs_enqueued  # type: ignore
+except Exception:
+    # Imported as `TutorDexAggregator.*` from repo root (e.g., unit tests).
+    from TutorDexAggregator.services.job_wakeup import notify_jobs_enqueued  # type: ignore
 
-def enqueue_extraction_jobs(store: Any, *, cfg: Any, channel_link: str, message_ids: List[str], force: bool = False) -> None:
+
+def enqueue_extraction_jobs(
+    store: Any,
+    *,
+    cfg: Any,
+    channel_link: str,
+    message_ids: List[str],
+    force: bool = False,
+    raise_on_error: bool = False,
+) -> None:
     if not enqueue_enabled(cfg):
         return
     ids = [str(x).strip() for x in (message_ids or []) if str(x).strip()]
     if not ids:
         return
-    store.enqueue_extractions(channel_link=channel_link, message_ids=ids, pipeline_version=pipeline_version(cfg), force=bool(force))
-
+    pv = pipeline_version(cfg)
+    enqueued = store.enqueue_extractions(
+        channel_link=channel_link, message_ids=ids, pipeline_version=pv, force=bool(force), raise_on_error=bool(raise_on_error)
+    )
+    try:
+        enqueued = int(enqueued or 0)
+    except (TypeError, ValueError):
+        enqueued = 0
+    notify_jobs_enqueued(cfg, pv, enqueued)
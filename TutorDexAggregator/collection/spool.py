@@ -0,0 +1,382 @@
+"""
+Durable local spool between Telegram capture and Supabase.
+
+The tail collector appends every captured raw row (plus whether to enqueue extraction for it) to `RawSpool`, an
+append-only SQLite table in WAL mode, and returns to Telethon immediately. `SpoolDrainer` pushes the spool upstream
+in `seq` order:
+
+- one batch in flight; the batch size halves after a failed push and doubles back after a successful one (down to
+  1, up to `batch_size`), with exponential backoff between failed attempts, so a slow or down Supabase sees less load
+  instead of more
+- a batch is removed from the spool only after its upsert and its extraction enqueue succeeded, so a crash or
+  outage replays it on the next start
+- duplicates are dropped on append by `(channel_link, message_id, edit_date)`; inside a batch, later versions of a
+  message replace earlier ones (an ON CONFLICT upsert cannot touch the same row twice)
+
+Extraction enqueueing rides on the same record and runs after the batch upsert, as the direct path did. A failed
+enqueue fails the push like a failed upsert.
+
+A record that can never be written would block everything behind it, so it is moved to the `dead_letter` table
+(same file) and acked: immediately when its row lacks a required column, or after `dead_letter_after` consecutive
+non-retryable 4xx answers to it alone (batch size 1). Network errors, 5xx, 408 and 429 are always retried.
+
+Deletes are not spooled as rows: `DeleteCoalescer` holds back ids that still have a spooled version
+(`spooled_ids`), so a delete never reaches Supabase before the row it marks. Ids still held at shutdown are parked
+in the same file (`park_deletes`) and picked up again on the next start.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from collection.enqueue import enqueue_extraction_jobs
+from logging_setup import log_event
+from supabase_raw_persist import RAW_REQUIRED_FIELDS
+from observability_metrics import (
+    collector_messages_upserted_total,
+    collector_spool_appends_total,
+    collector_spool_dead_letters_total,
+    collector_spool_depth,
+    collector_spool_drain_batches_total,
+    collector_spool_oldest_age_seconds,
+)
+
+ENQUEUE_NONE = "none"
+ENQUEUE_NORMAL = "normal"
+ENQUEUE_FORCE = "force"
+
+# Upsert answers worth retrying even when they come back for a single record.
+_RETRYABLE_STATUSES = {408, 429}
+
+_SCHEMA = """
+create table if not exists spool (
+  seq integer primary key autoincrement,
+  channel_link text not null,
+  message_id text not null,
+  edit_key text not null,
+  enqueue text not null,
+  row_json text not null,
+  spooled_at real not null,
+  unique (channel_link, message_id, edit_key)
+);
+create table if not exists dead_letter (
+  seq integer primary key,
+  channel_link text not null,
+  message_id text not null,
+  row_json text not null,
+  reason text not null,
+  spooled_at real not null,
+  dead_lettered_at real not null
+);
+create table if not exists parked_deletes (
+  channel_link text not null,
+  message_id text not null,
+  primary key (channel_link, message_id)
+);
+"""
+
+
+@dataclass(frozen=True)
+class SpoolRecord:
+    seq: int
+    channel_link: str
+    message_id: str
+    enqueue: str
+    row: Dict[str, Any]
+    spooled_at: float
+
+
+class RawSpool:
+    """Append-only SQLite (WAL) queue of raw message rows; safe to share between the event loop and a drainer thread."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("pragma journal_mode=wal")
+        # WAL + NORMAL survives process crashes (only an OS crash can lose the last commits) without an fsync per append.
+        self._conn.execute("pragma synchronous=normal")
+        self._conn.executescript(_SCHEMA)
+
+    def append(self, row: Dict[str, Any], *, enqueue: str = ENQUEUE_NONE) -> bool:
+        """Spool one `build_raw_row` row; returns False if this exact version is already spooled."""
+        channel_link = str(row.get("channel_link") or "")
+        message_id = str(row.get("message_id") or "")
+        edit_key = str(row.get("edit_date") or "")
+        with self._lock:
+            cur = self._conn.execute(
+                "insert or ignore into spool (channel_link, message_id, edit_key, enqueue, row_json, spooled_at) values (?, ?, ?, ?, ?, ?)",
+                (channel_link, message_id, edit_key, enqueue, json.dumps(row, ensure_ascii=False), time.time()),
+            )
+            added = cur.rowcount == 1
+            if not added and enqueue == ENQUEUE_FORCE:
+                # Same version seen again but now flagged as an edit: keep the stronger enqueue request.
+                self._conn.execute(
+                    "update spool set enqueue = ? where channel_link = ? and message_id = ? and edit_key = ?",
+                    (ENQUEUE_FORCE, channel_link, message_id, edit_key),
+                )
+        try:
+            collector_spool_appends_total.labels(outcome="spooled" if added else "duplicate").inc()
+        except Exception:
+            # Metrics must never break runtime
+            pass
+        return added
+
+    def peek(self, limit: int) -> List[SpoolRecord]:
+        with self._lock:
+            rows = self._conn.execute(
+                "select seq, channel_link, message_id, enqueue, row_json, spooled_at from spool order by seq limit ?",
+                (max(1, int(limit)),),
+            ).fetchall()
+        return [SpoolRecord(seq=r[0], channel_link=r[1], message_id=r[2], enqueue=r[3], row=json.loads(r[4]), spooled_at=r[5]) for r in rows]
+
+    def ack(self, through_seq: int) -> None:
+        with self._lock:
+            self._conn.execute("delete from spool where seq <= ?", (int(through_seq),))
+
+    def dead_letter(self, record: SpoolRecord, *, reason: str) -> None:
+        """Move one record out of the spool into `dead_letter`, in one transaction."""
+        with self._lock:
+            self._conn.execute("begin")
+            self._conn.execute(
+                "insert or replace into dead_letter (seq, channel_link, message_id, row_json, reason, spooled_at, dead_lettered_at) "
+                "values (?, ?, ?, ?, ?, ?, ?)",
+                (record.seq, record.channel_link, record.message_id, json.dumps(record.row, ensure_ascii=False), reason, record.spooled_at, time.time()),
+            )
+            self._conn.execute("delete from spool where seq = ?", (record.seq,))
+            self._conn.execute("commit")
+
+    def spooled_ids(self, channel_link: str, message_ids: Iterable[str]) -> Set[str]:
+        """The subset of `message_ids` with a version still waiting in the spool."""
+        ids = sorted({str(x) for x in message_ids})
+        found: Set[str] = set()
+        with self._lock:
+            for i in range(0, len(ids), 500):
+                chunk = ids[i : i + 500]
+                rows = self._conn.execute(
+                    f"select distinct message_id from spool where channel_link = ? and message_id in ({','.join('?' * len(chunk))})",
+                    (channel_link, *chunk),
+                ).fetchall()
+                found.update(r[0] for r in rows)
+        return found
+
+    def park_deletes(self, pending: Dict[str, Set[str]]) -> int:
+        rows = [(channel_link, str(mid)) for channel_link, ids in pending.items() for mid in ids]
+        with self._lock:
+            self._conn.executemany("insert or ignore into parked_deletes (channel_link, message_id) values (?, ?)", rows)
+        return len(rows)
+
+    def take_parked_deletes(self) -> Dict[str, Set[str]]:
+        with self._lock:
+            self._conn.execute("begin")
+            rows = self._conn.execute("select channel_link, message_id from parked_deletes").fetchall()
+            self._conn.execute("delete from parked_deletes")
+            self._conn.execute("commit")
+        out: Dict[str, Set[str]] = {}
+        for channel_link, message_id in rows:
+            out.setdefault(channel_link, set()).add(message_id)
+        return out
+
+    def stats(self) -> Tuple[int, Optional[float]]:
+        """(depth, spooled_at of the oldest record)."""
+        with self._lock:
+            depth, oldest = self._conn.execute("select count(*), min(spooled_at) from spool").fetchone()
+        return int(depth or 0), oldest
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def collapse_batch(records: List[SpoolRecord]) -> Tuple[List[Dict[str, Any]], Dict[Tuple[str, bool], List[str]]]:
+    """
+    Rows to upsert (latest spooled version per message, in first-seen order) and message ids to enqueue, keyed by
+    (channel_link, force).
+    """
+    latest: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    enqueue: Dict[Tuple[str, str], str] = {}
+    for rec in records:
+        key = (rec.channel_link, rec.message_id)
+        latest[key] = rec.row
+        if rec.enqueue == ENQUEUE_FORCE or (rec.enqueue == ENQUEUE_NORMAL and enqueue.get(key) != ENQUEUE_FORCE):
+            enqueue[key] = rec.enqueue
+    jobs: Dict[Tuple[str, bool], List[str]] = {}
+    for (channel_link, message_id), mode in enqueue.items():
+        jobs.setdefault((channel_link, mode == ENQUEUE_FORCE), []).append(message_id)
+    return list(latest.values()), jobs
+
+
+class SpoolDrainer:
+    def __init__(
+        self,
+        spool: RawSpool,
+        store: Any,
+        *,
+        cfg: Any,
+        version: Any,
+        batch_size: int = 200,
+        idle_s: float = 0.5,
+        max_backoff_s: float = 60.0,
+        dead_letter_after: int = 3,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.spool = spool
+        self.store = store
+        self.cfg = cfg
+        self.version = version
+        self.max_batch = max(1, int(batch_size))
+        self.batch = self.max_batch
+        self.idle_s = max(0.01, float(idle_s))
+        self.max_backoff_s = max(0.01, float(max_backoff_s))
+        self.logger = logger or logging.getLogger("collector")
+        self.dead_letter_after = max(1, int(dead_letter_after))
+        self.failures = 0
+        self._rejections = 0
+        self._wake = asyncio.Event()
+        self._closed = False
+        self._task: Optional[asyncio.Task] = None
+
+    def notify(self) -> None:
+        """Called after an append so an idle drainer picks the record up without waiting out `idle_s`."""
+        self._wake.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while not self._closed:
+            pushed = await self.drain_once()
+            if pushed > 0:
+                continue
+            if pushed < 0:
+                delay = min(self.max_backoff_s, 0.5 * (2 ** min(self.failures, 16)))
+            else:
+                delay = self.idle_s
+            try:
+                await asyncio.wait_for(self._wake.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def drain_once(self) -> int:
+        """Push the next batch; returns records drained, 0 if the spool is empty, -1 if the push failed."""
+        records = await asyncio.to_thread(self.spool.peek, self.batch)
+        if not records:
+            self._publish()
+            return 0
+        valid = []
+        for rec in records:
+            if any(rec.row.get(k) is None for k in RAW_REQUIRED_FIELDS):
+                await asyncio.to_thread(self._dead_letter, rec, "invalid_row")
+            else:
+                valid.append(rec)
+        if not valid:
+            self._publish()
+            return len(records)
+        try:
+            ok = await asyncio.to_thread(self._push, valid)
+        except Exception as e:
+            log_event(self.logger, logging.WARNING, "raw_spool_drain_error", error=str(e), batch=self.batch)
+            ok = False
+        if not ok:
+            status = getattr(self.store, "last_upsert_status", None)
+            if len(valid) == 1 and status is not None and 400 <= status < 500 and status not in _RETRYABLE_STATUSES:
+                self._rejections += 1
+                if self._rejections >= self.dead_letter_after:
+                    await asyncio.to_thread(self._dead_letter, valid[0], "rejected", status)
+                    self._rejections = 0
+                    self.failures = 0
+                    self._publish()
+                    return 1
+            else:
+                self._rejections = 0
+            self._publish()
+            self.failures += 1
+            self.batch = max(1, self.batch // 2)
+            return -1
+        await asyncio.to_thread(self.spool.ack, valid[-1].seq)
+        self.failures = 0
+        self._rejections = 0
+        self.batch = min(self.max_batch, self.batch * 2)
+        self._publish()
+        return len(records)
+
+    def _dead_letter(self, record: SpoolRecord, reason: str, status: Optional[int] = None) -> None:
+        self.spool.dead_letter(record, reason=reason)
+        log_event(
+            self.logger,
+            logging.ERROR,
+            "raw_spool_dead_letter",
+            reason=reason,
+            status_code=status,
+            channel=record.channel_link,
+            message_id=record.message_id,
+            seq=record.seq,
+        )
+        try:
+            collector_spool_dead_letters_total.labels(reason=reason).inc()
+        except Exception:
+            # Metrics must never break runtime
+            pass
+
+    def _push(self, records: List[SpoolRecord]) -> bool:
+        rows, jobs = collapse_batch(records)
+        attempted, ok_rows = self.store.upsert_messages_batch(rows=rows)
+        if ok_rows < attempted and self.store.enabled():
+            log_event(self.logger, logging.WARNING, "raw_spool_drain_failed", attempted=attempted, ok_rows=ok_rows, batch=self.batch, failures=self.failures + 1)
+            try:
+                collector_spool_drain_batches_total.labels(outcome="failed").inc()
+            except Exception:
+                # Metrics must never break runtime
+                pass
+            return False
+        if ok_rows:
+            # Raises on a failed enqueue RPC: the batch stays spooled and the retry re-upserts (idempotent) and
+            # re-enqueues it, so an extraction job is never lost to a Supabase blip.
+            for (channel_link, force), message_ids in jobs.items():
+                enqueue_extraction_jobs(self.store, cfg=self.cfg, channel_link=channel_link, message_ids=message_ids, force=force, raise_on_error=True)
+        try:
+            collector_spool_drain_batches_total.labels(outcome="ok").inc()
+            if ok_rows:
+                per_channel: Dict[str, int] = {}
+                for r in rows:
+                    per_channel[r["channel_link"]] = per_channel.get(r["channel_link"], 0) + 1
+                for channel_link, n in per_channel.items():
+                    collector_messages_upserted_total.labels(
+                        channel=channel_link, pipeline_version=self.version.pipeline_version, schema_version=self.version.schema_version
+                    ).inc(n)
+        except Exception:
+            # Metrics must never break runtime
+            pass
+        return True
+
+    def _publish(self) -> None:
+        try:
+            depth, oldest = self.spool.stats()
+            collector_spool_depth.set(depth)
+            collector_spool_oldest_age_seconds.set(max(0.0, time.time() - oldest) if oldest is not None else 0.0)
+        except Exception:
+            # Metrics must never break runtime
+            pass
+
+    async def close(self, *, timeout_s: float = 10.0) -> None:
+        """Stop the loop and make a bounded last attempt to drain; anything left stays spooled for the next start."""
+        self._closed = True
+        self._wake.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        deadline = time.monotonic() + max(0.0, float(timeout_s))
+        while time.monotonic() < deadline:
+            if await self.drain_once() <= 0:
+                break
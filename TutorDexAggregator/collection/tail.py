@@ -5,6 +5,7 @@ import asyncio
 import logging
 import os
 from datetime import datetime, timezone
+from pathlib import Path
 from typing import Any, Dict, List
 
 from telethon import events
@@ -12,8 +13,10 @@ from telethon import events
 from collection.backoff import retry_with_backoff
 from collection.channels import channel_link_from_entity, normalize_channel_ref, parse_channels_arg, parse_channels_from_env
 from collection.config import MissingTelegramCredentials, build_client, enqueue_enabled, pipeline_version
+from collection.backfill_scheduler import CheckpointWriter
 from collection.counters import Counters
-from collection.enqueue import enqueue_extraction_jobs
+from collection.deletes import DeleteCoalescer
+from collection.spool import ENQUEUE_FORCE, ENQUEUE_NORMAL, RawSpool, SpoolDrainer
 from collection.types import CollectorContext
 from collection.utils import iso, truthy, utc_now
 from logging_setup import bind_log_context, log_event
@@ -22,7 +25,6 @@ from observability_metrics import (
     collector_errors_total,
     collector_last_message_timestamp_seconds,
     collector_messages_seen_total,
-    collector_messages_upserted_total,
 )
 from supabase_raw_persist import SupabaseRawStore, build_raw_row
 
@@ -80,6 +82,25 @@ async def run_tail(ctx: CollectorContext, args: argparse.Namespace) -> int:
         )
 
     counts: Dict[str, Counters] = {}
+    spool_path = Path(str(ctx.cfg.collector_spool_path or "state/collector_spool.sqlite3"))
+    spool = RawSpool(spool_path if spool_path.is_absolute() else ctx.here / spool_path)
+    drainer = SpoolDrainer(
+        spool,
+        store,
+        cfg=ctx.cfg,
+        version=ctx.version,
+        batch_size=int(ctx.cfg.collector_spool_batch_size or 200),
+        max_backoff_s=float(ctx.cfg.collector_spool_max_backoff_seconds or 60.0),
+        logger=ctx.logger,
+    )
+    progress = CheckpointWriter(store, run_id=run_id)
+    deletes = DeleteCoalescer(
+        store,
+        spool=spool,
+        flush_interval_s=float(ctx.cfg.collector_delete_flush_seconds or 1.0),
+        max_pending=int(ctx.cfg.collector_delete_batch_size or 500),
+        logger=ctx.logger,
+    )
 
     def _get_counter(channel_link: str) -> Counters:
         c = counts.get(channel_link)
@@ -122,31 +143,24 @@ async def run_tail(ctx: CollectorContext, args: argparse.Namespace) -> int:
                     pass
                 row = build_raw_row(channel_link=channel_link, channel_id=channel_id, msg=msg)
                 if row:
-                    _, ok_rows = store.upsert_messages_batch(rows=[row])
-                    counter.written += ok_rows
-                    if ok_rows:
-                        try:
-                            collector_messages_upserted_total.labels(
-                                channel=channel_link, pipeline_version=ctx.version.pipeline_version, schema_version=ctx.version.schema_version
-                            ).inc(ok_rows)
-                        except Exception:
-                            # Metrics must never break runtime
-                            pass
-                        enqueue_extraction_jobs(store, cfg=ctx.cfg, channel_link=channel_link, message_ids=[str(getattr(msg, "id", ""))], force=False)
+                    # Local append only; the drainer upserts and enqueues (capture never waits on Supabase).
+                    spool.append(row, enqueue=ENQUEUE_NORMAL)
+                    drainer.notify()
                     dt = getattr(msg, "date", None)
                     if isinstance(dt, datetime):
                         counter.last_message_date_iso = iso(dt)
                     counter.last_message_id = str(getattr(msg, "id", "") or "") or counter.last_message_id
 
-                store.upsert_progress(
-                    run_id=run_id,
-                    channel_link=channel_link,
-                    last_message_id=counter.last_message_id,
-                    last_message_date_iso=counter.last_message_date_iso,
-                    scanned=counter.scanned,
-                    inserted=0,
-                    updated=0,
-                    errors=counter.errors,
+                progress.submit(
+                    {
+                        "channel_link": channel_link,
+                        "last_message_id": counter.last_message_id,
+                        "last_message_date_iso": counter.last_message_date_iso,
+                        "scanned": counter.scanned,
+                        "inserted": 0,
+                        "updated": 0,
+                        "errors": counter.errors,
+                    }
                 )
             except Exception as e:
                 counter.errors += 1
@@ -178,17 +192,8 @@ async def run_tail(ctx: CollectorContext, args: argparse.Namespace) -> int:
             try:
                 row = build_raw_row(channel_link=channel_link, channel_id=channel_id, msg=msg)
                 if row:
-                    _, ok_rows = store.upsert_messages_batch(rows=[row])
-                    counter.written += ok_rows
-                    if ok_rows:
-                        try:
-                            collector_messages_upserted_total.labels(
-                                channel=channel_link, pipeline_version=ctx.version.pipeline_version, schema_version=ctx.version.schema_version
-                            ).inc(ok_rows)
-                        except Exception:
-                            # Metrics must never break runtime
-                            pass
-                        enqueue_extraction_jobs(store, cfg=ctx.cfg, channel_link=channel_link, message_ids=[str(getattr(msg, "id", ""))], force=True)
+                    spool.append(row, enqueue=ENQUEUE_FORCE)
+                    drainer.notify()
                 log_event(ctx.logger, logging.DEBUG, "raw_tail_edit_ok")
             except Exception as e:
                 counter.errors += 1
@@ -214,8 +219,7 @@ async def run_tail(ctx: CollectorContext, args: argparse.Namespace) -> int:
             schema_version=ctx.version.schema_version,
         ):
             try:
-                patched = store.mark_deleted(channel_link=channel_link, message_ids=ids)
-                log_event(ctx.logger, logging.DEBUG, "raw_tail_delete_ok", ids=len(ids), patched=patched)
+                deletes.add(channel_link, ids)
             except Exception as e:
                 try:
                     collector_errors_total.labels(
@@ -237,10 +241,19 @@ async def run_tail(ctx: CollectorContext, args: argparse.Namespace) -> int:
         pipeline_version=pipeline_version(ctx.cfg),
         queue_rpc_sql="supabase sqls/2025-12-22_extraction_queue_rpc.sql",
     )
+    # Records left over from a previous run (outage, crash) drain first, in capture order.
+    drainer.start()
+    progress.start()
+    deletes.start()
     try:
         await client.run_until_disconnected()
         return 0
     finally:
+        # Drain first so deletes held for spooled rows can go out; whatever is still held gets parked.
+        await drainer.close()
+        await deletes.close()
+        await progress.close()
+        spool.close()
         meta = dict(base_meta)
         meta.update({"stopped_at": utc_now().isoformat()})
         store.finish_run(run_id=run_id, status="cancelled", meta_patch=meta)
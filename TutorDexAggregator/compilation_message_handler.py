@@ -20,8 +20,6 @@ from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-import requests
-
 try:
     from compilation_extractor import extract_assignment_codes
 except Exception:  # pragma: no cover
@@ -112,6 +110,12 @@ def extract_json_object(text: str) -> Dict[str, Any]:
 
 
 def _chat_completion(*, model_name: str, user_content: str, cid: Optional[str], channel: Optional[str]) -> str:
+    # Imported lazily: the pool pulls in the metrics registry, which only the worker process needs.
+    try:
+        from llm_endpoint_pool import llm_endpoint_pool
+    except Exception:  # pragma: no cover
+        from TutorDexAggregator.llm_endpoint_pool import llm_endpoint_pool
+
     url = f"{_llm_api_url()}/v1/chat/completions"
     messages: List[Dict[str, str]] = [
         {"role": "system", "content": ""},
@@ -122,7 +126,7 @@ def _chat_completion(*, model_name: str, user_content: str, cid: Optional[str],
     with bind_log_context(cid=str(cid) if cid else None, channel=channel or None, step="llm_assignment_code_extract"):
         log_event(logger, logging.INFO, "llm_call_start", model=model_name, url=url, user_chars=len(user_content or ""))
         t0 = timed()
-        resp = requests.post(url, json=payload, timeout=_llm_timeout_seconds())
+        resp = llm_endpoint_pool(_CFG).post("/v1/chat/completions", json=payload, timeout=_llm_timeout_seconds())
         elapsed_ms = round((timed() - t0) * 1000.0, 2)
         if resp.status_code >= 400:
             body = (resp.text or "")[:400]
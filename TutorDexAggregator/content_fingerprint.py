@@ -0,0 +1,101 @@
+"""
+Content fingerprints for raw Telegram messages.
+
+Agencies edit posts constantly without changing the assignment: emoji, "bump" lines, spacing, "TAKEN"/"CLOSED"
+toggles. Two hashes are stored on `telegram_messages_raw` (and copied onto `telegram_extractions` when a job is
+enqueued) so `enqueue_telegram_extractions_fingerprinted` can tell edits apart without an LLM call:
+
+- `content_hash`: the text after `normalize_text`, NFKC + casefold, with emoji/symbols, bump-only lines and
+  whitespace differences removed. Equal hashes mean the edit changed nothing an extraction would see.
+- `body_hash`: the same, with status markers also removed (status lines like "Status: Closed", bracketed or
+  upper-case TAKEN/CLOSED/FILLED tags). Equal body hashes with different content hashes mean a status-only edit.
+
+Both hashes carry `FINGERPRINT_VERSION`; changing the normalization must bump it so old hashes stop matching.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import unicodedata
+from typing import Any, Optional, Tuple
+
+try:
+    from normalize import normalize_text  # type: ignore
+except Exception:
+    from TutorDexAggregator.normalize import normalize_text  # type: ignore
+
+FINGERPRINT_VERSION = "v1"
+
+_CLOSED_WORDS = ("taken", "closed", "filled", "expired")
+_OPEN_WORDS = ("open", "available", "reopened")
+_STATUS_WORDS = "|".join(_CLOSED_WORDS + _OPEN_WORDS)
+
+# Whole lines that only carry a status: "TAKEN", "Assignment closed", "Application Status: Open", "New assignment".
+_STATUS_LINE_RE = re.compile(
+    rf"^(?:(?:assignment|application|job)\s+)?(?:status\s*:?\s*)?(?:{_STATUS_WORDS})(?:\s+(?:assignment|already))?$|^new\s+assignment$"
+)
+# Status tags inside a line: "[TAKEN]", "(closed)", "【Filled】".
+_STATUS_TAG_RE = re.compile(rf"[\[(【]\s*(?:{_STATUS_WORDS})\s*[\])】]", re.IGNORECASE)
+# Upper-case status words are tags in practice ("❌ TAKEN ❌ Job 123"); matched before casefolding.
+_STATUS_CAPS_RE = re.compile(r"\b(?:TAKEN|CLOSED|FILLED|EXPIRED|AVAILABLE)\b")
+_CLOSED_RE = re.compile(rf"\b(?:{'|'.join(_CLOSED_WORDS)})\b")
+_BUMP_LINE_RE = re.compile(r"^(?:bump(?:ed)?|up|re-?post(?:ed)?|updated?)$")
+_SPACE_RE = re.compile(r"\s+")
+_EDGE_PUNCT_RE = re.compile(r"^[^\w]+|[^\w]+$")
+_NOISE_CATEGORIES = {"So", "Sk", "Cf", "Cs", "Co", "Cn"}
+
+
+def _strip_noise(text: str) -> str:
+    return "".join(ch for ch in text if unicodedata.category(ch) not in _NOISE_CATEGORIES)
+
+
+def _lines(raw_text: Any, *, drop_status: bool) -> Tuple[str, ...]:
+    text = unicodedata.normalize("NFKC", normalize_text(str(raw_text or "")))
+    if drop_status:
+        text = _STATUS_TAG_RE.sub(" ", text)
+        text = _STATUS_CAPS_RE.sub(" ", text)
+    out = []
+    for line in _strip_noise(text).casefold().split("\n"):
+        line = _SPACE_RE.sub(" ", line).strip()
+        bare = _EDGE_PUNCT_RE.sub("", line)
+        if not bare or _BUMP_LINE_RE.match(bare):
+            continue
+        if drop_status and _STATUS_LINE_RE.match(bare):
+            continue
+        out.append(line)
+    return tuple(out)
+
+
+def _digest(lines: Tuple[str, ...]) -> str:
+    return hashlib.sha256(("\n".join((FINGERPRINT_VERSION,) + lines)).encode("utf-8")).hexdigest()
+
+
+def content_fingerprints(raw_text: Any) -> Tuple[str, str]:
+    """(content_hash, body_hash) of a raw message text."""
+    return _digest(_lines(raw_text, drop_status=False)), _digest(_lines(raw_text, drop_status=True))
+
+
+def edit_status(raw_text: Any, *, channel_link: Any = None) -> Optional[str]:
+    """
+    Status carried by a status-only edit: "closed", "open", or None when the text carries no closing marker.
+
+    Allowlisted agencies use their explicit status rules (`extractors.status_detector`), which can say "open";
+    elsewhere any closing word on a status line or tag means closed. A missing marker is not "open": the assignment
+    may have been closed by expiry or by hand, so the caller decides whether a marker was actually removed.
+    """
+    try:
+        from extractors.status_detector import detect_status  # type: ignore
+    except Exception:
+        from TutorDexAggregator.extractors.status_detector import detect_status  # type: ignore
+
+    det = detect_status(raw_text=raw_text, channel_link=channel_link)
+    if det is not None:
+        return det.status
+    text = unicodedata.normalize("NFKC", normalize_text(str(raw_text or "")))
+    markers = [m.group(0) for m in _STATUS_TAG_RE.finditer(text)] + _STATUS_CAPS_RE.findall(text)
+    for line in _strip_noise(text).casefold().split("\n"):
+        bare = _EDGE_PUNCT_RE.sub("", _SPACE_RE.sub(" ", line).strip())
+        if bare and _STATUS_LINE_RE.match(bare):
+            markers.append(bare)
+    return "closed" if any(_CLOSED_RE.search(m.casefold()) for m in markers) else None
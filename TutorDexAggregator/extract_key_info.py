@@ -1,12 +1,15 @@
 import json
 import hashlib
-import requests
+import re
 from pathlib import Path
 from functools import lru_cache
-from typing import Optional
+from typing import Optional, Tuple
 import logging
 
+from extraction_output_schema import CONSTRAINT_OFF, JsonObjectStream, constraint_payload, normalize_constraint_mode, schema_max_tokens
+from llm_endpoint_pool import llm_endpoint_pool
 from logging_setup import bind_log_context, log_event, setup_logging, timed
+from observability_metrics import worker_llm_completion_tokens, worker_llm_output_total, worker_llm_stream_early_stops_total
 from agency_registry import get_agency_examples_key
 from shared.config import load_aggregator_config
 from shared.observability.exception_handler import swallow_exception
@@ -15,11 +18,9 @@ setup_logging()
 logger = logging.getLogger("extract_key_info")
 _CFG = load_aggregator_config()
 
-# Reuse HTTP sessions for better throughput (keep-alive) when doing large backfills.
-_LLM_SESSION = requests.Session()
-
 # No local model fallback: require a local LLM HTTP API (LM Studio / Mixtral).
-# Configure the endpoint via the LLM_API_URL environment variable (e.g. http://127.0.0.1:7860/api/generate)
+# Configure the endpoint via the LLM_API_URL environment variable (e.g. http://127.0.0.1:7860/api/generate),
+# or several via LLM_API_URLS; calls go through the shared keep-alive endpoint pool (llm_endpoint_pool.py).
 
 # Default to the Mixtral instruct model you installed in LM Studio
 MODEL_NAME = "lfm2-8b-a1b"
@@ -457,6 +458,120 @@ def extract_preferred_json_object(text: str) -> str:
     return extract_first_json_object(s)
 
 
+# -----------------------------
+# Constrained decoding / streaming
+# -----------------------------
+
+_CONSTRAINT_REJECTED_STATUSES = {400, 422}
+# A rejection only disables the constraint when the error names the constraint field and says it is not accepted;
+# any other 400/422 (context length, bad model name, ...) is a failure of that one request.
+_CONSTRAINT_FIELD_RE = re.compile(r"response_format|json_schema|grammar|guided_|structured output", re.IGNORECASE)
+_CONSTRAINT_UNSUPPORTED_RE = re.compile(
+    r"not (?:supported|allowed|implemented|permitted)|unsupported|unknown|unrecognized|unexpected|extra (?:fields|inputs)|does not support|invalid",
+    re.IGNORECASE,
+)
+_constraint_disabled: set = set()
+
+
+def _output_constraint() -> str:
+    mode = normalize_constraint_mode(getattr(_CFG, "llm_output_constraint", None))
+    return CONSTRAINT_OFF if mode in _constraint_disabled else mode
+
+
+def _constraint_unsupported(status_code: int, body: str) -> bool:
+    return status_code in _CONSTRAINT_REJECTED_STATUSES and bool(_CONSTRAINT_FIELD_RE.search(body)) and bool(_CONSTRAINT_UNSUPPORTED_RE.search(body))
+
+
+def _disable_output_constraint(mode: str, *, status_code: int, body: str) -> None:
+    _constraint_disabled.add(mode)
+    log_event(logger, logging.WARNING, "llm_output_constraint_unsupported", constraint=mode, status_code=status_code, body=body[:400])
+
+
+def _response_text(data: dict) -> Optional[str]:
+    text = None
+    choices = data.get("choices", [])
+    if choices:
+        msg = choices[0].get("message", {})
+        text = msg.get("content") or msg.get("text")
+    if not text and data.get("outputs"):
+        out = data["outputs"]
+        if isinstance(out, list) and len(out) > 0 and "content" in out[0]:
+            parts = out[0]["content"]
+            if isinstance(parts, list) and len(parts) > 0:
+                text = "".join([c.get("text", "") for c in parts if isinstance(c, dict)])
+    return text
+
+
+def _read_stream(r) -> Tuple[str, dict]:
+    """Consume an OpenAI-style SSE stream until the answer's JSON object closes (or the stream ends)."""
+    scanner = JsonObjectStream()
+    chunks = 0
+    usage_tokens = None
+    for raw_line in r.iter_lines(decode_unicode=True):
+        line = (raw_line or "").strip()
+        if not line.startswith("data:"):
+            continue
+        body = line[len("data:"):].strip()
+        if body == "[DONE]":
+            break
+        try:
+            event = json.loads(body)
+        except Exception:
+            continue
+        usage = event.get("usage") if isinstance(event, dict) else None
+        if isinstance(usage, dict) and usage.get("completion_tokens") is not None:
+            usage_tokens = int(usage["completion_tokens"])
+        choices = event.get("choices") if isinstance(event, dict) else None
+        if not choices:
+            continue
+        delta = choices[0].get("delta") or {}
+        piece = delta.get("content") or ""
+        if not piece:
+            continue
+        chunks += 1
+        if scanner.feed(piece):
+            break
+    stats = {"streamed": True, "early_stop": scanner.closed, "completion_tokens": usage_tokens if usage_tokens is not None else chunks}
+    return scanner.answer(), stats
+
+
+def _request_completion(payload: dict, *, timeout_s: int, stream: bool) -> Tuple[int, dict, Optional[str], dict]:
+    """POST one chat completion; returns (status_code, response data, text, stats). Error bodies land in `data["_body"]`."""
+    pool = llm_endpoint_pool(_CFG)
+    if stream:
+        with pool.stream("/v1/chat/completions", json={**payload, "stream": True}, timeout=timeout_s) as r:
+            if r.status_code >= 400:
+                return r.status_code, {"_body": r.text}, None, {}
+            text, stats = _read_stream(r)
+            return r.status_code, {"_streamed": True}, text, stats
+    r = pool.post("/v1/chat/completions", json=payload, timeout=timeout_s)
+    if r.status_code >= 400:
+        return r.status_code, {"_body": r.text}, None, {}
+    data = r.json()
+    usage = data.get("usage") if isinstance(data, dict) else None
+    tokens = usage.get("completion_tokens") if isinstance(usage, dict) else None
+    return r.status_code, data, _response_text(data), {"streamed": False, "completion_tokens": tokens}
+
+
+def _observe_completion(constraint: str, stats: dict) -> None:
+    try:
+        if stats.get("completion_tokens") is not None:
+            worker_llm_completion_tokens.labels(constraint=constraint).observe(float(stats["completion_tokens"]))
+        if stats.get("early_stop"):
+            worker_llm_stream_early_stops_total.inc()
+    except Exception:
+        # Metrics must never break runtime
+        pass
+
+
+def _count_output(constraint: str, outcome: str) -> None:
+    try:
+        worker_llm_output_total.labels(constraint=constraint, outcome=outcome).inc()
+    except Exception:
+        # Metrics must never break runtime
+        pass
+
+
 def extract_assignment_with_model(message: str, chat: str = "", model_name: str = MODEL_NAME, max_tokens: Optional[int] = None, temp=0.0, cid: Optional[str] = None):
     """
     Generate extraction JSON by calling LM Studio/Mixtral using chat format
@@ -470,7 +585,6 @@ def extract_assignment_with_model(message: str, chat: str = "", model_name: str
         temp: Temperature for generation
     """
 
-    llm_api = str(_CFG.llm_api_url or "http://localhost:1234")
     model_name_env = str(_CFG.llm_model_name or model_name)
     timeout_s = int(_CFG.llm_timeout_seconds or 200)
     max_tokens_resolved = int(max_tokens if max_tokens is not None else (_CFG.llm_max_tokens or 6144))
@@ -508,6 +622,11 @@ def extract_assignment_with_model(message: str, chat: str = "", model_name: str
             "temperature": float(temp),
             "max_tokens": max_tokens_resolved,
         }
+        constraint = _output_constraint()
+        if constraint != CONSTRAINT_OFF:
+            payload.update(constraint_payload(constraint))
+            if max_tokens is None:
+                payload["max_tokens"] = schema_max_tokens(message, ceiling=max_tokens_resolved)
 
         mock_path = str(_CFG.llm_mock_output_file or "").strip()
         if mock_path:
@@ -518,36 +637,38 @@ def extract_assignment_with_model(message: str, chat: str = "", model_name: str
             log_event(logger, logging.WARNING, "llm_extract_mocked", file=str(p), chars=len(text))
             data = {"_mocked": True}
         else:
-            url = f"{llm_api.rstrip('/')}/v1/chat/completions"
+            stream = bool(_CFG.llm_stream)
             try:
                 t0 = timed()
-                r = _LLM_SESSION.post(url, json=payload, timeout=timeout_s)
-                r.raise_for_status()
-                data = r.json()
+                status_code, data, text, stats = _request_completion(payload, timeout_s=timeout_s, stream=stream)
+                body = str(data.get("_body") or "")
+                if constraint != CONSTRAINT_OFF and _constraint_unsupported(status_code, body):
+                    # Backend does not accept the schema/grammar: fall back to free-form output for this process.
+                    _disable_output_constraint(constraint, status_code=status_code, body=body)
+                    constraint = CONSTRAINT_OFF
+                    payload = {k: v for k, v in payload.items() if k not in {"response_format", "grammar"}}
+                    payload["max_tokens"] = max_tokens_resolved
+                    status_code, data, text, stats = _request_completion(payload, timeout_s=timeout_s, stream=stream)
+                if status_code >= 400:
+                    raise RuntimeError(f"LLM API error status={status_code} body={str(data.get('_body') or '')[:400]}")
                 log_event(
                     logger,
                     logging.INFO,
                     "llm_extract_ok",
-                    status_code=getattr(r, "status_code", None),
+                    status_code=status_code,
                     elapsed_ms=round((timed() - t0) * 1000.0, 2),
+                    constraint=constraint,
+                    max_tokens=payload.get("max_tokens"),
+                    **stats,
                 )
+                _observe_completion(constraint, stats)
             except Exception as e:
                 logger.exception("llm_extract_failed error=%s", e)
                 raise RuntimeError(f"LLM API call failed: {e}")
 
-            text = None
             try:
-                choices = data.get("choices", [])
-                if choices:
-                    msg = choices[0].get("message", {})
-                    text = msg.get("content") or msg.get("text")
-                if not text and data.get("outputs"):
-                    out = data["outputs"]
-                    if isinstance(out, list) and len(out) > 0 and "content" in out[0]:
-                        parts = out[0]["content"]
-                        if isinstance(parts, list) and len(parts) > 0:
-                            text = "".join([c.get("text", "") for c in parts if isinstance(c, dict)])
                 if not text:
+                    _count_output(constraint, "no_text")
                     try:
                         response_preview = json.dumps(data, ensure_ascii=False, sort_keys=True)[:2000]
                     except Exception:
@@ -566,11 +687,18 @@ def extract_assignment_with_model(message: str, chat: str = "", model_name: str
                 raise RuntimeError(f"Failed to parse LLM response: {e}")
 
         text = text.strip().strip("```")
-        candidate = extract_preferred_json_object(text).replace("\\_", "_")
+        try:
+            candidate = extract_preferred_json_object(text).replace("\\_", "_")
+        except Exception:
+            if not mock_path:
+                _count_output(constraint, "invalid_json")
+            raise
 
         try:
             parsed = safe_parse_json(candidate)
         except Exception as e:
+            if not mock_path:
+                _count_output(constraint, "invalid_json")
             # Include error message to avoid losing the useful snippet from safe_parse_json.
             log_event(
                 logger,
@@ -589,6 +717,9 @@ def extract_assignment_with_model(message: str, chat: str = "", model_name: str
                 },
             ) from e
 
+        if not mock_path:
+            _count_output(constraint, "parsed")
+
         # NOTE: Legacy `validator.py` post-processor removed. Hardening happens in:
         # - `hard_validator.py` (null/drop invariants)
         # - deterministic extractors (e.g., `extractors/time_availability.py`)
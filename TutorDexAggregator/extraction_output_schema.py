@@ -0,0 +1,276 @@
+"""
+Output contract for the extraction LLM call, in machine-readable form.
+
+`ASSIGNMENT_OUTPUT_SCHEMA` mirrors the "OUTPUT SCHEMA (JSON)" block of `prompts/system_prompt_live.txt` (same keys,
+same order, every key required). It drives:
+
+- constrained decoding (`LLM_OUTPUT_CONSTRAINT`):
+  - `json_schema`: OpenAI-style `response_format` (llama.cpp server, LM Studio, vLLM)
+  - `gbnf`: a llama.cpp `grammar` string generated from the same schema (servers without JSON-schema support)
+- `schema_max_tokens`: a completion budget sized to the message instead of the global `LLM_MAX_TOKENS`
+- `JsonObjectStream`: detects when a streamed answer's top-level object has closed so the client can stop reading
+
+String/array caps are generous (well above anything in `message_examples/`); they bound the grammar, not the data.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+CONSTRAINT_OFF = "off"
+CONSTRAINT_JSON_SCHEMA = "json_schema"
+CONSTRAINT_GBNF = "gbnf"
+CONSTRAINT_MODES = (CONSTRAINT_OFF, CONSTRAINT_JSON_SCHEMA, CONSTRAINT_GBNF)
+
+# Conservative: JSON punctuation and short snippets tokenize worse than prose.
+CHARS_PER_TOKEN = 2.5
+# Verbatim fields overlap (academic text vs remarks, address vs remarks), so allow twice the message.
+MESSAGE_COPY_FACTOR = 2.0
+MAX_TOKENS_MARGIN = 64
+
+
+def _nullable_str(max_length: int) -> Dict[str, Any]:
+    return {"type": ["string", "null"], "maxLength": int(max_length)}
+
+
+def _nullable_str_list(max_items: int, max_length: int) -> Dict[str, Any]:
+    return {"type": ["array", "null"], "items": {"type": "string", "maxLength": int(max_length)}, "maxItems": int(max_items)}
+
+
+def _object(properties: Dict[str, Any]) -> Dict[str, Any]:
+    return {"type": "object", "properties": properties, "required": list(properties), "additionalProperties": False}
+
+
+ASSIGNMENT_OUTPUT_SCHEMA: Dict[str, Any] = _object(
+    {
+        "assignment_code": _nullable_str(64),
+        "academic_display_text": _nullable_str(300),
+        "learning_mode": _object(
+            {
+                "mode": {"enum": ["Online", "Face-to-Face", "Hybrid", None]},
+                "raw_text": _nullable_str(200),
+            }
+        ),
+        "address": _nullable_str_list(6, 200),
+        "postal_code": _nullable_str_list(6, 16),
+        "nearest_mrt": _nullable_str_list(6, 80),
+        "lesson_schedule": _nullable_str_list(6, 200),
+        "start_date": _nullable_str(120),
+        "rate": _object(
+            {
+                "min": {"type": ["number", "null"]},
+                "max": {"type": ["number", "null"]},
+                "raw_text": _nullable_str(200),
+            }
+        ),
+        "additional_remarks": _nullable_str(1500),
+    }
+)
+
+
+def normalize_constraint_mode(value: Any) -> str:
+    mode = str(value or "").strip().lower().replace("-", "_")
+    if mode in {"", "0", "false", "none", "no"}:
+        return CONSTRAINT_OFF
+    if mode in {"grammar", "gbnf"}:
+        return CONSTRAINT_GBNF
+    if mode in {"1", "true", "yes", "json", "json_schema", "schema"}:
+        return CONSTRAINT_JSON_SCHEMA
+    return CONSTRAINT_OFF
+
+
+def _types(schema: Dict[str, Any]) -> List[str]:
+    t = schema.get("type")
+    if isinstance(t, list):
+        return [str(x) for x in t]
+    return [str(t)] if t else []
+
+
+# ----------------------------
+# max_tokens
+# ----------------------------
+def _budget(schema: Dict[str, Any]) -> Tuple[int, int]:
+    """(structural chars, max string-content chars) for the largest output `schema` admits."""
+    if "enum" in schema:
+        return max(len(json.dumps(v)) for v in schema["enum"]), 0
+    types = _types(schema)
+    if "object" in types:
+        struct, content = 2, 0
+        for key, sub in schema.get("properties", {}).items():
+            s, c = _budget(sub)
+            struct += len(json.dumps(key)) + 4 + s  # `"key": ` + value + `,\n`
+            content += c
+        return struct, content
+    if "array" in types:
+        n = int(schema.get("maxItems") or 0)
+        s, c = _budget(schema.get("items") or {})
+        return 2 + n * (s + 2), n * c
+    if "string" in types:
+        return 2, int(schema.get("maxLength") or 0)
+    if "number" in types or "integer" in types:
+        return 12, 0
+    return 5, 0
+
+
+def schema_max_tokens(message: str, *, schema: Optional[Dict[str, Any]] = None, ceiling: Optional[int] = None) -> int:
+    """
+    Completion budget for one extraction: the schema's full skeleton plus string content bounded by what could be
+    copied out of `message`, converted to tokens conservatively.
+
+    Only safe with constrained decoding: an unconstrained model may spend tokens on a `<think>` prelude.
+    """
+    struct, content = _budget(schema or ASSIGNMENT_OUTPUT_SCHEMA)
+    copied = min(content, int(len(message or "") * MESSAGE_COPY_FACTOR))
+    tokens = int(math.ceil((struct + copied) / CHARS_PER_TOKEN)) + MAX_TOKENS_MARGIN
+    if ceiling:
+        tokens = min(tokens, int(ceiling))
+    return max(1, tokens)
+
+
+# ----------------------------
+# GBNF
+# ----------------------------
+_GBNF_PRIMITIVES = {
+    "ws": r"[ \t\n]{0,20}",
+    "char": r'[^"\\\x7F\x00-\x1F] | "\\" (["\\/bfnrt] | "u" [0-9a-fA-F]{4})',
+    "number": r'"-"? [0-9]{1,15} ("." [0-9]{1,6})?',
+    "null": r'"null"',
+}
+
+
+def _gbnf_literal(value: Any) -> str:
+    return json.dumps(json.dumps(value))
+
+
+def schema_to_gbnf(schema: Optional[Dict[str, Any]] = None) -> str:
+    """
+    llama.cpp GBNF for the subset of JSON Schema used here: fixed-order objects with every key required, enums,
+    strings with `maxLength`, numbers, arrays with `maxItems`, and `["<type>", "null"]` unions.
+
+    Whitespace runs are capped so a constrained model cannot idle in whitespace after the last key.
+    """
+    rules: Dict[str, str] = {}
+
+    def rule(name: str, body: str) -> str:
+        rules[name] = body
+        return name
+
+    def visit(node: Dict[str, Any], name: str) -> str:
+        if "enum" in node:
+            return rule(name, " | ".join(_gbnf_literal(v) for v in node["enum"]))
+        alts: List[str] = []
+        for t in _types(node):
+            if t == "null":
+                alts.append("null")
+            elif t == "string":
+                n = int(node.get("maxLength") or 0)
+                alts.append(f'"\\"" char{{0,{n}}} "\\""' if n else '"\\"" char* "\\""')
+            elif t in {"number", "integer"}:
+                alts.append("number")
+            elif t == "array":
+                item = visit(node.get("items") or {}, f"{name}-item")
+                n = int(node.get("maxItems") or 0)
+                more = f'("," ws {item}){{0,{n - 1}}}' if n else f'("," ws {item})*'
+                alts.append(f'"[" ws ({item} ws {more} ws)? "]"')
+            elif t == "object":
+                parts: List[str] = []
+                for i, (key, sub) in enumerate(node.get("properties", {}).items()):
+                    value = visit(sub, f"{name}-{key.replace('_', '-')}")
+                    sep = "" if i == 0 else '"," ws '
+                    parts.append(f"{sep}{_gbnf_literal(key)} ws \":\" ws {value} ws")
+                alts.append('"{" ws ' + " ".join(parts) + ' "}"')
+        if len(alts) == 1 and alts[0] in _GBNF_PRIMITIVES:
+            return alts[0]
+        return rule(name, " | ".join(f"({a})" if " " in a else a for a in alts))
+
+    top = visit(schema or ASSIGNMENT_OUTPUT_SCHEMA, "assignment")
+    lines = [f"root ::= {top} ws"]
+    lines.extend(f"{k} ::= {v}" for k, v in rules.items())
+    lines.extend(f"{k} ::= {v}" for k, v in _GBNF_PRIMITIVES.items())
+    return "\n".join(lines) + "\n"
+
+
+def constraint_payload(mode: str, *, schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Request fields to merge into a chat-completions payload for `mode` (empty for `off`)."""
+    schema = schema or ASSIGNMENT_OUTPUT_SCHEMA
+    if mode == CONSTRAINT_JSON_SCHEMA:
+        return {"response_format": {"type": "json_schema", "json_schema": {"name": "tuition_assignment", "strict": True, "schema": schema}}}
+    if mode == CONSTRAINT_GBNF:
+        return {"grammar": schema_to_gbnf(schema)}
+    return {}
+
+
+# ----------------------------
+# Streaming early stop
+# ----------------------------
+class JsonObjectStream:
+    """
+    Incremental scanner over streamed model text that reports when the first top-level JSON object closes.
+
+    Any `<think>...</think>` prelude is skipped first, matching `extract_preferred_json_object`'s preference for the
+    first object after the closing think tag.
+    """
+
+    def __init__(self) -> None:
+        self.text = ""
+        self.end: Optional[int] = None
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._started = False
+
+    @property
+    def closed(self) -> bool:
+        return self.end is not None
+
+    def _scan_start(self) -> Optional[int]:
+        lower = self.text.lower()
+        if lower.lstrip().startswith("<think>"):
+            close = lower.find("</think>")
+            return None if close == -1 else close + len("</think>")
+        return 0
+
+    def feed(self, chunk: str) -> bool:
+        if self.closed or not chunk:
+            return self.closed
+        self.text += chunk
+        if not self._started:
+            start = self._scan_start()
+            if start is None:
+                return False
+            brace = self.text.find("{", max(start, self._pos))
+            if brace == -1:
+                self._pos = len(self.text)
+                return False
+            self._started = True
+            self._pos = brace
+        text = self.text
+        i = self._pos
+        while i < len(text):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.end = i + 1
+                    break
+            i += 1
+        self._pos = i
+        return self.closed
+
+    def answer(self) -> str:
+        """Text up to and including the closed object (or everything read, if it never closed)."""
+        return self.text[: self.end] if self.end is not None else self.text
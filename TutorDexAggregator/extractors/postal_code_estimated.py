@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import logging
 import re
-import time
 from dataclasses import dataclass
 from functools import lru_cache
 from typing import Any, Dict, List, Optional
@@ -10,6 +9,7 @@ from typing import Any, Dict, List, Optional
 import requests
 
 from shared.config import load_aggregator_config
+from shared.geocoding_cache import ADDRESS_POSTAL, GeocodeUnavailable, geocode_cache
 
 try:
     # Running from `TutorDexAggregator/` with that folder on sys.path.
@@ -116,14 +116,16 @@ def _clean_address_for_geocode(address: str) -> str:
     return s
 
 
-@lru_cache(maxsize=5000)
 def _estimate_postal_from_cleaned_address(cleaned_address: str, *, timeout_s: float) -> Optional[str]:
-    if _nominatim_disabled():
-        return None
     q = _clean_address_for_geocode(cleaned_address)
     if not q:
         return None
+    fetch = None if _nominatim_disabled() else (lambda: _nominatim_estimate_postal(q, timeout_s=timeout_s))
+    return geocode_cache(_cfg()).get(ADDRESS_POSTAL, q.lower(), fetch)
+
 
+def _nominatim_estimate_postal(q: str, *, timeout_s: float) -> Optional[str]:
+    """Raises `GeocodeUnavailable` when Nominatim could not answer (not cached); None means no match."""
     # Nominatim: query by free-form string; force SG.
     url = "https://nominatim.openstreetmap.org/search"
     params = {
@@ -135,66 +137,48 @@ def _estimate_postal_from_cleaned_address(cleaned_address: str, *, timeout_s: fl
     }
     headers = {"User-Agent": _nominatim_user_agent()}
 
-    max_attempts = int(_cfg().nominatim_retries)
-    backoff_s = float(_cfg().nominatim_backoff_seconds)
-
-    last_err: Optional[str] = None
-    for attempt in range(max(1, min(max_attempts, 6))):
-        try:
-            t0 = timed()
-            resp = requests.get(url, params=params, headers=headers, timeout=float(timeout_s))
-            log_event(
-                logger,
-                logging.INFO,
-                "nominatim_postal_lookup",
-                status_code=getattr(resp, "status_code", None),
-                elapsed_ms=round((timed() - t0) * 1000.0, 2),
-                q_chars=len(q),
-                attempt=attempt + 1,
-            )
-        except Exception as e:
-            last_err = str(e)
-            resp = None
-
-        if resp is None:
-            if attempt < max_attempts - 1:
-                time.sleep(min(10.0, backoff_s * (2**attempt)))
-            continue
-
-        if resp.status_code in {429, 503} and attempt < max_attempts - 1:
-            retry_after = resp.headers.get("Retry-After")
-            sleep_s = min(20.0, backoff_s * (2**attempt))
-            if retry_after:
-                try:
-                    sleep_s = max(sleep_s, float(retry_after))
-                except Exception:
-                    pass
-            time.sleep(min(20.0, sleep_s))
-            continue
-
-        if resp.status_code >= 400:
-            return None
-
+    # One attempt; the shared cache retries transient failures, taking a rate slot for each attempt.
+    try:
+        t0 = timed()
+        resp = requests.get(url, params=params, headers=headers, timeout=float(timeout_s))
+        log_event(
+            logger,
+            logging.INFO,
+            "nominatim_postal_lookup",
+            status_code=getattr(resp, "status_code", None),
+            elapsed_ms=round((timed() - t0) * 1000.0, 2),
+            q_chars=len(q),
+        )
+    except Exception as e:
+        raise GeocodeUnavailable(str(e)) from e
+
+    if resp.status_code == 429 or resp.status_code >= 500:
+        retry_after: Optional[float] = None
         try:
-            data = resp.json()
+            retry_after = float(resp.headers.get("Retry-After"))
         except Exception:
-            return None
-        if not isinstance(data, list):
-            return None
-
-        for r in data:
-            if not isinstance(r, dict):
-                continue
-            addr = r.get("address") if isinstance(r.get("address"), dict) else {}
-            postal = addr.get("postcode") if isinstance(addr, dict) else None
-            for candidate in (postal, r.get("display_name")):
-                codes = _extract_sg_postal_codes(candidate)
-                if codes:
-                    return codes[0]
+            pass
+        raise GeocodeUnavailable(f"nominatim_status={resp.status_code}", retry_after=retry_after)
+    if resp.status_code >= 400:
+        return None
 
+    try:
+        data = resp.json()
+    except Exception:
+        return None
+    if not isinstance(data, list):
         return None
 
-    _ = last_err
+    for r in data:
+        if not isinstance(r, dict):
+            continue
+        addr = r.get("address") if isinstance(r.get("address"), dict) else {}
+        postal = addr.get("postcode") if isinstance(addr, dict) else None
+        for candidate in (postal, r.get("display_name")):
+            codes = _extract_sg_postal_codes(candidate)
+            if codes:
+                return codes[0]
+
     return None
 
 
@@ -15,6 +15,9 @@ Policy decisions (documented in `docs/time_availability.md`):
 - Day ranges like "Mon-Fri" are treated as ESTIMATED even if paired with a concrete time.
 - Negations (e.g. "No Sunday before 3pm") are not represented in the schema; we still emit the
   corresponding estimated window and attach a parse warning.
+
+Implementation: each line is lexed once (`_lex_line`) into day/keyword/separator tokens plus time events;
+clauses and the line-level fallbacks read from that token list instead of re-scanning the text.
 """
 
 from __future__ import annotations
@@ -26,6 +29,8 @@ from typing import Any, Dict, List, Optional, Tuple
 
 DAYS: Tuple[str, ...] = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
 _DAY_INDEX: Dict[str, int] = {d: i for i, d in enumerate(DAYS)}
+_WEEKDAY_DAYS: Tuple[str, ...] = DAYS[:5]
+_WEEKEND_DAYS: Tuple[str, ...] = DAYS[5:]
 
 
 def _empty_time_availability() -> Dict[str, Any]:
@@ -52,6 +57,11 @@ def _to_window(start: Tuple[int, int], end: Tuple[int, int]) -> str:
     return f"{_hhmm(*start)}-{_hhmm(*end)}"
 
 
+_TIME_24H_FULL_RE = re.compile(r"(\d{1,2}):(\d{2})")
+_TIME_AMPM_FULL_RE = re.compile(r"(\d{1,2})(?::(\d{2}))?([ap]m)")
+_TIME_COMPACT_FULL_RE = re.compile(r"(\d{3,4})([ap]m)?")
+
+
 def _parse_time_hhmm(token: str) -> Optional[Tuple[int, int]]:
     """
     Parse a single time token into (hour24, minute).
@@ -66,7 +76,7 @@ def _parse_time_hhmm(token: str) -> Optional[Tuple[int, int]]:
         return None
 
     # 24h with colon: 19:30
-    m = re.fullmatch(r"(\d{1,2}):(\d{2})", s)
+    m = _TIME_24H_FULL_RE.fullmatch(s)
     if m:
         hh, mm = int(m.group(1)), int(m.group(2))
         if 0 <= hh <= 23 and 0 <= mm <= 59:
@@ -74,7 +84,7 @@ def _parse_time_hhmm(token: str) -> Optional[Tuple[int, int]]:
         return None
 
     # am/pm with optional minutes: 7pm, 7:30pm
-    m = re.fullmatch(r"(\d{1,2})(?::(\d{2}))?([ap]m)", s)
+    m = _TIME_AMPM_FULL_RE.fullmatch(s)
     if m:
         hh = int(m.group(1))
         mm = int(m.group(2) or "0")
@@ -88,7 +98,7 @@ def _parse_time_hhmm(token: str) -> Optional[Tuple[int, int]]:
         return hh24, mm
 
     # Compact hhmm with optional am/pm: 730pm, 1930
-    m = re.fullmatch(r"(\d{3,4})([ap]m)?", s)
+    m = _TIME_COMPACT_FULL_RE.fullmatch(s)
     if m:
         digits = m.group(1)
         ap = m.group(2)
@@ -114,17 +124,9 @@ def _parse_time_hhmm(token: str) -> Optional[Tuple[int, int]]:
     return None
 
 
-_DAY_TOKEN_RE = re.compile(
-    r"(?i)\b(mon(?:day)?s?|tue(?:s|sday)?s?|wed(?:s|nesday)?s?|thu(?:rs|rsday)?s?|fri(?:day)?s?|sat(?:urday)?s?|sun(?:day)?s?)\b"
-)
+_DAY_WORD = r"mon(?:day)?s?|tue(?:s|sday)?s?|wed(?:s|nesday)?s?|thu(?:rs|rsday)?s?|fri(?:day)?s?|sat(?:urday)?s?|sun(?:day)?s?"
 
-_DAY_RANGE_RE = re.compile(
-    r"(?i)\b(mon(?:day)?s?|tue(?:s|sday)?s?|wed(?:s|nesday)?s?|thu(?:rs|rsday)?s?|fri(?:day)?s?|sat(?:urday)?s?|sun(?:day)?s?)\s*(?:-|to)\s*(mon(?:day)?s?|tue(?:s|sday)?s?|wed(?:s|nesday)?s?|thu(?:rs|rsday)?s?|fri(?:day)?s?|sat(?:urday)?s?|sun(?:day)?s?)\b"
-)
-
-_WEEKDAYS_RE = re.compile(r"(?i)\bweekdays?\b")
-_WEEKENDS_RE = re.compile(r"(?i)\bweekends?\b")
-_ALL_DAYS_RE = re.compile(r"(?i)\b(daily|every\s*day|everyday|all\s+days)\b")
+_DAY_TOKEN_RE = re.compile(rf"(?i)\b({_DAY_WORD})\b")
 
 
 def _canon_day_token(tok: str) -> Optional[str]:
@@ -167,45 +169,6 @@ class _DayInfo:
     ranged: bool  # mon-fri style range
 
 
-def _extract_days(line: str) -> _DayInfo:
-    s = str(line or "")
-    broad = False
-    ranged = False
-
-    days: List[str] = []
-
-    if _ALL_DAYS_RE.search(s):
-        broad = True
-        days.extend(list(DAYS))
-
-    if _WEEKDAYS_RE.search(s):
-        broad = True
-        days.extend(["monday", "tuesday", "wednesday", "thursday", "friday"])
-
-    if _WEEKENDS_RE.search(s):
-        broad = True
-        days.extend(["saturday", "sunday"])
-
-    # Ranges like Mon-Fri, Tue to Thu (treated as estimated policy-wise).
-    for m in _DAY_RANGE_RE.finditer(s):
-        expanded = _expand_range(m.group(1), m.group(2))
-        if expanded:
-            ranged = True
-            for d in expanded:
-                if d not in days:
-                    days.append(d)
-
-    # Individual day tokens (Mon, Tue & Thu). Avoid double-counting when ranges already expanded.
-    for m in _DAY_TOKEN_RE.finditer(s):
-        d = _canon_day_token(m.group(1))
-        if d and d not in days:
-            days.append(d)
-
-    # Preserve order by weekday index (stable, deterministic).
-    days = sorted(days, key=lambda d: _DAY_INDEX.get(d, 999))
-    return _DayInfo(days=days, broad=broad, ranged=ranged)
-
-
 _TIME_RANGE_AMPM_AMPM_RE = re.compile(
     r"(?i)\b(\d{1,2})(?::(\d{2}))?\s*([ap]m)\s*(?:-|to)\s*(\d{1,2})(?::(\d{2}))?\s*([ap]m)\b"
 )
@@ -219,8 +182,15 @@ _TIME_RANGE_COMPACT_RE = re.compile(r"\b(\d{3,4})\s*(?:-|to)\s*(\d{3,4})\b")
 _RELATIVE_RE = re.compile(
     r"(?i)\b(after|from|before)\s+(\d{1,2}(?::\d{2})?\s*[ap]m|\d{3,4}\s*[ap]m|\d{1,2}:\d{2}|\d{3,4})\b"
 )
-
-_FUZZY_RE = re.compile(r"(?i)\b(morning|afternoon|evening|night)\b")
+_SINGLE_TIME_RE = re.compile(r"(?i)\b(\d{1,2}(?::\d{2})?\s*[ap]m|\d{3,4}\s*[ap]m|\d{1,2}:\d{2}|\d{3,4})\b")
+_HAS_DIGIT_RE = re.compile(r"\d")
+
+_FUZZY_WINDOWS: Dict[str, str] = {
+    "morning": "08:00-12:00",
+    "afternoon": "12:00-17:00",
+    "evening": "16:00-21:00",
+    "night": "19:00-23:00",
+}
 _NOTE_HINT_RE = re.compile(
     r"(?i)\b("
     r"tbc|to be confirmed|flexible|to be discussed|"
@@ -228,7 +198,27 @@ _NOTE_HINT_RE = re.compile(
     r")\b"
 )
 
-_NEGATION_NEAR_TIME_RE = re.compile(r"(?i)\b(no|not|exclude|except)\b")
+_TIMING_HEADER_RE = re.compile(r"(?i)\b(timing|available|availability|avail|preferably|preferred)\b")
+
+# Every word-level token in one alternation, so a line is scanned once instead of once per pattern. The families
+# never share a word, and the only multi-word alternatives (day ranges, "every day"/"all days") contain no other
+# family's word, so each family gets the same matches a standalone finditer would. Day ranges come first so
+# "mon-fri" is one token; a refused (wrap-around) range still contributes its standalone endpoint days.
+# Clause separators are `/` or `|` with whitespace on both sides, so URLs like `https://...` stay intact.
+# Note hints are scanned separately: "tutors to propose all" overlaps "all days". The leading lookahead (first
+# letters of every alternative) lets the scan skip other positions without trying each branch.
+_LEX_RE = re.compile(
+    r"(?i)(?=[mtwfsdean/|])(?:"
+    rf"\b(?P<range_a>{_DAY_WORD})\s*(?:-|to)\s*(?P<range_b>{_DAY_WORD})\b"
+    rf"|\b(?P<day>{_DAY_WORD})\b"
+    r"|\b(?P<all>daily|every\s*day|everyday|all\s+days)\b"
+    r"|\b(?P<weekdays>weekdays?)\b"
+    r"|\b(?P<weekends>weekends?)\b"
+    r"|\b(?P<fuzzy>morning|afternoon|evening|night)\b"
+    r"|\b(?P<neg>no|not|exclude|except)\b"
+    r"|(?P<sep>(?<=\s)[/|](?=\s))"
+    r")"
+)
 
 
 @dataclass
@@ -239,17 +229,93 @@ class _Event:
     evidence: str
 
 
-def _events_in_line(line: str) -> List[_Event]:
+@dataclass(frozen=True)
+class _Token:
+    kind: str  # range|day|all|weekdays|weekends|fuzzy|neg|sep
+    start: int
+    end: int
+    days: Tuple[str, ...] = ()  # range: expanded days (empty when refused); day: the canonical day
+    ends: Tuple[str, ...] = ()  # refused range: endpoint days that stand alone as day tokens
+
+
+@dataclass
+class _Line:
+    tokens: List[_Token]
+    events: List[_Event]
+    clauses: List[Tuple[int, int]]  # (start, end) within the line
+    header: bool
+
+
+def _lex(s: str) -> List[_Token]:
+    out: List[_Token] = []
+    for m in _LEX_RE.finditer(s):
+        kind = m.lastgroup
+        if kind == "range_b":
+            days = tuple(_expand_range(m.group("range_a"), m.group("range_b")))
+            ends: Tuple[str, ...] = ()
+            if not days:
+                # Refused range: its endpoints still count where they stand alone as day words ("satto wed" does not).
+                hits = (_DAY_TOKEN_RE.match(s, m.start("range_a")), _DAY_TOKEN_RE.match(s, m.start("range_b")))
+                ends = tuple(d for d in (_canon_day_token(h.group(1)) for h in hits if h) if d)
+            out.append(_Token("range", m.start(), m.end(), days, ends))
+        elif kind == "day":
+            d = _canon_day_token(m.group("day"))
+            out.append(_Token("day", m.start(), m.end(), (d,) if d else ()))
+        else:
+            out.append(_Token(str(kind), m.start(), m.end()))
+    return out
+
+
+def _days_from_tokens(tokens: List[_Token]) -> _DayInfo:
+    kinds = {t.kind for t in tokens}
+    broad = False
+    ranged = False
+    days: List[str] = []
+
+    if "all" in kinds:
+        broad = True
+        days.extend(DAYS)
+    if "weekdays" in kinds:
+        broad = True
+        days.extend(_WEEKDAY_DAYS)
+    if "weekends" in kinds:
+        broad = True
+        days.extend(_WEEKEND_DAYS)
+
+    # Ranges like Mon-Fri, Tue to Thu (treated as estimated policy-wise).
+    for t in tokens:
+        if t.kind == "range" and t.days:
+            ranged = True
+            for d in t.days:
+                if d not in days:
+                    days.append(d)
+
+    # Individual day tokens (Mon, Tue & Thu), including the endpoints of a refused range.
+    for t in tokens:
+        if t.kind == "day" or (t.kind == "range" and not t.days):
+            for d in t.days or t.ends:
+                if d not in days:
+                    days.append(d)
+
+    # Preserve order by weekday index (stable, deterministic).
+    days = sorted(days, key=lambda d: _DAY_INDEX.get(d, 999))
+    return _DayInfo(days=days, broad=broad, ranged=ranged)
+
+
+def _extract_days(line: str) -> _DayInfo:
+    return _days_from_tokens(_lex(str(line or "")))
+
+
+def _time_events(s: str) -> List[_Event]:
     """
-    Extract time-related events in a line, returning spans relative to the line.
+    Time ranges, relative phrases and single times in `s`, in priority order (a span claimed by an earlier
+    pattern is never reused).
     """
-    s = str(line or "")
     out: List[_Event] = []
+    if not _HAS_DIGIT_RE.search(s):
+        return out
     covered: List[Tuple[int, int]] = []
 
-    def _mark(span: Tuple[int, int]) -> None:
-        covered.append(span)
-
     def _is_covered(span: Tuple[int, int]) -> bool:
         for a, b in covered:
             if not (span[1] <= a or span[0] >= b):
@@ -263,38 +329,27 @@ def _events_in_line(line: str) -> List[_Event]:
             if _is_covered(span):
                 continue
 
-            window: Optional[str] = None
+            start = end = None
             if rx is _TIME_RANGE_AMPM_AMPM_RE:
                 start = _parse_time_hhmm(f"{m.group(1)}:{m.group(2) or '00'}{m.group(3)}")
                 end = _parse_time_hhmm(f"{m.group(4)}:{m.group(5) or '00'}{m.group(6)}")
-                if start and end:
-                    window = _to_window(start, end)
             elif rx is _TIME_RANGE_AMPM_RE:
                 # Assume end uses same am/pm as start if missing.
                 start = _parse_time_hhmm(f"{m.group(1)}:{m.group(2) or '00'}{m.group(3)}")
-                end_tok = f"{m.group(4)}:{m.group(5) or '00'}{m.group(3)}"
-                end = _parse_time_hhmm(end_tok)
-                if start and end:
-                    window = _to_window(start, end)
+                end = _parse_time_hhmm(f"{m.group(4)}:{m.group(5) or '00'}{m.group(3)}")
             elif rx is _TIME_RANGE_24H_RE:
                 start = _parse_time_hhmm(f"{m.group(1)}:{m.group(2)}")
                 end = _parse_time_hhmm(f"{m.group(3)}:{m.group(4)}")
-                if start and end:
-                    window = _to_window(start, end)
             elif rx is _TIME_RANGE_COMPACT_AMPM_RE:
                 start = _parse_time_hhmm(f"{m.group(1)}{m.group(2)}")
                 end = _parse_time_hhmm(f"{m.group(3)}{m.group(4)}")
-                if start and end:
-                    window = _to_window(start, end)
             elif rx is _TIME_RANGE_COMPACT_RE:
                 start = _parse_time_hhmm(m.group(1))
                 end = _parse_time_hhmm(m.group(2))
-                if start and end:
-                    window = _to_window(start, end)
 
-            if window:
-                out.append(_Event(kind="explicit_range", window=window, span=span, evidence=s[span[0] : span[1]]))
-                _mark(span)
+            if start and end:
+                out.append(_Event(kind="explicit_range", window=_to_window(start, end), span=span, evidence=s[span[0] : span[1]]))
+                covered.append(span)
 
     # 2) Relative phrases (estimated only when no explicit end is given).
     for m in _RELATIVE_RE.finditer(s):
@@ -306,43 +361,15 @@ def _events_in_line(line: str) -> List[_Event]:
         if not t:
             continue
         if kw in {"after", "from"}:
-            window = _to_window(t, (23, 0))
-            out.append(_Event(kind="relative_after", window=window, span=span, evidence=s[span[0] : span[1]]))
-            _mark(span)
+            out.append(_Event(kind="relative_after", window=_to_window(t, (23, 0)), span=span, evidence=s[span[0] : span[1]]))
+            covered.append(span)
         elif kw == "before":
-            window = _to_window((8, 0), t)
-            out.append(_Event(kind="relative_before", window=window, span=span, evidence=s[span[0] : span[1]]))
-            _mark(span)
-
-    # 3) Fuzzy phrases (morning/afternoon/evening/night).
-    for m in _FUZZY_RE.finditer(s):
-        span = (m.start(), m.end())
-        if _is_covered(span):
-            continue
-        word = str(m.group(1) or "").strip().lower()
-        fixed: Dict[str, str] = {
-            "morning": "08:00-12:00",
-            "afternoon": "12:00-17:00",
-            "evening": "16:00-21:00",
-            "night": "19:00-23:00",
-        }
-        window = fixed.get(word)
-        if window:
-            out.append(_Event(kind="fuzzy", window=window, span=span, evidence=s[span[0] : span[1]]))
-            _mark(span)
+            out.append(_Event(kind="relative_before", window=_to_window((8, 0), t), span=span, evidence=s[span[0] : span[1]]))
+            covered.append(span)
 
-    # 4) Note hints: tbc/flexible/etc. (never create windows; only note evidence).
-    for m in _NOTE_HINT_RE.finditer(s):
-        span = (m.start(), m.end())
-        if _is_covered(span):
-            continue
-        out.append(_Event(kind="note", window=None, span=span, evidence=s[span[0] : span[1]]))
-        _mark(span)
-
-    # 5) Explicit single times (day + time => explicit unless broad/ranged).
+    # 3) Explicit single times (day + time => explicit unless broad/ranged).
     # Only add singles when they aren't part of ranges/relative already.
-    single_re = re.compile(r"(?i)\b(\d{1,2}(?::\d{2})?\s*[ap]m|\d{3,4}\s*[ap]m|\d{1,2}:\d{2}|\d{3,4})\b")
-    for m in single_re.finditer(s):
+    for m in _SINGLE_TIME_RE.finditer(s):
         span = (m.start(), m.end())
         if _is_covered(span):
             continue
@@ -351,12 +378,54 @@ def _events_in_line(line: str) -> List[_Event]:
             continue
         window = _to_window(t, t)  # single time => start=end (no inferred duration)
         out.append(_Event(kind="explicit_single", window=window, span=span, evidence=s[span[0] : span[1]]))
-        _mark(span)
+        covered.append(span)
 
     return out
 
 
-def _best_effort_original(raw_text: str, normalized_substring: str) -> str:
+def _lex_line(line: str) -> _Line:
+    s = str(line or "")
+    tokens = _lex(s)
+
+    times = _time_events(s)
+    # Fuzzy words and note hints never overlap a time span (those always contain digits), so only the
+    # event order below has to match the original priority: ranges, relative, fuzzy, note, single.
+    head = [ev for ev in times if ev.kind != "explicit_single"]
+    singles = [ev for ev in times if ev.kind == "explicit_single"]
+    fuzzy = [
+        _Event(kind="fuzzy", window=_FUZZY_WINDOWS[s[t.start : t.end].lower()], span=(t.start, t.end), evidence=s[t.start : t.end])
+        for t in tokens
+        if t.kind == "fuzzy"
+    ]
+    notes = [_Event(kind="note", window=None, span=(m.start(), m.end()), evidence=m.group(0)) for m in _NOTE_HINT_RE.finditer(s)]
+
+    clauses: List[Tuple[int, int]] = []
+    last = 0
+    for t in tokens:
+        if t.kind != "sep":
+            continue
+        if s[last : t.start].strip():
+            clauses.append((last, t.start))
+        last = t.end
+    if s[last:].strip():
+        clauses.append((last, len(s)))
+
+    return _Line(
+        tokens=tokens,
+        events=head + fuzzy + notes + singles,
+        clauses=clauses or [(0, len(s))],
+        header=bool(_TIMING_HEADER_RE.search(s)),
+    )
+
+
+def _events_in_line(line: str) -> List[_Event]:
+    """
+    Extract time-related events in a line, returning spans relative to the line.
+    """
+    return _lex_line(line).events
+
+
+def _best_effort_original(raw_text: str, normalized_substring: str, raw_lower: Optional[str] = None) -> str:
     """
     For meta/debugging only: try to recover a raw substring; fall back to normalized.
     """
@@ -365,7 +434,7 @@ def _best_effort_original(raw_text: str, normalized_substring: str) -> str:
     if not raw or not needle:
         return needle
     try:
-        idx = raw.lower().find(needle.lower())
+        idx = (raw.lower() if raw_lower is None else raw_lower).find(needle.lower())
         if idx >= 0:
             return raw[idx : idx + len(needle)]
     except Exception:
@@ -389,32 +458,24 @@ def extract_time_availability(raw_text: str, normalized_text: str) -> Tuple[Dict
 
     explicit = out["explicit"]
     estimated = out["estimated"]
+    raw_lower = raw_text.lower()
 
     note_candidates: List[Tuple[int, int]] = []  # spans in normalized_text
-
-    def _looks_like_timing_header(s: str) -> bool:
-        return bool(re.search(r"(?i)\b(timing|available|availability|avail|preferably|preferred)\b", s or ""))
-
-    def _split_clauses(line: str) -> List[Tuple[str, int]]:
-        """
-        Split a line into independent clauses for simpler day/time association.
-
-        We split only on separators with surrounding whitespace to avoid breaking URLs like `https://...`.
-        """
-        s = str(line or "")
-        if not s.strip():
-            return []
-        parts: List[Tuple[str, int]] = []
-        last = 0
-        for m in re.finditer(r"(?:(?<=\s)/(?=\s)|(?<=\s)\|(?=\s))", s):
-            seg = s[last : m.start()]
-            if seg.strip():
-                parts.append((seg, last))
-            last = m.end()
-        tail = s[last:]
-        if tail.strip():
-            parts.append((tail, last))
-        return parts or [(s, 0)]
+    weekdays_seen = False
+    weekends_seen = False
+
+    def _span(typ: str, days: List[str], s0: int, s1: int, window: Optional[str] = None) -> None:
+        item: Dict[str, Any] = {
+            "type": typ,
+            "days": days,
+            "original_substring": _best_effort_original(raw_text, normalized_text[s0:s1], raw_lower),
+            "normalized_substring": normalized_text[s0:s1],
+            "start_idx": int(s0),
+            "end_idx": int(s1),
+        }
+        if window is not None:
+            item["window"] = window
+        meta["matched_spans"].append(item)
 
     # Iterate line-by-line to keep evidence spans meaningful and conservative.
     offset = 0
@@ -427,10 +488,12 @@ def extract_time_availability(raw_text: str, normalized_text: str) -> Tuple[Dict
         if not line.strip():
             continue
 
-        header_hint = _looks_like_timing_header(line)
-        line_day_info = _extract_days(line)
-        line_events = _events_in_line(line)
-        line_windows = [ev for ev in line_events if ev.window]
+        lexed = _lex_line(line)
+        header_hint = lexed.header
+        line_day_info = _days_from_tokens(lexed.tokens)
+        line_windows = [ev for ev in lexed.events if ev.window]
+        weekdays_seen = weekdays_seen or any(t.kind == "weekdays" for t in lexed.tokens)
+        weekends_seen = weekends_seen or any(t.kind == "weekends" for t in lexed.tokens)
 
         # Carry-over: if a prior line contained only days (no windows) under a timing-ish header,
         # and the current line contains time windows but no days, apply windows to the pending days.
@@ -443,52 +506,32 @@ def extract_time_availability(raw_text: str, normalized_text: str) -> Tuple[Dict
                 typ = "estimated" if estimated_kind else "explicit"
                 for d in pending_days:
                     _dedupe_append(target_map[d], ev.window)
-
-                s0, s1 = line_start + ev.span[0], line_start + ev.span[1]
-                meta["matched_spans"].append(
-                    {
-                        "type": typ,
-                        "days": list(pending_days),
-                        "original_substring": _best_effort_original(raw_text, normalized_text[s0:s1]),
-                        "normalized_substring": normalized_text[s0:s1],
-                        "start_idx": int(s0),
-                        "end_idx": int(s1),
-                        "window": ev.window,
-                    }
-                )
+                _span(typ, list(pending_days), line_start + ev.span[0], line_start + ev.span[1], ev.window)
             meta["rules_fired"].append("carry_days_to_next_line")
 
             pending_days = []
             pending_context_hint = False
 
-        for clause, clause_off in _split_clauses(line):
-            clause_start = line_start + clause_off
-            day_info = _extract_days(clause)
-            events = _events_in_line(clause)
+        # Clauses never straddle a separator token, so each clause's tokens/events are a slice of the line's.
+        for c0, c1 in lexed.clauses:
+            clause_tokens = [t for t in lexed.tokens if c0 <= t.start < c1]
+            events = [ev for ev in lexed.events if c0 <= ev.span[0] < c1]
+            day_info = _days_from_tokens(clause_tokens)
             windows_in_line = [ev for ev in events if ev.window]
 
             # Always capture note hints even when no days are present.
             for ev in events:
                 if ev.kind == "note":
-                    s0, s1 = clause_start + ev.span[0], clause_start + ev.span[1]
+                    s0, s1 = line_start + ev.span[0], line_start + ev.span[1]
                     note_candidates.append((s0, s1))
-                    meta["matched_spans"].append(
-                        {
-                            "type": "note",
-                            "days": day_info.days,
-                            "original_substring": _best_effort_original(raw_text, normalized_text[s0:s1]),
-                            "normalized_substring": normalized_text[s0:s1],
-                            "start_idx": int(s0),
-                            "end_idx": int(s1),
-                        }
-                    )
+                    _span("note", day_info.days, s0, s1)
                     meta["rules_fired"].append("note_hint")
 
             # If no day mentions, never assign to a day (conservative).
             if not day_info.days:
                 continue
 
-            if _NEGATION_NEAR_TIME_RE.search(clause) and any(ev.window for ev in events):
+            if windows_in_line and any(t.kind == "neg" for t in clause_tokens):
                 meta["parse_warnings"].append("negation_detected_near_time")
 
             # Fixed estimated ranges for weekdays/weekends when no concrete time was provided.
@@ -498,20 +541,11 @@ def extract_time_availability(raw_text: str, normalized_text: str) -> Tuple[Dict
                 for d in day_info.days:
                     _dedupe_append(estimated[d], full)
                 # Evidence: prefer the keyword span.
-                kw_match = _WEEKDAYS_RE.search(clause) or _WEEKENDS_RE.search(clause)
-                if kw_match:
-                    s0, s1 = clause_start + kw_match.start(), clause_start + kw_match.end()
-                    meta["matched_spans"].append(
-                        {
-                            "type": "estimated",
-                            "days": day_info.days,
-                            "original_substring": _best_effort_original(raw_text, normalized_text[s0:s1]),
-                            "normalized_substring": normalized_text[s0:s1],
-                            "start_idx": int(s0),
-                            "end_idx": int(s1),
-                            "window": full,
-                        }
-                    )
+                kw = next((t for t in clause_tokens if t.kind == "weekdays"), None) or next(
+                    (t for t in clause_tokens if t.kind == "weekends"), None
+                )
+                if kw:
+                    _span("estimated", day_info.days, line_start + kw.start, line_start + kw.end, full)
                 meta["rules_fired"].append("fixed_weekday_weekend_range")
 
             for ev in events:
@@ -537,19 +571,7 @@ def extract_time_availability(raw_text: str, normalized_text: str) -> Tuple[Dict
 
                 for day in day_info.days:
                     _dedupe_append(target_map[day], ev.window)
-
-                s0, s1 = clause_start + ev.span[0], clause_start + ev.span[1]
-                meta["matched_spans"].append(
-                    {
-                        "type": typ,
-                        "days": day_info.days,
-                        "original_substring": _best_effort_original(raw_text, normalized_text[s0:s1]),
-                        "normalized_substring": normalized_text[s0:s1],
-                        "start_idx": int(s0),
-                        "end_idx": int(s1),
-                        "window": ev.window,
-                    }
-                )
+                _span(typ, day_info.days, line_start + ev.span[0], line_start + ev.span[1], ev.window)
 
         # If this line has multiple days and exactly one window, treat it as applying to the whole line's day list.
         # This fixes formats like: "MONDAY / THURSDAY / FRIDAY - AFTER 4PM" where clause splitting would
@@ -562,27 +584,12 @@ def extract_time_availability(raw_text: str, normalized_text: str) -> Tuple[Dict
             target_map = estimated if estimated_kind else explicit
 
             # If any of the days are missing this window in the chosen section, add it for all days.
-            needs = False
-            for d in line_day_info.days:
-                if ev.window not in (target_map.get(d) or []):
-                    needs = True
-                    break
+            needs = any(ev.window not in (target_map.get(d) or []) for d in line_day_info.days)
             if needs:
                 typ = "estimated" if estimated_kind else "explicit"
                 for d in line_day_info.days:
                     _dedupe_append(target_map[d], ev.window)
-                s0, s1 = line_start + ev.span[0], line_start + ev.span[1]
-                meta["matched_spans"].append(
-                    {
-                        "type": typ,
-                        "days": list(line_day_info.days),
-                        "original_substring": _best_effort_original(raw_text, normalized_text[s0:s1]),
-                        "normalized_substring": normalized_text[s0:s1],
-                        "start_idx": int(s0),
-                        "end_idx": int(s1),
-                        "window": ev.window,
-                    }
-                )
+                _span(typ, list(line_day_info.days), line_start + ev.span[0], line_start + ev.span[1], ev.window)
                 meta["rules_fired"].append("single_time_applies_to_all_days_in_line")
 
         # Update pending days context for a potential next-line time.
@@ -598,9 +605,9 @@ def extract_time_availability(raw_text: str, normalized_text: str) -> Tuple[Dict
 
     # "Weekdays/weekends" with no time should produce estimated full-day windows.
     # (Only when those keywords appear; day_info.broad above sets broad but we didn't create events.)
-    if _WEEKDAYS_RE.search(normalized_text):
+    if weekdays_seen:
         meta["rules_fired"].append("weekdays_keyword_seen")
-    if _WEEKENDS_RE.search(normalized_text):
+    if weekends_seen:
         meta["rules_fired"].append("weekends_keyword_seen")
 
     # If a note hint exists, choose the earliest one as note (must be a verbatim substring).
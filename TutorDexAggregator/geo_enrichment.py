@@ -11,6 +11,11 @@ from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from shared.config import load_aggregator_config
 
+try:
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover
+    np = None  # type: ignore
+
 logger = logging.getLogger("geo_enrichment")
 
 
@@ -162,9 +167,20 @@ def _kml_name_to_region(name: str) -> Optional[str]:
     return mapping.get(key)
 
 
-@lru_cache(maxsize=1)
-def _load_regions() -> Tuple[Optional[List[Tuple[str, List[List[List[List[float]]]]]]], Optional[str]]:
-    path = _region_geojson_path()
+def _prebuilt() -> Any:
+    """`prebuilt_artifacts` module, or None when prebuilt artifacts are disabled/unavailable."""
+    try:
+        try:
+            import prebuilt_artifacts as pa  # type: ignore
+        except Exception:
+            from TutorDexAggregator import prebuilt_artifacts as pa  # type: ignore
+        return pa if pa.enabled() and pa.numpy_available() else None
+    except Exception as e:
+        logger.debug("prebuilt_artifacts_unavailable error=%s", e)
+        return None
+
+
+def _parse_regions(path: Path) -> Tuple[Optional[List[Tuple[str, List[List[List[List[float]]]]]]], Optional[str]]:
     if not path.exists():
         return None, f"missing_region_geojson:{path}"
     try:
@@ -197,14 +213,220 @@ def _load_regions() -> Tuple[Optional[List[Tuple[str, List[List[List[List[float]
     return out, None
 
 
+@lru_cache(maxsize=1)
+def _load_regions() -> Tuple[Optional[List[Tuple[str, List[List[List[List[float]]]]]]], Optional[str]]:
+    path = _region_geojson_path()
+    if not path.exists():
+        return None, f"missing_region_geojson:{path}"
+    pa = _prebuilt()
+    if pa is not None:
+        arr = pa.load_regions(pa.artifacts_dir(), source=path)
+        if arr is not None:
+            return arr.to_regions(), None
+    return _parse_regions(path)
+
+
+# Region index: per-polygon bounding boxes + a uniform grid (~550 m cells) over all polygons.
+# Each cell stores the polygons whose boundary passes through it (tested exactly, in file order)
+# and the region of the first polygon that covers the whole cell (answered with no test).
+_REGION_GRID_CELL_DEG = 0.005
+# Cells within this distance of an edge count as boundary cells, so float rounding in the ray
+# casting can never differ between a cell's center and any other point in it.
+_REGION_GRID_MARGIN_DEG = 1e-7
+# Exact-coordinate memo: assignments geocode from a few hundred postal sectors, so the same
+# postal-code coordinates repeat constantly.
+_REGION_MEMO_MAX = 4096
+
+
+class _Ring:
+    """Edge arrays for one ring; `contains` is `_point_in_ring` vectorized with identical arithmetic."""
+
+    __slots__ = ("n", "xs", "ys", "xj", "yj", "dy")
+
+    def __init__(self, ring: List[List[float]]):
+        arr = np.asarray(ring, dtype=np.float64).reshape(-1, 2)
+        self.n = len(arr)
+        self.xs = np.ascontiguousarray(arr[:, 0])
+        self.ys = np.ascontiguousarray(arr[:, 1])
+        # Edge i runs from vertex i-1 (vertex n-1 for i=0) to vertex i, as in `_point_in_ring`.
+        self.xj = np.roll(self.xs, 1)
+        self.yj = np.roll(self.ys, 1)
+        dy = self.yj - self.ys
+        self.dy = np.where(dy == 0, 1e-15, dy)
+
+    def contains(self, lon: float, lat: float) -> bool:
+        if self.n < 4:
+            return False
+        straddles = (self.ys > lat) != (self.yj > lat)
+        x_cross = (self.xj - self.xs) * (lat - self.ys) / self.dy + self.xs
+        return bool(np.count_nonzero(straddles & (lon < x_cross)) & 1)
+
+    def row_parity(self, lat: float, lons: Any) -> Any:
+        """`contains` for many points on one latitude (used to classify grid cells)."""
+        straddles = (self.ys > lat) != (self.yj > lat)
+        x_cross = np.sort(((self.xj - self.xs) * (lat - self.ys) / self.dy + self.xs)[straddles])
+        crossings_right = len(x_cross) - np.searchsorted(x_cross, lons, side="right")
+        return (crossings_right & 1).astype(bool)
+
+
+class _Polygon:
+    __slots__ = ("region", "outer", "holes", "min_x", "min_y", "max_x", "max_y")
+
+    def __init__(self, region: str, polygon: List[List[List[float]]]):
+        self.region = region
+        self.outer = _Ring(polygon[0])
+        # Degenerate holes never exclude anything in `_point_in_polygon`.
+        self.holes = [h for h in (_Ring(r) for r in polygon[1:]) if h.n >= 4]
+        self.min_x, self.max_x = float(self.outer.xs.min()), float(self.outer.xs.max())
+        self.min_y, self.max_y = float(self.outer.ys.min()), float(self.outer.ys.max())
+
+    def contains(self, lon: float, lat: float) -> bool:
+        # Outside the bounding box the ray crosses no edge (or every edge at that latitude, an even
+        # number), so the ray casting result is "outside" without looking at any vertex.
+        if lat < self.min_y or lat >= self.max_y:
+            return False
+        if lon < self.min_x - _REGION_GRID_MARGIN_DEG or lon > self.max_x + _REGION_GRID_MARGIN_DEG:
+            return False
+        if not self.outer.contains(lon, lat):
+            return False
+        return not any(h.contains(lon, lat) for h in self.holes)
+
+
+class _RegionIndex:
+    def __init__(self, regions: List[Tuple[str, List[List[List[List[float]]]]]]):
+        self.polygons: List[_Polygon] = []
+        for region, polys in regions:
+            for poly in polys:
+                if poly and len(poly[0]) >= 4:
+                    self.polygons.append(_Polygon(region, poly))
+        self._memo: Dict[Tuple[float, float], Optional[str]] = {}
+        self.cells: Dict[int, Tuple[Tuple[int, ...], Optional[str]]] = {}
+        if not self.polygons:
+            self.x0 = self.y0 = self.x1 = self.y1 = 0.0
+            self.nx = self.ny = 0
+            return
+
+        m, cs = _REGION_GRID_MARGIN_DEG, _REGION_GRID_CELL_DEG
+        self.x0 = min(p.min_x for p in self.polygons) - 2 * m
+        self.y0 = min(p.min_y for p in self.polygons) - 2 * m
+        self.x1 = max(p.max_x for p in self.polygons) + 2 * m
+        self.y1 = max(p.max_y for p in self.polygons) + 2 * m
+        self.nx = int((self.x1 - self.x0) / cs) + 1
+        self.ny = int((self.y1 - self.y0) / cs) + 1
+        self._build_cells()
+
+    def _cell_x(self, x: Any) -> Any:
+        return np.clip(np.floor((x - self.x0) / _REGION_GRID_CELL_DEG).astype(np.int64), 0, self.nx - 1)
+
+    def _cell_y(self, y: Any) -> Any:
+        return np.clip(np.floor((y - self.y0) / _REGION_GRID_CELL_DEG).astype(np.int64), 0, self.ny - 1)
+
+    def _boundary_mask(self, poly: _Polygon) -> Any:
+        mask = np.zeros((self.ny, self.nx), dtype=bool)
+        m = _REGION_GRID_MARGIN_DEG
+        for ring in [poly.outer, *poly.holes]:
+            ix0 = self._cell_x(np.minimum(ring.xs, ring.xj) - m)
+            ix1 = self._cell_x(np.maximum(ring.xs, ring.xj) + m)
+            iy0 = self._cell_y(np.minimum(ring.ys, ring.yj) - m)
+            iy1 = self._cell_y(np.maximum(ring.ys, ring.yj) + m)
+            single = (ix0 == ix1) & (iy0 == iy1)
+            mask[iy0[single], ix0[single]] = True
+            for a, b, c, d in zip(ix0[~single].tolist(), ix1[~single].tolist(), iy0[~single].tolist(), iy1[~single].tolist()):
+                mask[c : d + 1, a : b + 1] = True
+        return mask
+
+    def _inside_mask(self, poly: _Polygon, boundary: Any) -> Any:
+        """Cells (not touching any edge) whose center lies inside `poly`."""
+        inside = np.zeros((self.ny, self.nx), dtype=bool)
+        cs = _REGION_GRID_CELL_DEG
+        ix0, ix1 = int(self._cell_x(poly.min_x)), int(self._cell_x(poly.max_x))
+        iy0, iy1 = int(self._cell_y(poly.min_y)), int(self._cell_y(poly.max_y))
+        cols = np.arange(ix0, ix1 + 1)
+        centers_x = self.x0 + (cols + 0.5) * cs
+        for iy in range(iy0, iy1 + 1):
+            lat = self.y0 + (iy + 0.5) * cs
+            row = poly.outer.row_parity(lat, centers_x)
+            for hole in poly.holes:
+                row &= ~hole.row_parity(lat, centers_x)
+            inside[iy, ix0 : ix1 + 1] = row & ~boundary[iy, ix0 : ix1 + 1]
+        return inside
+
+    def _build_cells(self) -> None:
+        ncells = self.nx * self.ny
+        covered_by = np.full(ncells, -1, dtype=np.int64)
+        candidates: Dict[int, List[int]] = {}
+        for pi, poly in enumerate(self.polygons):
+            boundary = self._boundary_mask(poly)
+            inside = self._inside_mask(poly, boundary)
+            open_cells = covered_by < 0
+            for c in np.flatnonzero(boundary.ravel() & open_cells).tolist():
+                candidates.setdefault(c, []).append(pi)
+            covered_by[inside.ravel() & open_cells] = pi
+        for c in set(candidates) | set(np.flatnonzero(covered_by >= 0).tolist()):
+            owner = int(covered_by[c])
+            self.cells[c] = (tuple(candidates.get(c, ())), self.polygons[owner].region if owner >= 0 else None)
+
+    def lookup(self, lon: float, lat: float) -> Optional[str]:
+        key = (lon, lat)
+        if key in self._memo:
+            return self._memo[key]
+        region = self._lookup(lon, lat)
+        if len(self._memo) >= _REGION_MEMO_MAX:
+            self._memo.clear()
+        self._memo[key] = region
+        return region
+
+    def _lookup(self, lon: float, lat: float) -> Optional[str]:
+        if not (self.x0 <= lon < self.x1 and self.y0 <= lat < self.y1):
+            return None
+        ix = min(int((lon - self.x0) / _REGION_GRID_CELL_DEG), self.nx - 1)
+        iy = min(int((lat - self.y0) / _REGION_GRID_CELL_DEG), self.ny - 1)
+        entry = self.cells.get(iy * self.nx + ix)
+        if entry is None:
+            return None
+        candidates, covered = entry
+        for pi in candidates:
+            poly = self.polygons[pi]
+            if poly.contains(lon, lat):
+                return poly.region
+        return covered
+
+
+_REGION_INDEX: Tuple[Any, Optional[_RegionIndex]] = (None, None)
+
+
+def _region_index() -> Optional[_RegionIndex]:
+    """Index over the currently loaded regions (rebuilt whenever `_load_regions` reloads)."""
+    global _REGION_INDEX
+    regions, err = _load_regions()
+    if err or not regions or np is None:
+        return None
+    source, index = _REGION_INDEX
+    if source is not regions:
+        index = _RegionIndex(regions)
+        _REGION_INDEX = (regions, index)
+    return index
+
+
+def _lookup_region_linear(regions: List[Tuple[str, List[List[List[List[float]]]]]], lon: float, lat: float) -> Optional[str]:
+    for region, polys in regions:
+        for poly in polys:
+            if _point_in_polygon(lon, lat, poly):
+                return region
+    return None
+
+
 def lookup_region(*, lat: float, lon: float) -> Tuple[Optional[str], Optional[str]]:
     regions, err = _load_regions()
     if err or not regions:
         return None, err
-    for region, polys in regions:
-        for poly in polys:
-            if _point_in_polygon(float(lon), float(lat), poly):
-                return region, None
+    index = _region_index()
+    if index is not None:
+        region = index.lookup(float(lon), float(lat))
+    else:
+        region = _lookup_region_linear(regions, float(lon), float(lat))
+    if region:
+        return region, None
     return None, "region_not_found"
 
 
@@ -212,9 +434,7 @@ def lookup_region(*, lat: float, lon: float) -> Tuple[Optional[str], Optional[st
 # Nearest MRT lookup (static JSON)
 # --------------------------
 
-@lru_cache(maxsize=1)
-def _load_mrt_stations() -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
-    path = _mrt_data_path()
+def _parse_mrt_stations(path: Path) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
     if not path.exists():
         return None, f"missing_mrt_data:{path}"
     try:
@@ -246,21 +466,141 @@ def _load_mrt_stations() -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]
     return out, None
 
 
+@lru_cache(maxsize=1)
+def _load_mrt_stations() -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+    path = _mrt_data_path()
+    if not path.exists():
+        return None, f"missing_mrt_data:{path}"
+    pa = _prebuilt()
+    if pa is not None:
+        arr = pa.load_stations(pa.artifacts_dir(), source=path)
+        if arr is not None:
+            return arr.to_stations(), None
+    return _parse_mrt_stations(path)
+
+
+# Query rows per (rows x stations) distance matrix in batch lookups.
+_MRT_BATCH_CHUNK = 2048
+# NumPy's sin/cos/atan2 may differ from `math` in the last bits, so stations within this slack of
+# the k-th best vectorized distance are re-ranked with `_haversine_m`; ties then resolve exactly
+# like the original scan (first station in dataset order wins).
+_MRT_RERANK_SLACK_M = 1e-3
+
+
+class _StationIndex:
+    """Station coordinates as arrays for vectorized haversine over all stations at once."""
+
+    def __init__(self, stations: List[Dict[str, Any]]):
+        coords = np.asarray([[float(s["latitude"]), float(s["longitude"])] for s in stations], dtype=np.float64).reshape(-1, 2)
+        self.lat = coords[:, 0]
+        self.lon = coords[:, 1]
+        self.cos_lat = np.cos(np.radians(self.lat))
+
+    def distances(self, lat: Any, lon: Any) -> Any:
+        """(M, S) distances in meters for M query points, same formula as `_haversine_m`."""
+        lat = np.asarray(lat, dtype=np.float64).reshape(-1, 1)
+        lon = np.asarray(lon, dtype=np.float64).reshape(-1, 1)
+        dphi = np.radians(self.lat[None, :] - lat)
+        dlmb = np.radians(self.lon[None, :] - lon)
+        a = np.sin(dphi / 2) ** 2 + np.cos(np.radians(lat)) * self.cos_lat[None, :] * (np.sin(dlmb / 2) ** 2)
+        return 6378137.0 * (2 * np.arctan2(np.sqrt(a), np.sqrt(np.maximum(0.0, 1 - a))))
+
+
+_STATION_INDEX: Tuple[Any, Optional[_StationIndex]] = (None, None)
+
+
+def _station_index() -> Optional[_StationIndex]:
+    """Index over the currently loaded stations (rebuilt whenever `_load_mrt_stations` reloads)."""
+    global _STATION_INDEX
+    stations, err = _load_mrt_stations()
+    if err or not stations or np is None:
+        return None
+    source, index = _STATION_INDEX
+    if source is not stations:
+        index = _StationIndex(stations)
+        _STATION_INDEX = (stations, index)
+    return index
+
+
+def _exact_ranking(stations: List[Dict[str, Any]], lat: float, lon: float, candidates: Iterable[int], k: int) -> List[Tuple[int, float]]:
+    ranked: List[Tuple[float, int]] = []
+    for i in candidates:
+        s = stations[i]
+        d = _haversine_m(lat, lon, float(s["latitude"]), float(s["longitude"]))
+        if math.isfinite(d):
+            ranked.append((d, i))
+    ranked.sort()
+    return [(i, d) for d, i in ranked[:k]]
+
+
+def _rank_stations(stations: List[Dict[str, Any]], points: List[Tuple[float, float]], k: int) -> List[List[Tuple[int, float]]]:
+    """For each (lat, lon), the k nearest stations as (index, meters), nearest first."""
+    k = max(1, min(int(k), len(stations)))
+    index = _station_index()
+    if index is None:
+        return [_exact_ranking(stations, lat, lon, range(len(stations)), k) for lat, lon in points]
+
+    out: List[List[Tuple[int, float]]] = []
+    for start in range(0, len(points), _MRT_BATCH_CHUNK):
+        chunk = points[start : start + _MRT_BATCH_CHUNK]
+        dist = index.distances([p[0] for p in chunk], [p[1] for p in chunk])
+        dist = np.where(np.isfinite(dist), dist, np.inf)
+        kth = np.partition(dist, k - 1, axis=1)[:, k - 1]
+        # Fewer than k finite distances: keep every finite one.
+        short = ~np.isfinite(kth)
+        if short.any():
+            kth[short] = np.max(np.where(np.isfinite(dist[short]), dist[short], -np.inf), axis=1)
+        rows, cols = np.nonzero(dist <= (kth + _MRT_RERANK_SLACK_M)[:, None])
+        bounds = np.searchsorted(rows, np.arange(len(chunk) + 1)).tolist()
+        cols_l = cols.tolist()
+        for n, (lat, lon) in enumerate(chunk):
+            out.append(_exact_ranking(stations, lat, lon, cols_l[bounds[n] : bounds[n + 1]], k))
+    return out
+
+
+def _station_result(station: Dict[str, Any], distance_m: float) -> Dict[str, Any]:
+    out = dict(station)
+    out["distance_m"] = int(round(distance_m))
+    return out
+
+
 def lookup_nearest_mrt(*, lat: float, lon: float) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
     stations, err = _load_mrt_stations()
     if err or not stations:
         return None, err
-    best: Optional[Dict[str, Any]] = None
-    best_d = float("inf")
-    for s in stations:
-        d = _haversine_m(float(lat), float(lon), float(s["latitude"]), float(s["longitude"]))
-        if d < best_d:
-            best_d = d
-            best = s
-    if not best or not math.isfinite(best_d):
+    ranked = _rank_stations(stations, [(float(lat), float(lon))], 1)[0]
+    if not ranked:
         return None, "mrt_not_found"
-    out = dict(best)
-    out["distance_m"] = int(round(best_d))
+    i, d = ranked[0]
+    return _station_result(stations[i], d), None
+
+
+def lookup_nearest_mrt_batch(points: Iterable[Tuple[Any, Any]], k: int = 1) -> Tuple[List[List[Dict[str, Any]]], Optional[str]]:
+    """
+    The `k` nearest MRT stations for each (lat, lon) in `points`, nearest first.
+
+    Station dicts have the same shape as `lookup_nearest_mrt` (incl. `distance_m`) and equal
+    distances keep dataset order, so `[0]` is exactly what `lookup_nearest_mrt` returns.
+    Points with missing/invalid coordinates get an empty list; the error is a dataset error.
+    """
+    pts = list(points)
+    stations, err = _load_mrt_stations()
+    if err or not stations:
+        return [[] for _ in pts], err
+    valid: List[int] = []
+    coords: List[Tuple[float, float]] = []
+    for n, p in enumerate(pts):
+        try:
+            lat_f, lon_f = _safe_float(p[0]), _safe_float(p[1])
+        except Exception:
+            continue
+        if lat_f is None or lon_f is None:
+            continue
+        valid.append(n)
+        coords.append((lat_f, lon_f))
+    out: List[List[Dict[str, Any]]] = [[] for _ in pts]
+    for n, ranked in zip(valid, _rank_stations(stations, coords, k)):
+        out[n] = [_station_result(stations[i], d) for i, d in ranked]
     return out, None
 
 
@@ -3,8 +3,7 @@ import logging
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
-import requests
-
+from llm_endpoint_pool import llm_endpoint_pool
 from logging_setup import bind_log_context, log_event, setup_logging, timed
 from shared.config import load_aggregator_config
 
@@ -88,7 +87,7 @@ def chat_completion(
     with bind_log_context(cid=str(cid) if cid else None, channel=channel or None, step=step):
         log_event(logger, logging.INFO, "llm_call_start", model=model_name, url=url, prompt_chars=len(system_prompt or ""), user_chars=len(user_content or ""))
         t0 = timed()
-        resp = requests.post(url, json=payload, timeout=cfg.timeout_s)
+        resp = llm_endpoint_pool(_CFG).post("/v1/chat/completions", json=payload, timeout=cfg.timeout_s)
         elapsed_ms = round((timed() - t0) * 1000.0, 2)
         if resp.status_code >= 400:
             body = (resp.text or "")[:400]
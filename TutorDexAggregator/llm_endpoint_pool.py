@@ -0,0 +1,371 @@
+"""
+Health-aware pool of OpenAI-compatible LLM endpoints (LM Studio / llama.cpp servers).
+
+`LLM_API_URLS` lists several base URLs (comma-separated) so one worker can spread calls across model servers on the
+same box; with only `LLM_API_URL` set the pool holds a single endpoint and behaves like a plain session.
+
+Routing:
+- least outstanding requests among endpoints in rotation (round-robin on ties)
+- per-endpoint concurrency cap (`LLM_ENDPOINT_MAX_INFLIGHT`); callers wait for a slot when every endpoint is full
+- passive ejection: `LLM_ENDPOINT_EJECT_AFTER_FAILURES` consecutive timeouts/connection errors/5xx take an endpoint
+  out of rotation for `LLM_ENDPOINT_EJECT_SECONDS`
+- active probes: a background thread GETs `LLM_ENDPOINT_PROBE_PATH` on every endpoint each
+  `LLM_ENDPOINT_PROBE_INTERVAL_SECONDS`, ejecting failures and returning recovered endpoints early
+- if every endpoint is ejected, requests are still routed across all of them (an outage should look like errors,
+  not a stalled queue)
+
+Connection errors and 5xx responses are retried once on a different endpoint. Timeouts are not: the server may
+still be generating, and re-sending would double the load on the model.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import requests
+
+try:
+    from logging_setup import log_event  # type: ignore
+except Exception:  # pragma: no cover
+    from TutorDexAggregator.logging_setup import log_event  # type: ignore
+
+try:
+    from observability_metrics import (  # type: ignore
+        llm_endpoint_ejections_total,
+        llm_endpoint_healthy,
+        llm_endpoint_inflight,
+        llm_endpoint_latency_seconds,
+        llm_endpoint_queue_wait_seconds,
+        llm_endpoint_queue_waiting,
+        llm_endpoint_requests_total,
+    )
+except Exception:  # pragma: no cover
+    from TutorDexAggregator.observability_metrics import (  # type: ignore
+        llm_endpoint_ejections_total,
+        llm_endpoint_healthy,
+        llm_endpoint_inflight,
+        llm_endpoint_latency_seconds,
+        llm_endpoint_queue_wait_seconds,
+        llm_endpoint_queue_waiting,
+        llm_endpoint_requests_total,
+    )
+
+logger = logging.getLogger("llm_endpoint_pool")
+
+DEFAULT_API_URL = "http://localhost:1234"
+
+
+class NoEndpointAvailable(requests.exceptions.ConnectionError):
+    """No endpoint slot freed up before the request's timeout."""
+
+
+@dataclass
+class _Endpoint:
+    url: str
+    inflight: int = 0
+    consecutive_failures: int = 0
+    ejected_until: float = 0.0
+    requests: int = 0
+    failures: int = 0
+
+    def in_rotation(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+
+def _metric(fn, *args: Any) -> None:
+    try:
+        fn(*args)
+    except Exception:
+        # Metrics must never break runtime
+        pass
+
+
+def _outcome(exc: Optional[BaseException], status_code: Optional[int]) -> str:
+    if exc is not None:
+        return "timeout" if isinstance(exc, requests.exceptions.Timeout) else "connection_error"
+    if status_code is not None and status_code >= 500:
+        return "http_5xx"
+    if status_code is not None and status_code >= 400:
+        return "http_4xx"
+    return "ok"
+
+
+class EndpointPool:
+    def __init__(
+        self,
+        urls: Sequence[str],
+        *,
+        max_inflight: int = 4,
+        eject_after_failures: int = 2,
+        eject_s: float = 30.0,
+        probe_path: str = "/v1/models",
+        probe_interval_s: float = 15.0,
+        probe_timeout_s: float = 3.0,
+        session: Optional[requests.Session] = None,
+    ) -> None:
+        cleaned = [str(u).strip().rstrip("/") for u in urls if str(u or "").strip()]
+        if not cleaned:
+            cleaned = [DEFAULT_API_URL]
+        self.endpoints: List[_Endpoint] = [_Endpoint(url=u) for u in dict.fromkeys(cleaned)]
+        self.max_inflight = max(1, int(max_inflight))
+        self.eject_after_failures = max(1, int(eject_after_failures))
+        self.eject_s = max(0.0, float(eject_s))
+        self.probe_path = "/" + str(probe_path or "/v1/models").lstrip("/")
+        self.probe_interval_s = float(probe_interval_s or 0)
+        self.probe_timeout_s = float(probe_timeout_s)
+        self.session = session or requests.Session()
+        self._cond = threading.Condition()
+        self._rr = 0
+        self._waiting = 0
+        self._stop = threading.Event()
+        self._probe_thread: Optional[threading.Thread] = None
+        for ep in self.endpoints:
+            _metric(lambda u: llm_endpoint_healthy.labels(endpoint=u).set(1), ep.url)
+            _metric(lambda u: llm_endpoint_inflight.labels(endpoint=u).set(0), ep.url)
+
+    # ----------------------------
+    # Routing
+    # ----------------------------
+    def _pick(self, exclude: Sequence[str]) -> Optional[_Endpoint]:
+        now = time.monotonic()
+        n = len(self.endpoints)
+        eligible = [(i, ep) for i, ep in enumerate(self.endpoints) if ep.url not in exclude]
+        in_rotation = [(i, ep) for i, ep in eligible if ep.in_rotation(now)]
+        # Panic routing: with everything ejected, keep sending rather than queueing forever.
+        pool = in_rotation or eligible
+        free = [(i, ep) for i, ep in pool if ep.inflight < self.max_inflight]
+        if not free:
+            return None
+        _, best = min(free, key=lambda p: (p[1].inflight, (p[0] - self._rr) % n))
+        self._rr = (self._rr + 1) % n
+        return best
+
+    def _acquire(self, *, exclude: Sequence[str], wait_s: float) -> _Endpoint:
+        t0 = time.monotonic()
+        deadline = t0 + max(0.0, wait_s)
+        with self._cond:
+            ep = self._pick(exclude)
+            if ep is None and wait_s > 0:
+                self._waiting += 1
+                _metric(llm_endpoint_queue_waiting.set, self._waiting)
+                try:
+                    while ep is None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                        ep = self._pick(exclude)
+                finally:
+                    self._waiting -= 1
+                    _metric(llm_endpoint_queue_waiting.set, self._waiting)
+            if ep is None:
+                raise NoEndpointAvailable(f"no LLM endpoint slot free within {wait_s:.0f}s ({len(self.endpoints)} endpoints)")
+            ep.inflight += 1
+            ep.requests += 1
+            inflight = ep.inflight
+        _metric(lambda: llm_endpoint_inflight.labels(endpoint=ep.url).set(inflight))
+        _metric(lambda: llm_endpoint_queue_wait_seconds.labels(endpoint=ep.url).observe(time.monotonic() - t0))
+        return ep
+
+    def _eject_locked(self, ep: _Endpoint, reason: str) -> None:
+        was_in_rotation = ep.in_rotation(time.monotonic())
+        ep.ejected_until = time.monotonic() + self.eject_s
+        if was_in_rotation:
+            _metric(lambda: llm_endpoint_ejections_total.labels(endpoint=ep.url, reason=reason).inc())
+            _metric(lambda: llm_endpoint_healthy.labels(endpoint=ep.url).set(0))
+            log_event(logger, logging.WARNING, "llm_endpoint_ejected", endpoint=ep.url, reason=reason, eject_s=self.eject_s)
+
+    def _restore_locked(self, ep: _Endpoint) -> None:
+        ep.consecutive_failures = 0
+        if not ep.in_rotation(time.monotonic()):
+            ep.ejected_until = 0.0
+            _metric(lambda: llm_endpoint_healthy.labels(endpoint=ep.url).set(1))
+            log_event(logger, logging.INFO, "llm_endpoint_restored", endpoint=ep.url)
+
+    def _release(self, ep: _Endpoint, *, outcome: str, elapsed_s: float) -> None:
+        with self._cond:
+            ep.inflight = max(0, ep.inflight - 1)
+            inflight = ep.inflight
+            if outcome in {"timeout", "connection_error", "http_5xx"}:
+                ep.failures += 1
+                ep.consecutive_failures += 1
+                if ep.consecutive_failures >= self.eject_after_failures:
+                    self._eject_locked(ep, outcome)
+            else:
+                self._restore_locked(ep)
+            self._cond.notify_all()
+        _metric(lambda: llm_endpoint_inflight.labels(endpoint=ep.url).set(inflight))
+        _metric(lambda: llm_endpoint_requests_total.labels(endpoint=ep.url, outcome=outcome).inc())
+        _metric(lambda: llm_endpoint_latency_seconds.labels(endpoint=ep.url).observe(elapsed_s))
+
+    def _send(self, path: str, *, json: Any, timeout: float, stream: bool) -> Tuple[Optional[_Endpoint], float, requests.Response]:
+        """
+        Run the retry loop and return `(endpoint, t0, response)` for the answer the caller keeps.
+
+        The returned endpoint is still held (caller releases it); it is None when every attempt failed with a 5xx
+        and the last such response is handed back for the caller's own status handling.
+        """
+        tried: List[str] = []
+        last_resp: Optional[requests.Response] = None
+        last_exc: Optional[BaseException] = None
+        for attempt in range(min(2, len(self.endpoints))):
+            try:
+                # Only the first attempt queues for a slot; a retry goes to another endpoint right away or not at all.
+                ep = self._acquire(exclude=tried, wait_s=float(timeout) if attempt == 0 else 0.0)
+            except NoEndpointAvailable:
+                if attempt == 0:
+                    raise
+                break
+            tried.append(ep.url)
+            t0 = time.perf_counter()
+            resp: Optional[requests.Response] = None
+            exc: Optional[BaseException] = None
+            try:
+                resp = self.session.post(f"{ep.url}/{path.lstrip('/')}", json=json, timeout=timeout, stream=stream)
+            except requests.exceptions.RequestException as e:
+                exc = e
+            outcome = _outcome(exc, resp.status_code if resp is not None else None)
+            if outcome in {"ok", "http_4xx"}:
+                return ep, t0, resp  # type: ignore[return-value]
+            self._release(ep, outcome=outcome, elapsed_s=time.perf_counter() - t0)
+            if outcome == "timeout":
+                raise exc  # type: ignore[misc]
+            if outcome == "connection_error":
+                last_exc = exc
+                continue
+            if last_resp is not None:
+                last_resp.close()
+            last_resp = resp
+        if last_resp is not None:
+            return None, time.perf_counter(), last_resp
+        raise last_exc if last_exc is not None else NoEndpointAvailable("no LLM endpoint answered")
+
+    def post(self, path: str, *, json: Any, timeout: float) -> requests.Response:
+        """
+        POST `json` to `path` on the chosen endpoint and return the response (any status).
+
+        Raises the last `requests` exception when no endpoint answered; callers keep their own status handling.
+        """
+        ep, t0, resp = self._send(path, json=json, timeout=timeout, stream=False)
+        if ep is not None:
+            self._release(ep, outcome=_outcome(None, resp.status_code), elapsed_s=time.perf_counter() - t0)
+        return resp
+
+    @contextmanager
+    def stream(self, path: str, *, json: Any, timeout: float) -> Iterator[requests.Response]:
+        """
+        Like `post`, but yields a streaming response; the endpoint slot is held until the block exits.
+
+        Closing early (e.g. once the answer is complete) drops the connection, which stops generation on
+        llama.cpp / LM Studio servers.
+        """
+        ep, t0, resp = self._send(path, json=json, timeout=timeout, stream=True)
+        outcome = _outcome(None, resp.status_code)
+        try:
+            yield resp
+        except requests.exceptions.RequestException as e:
+            outcome = _outcome(e, None)
+            raise
+        finally:
+            resp.close()
+            if ep is not None:
+                self._release(ep, outcome=outcome, elapsed_s=time.perf_counter() - t0)
+
+    # ----------------------------
+    # Active health probes
+    # ----------------------------
+    def probe_once(self) -> Dict[str, bool]:
+        results: Dict[str, bool] = {}
+        for ep in list(self.endpoints):
+            try:
+                r = self.session.get(f"{ep.url}{self.probe_path}", timeout=self.probe_timeout_s)
+                ok = r.status_code < 500
+            except requests.exceptions.RequestException:
+                ok = False
+            with self._cond:
+                if ok:
+                    self._restore_locked(ep)
+                else:
+                    self._eject_locked(ep, "probe")
+                self._cond.notify_all()
+            results[ep.url] = ok
+        return results
+
+    def start_probes(self) -> None:
+        if self.probe_interval_s <= 0 or self._probe_thread is not None:
+            return
+
+        def _loop() -> None:
+            while not self._stop.wait(self.probe_interval_s):
+                try:
+                    self.probe_once()
+                except Exception:
+                    logger.debug("llm_endpoint_probe_failed", exc_info=True)
+
+        self._probe_thread = threading.Thread(target=_loop, name="llm_endpoint_probes", daemon=True)
+        self._probe_thread.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        t = self._probe_thread
+        if t is not None:
+            t.join(timeout=1.0)
+        self._probe_thread = None
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._cond:
+            return [
+                {
+                    "url": ep.url,
+                    "in_rotation": ep.in_rotation(now),
+                    "inflight": ep.inflight,
+                    "requests": ep.requests,
+                    "failures": ep.failures,
+                    "consecutive_failures": ep.consecutive_failures,
+                }
+                for ep in self.endpoints
+            ]
+
+
+def endpoint_urls(cfg: Any) -> List[str]:
+    raw = str(getattr(cfg, "llm_api_urls", None) or "").strip()
+    urls = [u.strip() for u in raw.split(",") if u.strip()] if raw else []
+    return urls or [str(getattr(cfg, "llm_api_url", None) or DEFAULT_API_URL)]
+
+
+_POOL: Optional[EndpointPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def llm_endpoint_pool(cfg: Any) -> EndpointPool:
+    """Process-wide pool built from `cfg` on first use (probes start with it)."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = EndpointPool(
+                endpoint_urls(cfg),
+                max_inflight=int(getattr(cfg, "llm_endpoint_max_inflight", None) or 4),
+                eject_after_failures=int(getattr(cfg, "llm_endpoint_eject_after_failures", None) or 2),
+                eject_s=float(getattr(cfg, "llm_endpoint_eject_seconds", 30.0) or 0),
+                probe_path=str(getattr(cfg, "llm_endpoint_probe_path", None) or "/v1/models"),
+                probe_interval_s=float(getattr(cfg, "llm_endpoint_probe_interval_seconds", 15.0) or 0),
+            )
+            # A single endpoint has nowhere else to route; probing it would only add log noise.
+            if len(_POOL.endpoints) > 1:
+                _POOL.start_probes()
+        return _POOL
+
+
+def set_llm_endpoint_pool(pool: Optional[EndpointPool]) -> None:
+    """Replace the process-wide pool (tests, tools); None rebuilds it from config on next use."""
+    global _POOL
+    with _POOL_LOCK:
+        old, _POOL = _POOL, pool
+    if old is not None and old is not pool:
+        old.close()
@@ -54,6 +54,69 @@ collector_last_message_timestamp_seconds = Gauge(
     ["channel", "pipeline_version", "schema_version"],
 )
 
+collector_spool_depth = Gauge(
+    "collector_spool_depth",
+    "Raw message records waiting in the collector's local spool.",
+)
+
+collector_spool_oldest_age_seconds = Gauge(
+    "collector_spool_oldest_age_seconds",
+    "Age of the oldest record in the collector's local spool (0 when empty).",
+)
+
+collector_spool_appends_total = Counter(
+    "collector_spool_appends_total",
+    "Raw message versions appended to the collector spool, by outcome (spooled, duplicate).",
+    ["outcome"],
+)
+
+collector_spool_drain_batches_total = Counter(
+    "collector_spool_drain_batches_total",
+    "Spool batches pushed to Supabase, by outcome.",
+    ["outcome"],
+)
+
+collector_spool_dead_letters_total = Counter(
+    "collector_spool_dead_letters_total",
+    "Spool records moved to the dead-letter table instead of being pushed, by reason (invalid_row, rejected).",
+    ["reason"],
+)
+
+collector_extractions_avoided_total = Counter(
+    "collector_extractions_avoided_total",
+    "Edit re-extractions not queued because the content fingerprint showed no change (reason=unchanged). Status-only edits are counted by worker_status_refresh_total once settled.",
+    ["reason"],
+)
+
+collector_deleted_messages_total = Counter(
+    "collector_deleted_messages_total",
+    "Telegram message deletions applied to raw storage, by outcome (marked, unchanged = already deleted/unknown, failed).",
+    ["outcome"],
+)
+
+collector_delete_assignments_closed_total = Counter(
+    "collector_delete_assignments_closed_total",
+    "Open assignments closed because their source Telegram message was deleted.",
+)
+
+collector_backfill_flood_waits_total = Counter(
+    "collector_backfill_flood_waits_total",
+    "Telegram flood waits hit during backfill, by the pause applied (channel = that channel only, global = all workers).",
+    ["scope"],
+)
+
+collector_backfill_channels = Gauge(
+    "collector_backfill_channels",
+    "Backfill channels by scheduler state (queued/active/paused/done/failed).",
+    ["state"],
+)
+
+collector_backfill_checkpoints_total = Counter(
+    "collector_backfill_checkpoints_total",
+    "Backfill progress checkpoints written to ingestion_run_progress, by outcome.",
+    ["outcome"],
+)
+
 collector_pipeline_version = Gauge(
     "collector_pipeline_version",
     "Collector pipeline version (label value).",
@@ -157,6 +220,67 @@ worker_llm_fail_total = Counter(
     ["pipeline_version", "schema_version"],
 )
 
+worker_llm_completion_tokens = Histogram(
+    "worker_llm_completion_tokens",
+    "Completion tokens per extraction call (usage when reported, else streamed chunks).",
+    ["constraint"],
+    buckets=(64, 128, 256, 384, 512, 768, 1024, 1536, 2048, 4096, 8192),
+)
+
+worker_llm_output_total = Counter(
+    "worker_llm_output_total",
+    "Extraction call outputs by parse outcome (parsed, invalid_json, no_text).",
+    ["constraint", "outcome"],
+)
+
+worker_llm_stream_early_stops_total = Counter(
+    "worker_llm_stream_early_stops_total",
+    "Streamed extraction responses closed as soon as the JSON object was complete.",
+)
+
+llm_endpoint_requests_total = Counter(
+    "llm_endpoint_requests_total",
+    "LLM HTTP requests per endpoint of the endpoint pool, by outcome (ok, http_4xx, http_5xx, timeout, connection_error).",
+    ["endpoint", "outcome"],
+)
+
+llm_endpoint_latency_seconds = Histogram(
+    "llm_endpoint_latency_seconds",
+    "LLM HTTP request latency (seconds) per endpoint.",
+    ["endpoint"],
+    buckets=(0.25, 0.5, 1, 2, 5, 10, 20, 45, 90, 180, 300),
+)
+
+llm_endpoint_inflight = Gauge(
+    "llm_endpoint_inflight",
+    "LLM requests currently outstanding on each endpoint.",
+    ["endpoint"],
+)
+
+llm_endpoint_healthy = Gauge(
+    "llm_endpoint_healthy",
+    "1 when the endpoint is in rotation, 0 while it is ejected.",
+    ["endpoint"],
+)
+
+llm_endpoint_ejections_total = Counter(
+    "llm_endpoint_ejections_total",
+    "Endpoints taken out of rotation, by reason (timeout, http_5xx, connection_error, probe).",
+    ["endpoint", "reason"],
+)
+
+llm_endpoint_queue_waiting = Gauge(
+    "llm_endpoint_queue_waiting",
+    "LLM requests waiting for a free endpoint slot (all healthy endpoints at their concurrency cap).",
+)
+
+llm_endpoint_queue_wait_seconds = Histogram(
+    "llm_endpoint_queue_wait_seconds",
+    "Time (seconds) an LLM request waited for a free slot, by the endpoint it was routed to.",
+    ["endpoint"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, 120),
+)
+
 worker_supabase_requests_total = Counter(
     "worker_supabase_requests_total",
     "Supabase operations attempted.",
@@ -182,6 +306,30 @@ worker_requeued_stale_jobs_total = Counter(
     ["pipeline_version", "schema_version"],
 )
 
+worker_idle_wakeups_total = Counter(
+    "worker_idle_wakeups_total",
+    "Idle waits ended, by reason (notified=push wakeup, timeout=safety poll, unavailable/sleep=no push channel).",
+    ["reason", "pipeline_version", "schema_version"],
+)
+
+worker_prefilter_decisions_total = Counter(
+    "worker_prefilter_decisions_total",
+    "Deterministic pre-LLM prefilter decisions (decision=skip|pass, reason=skip reason or route).",
+    ["decision", "reason", "pipeline_version", "schema_version"],
+)
+
+worker_status_refresh_total = Counter(
+    "worker_status_refresh_total",
+    "Status-only edit jobs settled without the LLM, by outcome (closed, reopened, unchanged, requeued, failed).",
+    ["outcome", "pipeline_version", "schema_version"],
+)
+
+worker_prefilter_saved_llm_seconds_total = Counter(
+    "worker_prefilter_saved_llm_seconds_total",
+    "Estimated LLM seconds not spent because the prefilter settled the job (recent mean LLM latency per skip).",
+    ["reason", "pipeline_version", "schema_version"],
+)
+
 
 # ----------------------------
 # Tutor types extraction metrics
@@ -0,0 +1,419 @@
+"""
+Prebuilt binary artifacts for fast worker startup.
+
+The geo datasets (region polygons, MRT stations) and the tutor-type taxonomy are parsed from
+JSON/YAML on first use, which puts a few hundred milliseconds of parsing on the first job every
+worker handles. This module compiles them once into compact artifacts:
+
+- regions: `.npy` arrays (vertices / ring offsets / polygon offsets) + a JSON manifest
+- MRT stations: a `.npy` coordinate array + names/lines/addresses in the manifest
+- tutor types: the parsed taxonomy and flat alias index as JSON (no PyYAML import needed)
+
+Every artifact records the sha256 of its source file and is ignored when the source changed, so
+a stale build can never change enrichment results; callers simply fall back to parsing the
+source. Arrays are opened with `np.load(mmap_mode="r")`, so workers share the page cache.
+
+Build ahead of time with `python utilities/build_prebuilt_artifacts.py`; workers also rebuild
+missing/stale artifacts at startup (see `warm_worker_caches`) because the compose volume mount
+hides anything produced at image build time.
+
+NumPy is optional: without it only the taxonomy index is used.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from shared.config import load_aggregator_config
+from shared.observability.exception_handler import swallow_exception
+
+try:
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover
+    np = None  # type: ignore
+
+logger = logging.getLogger("prebuilt_artifacts")
+
+# Bump when the on-disk layout changes; older manifests are then treated as stale.
+FORMAT_VERSION = 1
+
+REGIONS = "regions"
+MRT_STATIONS = "mrt_stations"
+TUTOR_TYPES_INDEX = "tutor_types.index.json"
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+def _env_flag(name: str) -> Optional[bool]:
+    raw = os.environ.get(name)
+    if raw is None:
+        return None
+    s = str(raw).strip().lower()
+    if s in {"1", "true", "yes", "y", "on"}:
+        return True
+    if s in {"0", "false", "no", "n", "off"}:
+        return False
+    return None
+
+
+def enabled() -> bool:
+    override = _env_flag("PREBUILT_ARTIFACTS_ENABLED")
+    if override is not None:
+        return bool(override)
+    return bool(load_aggregator_config().prebuilt_artifacts_enabled)
+
+
+def artifacts_dir() -> Path:
+    p = str(os.environ.get("PREBUILT_ARTIFACTS_DIR") or "").strip()
+    if not p:
+        p = str(load_aggregator_config().prebuilt_artifacts_dir or "").strip()
+    return Path(p) if p else (Path(__file__).resolve().parent / "data" / "prebuilt")
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# --------------------------
+# Manifest + array storage
+# --------------------------
+
+def _manifest_path(out_dir: Path, name: str) -> Path:
+    return out_dir / f"{name}.manifest.json"
+
+
+def _write_json_atomic(path: Path, payload: Dict[str, Any]) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(payload, ensure_ascii=False, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _save_arrays(out_dir: Path, name: str, *, source_sha256: str, arrays: Dict[str, Any], meta: Dict[str, Any]) -> Path:
+    """
+    Write `arrays` as `<name>-<hash>.<key>.npy` and then the manifest pointing at them.
+
+    Array file names carry the source hash, so a reader holding an older manifest never sees
+    arrays from a newer build; the manifest is replaced atomically last.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stem = f"{name}-{source_sha256[:16]}"
+    files: Dict[str, str] = {}
+    for key, arr in arrays.items():
+        fname = f"{stem}.{key}.npy"
+        tmp = out_dir / (fname + ".tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(arr))
+        os.replace(tmp, out_dir / fname)
+        files[key] = fname
+    manifest = {"format_version": FORMAT_VERSION, "source_sha256": source_sha256, "files": files, **meta}
+    path = _manifest_path(out_dir, name)
+    _write_json_atomic(path, manifest)
+
+    # Drop arrays from earlier builds of this artifact.
+    for old in out_dir.glob(f"{name}-*.npy"):
+        if not old.name.startswith(stem + "."):
+            try:
+                old.unlink()
+            except Exception as e:
+                swallow_exception(e, context="prebuilt_artifacts_cleanup", extra={"file": str(old)})
+    return path
+
+
+def _load_arrays(out_dir: Path, name: str, *, source_sha256: str) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    if np is None:
+        return None
+    try:
+        manifest = json.loads(_manifest_path(out_dir, name).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("prebuilt_manifest_unreadable name=%s error=%s", name, e)
+        return None
+    if not isinstance(manifest, dict) or manifest.get("format_version") != FORMAT_VERSION:
+        return None
+    if manifest.get("source_sha256") != source_sha256:
+        return None
+    files = manifest.get("files") if isinstance(manifest.get("files"), dict) else {}
+    arrays: Dict[str, Any] = {}
+    try:
+        for key, fname in files.items():
+            arrays[key] = np.load(out_dir / str(fname), mmap_mode="r", allow_pickle=False)
+    except Exception as e:
+        logger.warning("prebuilt_arrays_unreadable name=%s error=%s", name, e)
+        return None
+    return arrays, manifest
+
+
+# --------------------------
+# Regions
+# --------------------------
+
+RegionList = List[Tuple[str, List[List[List[List[float]]]]]]
+
+
+@dataclass(frozen=True)
+class RegionArrays:
+    """
+    Flattened region polygons.
+
+    - `names[i]`: region of feature i (features keep GeoJSON order; a region may repeat)
+    - `vertices`: (N, 2) float64 [lon, lat]
+    - `rings`: (R, 2) int64 [start, end) into `vertices`
+    - `polygons`: (P, 3) int64 [first_ring, end_ring, feature]; ring `first_ring` is the outer ring
+    """
+
+    names: List[str]
+    vertices: Any
+    rings: Any
+    polygons: Any
+
+    def to_regions(self) -> RegionList:
+        """Rebuild the nested-list shape produced by `geo_enrichment._load_regions`."""
+        verts = self.vertices.tolist()
+        rings = self.rings.tolist()
+        out: RegionList = [(n, []) for n in self.names]
+        for first, end, feat in self.polygons.tolist():
+            out[feat][1].append([verts[s:e] for s, e in rings[first:end]])
+        return out
+
+
+def regions_to_arrays(regions: RegionList) -> RegionArrays:
+    verts: List[List[float]] = []
+    rings: List[Tuple[int, int]] = []
+    polys: List[Tuple[int, int, int]] = []
+    for feat, (_, feature_polys) in enumerate(regions):
+        for poly in feature_polys:
+            first = len(rings)
+            for ring in poly:
+                start = len(verts)
+                verts.extend(ring)
+                rings.append((start, len(verts)))
+            polys.append((first, len(rings), feat))
+    return RegionArrays(
+        names=[str(n) for n, _ in regions],
+        vertices=np.asarray(verts, dtype=np.float64).reshape(-1, 2),
+        rings=np.asarray(rings, dtype=np.int64).reshape(-1, 2),
+        polygons=np.asarray(polys, dtype=np.int64).reshape(-1, 3),
+    )
+
+
+def save_regions(out_dir: Path, *, source: Path, regions: RegionList) -> Path:
+    arr = regions_to_arrays(regions)
+    return _save_arrays(
+        out_dir,
+        REGIONS,
+        source_sha256=file_sha256(source),
+        arrays={"vertices": arr.vertices, "rings": arr.rings, "polygons": arr.polygons},
+        meta={"names": arr.names},
+    )
+
+
+def load_regions(out_dir: Path, *, source: Path) -> Optional[RegionArrays]:
+    loaded = _load_arrays(out_dir, REGIONS, source_sha256=file_sha256(source))
+    if loaded is None:
+        return None
+    arrays, manifest = loaded
+    names = manifest.get("names")
+    if not isinstance(names, list) or not {"vertices", "rings", "polygons"} <= set(arrays):
+        return None
+    return RegionArrays(names=[str(n) for n in names], vertices=arrays["vertices"], rings=arrays["rings"], polygons=arrays["polygons"])
+
+
+# --------------------------
+# MRT stations
+# --------------------------
+
+@dataclass(frozen=True)
+class StationArrays:
+    """Stations in dataset order: `coords` is (S, 2) float64 [lat, lon]; text fields are parallel lists."""
+
+    coords: Any
+    names: List[str]
+    addresses: List[Optional[str]]
+    lines: List[Optional[str]]
+
+    def to_stations(self) -> List[Dict[str, Any]]:
+        """Rebuild the dict rows produced by `geo_enrichment._load_mrt_stations`."""
+        out: List[Dict[str, Any]] = []
+        for (lat, lon), name, address, line in zip(self.coords.tolist(), self.names, self.addresses, self.lines):
+            out.append({"name": name, "address": address, "line": line, "latitude": lat, "longitude": lon})
+        return out
+
+
+def save_stations(out_dir: Path, *, source: Path, stations: Sequence[Dict[str, Any]]) -> Path:
+    coords = np.asarray([[s["latitude"], s["longitude"]] for s in stations], dtype=np.float64).reshape(-1, 2)
+    return _save_arrays(
+        out_dir,
+        MRT_STATIONS,
+        source_sha256=file_sha256(source),
+        arrays={"coords": coords},
+        meta={
+            "names": [s.get("name") for s in stations],
+            "addresses": [s.get("address") for s in stations],
+            "lines": [s.get("line") for s in stations],
+        },
+    )
+
+
+def load_stations(out_dir: Path, *, source: Path) -> Optional[StationArrays]:
+    loaded = _load_arrays(out_dir, MRT_STATIONS, source_sha256=file_sha256(source))
+    if loaded is None:
+        return None
+    arrays, manifest = loaded
+    coords = arrays.get("coords")
+    names, addresses, lines = manifest.get("names"), manifest.get("addresses"), manifest.get("lines")
+    if coords is None or not all(isinstance(x, list) and len(x) == len(coords) for x in (names, addresses, lines)):
+        return None
+    return StationArrays(coords=coords, names=names, addresses=addresses, lines=lines)
+
+
+# --------------------------
+# Build / warm-up
+# --------------------------
+
+def _geo_module() -> Any:
+    try:
+        import geo_enrichment  # type: ignore
+    except Exception:
+        from TutorDexAggregator import geo_enrichment  # type: ignore
+    return geo_enrichment
+
+
+def _tutor_types_module() -> Any:
+    from shared.taxonomy import tutor_types  # type: ignore
+
+    return tutor_types
+
+
+def is_stale(out_dir: Optional[Path] = None) -> Dict[str, bool]:
+    """Per-artifact staleness (missing counts as stale). Geo artifacts are only checked when NumPy is available."""
+    geo = _geo_module()
+    out_dir = out_dir or artifacts_dir()
+    stale: Dict[str, bool] = {}
+    if np is not None:
+        region_src, mrt_src = geo._region_geojson_path(), geo._mrt_data_path()
+        if region_src.exists():
+            stale[REGIONS] = load_regions(out_dir, source=region_src) is None
+        if mrt_src.exists():
+            stale[MRT_STATIONS] = load_stations(out_dir, source=mrt_src) is None
+    try:
+        manifest = json.loads((out_dir / TUTOR_TYPES_INDEX).read_text(encoding="utf-8"))
+        tt = _tutor_types_module()
+        stale[TUTOR_TYPES_INDEX] = manifest.get("source_sha256") != tt.taxonomy_sha256() or manifest.get("format_version") != tt.INDEX_FORMAT_VERSION
+    except Exception:
+        stale[TUTOR_TYPES_INDEX] = True
+    return stale
+
+
+def build_artifacts(out_dir: Optional[Path] = None, *, only_stale: bool = False) -> Dict[str, str]:
+    """
+    Compile the artifacts into `out_dir` from the configured source files.
+
+    Returns {artifact: "built" | "fresh" | "skipped:<reason>"}.
+    """
+    geo = _geo_module()
+    out_dir = out_dir or artifacts_dir()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stale = is_stale(out_dir) if only_stale else {}
+    results: Dict[str, str] = {}
+
+    if np is None:
+        results[REGIONS] = results[MRT_STATIONS] = "skipped:numpy_missing"
+    else:
+        if only_stale and not stale.get(REGIONS, True):
+            results[REGIONS] = "fresh"
+        else:
+            regions, err = geo._parse_regions(geo._region_geojson_path())
+            if regions is None:
+                results[REGIONS] = f"skipped:{err}"
+            else:
+                save_regions(out_dir, source=geo._region_geojson_path(), regions=regions)
+                results[REGIONS] = "built"
+        if only_stale and not stale.get(MRT_STATIONS, True):
+            results[MRT_STATIONS] = "fresh"
+        else:
+            stations, err = geo._parse_mrt_stations(geo._mrt_data_path())
+            if stations is None:
+                results[MRT_STATIONS] = f"skipped:{err}"
+            else:
+                save_stations(out_dir, source=geo._mrt_data_path(), stations=stations)
+                results[MRT_STATIONS] = "built"
+
+    if only_stale and not stale.get(TUTOR_TYPES_INDEX, True):
+        results[TUTOR_TYPES_INDEX] = "fresh"
+    else:
+        try:
+            _tutor_types_module().export_index(str(out_dir / TUTOR_TYPES_INDEX))
+            results[TUTOR_TYPES_INDEX] = "built"
+        except Exception as e:
+            results[TUTOR_TYPES_INDEX] = f"skipped:{e}"
+    return results
+
+
+def warm_worker_caches(*, build_missing: bool = True) -> Dict[str, Any]:
+    """
+    Load everything the first extraction would otherwise load lazily, preferring prebuilt artifacts.
+
+    Called once at worker startup. Returns per-step timings (ms) and build results for logging.
+    Never raises: a failing step only means that cache is filled lazily on first use instead.
+    """
+    timings: Dict[str, Any] = {}
+    t_all = time.perf_counter()
+    use_prebuilt = False
+    try:
+        use_prebuilt = enabled()
+    except Exception as e:
+        swallow_exception(e, context="prebuilt_artifacts_config")
+
+    if use_prebuilt and build_missing:
+        t0 = time.perf_counter()
+        try:
+            built = build_artifacts(only_stale=True)
+            timings["build"] = {k: v for k, v in built.items() if v != "fresh"}
+        except Exception as e:
+            # Typically a read-only mount; workers still start and parse the sources instead.
+            swallow_exception(e, context="prebuilt_artifacts_build")
+        timings["build_ms"] = round((time.perf_counter() - t0) * 1000.0, 2)
+
+    def _step(name: str, fn: Any) -> None:
+        t0 = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            swallow_exception(e, context="worker_cache_warmup", extra={"step": name})
+        timings[f"{name}_ms"] = round((time.perf_counter() - t0) * 1000.0, 2)
+
+    def _tutor_types() -> None:
+        tt = _tutor_types_module()
+        loaded = bool(use_prebuilt and tt.load_index(str(artifacts_dir() / TUTOR_TYPES_INDEX)))
+        if not loaded:
+            tt._ensure_loaded()
+        timings["tutor_types_prebuilt"] = loaded
+
+    def _subjects() -> None:
+        try:
+            from extractors.subjects_matcher import _subject_phrase_patterns  # type: ignore
+        except Exception:
+            from TutorDexAggregator.extractors.subjects_matcher import _subject_phrase_patterns  # type: ignore
+        # Compiled regexes cannot be serialized; compile them here instead of inside the first job.
+        _subject_phrase_patterns()
+
+    geo = _geo_module()
+    _step("regions", geo._region_index)
+    _step("mrt_stations", geo._station_index)
+    _step("tutor_types", _tutor_types)
+    _step("subject_patterns", _subjects)
+    timings["total_ms"] = round((time.perf_counter() - t_all) * 1000.0, 2)
+    return timings
@@ -2,13 +2,14 @@
 Geocoding Service
 
 Geocode Singapore postal codes using Nominatim API with caching and retry logic.
+Results are shared across processes (and with the backend) via `shared/geocoding_cache.py`.
 """
 import logging
 from functools import lru_cache
 from typing import Optional, Tuple
 
 from shared.config import load_aggregator_config
-from shared.observability.exception_handler import swallow_exception
+from shared.geocoding_cache import POSTAL_COORDS, GeocodeUnavailable, geocode_cache
 
 try:
     from utils.field_coercion import normalize_sg_postal_code
@@ -29,13 +30,12 @@ def nominatim_disabled() -> bool:
     return bool(_cfg().disable_nominatim)
 
 
-@lru_cache(maxsize=2048)
 def geocode_sg_postal(postal_code: str, *, timeout: int = 10) -> Optional[Tuple[float, float]]:
     """
-    Geocode Singapore postal code using Nominatim API.
+    Geocode Singapore postal code.
 
-    Returns (lat, lon) tuple or None if geocoding fails.
-    Caches results to avoid repeated API calls.
+    Resolved through the shared geocode cache (offline gazetteer, process memo, Redis) before
+    falling back to Nominatim; see `shared/geocoding_cache.py`.
 
     Args:
         postal_code: Singapore postal code (6 digits)
@@ -44,53 +44,36 @@ def geocode_sg_postal(postal_code: str, *, timeout: int = 10) -> Optional[Tuple[
     Returns:
         Tuple of (latitude, longitude) or None if geocoding fails
     """
-    if nominatim_disabled():
-        return None
-
     pc = normalize_sg_postal_code(postal_code)
     if not pc:
         return None
+    fetch = None if nominatim_disabled() else (lambda: _nominatim_geocode(pc, timeout=timeout))
+    return geocode_cache(_cfg()).get(POSTAL_COORDS, pc, fetch)
+
 
+def _nominatim_geocode(pc: str, *, timeout: int = 10) -> Optional[Tuple[float, float]]:
+    """
+    Geocode a normalized postal code using the Nominatim API.
+
+    Returns None when Nominatim has no match; raises `GeocodeUnavailable` when it could not
+    answer (network errors, rate limiting), so the miss is not cached.
+    """
     import requests
 
     url = "https://nominatim.openstreetmap.org/search"
     params = {"q": f"Singapore {pc}", "format": "jsonv2", "limit": 1, "countrycodes": "sg"}
     headers = {"User-Agent": (str(_cfg().nominatim_user_agent or "").strip() or "TutorDexAggregator/1.0")}
 
-    max_attempts = int(_cfg().nominatim_retries)
-    backoff_s = float(_cfg().nominatim_backoff_seconds)
-
-    resp = None
-    for attempt in range(max(1, min(max_attempts, 6))):
-        try:
-            resp = requests.get(url, params=params, headers=headers, timeout=timeout)
-        except Exception:
-            logger.debug("postal_geocode_failed", exc_info=True)
-            resp = None
-
-        if resp is None:
-            # transient network issue
-            if attempt < max_attempts - 1:
-                try:
-                    import time
-                    time.sleep(min(10.0, backoff_s * (2**attempt)))
-                except Exception as e:
-                    swallow_exception(e, context="geocoding_backoff_sleep", extra={"attempt": attempt, "module": __name__})
-            continue
-
-        if resp.status_code in {429, 503} and attempt < max_attempts - 1:
-            try:
-                import time
-                time.sleep(min(10.0, backoff_s * (2**attempt)))
-            except Exception as e:
-                swallow_exception(e, context="geocoding_rate_limit_backoff", extra={"attempt": attempt, "module": __name__})
-            continue
-
-        if resp.status_code >= 400:
-            return None
-        break
-
-    if resp is None:
+    # One attempt; the shared cache retries transient failures, taking a rate slot for each attempt.
+    try:
+        resp = requests.get(url, params=params, headers=headers, timeout=timeout)
+    except Exception as e:
+        logger.debug("postal_geocode_failed", exc_info=True)
+        raise GeocodeUnavailable(str(e)) from e
+
+    if resp.status_code == 429 or resp.status_code >= 500:
+        raise GeocodeUnavailable(f"nominatim_status={resp.status_code}", retry_after=_retry_after(resp))
+    if resp.status_code >= 400:
         return None
 
     try:
@@ -106,3 +89,10 @@ def geocode_sg_postal(postal_code: str, *, timeout: int = 10) -> Optional[Tuple[
         return (lat, lon)
     except Exception:
         return None
+
+
+def _retry_after(resp) -> Optional[float]:
+    try:
+        return float(resp.headers.get("Retry-After"))
+    except Exception:
+        return None
@@ -0,0 +1,145 @@
+"""
+Job Wakeup Service
+
+Push notification channel between the collector and extraction workers.
+
+The collector publishes on a Redis pub/sub channel (one per pipeline version) whenever
+`enqueue_extraction_jobs` adds work. Idle workers block on that channel instead of sleeping
+`EXTRACTION_WORKER_IDLE_S` between claim attempts, so new jobs are claimed immediately and an
+idle worker only polls the queue every `EXTRACTION_WORKER_SAFETY_POLL_S` as a safety net.
+
+Disabled unless `EXTRACTION_WAKEUP_REDIS_URL` is set. Redis failures never block enqueueing or
+claiming: notifications are best-effort and workers fall back to plain idle sleeps.
+"""
+import logging
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("job_wakeup")
+
+_NOTIFIERS: Dict[str, "JobWakeup"] = {}
+
+
+def wakeup_channel(prefix: str, pipeline_version: str) -> str:
+    return f"{prefix}extraction_jobs:{pipeline_version}"
+
+
+def _connect(redis_url: str) -> Any:
+    import redis  # optional dependency; only needed when wakeups are enabled
+
+    return redis.Redis.from_url(redis_url, socket_connect_timeout=2.0, socket_timeout=10.0)
+
+
+class JobWakeup:
+    """Publish/await "jobs enqueued" notifications for one pipeline version."""
+
+    def __init__(self, redis_url: str, *, channel: str, reconnect_s: float = 30.0):
+        self.redis_url = redis_url
+        self.channel = channel
+        self.reconnect_s = float(reconnect_s)
+        self._client: Any = None
+        self._pubsub: Any = None
+        self._retry_at = 0.0
+
+    @classmethod
+    def from_config(cls, cfg: Any, pipeline_version: str) -> Optional["JobWakeup"]:
+        url = str(getattr(cfg, "extraction_wakeup_redis_url", None) or "").strip()
+        if not url:
+            return None
+        prefix = str(getattr(cfg, "extraction_wakeup_prefix", None) or "tutordex:")
+        return cls(url, channel=wakeup_channel(prefix, pipeline_version))
+
+    def _get_client(self) -> Any:
+        if self._client is None:
+            if time.monotonic() < self._retry_at:
+                return None
+            try:
+                self._client = _connect(self.redis_url)
+            except Exception as e:
+                self._fail("connect", e)
+                return None
+        return self._client
+
+    def _fail(self, op: str, e: Exception) -> None:
+        logger.warning("job_wakeup_%s_failed channel=%s error=%s", op, self.channel, e)
+        self.close()
+        self._retry_at = time.monotonic() + self.reconnect_s
+
+    def notify(self, count: int = 1) -> bool:
+        """Tell idle workers that `count` jobs were enqueued. Returns False if not delivered."""
+        client = self._get_client()
+        if client is None:
+            return False
+        try:
+            client.publish(self.channel, str(int(count)))
+            return True
+        except Exception as e:
+            self._fail("publish", e)
+            return False
+
+    def _subscription(self) -> Any:
+        if self._pubsub is None:
+            client = self._get_client()
+            if client is None:
+                return None
+            try:
+                # Subscribed once and kept open: notifications published while the worker is busy are
+                # buffered on the connection and only cause one extra (cheap) claim attempt.
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                self._pubsub = pubsub
+            except Exception as e:
+                self._fail("subscribe", e)
+                return None
+        return self._pubsub
+
+    def wait(self, timeout_s: float, *, fallback_sleep_s: float) -> str:
+        """
+        Block until jobs are announced or `timeout_s` elapses.
+
+        Returns:
+            "notified", "timeout", or "unavailable" (Redis down; slept `fallback_sleep_s` instead)
+        """
+        pubsub = self._subscription()
+        if pubsub is None:
+            time.sleep(max(0.0, float(fallback_sleep_s)))
+            return "unavailable"
+        deadline = time.monotonic() + max(0.0, float(timeout_s))
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return "timeout"
+                msg = pubsub.get_message(timeout=min(remaining, 5.0))
+                if msg and msg.get("type") == "message":
+                    # Collapse a burst of notifications into a single wakeup.
+                    while pubsub.get_message(timeout=0.0):
+                        pass
+                    return "notified"
+        except Exception as e:
+            self._fail("listen", e)
+            time.sleep(max(0.0, float(fallback_sleep_s)))
+            return "unavailable"
+
+    def close(self) -> None:
+        for obj in (self._pubsub, self._client):
+            try:
+                if obj is not None:
+                    obj.close()
+            except Exception:
+                pass
+        self._pubsub = None
+        self._client = None
+
+
+def notify_jobs_enqueued(cfg: Any, pipeline_version: str, count: int) -> bool:
+    """Publish a wakeup for `pipeline_version` using a process-wide notifier (no-op when disabled)."""
+    if count <= 0:
+        return False
+    notifier = _NOTIFIERS.get(pipeline_version)
+    if notifier is None:
+        notifier = JobWakeup.from_config(cfg, pipeline_version)
+        if notifier is None:
+            return False
+        _NOTIFIERS[pipeline_version] = notifier
+    return notifier.notify(count)
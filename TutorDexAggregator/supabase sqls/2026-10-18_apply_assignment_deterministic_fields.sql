@@ -0,0 +1,63 @@
+-- Bulk write-back of recomputed deterministic fields onto assignments.
+--
+-- Used by `utilities/recompute_deterministic.py`, which re-runs the deterministic extractors
+-- (time availability, hard validation, signals/taxonomy) over historical extractions and applies the results
+-- a page at a time instead of one PATCH per assignment.
+--
+-- p_rows: JSON array of objects
+--   { "external_id": "...", "channel_id": "...", "message_id": "...", "fields": { <assignments column>: value, ... } }
+-- Rows match on (external_id, channel_id, message_id), i.e. the assignment still points at the source message the
+-- extraction came from (a later repost that moved the assignment to another message is left alone).
+-- Only columns present in `fields` change; unknown keys are ignored by jsonb_populate_record.
+
+create index if not exists assignments_external_id_idx
+  on public.assignments (external_id);
+
+create or replace function public.apply_assignment_deterministic_fields(
+  p_rows jsonb
+)
+returns jsonb
+language plpgsql
+security definer
+set search_path = public, pg_temp
+as $$
+declare
+  v_count integer;
+begin
+  with u as (
+    select distinct on (e->>'external_id', e->>'channel_id', e->>'message_id')
+      e->>'external_id' as external_id,
+      e->>'channel_id' as channel_id,
+      e->>'message_id' as message_id,
+      coalesce(e->'fields', '{}'::jsonb) as f
+    from jsonb_array_elements(coalesce(p_rows, '[]'::jsonb)) with ordinality as t(e, ord)
+    where coalesce(e->>'external_id', '') <> ''
+    order by e->>'external_id', e->>'channel_id', e->>'message_id', ord desc
+  )
+  update public.assignments a
+     set
+       time_availability_note = (jsonb_populate_record(a, u.f)).time_availability_note,
+       time_availability_explicit = (jsonb_populate_record(a, u.f)).time_availability_explicit,
+       time_availability_estimated = (jsonb_populate_record(a, u.f)).time_availability_estimated,
+       tutor_types = (jsonb_populate_record(a, u.f)).tutor_types,
+       rate_breakdown = (jsonb_populate_record(a, u.f)).rate_breakdown,
+       signals_subjects = (jsonb_populate_record(a, u.f)).signals_subjects,
+       signals_levels = (jsonb_populate_record(a, u.f)).signals_levels,
+       signals_specific_student_levels = (jsonb_populate_record(a, u.f)).signals_specific_student_levels,
+       signals_streams = (jsonb_populate_record(a, u.f)).signals_streams,
+       signals_academic_requests = (jsonb_populate_record(a, u.f)).signals_academic_requests,
+       signals_confidence_flags = (jsonb_populate_record(a, u.f)).signals_confidence_flags,
+       subjects_canonical = (jsonb_populate_record(a, u.f)).subjects_canonical,
+       subjects_general = (jsonb_populate_record(a, u.f)).subjects_general,
+       canonicalization_version = (jsonb_populate_record(a, u.f)).canonicalization_version,
+       parse_quality_score = (jsonb_populate_record(a, u.f)).parse_quality_score,
+       canonical_json = (jsonb_populate_record(a, u.f)).canonical_json
+    from u
+   where a.external_id = u.external_id
+     and a.channel_id is not distinct from u.channel_id
+     and a.message_id is not distinct from u.message_id;
+
+  get diagnostics v_count = row_count;
+  return jsonb_build_object('count', v_count);
+end;
+$$;
@@ -0,0 +1,56 @@
+-- Single-pass match counts for `/me/assignments/match-counts`.
+--
+-- The backend used to issue one `count=exact` query per window (7/14/30 days), each re-scanning the same
+-- filtered assignment set. This RPC scans the widest window once and returns a histogram of matching
+-- assignments by age in whole days; every window is derived from it in `TutorDexBackend/utils/database_utils.py`.
+--
+-- Semantics match the per-window PostgREST query:
+-- - all statuses (open + closed), windowed by `published_at >= now() - N days`
+-- - each non-empty filter array is an overlap (`&&`) match; filters are ANDed
+--
+-- Buckets use ceil(age / 1 day), so "assignments within N days" is exactly the sum of buckets 0..N
+-- (publish times at or after now() land in bucket 0).
+
+create or replace function public.assignment_match_count_histogram(
+  p_max_days integer,
+  p_levels text[] default null,
+  p_specific_student_levels text[] default null,
+  p_subjects_canonical text[] default null,
+  p_subjects_general text[] default null
+)
+returns jsonb
+language sql
+stable
+set search_path = public, pg_temp
+as $$
+with params as (
+  select now() as t_now, greatest(1, least(coalesce(p_max_days, 30), 366)) as max_days
+),
+matched as (
+  select
+    greatest(
+      0,
+      ceil(extract(epoch from (p.t_now - a.published_at)) / 86400.0)
+    )::integer as age_days
+  from public.assignments a
+  cross join params p
+  where a.published_at >= p.t_now - make_interval(days => p.max_days)
+    and (coalesce(cardinality(p_levels), 0) = 0 or a.signals_levels && p_levels)
+    and (
+      coalesce(cardinality(p_specific_student_levels), 0) = 0
+      or a.signals_specific_student_levels && p_specific_student_levels
+    )
+    and (coalesce(cardinality(p_subjects_canonical), 0) = 0 or a.subjects_canonical && p_subjects_canonical)
+    and (coalesce(cardinality(p_subjects_general), 0) = 0 or a.subjects_general && p_subjects_general)
+)
+select jsonb_build_object(
+  'max_days', (select max_days from params),
+  'buckets', coalesce(
+    (
+      select jsonb_agg(jsonb_build_object('age_days', age_days, 'count', c) order by age_days)
+      from (select age_days, count(*) as c from matched group by age_days) s
+    ),
+    '[]'::jsonb
+  )
+);
+$$;
@@ -0,0 +1,28 @@
+-- Row-change cursor for `public.assignments`.
+--
+-- The backend's in-memory open-assignments read model (`TutorDexBackend/services/assignments_read_model.py`)
+-- polls `updated_at > cursor` to pick up inserts, bumps and status changes (close/expire) incrementally.
+-- `last_seen` alone is not enough: closing/expiring an assignment does not move it.
+
+alter table public.assignments
+  add column if not exists updated_at timestamptz not null default now();
+
+create or replace function public.set_assignments_updated_at()
+returns trigger
+language plpgsql
+set search_path = public, pg_temp
+as $$
+begin
+  new.updated_at = now();
+  return new;
+end;
+$$;
+
+drop trigger if exists assignments_set_updated_at on public.assignments;
+create trigger assignments_set_updated_at
+before update on public.assignments
+for each row
+execute function public.set_assignments_updated_at();
+
+create index if not exists assignments_updated_at_id_idx
+  on public.assignments (updated_at, id);
@@ -0,0 +1,79 @@
+-- Claim extraction jobs together with their raw message and channel metadata.
+--
+-- `public.claim_telegram_extractions` returns bare queue rows, so the worker then issued one GET on
+-- `telegram_messages_raw` per job and one GET on `telegram_channels` per uncached channel. This RPC claims
+-- with the same semantics (FIFO, `for update skip locked`, attempt bump) and returns each job joined with:
+-- - `raw`: the fields `workers/supabase_operations.fetch_raw_message` selects (null if the raw row is gone)
+-- - `channel`: channel_link, channel_id, title (= agency_telegram_channel_name; null if unknown)
+--
+-- Returns a single JSON array ordered like the claim. Workers fall back to `claim_telegram_extractions`
+-- when this function is not installed.
+
+create or replace function public.claim_telegram_extractions_with_payload(
+  p_pipeline_version text,
+  p_limit integer default 20
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+  v_out jsonb;
+begin
+  with cte as (
+    select te.id
+    from public.telegram_extractions te
+    where te.pipeline_version = p_pipeline_version
+      and te.status = 'pending'
+    order by te.created_at asc, te.id asc
+    for update skip locked
+    limit greatest(1, p_limit)
+  ),
+  claimed as (
+    update public.telegram_extractions te
+      set
+        status = 'processing',
+        updated_at = now(),
+        meta = coalesce(te.meta, '{}'::jsonb)
+              || jsonb_build_object(
+                'processing_started_at', now(),
+                'attempt', coalesce(nullif((te.meta->>'attempt'), '')::int, 0) + 1
+              )
+    from cte
+    where te.id = cte.id
+    returning te.*
+  )
+  select coalesce(
+    jsonb_agg(
+      to_jsonb(c)
+      || jsonb_build_object(
+        'raw',
+        case when r.id is null then null else jsonb_build_object(
+          'id', r.id,
+          'channel_link', r.channel_link,
+          'channel_id', r.channel_id,
+          'message_id', r.message_id,
+          'message_date', r.message_date,
+          'edit_date', r.edit_date,
+          'raw_text', r.raw_text,
+          'is_forward', r.is_forward,
+          'deleted_at', r.deleted_at
+        ) end,
+        'channel',
+        case when ch.channel_link is null then null else jsonb_build_object(
+          'channel_link', ch.channel_link,
+          'channel_id', ch.channel_id,
+          'title', ch.agency_telegram_channel_name
+        ) end
+      )
+      order by c.created_at asc, c.id asc
+    ),
+    '[]'::jsonb
+  )
+  into v_out
+  from claimed c
+  left join public.telegram_messages_raw r on r.id = c.raw_id
+  left join public.telegram_channels ch on ch.channel_link = c.channel_link;
+
+  return v_out;
+end;
+$$;
@@ -0,0 +1,51 @@
+-- Bulk status finalization for extraction jobs.
+--
+-- Workers used to PATCH `telegram_extractions?id=eq.X` once per job, shipping the full client-side merged
+-- `meta` blob. `public.finalize_telegram_extractions(p_updates)` applies a whole claimed batch at once and
+-- merges meta server-side.
+--
+-- p_updates: JSON array of objects
+--   { "id": 123, "status": "ok"|"failed"|"skipped"|..., "meta_patch": {...}, "error": {...},
+--     "canonical_json": {...}, "llm_model": "..." }
+-- Optional keys that are absent leave the column unchanged (same as the PATCH, which only sent
+-- non-null fields). `meta_patch` is shallow-merged into the current meta (`meta || meta_patch`).
+-- Each id should appear at most once; the worker coalesces repeated transitions before calling.
+
+create or replace function public.finalize_telegram_extractions(
+  p_updates jsonb
+)
+returns jsonb
+language plpgsql
+security definer
+set search_path = public, pg_temp
+as $$
+declare
+  v_count integer;
+begin
+  with u as (
+    select distinct on ((e->>'id')::bigint)
+      (e->>'id')::bigint as id,
+      e
+    from jsonb_array_elements(coalesce(p_updates, '[]'::jsonb)) with ordinality as t(e, ord)
+    where e ? 'id' and e ? 'status'
+    order by (e->>'id')::bigint, ord desc
+  )
+  update public.telegram_extractions te
+     set
+       status = u.e->>'status',
+       updated_at = now(),
+       canonical_json = case when u.e ? 'canonical_json' then u.e->'canonical_json' else te.canonical_json end,
+       error_json = case when u.e ? 'error' then u.e->'error' else te.error_json end,
+       llm_model = case when u.e ? 'llm_model' then u.e->>'llm_model' else te.llm_model end,
+       meta = case
+                when jsonb_typeof(u.e->'meta_patch') = 'object'
+                  then coalesce(te.meta, '{}'::jsonb) || (u.e->'meta_patch')
+                else te.meta
+              end
+    from u
+   where te.id = u.id;
+
+  get diagnostics v_count = row_count;
+  return jsonb_build_object('count', v_count);
+end;
+$$;
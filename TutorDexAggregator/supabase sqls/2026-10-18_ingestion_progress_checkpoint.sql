@@ -0,0 +1,9 @@
+-- Per-channel completion flag for backfill checkpoints.
+--
+-- `collector.py backfill` writes `ingestion_run_progress` behind the work as a checkpoint: `last_message_id` is the
+-- oldest message of the channel whose row (and every newer one in the window) is already in `telegram_messages_raw`.
+-- `done` marks channels that reached `since` (or the start of the channel), so `collector.py backfill --resume-run`
+-- skips them and restarts every other channel at `max_id = last_message_id` (exclusive).
+
+alter table public.ingestion_run_progress
+  add column if not exists done boolean not null default false;
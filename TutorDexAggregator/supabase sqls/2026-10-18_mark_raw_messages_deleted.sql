@@ -0,0 +1,69 @@
+-- Set-based deletion marking for raw Telegram messages.
+--
+-- The collector used to PATCH `telegram_messages_raw` once per deleted message id (and overwrote `deleted_at` on
+-- every repeat). `public.mark_raw_messages_deleted(p_channel_link, p_message_ids)` marks a whole batch and closes the
+-- assignments sourced from those messages in the same transaction.
+--
+-- - Idempotent: rows that are already deleted keep their original `deleted_at`; only `open` assignments are closed.
+-- - An assignment is closed when its current source is one of the messages (`channel_id`, `message_id`); an assignment
+--   whose source moved to a later repost is left alone.
+-- - Assignments of messages deleted earlier are closed too, so a retry after an assignment was (re)created still
+--   cascades.
+--
+-- Returns { "requested": n, "marked": rows newly marked deleted, "closed": assignments closed }.
+
+create index if not exists assignments_channel_message_idx
+  on public.assignments (channel_id, message_id);
+
+create or replace function public.mark_raw_messages_deleted(
+  p_channel_link text,
+  p_message_ids text[],
+  p_deleted_at timestamptz default now()
+)
+returns jsonb
+language plpgsql
+security definer
+set search_path = public, pg_temp
+as $$
+declare
+  v_ids text[];
+  v_marked integer;
+  v_closed integer;
+begin
+  select coalesce(array_agg(distinct btrim(x)), '{}')
+    into v_ids
+    from unnest(coalesce(p_message_ids, '{}')) as t(x)
+   where btrim(coalesce(x, '')) <> '';
+
+  with marked as (
+    update public.telegram_messages_raw r
+       set deleted_at = coalesce(p_deleted_at, now()),
+           last_seen_at = now()
+     where r.channel_link = p_channel_link
+       and r.message_id = any(v_ids)
+       and r.deleted_at is null
+    returning r.id
+  ),
+  sources as (
+    select r.channel_id, r.message_id
+      from public.telegram_messages_raw r
+     where r.channel_link = p_channel_link
+       and r.message_id = any(v_ids)
+       and r.channel_id is not null
+  ),
+  closed as (
+    update public.assignments a
+       set status = 'closed',
+           last_seen = now()
+      from sources s
+     where a.channel_id = s.channel_id
+       and a.message_id = s.message_id
+       and a.status = 'open'
+    returning a.id
+  )
+  select (select count(*) from marked), (select count(*) from closed)
+    into v_marked, v_closed;
+
+  return jsonb_build_object('requested', coalesce(array_length(v_ids, 1), 0), 'marked', v_marked, 'closed', v_closed);
+end;
+$$;
@@ -0,0 +1,223 @@
+-- Incrementally maintained facet counters for open assignments.
+--
+-- `public.open_assignment_facets(...)` recomputes every facet with `unnest` + `count(*)` over all open
+-- assignments on each call. The unfiltered call (website landing page) is by far the most common one, so
+-- its result is kept in `public.open_assignment_facet_counts` and updated by statement-level triggers on
+-- `public.assignments`. Every writer (aggregator persist, `expire_assignments.py`, manual edits) goes
+-- through the same triggers, so the counters cannot drift from the table.
+--
+-- Reads:   public.open_assignment_facet_counts()          -> same JSON shape as open_assignment_facets()
+-- Repair:  public.refresh_open_assignment_facet_counts()  -> full recompute (also run at the end of this file)
+--
+-- Counting rules mirror `open_assignment_facets` exactly:
+-- - array facets count distinct assignments per non-blank value
+-- - agencies group by coalesce(agency_display_name, agency_telegram_channel_name)
+-- - learning_modes count non-blank learning_mode
+-- - tutor_types count distinct tutor_types[].canonical
+--
+-- Note: TRUNCATE on `public.assignments` does not fire row/statement DML triggers; run the refresh after it.
+
+create table if not exists public.open_assignment_facet_counts (
+  facet text not null,
+  value text not null,
+  count bigint not null default 0,
+  updated_at timestamptz not null default now(),
+  primary key (facet, value)
+);
+
+alter table public.open_assignment_facet_counts enable row level security;
+
+drop policy if exists open_assignment_facet_counts_service_role_all
+  on public.open_assignment_facet_counts;
+create policy open_assignment_facet_counts_service_role_all
+  on public.open_assignment_facet_counts
+  for all to service_role
+  using (true)
+  with check (true);
+
+-- Apply signed per-value deltas: rows in `p_removed` stop counting, rows in `p_added` start counting.
+-- Only rows with status = 'open' should be passed. Values whose net delta is 0 (e.g. a `last_seen` bump)
+-- are not written, so frequent no-op updates do not contend on the counter rows.
+create or replace function public._apply_open_assignment_facet_deltas(
+  p_removed public.assignments[],
+  p_added public.assignments[]
+)
+returns void
+language sql
+security definer
+set search_path = public, pg_temp
+as $$
+with changes as (
+  select -1 as sign, r.*
+  from unnest(coalesce(p_removed, '{}'::public.assignments[])) r
+  union all
+  select 1 as sign, r.*
+  from unnest(coalesce(p_added, '{}'::public.assignments[])) r
+),
+deltas as (
+  select 'total'::text as facet, ''::text as value, sum(sign) as delta
+  from changes
+  union all
+  select 'levels', v, sum(sign)
+  from (select distinct sign, id, unnest(signals_levels) as v from changes) d
+  where v is not null and btrim(v) <> ''
+  group by v
+  union all
+  select 'specific_levels', v, sum(sign)
+  from (select distinct sign, id, unnest(signals_specific_student_levels) as v from changes) d
+  where v is not null and btrim(v) <> ''
+  group by v
+  union all
+  select 'subjects', v, sum(sign)
+  from (select distinct sign, id, unnest(signals_subjects) as v from changes) d
+  where v is not null and btrim(v) <> ''
+  group by v
+  union all
+  select 'subjects_general', v, sum(sign)
+  from (select distinct sign, id, unnest(subjects_general) as v from changes) d
+  where v is not null and btrim(v) <> ''
+  group by v
+  union all
+  select 'subjects_canonical', v, sum(sign)
+  from (select distinct sign, id, unnest(subjects_canonical) as v from changes) d
+  where v is not null and btrim(v) <> ''
+  group by v
+  union all
+  select 'agencies', coalesce(agency_display_name, agency_telegram_channel_name), sum(sign)
+  from changes
+  where (agency_display_name is not null and btrim(agency_display_name) <> '')
+    or (agency_telegram_channel_name is not null and btrim(agency_telegram_channel_name) <> '')
+  group by coalesce(agency_display_name, agency_telegram_channel_name)
+  union all
+  select 'learning_modes', learning_mode, sum(sign)
+  from changes
+  where learning_mode is not null and btrim(learning_mode) <> ''
+  group by learning_mode
+  union all
+  select 'tutor_types', v, sum(sign)
+  from (
+    select distinct
+      sign,
+      id,
+      jsonb_array_elements(
+        case when jsonb_typeof(tutor_types) = 'array' then tutor_types else '[]'::jsonb end
+      ) ->> 'canonical' as v
+    from changes
+  ) d
+  where v is not null and btrim(v) <> ''
+  group by v
+)
+insert into public.open_assignment_facet_counts as c (facet, value, count, updated_at)
+select facet, value, delta, now()
+from deltas
+where delta <> 0
+-- Stable lock order across concurrent writers.
+order by facet, value
+on conflict (facet, value) do update
+  set count = c.count + excluded.count,
+      updated_at = excluded.updated_at;
+$$;
+
+create or replace function public.assignments_facet_counts_trigger()
+returns trigger
+language plpgsql
+security definer
+set search_path = public, pg_temp
+as $$
+declare
+  v_removed public.assignments[];
+  v_added public.assignments[];
+begin
+  if tg_op in ('UPDATE', 'DELETE') then
+    select array_agg(o) into v_removed from old_rows o where o.status = 'open';
+  end if;
+  if tg_op in ('INSERT', 'UPDATE') then
+    select array_agg(n) into v_added from new_rows n where n.status = 'open';
+  end if;
+  if v_removed is not null or v_added is not null then
+    perform public._apply_open_assignment_facet_deltas(v_removed, v_added);
+  end if;
+  return null;
+end;
+$$;
+
+drop trigger if exists assignments_facet_counts_ins on public.assignments;
+create trigger assignments_facet_counts_ins
+after insert on public.assignments
+referencing new table as new_rows
+for each statement
+execute function public.assignments_facet_counts_trigger();
+
+drop trigger if exists assignments_facet_counts_upd on public.assignments;
+create trigger assignments_facet_counts_upd
+after update on public.assignments
+referencing old table as old_rows new table as new_rows
+for each statement
+execute function public.assignments_facet_counts_trigger();
+
+drop trigger if exists assignments_facet_counts_del on public.assignments;
+create trigger assignments_facet_counts_del
+after delete on public.assignments
+referencing old table as old_rows
+for each statement
+execute function public.assignments_facet_counts_trigger();
+
+-- Full recompute. Blocks assignment writes for the duration so the result is an exact snapshot.
+create or replace function public.refresh_open_assignment_facet_counts()
+returns jsonb
+language plpgsql
+security definer
+set search_path = public, pg_temp
+as $$
+declare
+  v_open bigint;
+begin
+  lock table public.assignments in share row exclusive mode;
+  delete from public.open_assignment_facet_counts;
+  perform public._apply_open_assignment_facet_deltas(
+    null,
+    array(select a from public.assignments a where a.status = 'open')
+  );
+  select coalesce(max(count), 0) into v_open
+  from public.open_assignment_facet_counts
+  where facet = 'total' and value = '';
+  return jsonb_build_object('total', v_open);
+end;
+$$;
+
+create or replace function public._open_assignment_facet_list(p_facet text)
+returns jsonb
+language sql
+stable
+set search_path = public, pg_temp
+as $$
+select coalesce(
+  jsonb_agg(jsonb_build_object('value', value, 'count', count) order by count desc, value asc),
+  '[]'::jsonb
+)
+from public.open_assignment_facet_counts
+where facet = p_facet
+  and count > 0;
+$$;
+
+-- Constant-time equivalent of `open_assignment_facets()` with no filters.
+create or replace function public.open_assignment_facet_counts()
+returns jsonb
+language sql
+stable
+set search_path = public, pg_temp
+as $$
+select jsonb_build_object(
+  'total', coalesce((select count from public.open_assignment_facet_counts where facet = 'total' and value = ''), 0),
+  'levels', public._open_assignment_facet_list('levels'),
+  'specific_levels', public._open_assignment_facet_list('specific_levels'),
+  'subjects', public._open_assignment_facet_list('subjects'),
+  'subjects_general', public._open_assignment_facet_list('subjects_general'),
+  'subjects_canonical', public._open_assignment_facet_list('subjects_canonical'),
+  'agencies', public._open_assignment_facet_list('agencies'),
+  'learning_modes', public._open_assignment_facet_list('learning_modes'),
+  'tutor_types', public._open_assignment_facet_list('tutor_types')
+);
+$$;
+
+select public.refresh_open_assignment_facet_counts();
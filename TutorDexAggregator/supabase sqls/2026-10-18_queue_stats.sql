@@ -0,0 +1,147 @@
+-- Aggregated extraction queue stats for worker metrics.
+--
+-- Replaces the per-status `Prefer: count=exact` GETs (pending/processing/ok/failed) and the two
+-- "oldest created_at" lookups that every extraction worker issued every 15 seconds.
+--
+-- - public.queue_stats(p_pipeline_version, p_terminal_max_age_seconds) -> jsonb with all counts and ages
+--   - pending/processing: exact counts + oldest age via the partial indexes below (small, hot sets)
+--   - ok/failed (terminal, unbounded growth): cached exact counts, recounted at most every
+--     p_terminal_max_age_seconds by a single caller (transaction advisory lock)
+-- - public.try_acquire_worker_lease(p_name, p_owner, p_ttl_seconds) -> boolean
+--   - lightweight leader election so only one worker collects queue stats
+
+create index if not exists telegram_extractions_pending_created_idx
+  on public.telegram_extractions (pipeline_version, created_at)
+  where status = 'pending';
+
+create index if not exists telegram_extractions_processing_created_idx
+  on public.telegram_extractions (pipeline_version, created_at)
+  where status = 'processing';
+
+create index if not exists telegram_extractions_pipeline_status_idx
+  on public.telegram_extractions (pipeline_version, status);
+
+create table if not exists public.extraction_queue_terminal_counts (
+  pipeline_version text primary key,
+  ok_count bigint not null default 0,
+  failed_count bigint not null default 0,
+  counted_at timestamptz not null default now()
+);
+
+alter table public.extraction_queue_terminal_counts enable row level security;
+
+drop policy if exists extraction_queue_terminal_counts_service_role_all
+  on public.extraction_queue_terminal_counts;
+create policy extraction_queue_terminal_counts_service_role_all
+  on public.extraction_queue_terminal_counts
+  for all to service_role
+  using (true)
+  with check (true);
+
+create or replace function public.queue_stats(
+  p_pipeline_version text,
+  p_terminal_max_age_seconds integer default 300
+)
+returns jsonb
+language plpgsql
+security definer
+set search_path = public, pg_temp
+as $$
+declare
+  v_now timestamptz := now();
+  v_pending bigint;
+  v_processing bigint;
+  v_oldest_pending timestamptz;
+  v_oldest_processing timestamptz;
+  v_terminal public.extraction_queue_terminal_counts%rowtype;
+begin
+  select count(*), min(created_at)
+    into v_pending, v_oldest_pending
+  from public.telegram_extractions
+  where status = 'pending' and pipeline_version = p_pipeline_version;
+
+  select count(*), min(created_at)
+    into v_processing, v_oldest_processing
+  from public.telegram_extractions
+  where status = 'processing' and pipeline_version = p_pipeline_version;
+
+  select * into v_terminal
+  from public.extraction_queue_terminal_counts
+  where pipeline_version = p_pipeline_version;
+
+  if (
+    v_terminal.pipeline_version is null
+    or v_terminal.counted_at < v_now - make_interval(secs => greatest(0, coalesce(p_terminal_max_age_seconds, 300)))
+  ) and pg_try_advisory_xact_lock(hashtext('queue_stats:' || coalesce(p_pipeline_version, ''))) then
+    insert into public.extraction_queue_terminal_counts as t (pipeline_version, ok_count, failed_count, counted_at)
+    select
+      p_pipeline_version,
+      count(*) filter (where status = 'ok'),
+      count(*) filter (where status = 'failed'),
+      v_now
+    from public.telegram_extractions
+    where pipeline_version = p_pipeline_version
+      and status in ('ok', 'failed')
+    on conflict (pipeline_version) do update
+      set ok_count = excluded.ok_count,
+          failed_count = excluded.failed_count,
+          counted_at = excluded.counted_at
+    returning * into v_terminal;
+  end if;
+
+  return jsonb_build_object(
+    'pending', v_pending,
+    'processing', v_processing,
+    'ok', v_terminal.ok_count,
+    'failed', v_terminal.failed_count,
+    'terminal_counted_at', v_terminal.counted_at,
+    'oldest_pending_age_seconds',
+      case when v_oldest_pending is null then null
+           else greatest(0, extract(epoch from (v_now - v_oldest_pending))) end,
+    'oldest_processing_age_seconds',
+      case when v_oldest_processing is null then null
+           else greatest(0, extract(epoch from (v_now - v_oldest_processing))) end
+  );
+end;
+$$;
+
+create table if not exists public.worker_leases (
+  name text primary key,
+  owner text not null,
+  expires_at timestamptz not null
+);
+
+alter table public.worker_leases enable row level security;
+
+drop policy if exists worker_leases_service_role_all on public.worker_leases;
+create policy worker_leases_service_role_all
+  on public.worker_leases
+  for all to service_role
+  using (true)
+  with check (true);
+
+-- Acquire or renew a named lease. Returns true when p_owner holds the lease after the call.
+create or replace function public.try_acquire_worker_lease(
+  p_name text,
+  p_owner text,
+  p_ttl_seconds integer
+)
+returns boolean
+language plpgsql
+security definer
+set search_path = public, pg_temp
+as $$
+declare
+  v_owner text;
+begin
+  insert into public.worker_leases as l (name, owner, expires_at)
+  values (p_name, p_owner, now() + make_interval(secs => greatest(1, p_ttl_seconds)))
+  on conflict (name) do update
+    set owner = excluded.owner,
+        expires_at = excluded.expires_at
+    where l.owner = excluded.owner or l.expires_at < now()
+  returning owner into v_owner;
+
+  return v_owner is not null and v_owner = p_owner;
+end;
+$$;
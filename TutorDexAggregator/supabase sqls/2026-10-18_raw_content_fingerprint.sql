@@ -0,0 +1,124 @@
+-- Content fingerprints for raw messages, checked when extractions are (re)enqueued.
+--
+-- Every Telegram edit upserts `telegram_messages_raw` and force-enqueues a full LLM extraction, even when the edit
+-- only added an emoji, a bump line or a TAKEN/CLOSED marker. The collector now stores two hashes per raw row
+-- (`TutorDexAggregator/content_fingerprint.py`):
+--
+-- - `content_hash`: normalized text (emoji, symbols, bump lines and whitespace removed)
+-- - `body_hash`: the same with status markers also removed
+--
+-- Enqueueing copies them onto the `telegram_extractions` row. On a forced (edit) enqueue,
+-- `public.enqueue_telegram_extractions_fingerprinted(...)` compares the raw hashes with the job's:
+--
+-- - same `content_hash` as a job that is done or already queued: no job ("unchanged"); the raw upsert has already
+--   refreshed `edit_date` / `last_seen_at`.
+-- - same `body_hash` as a finished (`ok`) extraction: the job is re-queued with `meta.refresh = 'status_only'`, and
+--   the worker applies the new status to the message's assignments without calling the LLM.
+-- - anything else (including rows without hashes): the usual full re-extraction, clearing `meta.refresh` and
+--   `meta.status_refresh` (the worker only reopens assignments that its own last refresh closed).
+--
+-- Non-forced enqueues keep the semantics of `enqueue_telegram_extractions`.
+-- Returns { "enqueued": full extraction jobs, "status_only": status-refresh jobs, "unchanged": edits skipped }.
+
+alter table public.telegram_messages_raw
+  add column if not exists content_hash text,
+  add column if not exists body_hash text;
+
+alter table public.telegram_extractions
+  add column if not exists content_hash text,
+  add column if not exists body_hash text;
+
+create or replace function public.enqueue_telegram_extractions_fingerprinted(
+  p_pipeline_version text,
+  p_channel_link text,
+  p_message_ids text[],
+  p_force boolean default false
+)
+returns jsonb
+language plpgsql
+security definer
+set search_path = public, pg_temp
+as $$
+declare
+  v_jobs integer;
+  v_status_only integer;
+  v_unchanged integer;
+begin
+  with src as (
+    select r.id as raw_id, r.channel_link, r.message_id, r.message_date, r.content_hash, r.body_hash
+      from public.telegram_messages_raw r
+     where r.channel_link = p_channel_link
+       and r.message_id = any(p_message_ids)
+       and r.deleted_at is null
+  ),
+  classified as (
+    select
+      s.*,
+      case
+        when not p_force or e.id is null or s.content_hash is null then 'extract'
+        when e.status in ('ok', 'skipped', 'pending', 'processing') and e.content_hash = s.content_hash then 'unchanged'
+        when (e.status = 'ok' or (e.status = 'pending' and e.meta->>'refresh' = 'status_only'))
+             and e.body_hash = s.body_hash then 'status_only'
+        else 'extract'
+      end as route
+    from src s
+    left join public.telegram_extractions e
+      on e.raw_id = s.raw_id
+     and e.pipeline_version = p_pipeline_version
+  ),
+  upserted as (
+    insert into public.telegram_extractions as te (
+      raw_id,
+      pipeline_version,
+      status,
+      channel_link,
+      message_id,
+      message_date,
+      content_hash,
+      body_hash,
+      meta,
+      created_at,
+      updated_at
+    )
+    select
+      c.raw_id,
+      p_pipeline_version,
+      'pending',
+      c.channel_link,
+      c.message_id,
+      c.message_date,
+      c.content_hash,
+      c.body_hash,
+      case when c.route = 'status_only' then jsonb_build_object('refresh', 'status_only') end,
+      now(),
+      now()
+    from classified c
+    where c.route <> 'unchanged'
+    on conflict (raw_id, pipeline_version) do update
+      set
+        status = case
+          when te.status = 'ok' and not p_force then te.status
+          else 'pending'
+        end,
+        channel_link = excluded.channel_link,
+        message_id = excluded.message_id,
+        message_date = excluded.message_date,
+        content_hash = excluded.content_hash,
+        body_hash = excluded.body_hash,
+        meta = case
+          when excluded.meta ? 'refresh' then coalesce(te.meta, '{}'::jsonb) || excluded.meta
+          else te.meta - 'refresh' - 'status_refresh'
+        end,
+        updated_at = now()
+      where p_force or te.status <> 'ok'
+    returning coalesce(te.meta->>'refresh', '') = 'status_only' as status_only
+  )
+  select
+    (select count(*) from upserted),
+    (select count(*) from upserted where status_only),
+    (select count(*) from classified where route = 'unchanged')
+    into v_jobs, v_status_only, v_unchanged;
+
+  return jsonb_build_object('enqueued', v_jobs - v_status_only, 'status_only', v_status_only, 'unchanged', v_unchanged);
+end;
+$$;
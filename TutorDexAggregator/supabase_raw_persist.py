@@ -13,6 +13,13 @@ try:
 except Exception:
     from TutorDexAggregator.logging_setup import log_event, setup_logging, timed  # type: ignore
 
+try:
+    from content_fingerprint import content_fingerprints  # type: ignore
+    from observability_metrics import collector_extractions_avoided_total  # type: ignore
+except Exception:
+    from TutorDexAggregator.content_fingerprint import content_fingerprints  # type: ignore
+    from TutorDexAggregator.observability_metrics import collector_extractions_avoided_total  # type: ignore
+
 from shared.config import load_aggregator_config
 from shared.supabase_client import SupabaseClient, SupabaseConfig as ClientConfig, coerce_rows
 
@@ -110,6 +117,16 @@ def load_raw_config_from_env() -> SupabaseRawConfig:
     )
 
 
+# Message ids per `mark_raw_messages_deleted` call.
+DELETE_RPC_CHUNK = 500
+
+# Raw rows missing any of these are dropped by `upsert_messages_batch` instead of being sent.
+RAW_REQUIRED_FIELDS = ("channel_link", "message_id", "message_date", "message_json")
+
+# Raw row columns added by `2026-10-18_raw_content_fingerprint.sql`; dropped from upserts on schemas without them.
+FINGERPRINT_COLUMNS = ("content_hash", "body_hash")
+
+
 class RawFallbackWriter:
     def __init__(self, *, path: Path):
         self.path = path
@@ -130,6 +147,11 @@ class SupabaseRawStore:
         )
         fb = str(_CFG.raw_fallback_file or "").strip()
         self.fallback = RawFallbackWriter(path=Path(fb)) if fb else None
+        self._delete_rpc_available = True
+        self._fingerprint_columns = True
+        self._fingerprint_rpc_available = True
+        # HTTP status of the last `upsert_messages_batch` request (None if it raised or sent nothing).
+        self.last_upsert_status: Optional[int] = None
 
     def enabled(self) -> bool:
         return bool(self.client)
@@ -218,7 +240,7 @@ class SupabaseRawStore:
             return []
         try:
             resp = self.client.get(
-                f"{self.cfg.progress_table}?select=channel_link,last_message_id,last_message_date,scanned_count,inserted_count,updated_count,error_count,updated_at&run_id=eq.{int(run_id)}&order=channel_link.asc",
+                f"{self.cfg.progress_table}?select=channel_link,last_message_id,last_message_date,scanned_count,inserted_count,updated_count,error_count,done,updated_at&run_id=eq.{int(run_id)}&order=channel_link.asc",
                 timeout=20,
             )
         except Exception:
@@ -273,6 +295,7 @@ class SupabaseRawStore:
         inserted: int,
         updated: int,
         errors: int,
+        done: Optional[bool] = None,
     ) -> bool:
         if not self.client or not run_id:
             self._best_effort_fallback(
@@ -286,6 +309,7 @@ class SupabaseRawStore:
                     "inserted": inserted,
                     "updated": updated,
                     "errors": errors,
+                    "done": done,
                 },
             )
             return False
@@ -302,6 +326,9 @@ class SupabaseRawStore:
             row["last_message_id"] = last_message_id
         if last_message_date_iso:
             row["last_message_date"] = last_message_date_iso
+        if done is not None:
+            # `done` column: supabase sqls/2026-10-18_ingestion_progress_checkpoint.sql
+            row["done"] = bool(done)
         try:
             resp = self.client.post(
                 f"{self.cfg.progress_table}?on_conflict=run_id,channel_link",
@@ -327,6 +354,7 @@ class SupabaseRawStore:
         """
         Returns (attempted, ok_rows). PostgREST doesn't reliably tell insert vs update counts; treat ok_rows as written.
         """
+        self.last_upsert_status = None
         if not rows:
             return 0, 0
 
@@ -339,7 +367,7 @@ class SupabaseRawStore:
         normalized: List[Dict[str, Any]] = []
         dropped = 0
         for r in rows:
-            if r.get("channel_link") is None or r.get("message_id") is None or r.get("message_date") is None or r.get("message_json") is None:
+            if any(r.get(k) is None for k in RAW_REQUIRED_FIELDS):
                 dropped += 1
                 continue
             nr = {k: r.get(k, None) for k in all_keys}
@@ -355,6 +383,9 @@ class SupabaseRawStore:
                 self._best_effort_fallback(kind="message", row=r)
             return len(rows), 0
 
+        if not self._fingerprint_columns:
+            normalized = [{k: v for k, v in r.items() if k not in FINGERPRINT_COLUMNS} for r in normalized]
+
         t0 = timed()
         prefer = "resolution=merge-duplicates,return=minimal"
         try:
@@ -364,10 +395,20 @@ class SupabaseRawStore:
                 timeout=timeout,
                 prefer=prefer,
             )
+            if (
+                resp.status_code == 400
+                and ("PGRST204" in resp.text or "schema cache" in resp.text)
+                and any(k in all_keys for k in FINGERPRINT_COLUMNS)
+                and self._fingerprint_columns
+            ):
+                log_event(logger, logging.WARNING, "raw_fingerprint_columns_missing", body=resp.text[:400])
+                self._fingerprint_columns = False
+                return self.upsert_messages_batch(rows=rows, on_conflict=on_conflict, timeout=timeout)
         except Exception as e:
             log_event(logger, logging.WARNING, "raw_messages_upsert_failed", error=str(e), attempted=len(rows))
             return len(rows), 0
 
+        self.last_upsert_status = resp.status_code
         ok = resp.status_code < 400
         if not ok:
             log_event(logger, logging.WARNING, "raw_messages_upsert_status", status_code=resp.status_code, body=resp.text[:400], attempted=len(rows))
@@ -376,11 +417,23 @@ class SupabaseRawStore:
         log_event(logger, logging.DEBUG, "raw_messages_upsert_ok", attempted=len(rows), ms=round((timed() - t0) * 1000.0, 2))
         return len(rows), len(rows)
 
-    def enqueue_extractions(self, *, channel_link: str, message_ids: List[str], pipeline_version: str, force: bool = False) -> int:
+    def enqueue_extractions(
+        self,
+        *,
+        channel_link: str,
+        message_ids: List[str],
+        pipeline_version: str,
+        force: bool = False,
+        raise_on_error: bool = False,
+    ) -> int:
         """
-        Enqueue extraction jobs for existing raw messages via the Supabase RPC work queue.
+        Enqueue extraction jobs for existing raw messages via the Supabase RPC work queue; returns the jobs queued.
 
-        This calls `public.enqueue_telegram_extractions(...)` (see `supabase_schema_full.sql`).
+        Prefers `public.enqueue_telegram_extractions_fingerprinted(...)` (`supabase sqls/2026-10-18_raw_content_fingerprint.sql`),
+        which skips edits that left the content fingerprint unchanged and queues status-only edits as cheap status
+        refreshes; falls back to `public.enqueue_telegram_extractions(...)` (see `supabase_schema_full.sql`) if missing.
+
+        Failed RPC calls return 0, or raise `RuntimeError` with `raise_on_error` (callers that retry, e.g. the spool).
         """
         ids = [str(x).strip() for x in (message_ids or []) if str(x).strip()]
         if not ids:
@@ -398,57 +451,155 @@ class SupabaseRawStore:
             "p_message_ids": ids,
             "p_force": bool(force),
         }
+        if self._fingerprint_rpc_available:
+            out = self._enqueue_fingerprinted(body, raise_on_error=raise_on_error)
+            if out is not None:
+                return out
         try:
             resp = self.client.post("rpc/enqueue_telegram_extractions", body, timeout=20)
-            if resp.status_code >= 400:
-                log_event(
-                    logger,
-                    logging.WARNING,
-                    "raw_enqueue_extractions_status",
-                    status_code=resp.status_code,
-                    body=(resp.text or "")[:400],
-                )
-                return 0
-            try:
-                data = resp.json()
-            except Exception:
-                return 0
-            try:
-                return int(data or 0)
-            except Exception:
-                return 0
         except Exception as e:
             log_event(logger, logging.WARNING, "raw_enqueue_extractions_failed", error=str(e))
+            if raise_on_error:
+                raise
+            return 0
+        if resp.status_code >= 400:
+            log_event(
+                logger,
+                logging.WARNING,
+                "raw_enqueue_extractions_status",
+                status_code=resp.status_code,
+                body=(resp.text or "")[:400],
+            )
+            if raise_on_error:
+                raise RuntimeError(f"enqueue_telegram_extractions status={resp.status_code}")
+            return 0
+        try:
+            data = resp.json()
+        except Exception:
+            return 0
+        try:
+            return int(data or 0)
+        except Exception:
+            return 0
+
+    def _enqueue_fingerprinted(self, body: Dict[str, Any], *, raise_on_error: bool = False) -> Optional[int]:
+        try:
+            resp = self.client.post("rpc/enqueue_telegram_extractions_fingerprinted", body, timeout=20)
+        except Exception as e:
+            log_event(logger, logging.WARNING, "raw_enqueue_extractions_failed", error=str(e))
+            if raise_on_error:
+                raise
+            return 0
+        if resp.status_code == 404:
+            log_event(logger, logging.WARNING, "raw_enqueue_fingerprint_rpc_missing")
+            self._fingerprint_rpc_available = False
+            return None
+        if resp.status_code >= 400:
+            log_event(logger, logging.WARNING, "raw_enqueue_extractions_status", status_code=resp.status_code, body=(resp.text or "")[:400])
+            if raise_on_error:
+                raise RuntimeError(f"enqueue_telegram_extractions_fingerprinted status={resp.status_code}")
             return 0
+        try:
+            data = resp.json()
+        except Exception:
+            data = None
+        if isinstance(data, list) and data:
+            data = data[0]
+        if not isinstance(data, dict):
+            return 0
+        enqueued = _safe_int(data.get("enqueued")) or 0
+        status_only = _safe_int(data.get("status_only")) or 0
+        unchanged = _safe_int(data.get("unchanged")) or 0
+        try:
+            # Status-only jobs still run (without the LLM, or as a full extraction on fallback); the worker counts them.
+            collector_extractions_avoided_total.labels(reason="unchanged").inc(unchanged)
+        except Exception:
+            # Metrics must never break runtime
+            pass
+        if status_only or unchanged:
+            log_event(
+                logger,
+                logging.DEBUG,
+                "raw_enqueue_fingerprint_skips",
+                channel=body.get("p_channel_link"),
+                enqueued=enqueued,
+                status_only=status_only,
+                unchanged=unchanged,
+            )
+        return enqueued + status_only
+
+    def mark_deleted(self, *, channel_link: str, message_ids: Iterable[str], deleted_at_iso: Optional[str] = None) -> Dict[str, int]:
+        """
+        Mark raw messages deleted and close the assignments sourced from them.
 
-    def mark_deleted(self, *, channel_link: str, message_ids: Iterable[str], deleted_at_iso: Optional[str] = None) -> int:
-        ids = [str(x).strip() for x in message_ids if str(x).strip()]
+        Uses `public.mark_raw_messages_deleted` (`supabase sqls/2026-10-18_mark_raw_messages_deleted.sql`) in chunks of
+        `DELETE_RPC_CHUNK` ids; falls back to one PATCH per message (no assignment cascade) if the RPC is missing.
+        Returns {"requested", "marked", "closed", "failed"}; repeating a call marks and closes nothing new.
+        """
+        ids = sorted({str(x).strip() for x in message_ids if str(x).strip()})
+        res = {"requested": len(ids), "marked": 0, "closed": 0, "failed": 0}
         if not ids:
-            return 0
+            return res
         deleted_at_iso = deleted_at_iso or _utc_now_iso()
 
         if not self.client:
             for mid in ids:
                 self._best_effort_fallback(kind="delete", row={"channel_link": channel_link, "message_id": mid, "deleted_at": deleted_at_iso})
-            return 0
-
-        # Patch per-message to keep it simple and safe. If this becomes a bottleneck, switch to RPC.
-        patched = 0
-        for mid in ids:
+            return res
+
+        for i in range(0, len(ids), DELETE_RPC_CHUNK):
+            chunk = ids[i : i + DELETE_RPC_CHUNK]
+            out = self._mark_deleted_rpc(channel_link=channel_link, message_ids=chunk, deleted_at_iso=deleted_at_iso) if self._delete_rpc_available else None
+            if out is None:
+                out = self._mark_deleted_patch(channel_link=channel_link, message_ids=chunk, deleted_at_iso=deleted_at_iso)
+            for k in ("marked", "closed", "failed"):
+                res[k] += int(out.get(k) or 0)
+        return res
+
+    def _mark_deleted_rpc(self, *, channel_link: str, message_ids: List[str], deleted_at_iso: str) -> Optional[Dict[str, int]]:
+        body = {"p_channel_link": channel_link, "p_message_ids": message_ids, "p_deleted_at": deleted_at_iso}
+        try:
+            resp = self.client.post("rpc/mark_raw_messages_deleted", body, timeout=30)
+        except Exception as e:
+            log_event(logger, logging.WARNING, "raw_delete_rpc_failed", channel=channel_link, ids=len(message_ids), error=str(e))
+            return {"failed": len(message_ids)}
+        if resp.status_code == 404:
+            log_event(logger, logging.WARNING, "raw_delete_rpc_missing", channel=channel_link)
+            self._delete_rpc_available = False
+            return None
+        if resp.status_code >= 400:
+            log_event(logger, logging.WARNING, "raw_delete_rpc_status", status_code=resp.status_code, body=resp.text[:400], ids=len(message_ids))
+            return {"failed": len(message_ids)}
+        try:
+            data = resp.json()
+        except Exception:
+            data = None
+        if isinstance(data, list) and data:
+            data = data[0]
+        if not isinstance(data, dict):
+            return {}
+        return {"marked": _safe_int(data.get("marked")) or 0, "closed": _safe_int(data.get("closed")) or 0}
+
+    def _mark_deleted_patch(self, *, channel_link: str, message_ids: List[str], deleted_at_iso: str) -> Dict[str, int]:
+        # Pre-RPC path: one PATCH per message; already-deleted rows keep their original `deleted_at`.
+        out = {"marked": 0, "failed": 0}
+        for mid in message_ids:
             try:
                 resp = self.client.patch(
-                    f"{self.cfg.messages_table}?channel_link=eq.{requests.utils.quote(channel_link, safe='')}&message_id=eq.{requests.utils.quote(mid, safe='')}",
+                    f"{self.cfg.messages_table}?channel_link=eq.{requests.utils.quote(channel_link, safe='')}&message_id=eq.{requests.utils.quote(mid, safe='')}&deleted_at=is.null",
                     {"deleted_at": deleted_at_iso, "last_seen_at": _utc_now_iso()},
                     timeout=20,
                     prefer="return=minimal",
                 )
                 if resp.status_code < 400:
-                    patched += 1
+                    out["marked"] += 1
                 else:
+                    out["failed"] += 1
                     log_event(logger, logging.DEBUG, "raw_delete_patch_status", status_code=resp.status_code, body=resp.text[:200])
             except Exception as e:
+                out["failed"] += 1
                 log_event(logger, logging.DEBUG, "raw_delete_patch_failed", error=str(e))
-        return patched
+        return out
 
     def get_latest_message_cursor(self, *, channel_link: str) -> Tuple[Optional[str], Optional[str]]:
         """
@@ -505,6 +656,7 @@ def build_raw_row(
 
     raw_text = getattr(msg, "raw_text", None) or getattr(msg, "message", None) or ""
     edit_dt = getattr(msg, "edit_date", None)
+    content_hash, body_hash = content_fingerprints(raw_text)
 
     replies = getattr(msg, "replies", None)
     reply_count = None
@@ -529,6 +681,8 @@ def build_raw_row(
         "forwards": _safe_int(getattr(msg, "forwards", None)),
         "reply_count": reply_count,
         "edit_date": _jsonable(edit_dt) if edit_dt else None,
+        "content_hash": content_hash,
+        "body_hash": body_hash,
         "message_json": _jsonable(
             {
                 "id": message_id,
@@ -95,6 +95,8 @@ def _apply_run_env(env: Dict[str, str], run: RunConfig) -> Dict[str, str]:
 
     if run.llm_api_url:
         e["LLM_API_URL"] = run.llm_api_url
+        # A per-run URL must not be shadowed by an inherited endpoint list.
+        e["LLM_API_URLS"] = ""
     if run.llm_model_name:
         e["LLM_MODEL_NAME"] = run.llm_model_name
 
@@ -4,6 +4,8 @@ Backfill assignment `postal_lat`/`postal_lon` in Supabase for rows that already
 Why:
 - Older rows may have `postal_code` but missing `postal_lat/postal_lon` (schema added later, or geocode was disabled).
 - Website distance display + nearest sorting require assignment coords to compute distance.
+- `region` / `nearest_mrt_computed*` are derived from the coords (offline geo enrichment), so they are
+  filled in the same patch, computed for the whole batch at once.
 
 Usage:
   python utilities/backfill_assignment_latlon.py --limit 500
@@ -39,10 +41,13 @@ if str(PARENT) not in sys.path:
 
 from logging_setup import log_event, setup_logging  # noqa: E402
 from supabase_persist import SupabaseRestClient, SupabaseConfig, load_config_from_env, _geocode_sg_postal, _normalize_sg_postal_code  # noqa: E402
+import geo_enrichment  # noqa: E402
 
 setup_logging()
 logger = logging.getLogger("backfill_assignment_latlon")
 
+GEO_BATCH_SIZE = 50
+
 def _geocode_sg_postal_force(postal_code: str, *, timeout: int = 10) -> Optional[Tuple[float, float]]:
     pc = _normalize_sg_postal_code(postal_code)
     if not pc:
@@ -99,8 +104,28 @@ def fetch_candidates(client: SupabaseRestClient, *, table: str, status: str, lim
     return _coerce_rows(resp)
 
 
-def patch_row(client: SupabaseRestClient, *, table: str, row_id: int, lat: float, lon: float) -> None:
-    body = {"postal_lat": float(lat), "postal_lon": float(lon)}
+def geo_fields_batch(coords: List[Tuple[float, float]]) -> List[Dict[str, Any]]:
+    """Region + nearest MRT columns for each (lat, lon), as `build_assignment_row` would set them."""
+    if not coords or not geo_enrichment._enabled():
+        return [{} for _ in coords]
+    nearest, _ = geo_enrichment.lookup_nearest_mrt_batch(coords, k=1)
+    out: List[Dict[str, Any]] = []
+    for (lat, lon), mrt in zip(coords, nearest):
+        region, _ = geo_enrichment.lookup_region(lat=lat, lon=lon)
+        top = mrt[0] if mrt else {}
+        out.append(
+            {
+                "region": region,
+                "nearest_mrt_computed": top.get("name"),
+                "nearest_mrt_computed_line": top.get("line"),
+                "nearest_mrt_computed_distance_m": top.get("distance_m"),
+            }
+        )
+    return out
+
+
+def patch_row(client: SupabaseRestClient, *, table: str, row_id: int, lat: float, lon: float, extra: Optional[Dict[str, Any]] = None) -> None:
+    body = {"postal_lat": float(lat), "postal_lon": float(lon), **(extra or {})}
     resp = client.patch(f"{table}?id=eq.{int(row_id)}", body, timeout=20, prefer="return=minimal")
     if resp.status_code >= 400:
         raise RuntimeError(f"patch_failed id={row_id} status={resp.status_code} body={resp.text[:400]}")
@@ -144,6 +169,35 @@ def main() -> None:
     updated = 0
     skipped = 0
     failed = 0
+    geocoded: List[Tuple[Dict[str, Any], str, float, float]] = []
+
+    def _write_geocoded() -> None:
+        nonlocal updated, failed
+        geo_fields = geo_fields_batch([(lat, lon) for _, _, lat, lon in geocoded])
+        for (r, pc, lat, lon), extra in zip(geocoded, geo_fields):
+            row_id = r.get("id")
+            if args.dry_run:
+                updated += 1
+                log_event(
+                    logger,
+                    logging.INFO,
+                    "backfill_dry_run_update",
+                    id=row_id,
+                    external_id=r.get("external_id"),
+                    postal_code=pc,
+                    postal_lat=lat,
+                    postal_lon=lon,
+                    **extra,
+                )
+                continue
+
+            try:
+                patch_row(client, table=table, row_id=int(row_id), lat=lat, lon=lon, extra=extra)
+                updated += 1
+            except Exception as e:
+                failed += 1
+                log_event(logger, logging.WARNING, "backfill_patch_failed", id=row_id, error=str(e))
+        geocoded.clear()
 
     for r in rows:
         row_id = r.get("id")
@@ -173,27 +227,11 @@ def main() -> None:
             )
             continue
 
-        lat, lon = coords
-        if args.dry_run:
-            updated += 1
-            log_event(
-                logger,
-                logging.INFO,
-                "backfill_dry_run_update",
-                id=row_id,
-                external_id=r.get("external_id"),
-                postal_code=str(pc),
-                postal_lat=float(lat),
-                postal_lon=float(lon),
-            )
-            continue
-
-        try:
-            patch_row(client, table=table, row_id=int(row_id), lat=lat, lon=lon)
-            updated += 1
-        except Exception as e:
-            failed += 1
-            log_event(logger, logging.WARNING, "backfill_patch_failed", id=row_id, error=str(e))
+        geocoded.append((r, str(pc), float(coords[0]), float(coords[1])))
+        # Geocoding is rate limited; write in small batches so progress survives an interrupted run.
+        if len(geocoded) >= GEO_BATCH_SIZE:
+            _write_geocoded()
+    _write_geocoded()
 
     log_event(
         logger,
@@ -0,0 +1,292 @@
+"""
+Tokens-per-extraction and parse-failure rate for each LLM output mode, against a mocked streaming server
+(NO real LLM, NO Supabase).
+
+Runs every `message_examples/*.txt` post through the real `extract_assignment_with_model` (prompt build, endpoint pool,
+streaming reader, JSON parsing) for each combination of `LLM_OUTPUT_CONSTRAINT` (off / json_schema / gbnf) and
+`LLM_STREAM` (off / on). Numbers are taken from the hooks that feed the worker's metrics
+(`worker_llm_completion_tokens`, `worker_llm_output_total`, `worker_llm_stream_early_stops_total`), so they are the
+same figures the worker exports.
+
+The mock replays each post's recorded JSON and models the failure modes constrained decoding removes:
+- unconstrained answers are wrapped in prose and a code fence, with a trailing explanation after the object
+- every `--defect-every`th unconstrained answer is prose with no JSON object at all (json-repair cannot recover it)
+- `max_tokens` is enforced (`finish_reason="length"`), so a budget that is too tight truncates the answer
+- with `response_format` or `grammar` it emits only the schema's keys, as JSON, and stops
+`--reject-constraints` makes the mock answer 400 to constrained requests (a backend without schema support).
+
+  python utilities/benchmark_constrained_decoding.py
+  python utilities/benchmark_constrained_decoding.py --limit 40 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+AGG_DIR = Path(__file__).resolve().parents[1]
+if str(AGG_DIR) not in sys.path:
+    sys.path.insert(0, str(AGG_DIR))
+
+import extract_key_info as ek  # noqa: E402
+from extraction_output_schema import ASSIGNMENT_OUTPUT_SCHEMA, CONSTRAINT_MODES  # noqa: E402
+from llm_endpoint_pool import EndpointPool, set_llm_endpoint_pool  # noqa: E402
+from utilities.benchmark_pipeline import BenchCase, load_corpus  # noqa: E402
+
+_TOKEN_RE = re.compile(r"\s+|\w+|[^\w\s]")
+_PREFIX = "Sure! Here is the extracted information from the tuition assignment post:\n\n```json\n"
+_SUFFIX = (
+    "\n```\n\nNotes: fields that were not explicitly stated in the post were set to null, as instructed. "
+    "The rate was kept verbatim and no values were inferred from other fields. Let me know if you need anything else!"
+)
+_PROSE_ONLY = (
+    "This post lists a tuition assignment. The assignment code, level and subject are stated near the top, "
+    "the location is given as an address with a postal code, and the rate is shown per hour."
+)
+
+
+def mock_tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text or "")
+
+
+def _project(value: Any, schema: Dict[str, Any]) -> Any:
+    """Recorded answer reshaped to what a schema-constrained decoder can emit (schema keys, in order)."""
+    if isinstance(schema.get("properties"), dict):
+        src = value if isinstance(value, dict) else {}
+        return {k: _project(src.get(k), sub) for k, sub in schema["properties"].items()}
+    return value
+
+
+class MockLLMServer:
+    """OpenAI-compatible `/v1/chat/completions` stub that answers with each post's recorded JSON."""
+
+    def __init__(
+        self,
+        cases: List[BenchCase],
+        *,
+        defect_every: int = 8,
+        reject_constraints: bool = False,
+        reject_message: str = "response_format is not supported",
+    ) -> None:
+        self.answers: List[Tuple[str, Dict[str, Any]]] = [(c.raw_text.strip(), ek.safe_parse_json(c.llm_output)) for c in cases]
+        self.defect_every = int(defect_every)
+        self.reject_constraints = bool(reject_constraints)
+        self.reject_message = str(reject_message)
+        self.requests: List[Dict[str, Any]] = []
+        self._n = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                self._json(200, {"data": [{"id": "mock"}]})
+
+            def do_POST(self) -> None:
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                status, body, pieces, finish = server.respond(payload)
+                if status != 200 or not payload.get("stream"):
+                    self._json(status, body)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                try:
+                    for piece in pieces:
+                        self._event({"choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]})
+                    self._event({"choices": [{"index": 0, "delta": {}, "finish_reason": finish}]})
+                    self.wfile.write(b"data: [DONE]\n\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client stopped reading once the object closed.
+                    pass
+
+            def _event(self, obj: Dict[str, Any]) -> None:
+                self.wfile.write(b"data: " + json.dumps(obj).encode() + b"\n\n")
+                self.wfile.flush()
+
+            def _json(self, status: int, obj: Dict[str, Any]) -> None:
+                raw = json.dumps(obj).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self) -> "MockLLMServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _answer_for(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        user = ""
+        for m in payload.get("messages") or []:
+            if m.get("role") == "user":
+                user = str(m.get("content") or "")
+        for raw, answer in self.answers:
+            if raw and raw in user:
+                return answer
+        return {}
+
+    def respond(self, payload: Dict[str, Any]) -> Tuple[int, Dict[str, Any], List[str], str]:
+        constrained = "response_format" in payload or "grammar" in payload
+        with self._lock:
+            self.requests.append(payload)
+            self._n += 1
+            n = self._n
+        if constrained and self.reject_constraints:
+            return 400, {"error": {"message": self.reject_message}}, [], "error"
+        answer = self._answer_for(payload)
+        if constrained:
+            text = json.dumps(_project(answer, ASSIGNMENT_OUTPUT_SCHEMA), ensure_ascii=False)
+        else:
+            body = json.dumps(answer, ensure_ascii=False, indent=2)
+            if self.defect_every and n % self.defect_every == 0:
+                text = _PROSE_ONLY
+            else:
+                text = _PREFIX + body + _SUFFIX
+        tokens = mock_tokens(text)
+        finish = "stop"
+        limit = int(payload.get("max_tokens") or 0)
+        if limit and len(tokens) > limit:
+            tokens, finish = tokens[:limit], "length"
+        out = "".join(tokens)
+        body = {
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": out}, "finish_reason": finish}],
+            "usage": {"completion_tokens": len(tokens)},
+        }
+        return 200, body, tokens, finish
+
+
+class _Tally:
+    """Records what `extract_key_info` reports to its metrics (tokens per call, parse outcomes, early stops)."""
+
+    def __init__(self) -> None:
+        self.tokens: List[float] = []
+        self.outcomes: Dict[str, int] = {}
+        self.early_stops = 0
+
+    def observe_completion(self, constraint: str, stats: Dict[str, Any]) -> None:
+        if stats.get("completion_tokens") is not None:
+            self.tokens.append(float(stats["completion_tokens"]))
+        if stats.get("early_stop"):
+            self.early_stops += 1
+
+    def count_output(self, constraint: str, outcome: str) -> None:
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+
+@contextmanager
+def _configure(constraint: str, stream: bool, url: str) -> Iterator[_Tally]:
+    tally = _Tally()
+    saved_cfg = (ek._CFG.llm_output_constraint, ek._CFG.llm_stream, ek._CFG.llm_mock_output_file)
+    saved_disabled = set(ek._constraint_disabled)
+    saved_hooks = (ek._observe_completion, ek._count_output)
+
+    def _observe(c: str, stats: Dict[str, Any]) -> None:
+        tally.observe_completion(c, stats)
+        saved_hooks[0](c, stats)
+
+    def _count(c: str, outcome: str) -> None:
+        tally.count_output(c, outcome)
+        saved_hooks[1](c, outcome)
+
+    ek._CFG.llm_output_constraint = constraint
+    ek._CFG.llm_stream = stream
+    ek._CFG.llm_mock_output_file = None
+    ek._constraint_disabled.clear()
+    ek._observe_completion, ek._count_output = _observe, _count
+    set_llm_endpoint_pool(EndpointPool([url], probe_interval_s=0))
+    try:
+        yield tally
+    finally:
+        set_llm_endpoint_pool(None)
+        ek._observe_completion, ek._count_output = saved_hooks
+        ek._CFG.llm_output_constraint, ek._CFG.llm_stream, ek._CFG.llm_mock_output_file = saved_cfg
+        ek._constraint_disabled.clear()
+        ek._constraint_disabled.update(saved_disabled)
+
+
+def run_mode(server: MockLLMServer, cases: List[BenchCase], *, constraint: str, stream: bool) -> Dict[str, Any]:
+    with _configure(constraint, stream, server.url) as tally:
+        failures = 0
+        t0 = time.perf_counter()
+        for case in cases:
+            try:
+                ek.extract_assignment_with_model(case.raw_text, chat="t.me/benchmark")
+            except Exception:
+                failures += 1
+        wall_s = time.perf_counter() - t0
+    outputs = sum(tally.outcomes.values())
+    bad = tally.outcomes.get("invalid_json", 0) + tally.outcomes.get("no_text", 0)
+    return {
+        "constraint": constraint,
+        "stream": stream,
+        "extractions": len(cases),
+        "failures": failures,
+        "tokens_per_extraction": round(sum(tally.tokens) / len(tally.tokens), 1) if tally.tokens else 0.0,
+        "parse_failure_rate": round(bad / outputs, 4) if outputs else 0.0,
+        "early_stops": tally.early_stops,
+        "wall_s": round(wall_s, 3),
+    }
+
+
+def run_benchmark(
+    cases: List[BenchCase],
+    *,
+    modes: Optional[List[str]] = None,
+    streams: Tuple[bool, ...] = (False, True),
+    defect_every: int = 8,
+    reject_constraints: bool = False,
+) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    with MockLLMServer(cases, defect_every=defect_every, reject_constraints=reject_constraints) as server:
+        for constraint in modes or list(CONSTRAINT_MODES):
+            for stream in streams:
+                results.append(run_mode(server, cases, constraint=constraint, stream=stream))
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Tokens per extraction and parse-failure rate per LLM output mode (mock server).")
+    parser.add_argument("--limit", type=int, default=0, help="Only the first N corpus posts")
+    parser.add_argument("--defect-every", type=int, default=8, help="Every Nth unconstrained answer is malformed (0 = never)")
+    parser.add_argument("--reject-constraints", action="store_true", help="Mock answers 400 to constrained requests")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args(argv)
+
+    cases = load_corpus()
+    if args.limit:
+        cases = cases[: args.limit]
+    results = run_benchmark(cases, defect_every=args.defect_every, reject_constraints=args.reject_constraints)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print(f"{'constraint':<12} {'stream':<7} {'n':>5} {'tokens/extr':>12} {'parse_fail':>11} {'early_stops':>12} {'wall_s':>8}")
+    for r in results:
+        print(
+            f"{r['constraint']:<12} {str(r['stream']):<7} {r['extractions']:>5} {r['tokens_per_extraction']:>12.1f} "
+            f"{r['parse_failure_rate']:>11.2%} {r['early_stops']:>12} {r['wall_s']:>8.3f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,357 @@
+"""
+Offline benchmark for the deterministic extraction pipeline (NO Supabase, NO LLM server).
+
+Replays a corpus of posts through the same steps the extraction worker runs around the LLM call:
+- normalize_text
+- is_non_assignment
+- is_compilation
+- llm_parse: recorded LLM output -> JSON (same parsing as `extract_key_info`)
+  - or `llm_mocked`: the full `extract_assignment_with_model` call when `LLM_MOCK_OUTPUT_FILE` is set
+- enrich: `workers.extract_worker_enrich.enrich_payload` (postal/address fills, deterministic time,
+  hard validation, signals), plus the heaviest enrichment steps timed on their own
+  (time_availability, hard_validate, signals)
+- schema_validate
+- build_row: `services.row_builder.build_assignment_row` (no geocoding)
+
+Corpus: `message_examples/*.txt` ("Example N:" blocks with a `Raw:` post and its recorded `JSON:` output).
+`--llm-output-file` replaces every recorded output with one file (same format `LLM_MOCK_OUTPUT_FILE` uses).
+
+Reports per-stage throughput and latency percentiles. Baselines are plain JSON:
+  python utilities/benchmark_pipeline.py --repeat 20 --save-baseline utilities/benchmarks/pipeline_baseline.json
+  python utilities/benchmark_pipeline.py --repeat 20 --compare utilities/benchmarks/pipeline_baseline.json
+`--compare` exits 1 when a stage's p50 regressed by more than `--tolerance` (default 0.5 = +50%).
+Baselines are machine-specific; regenerate them on the machine that runs the comparison.
+
+Profiling: `--profile out.prof` (cProfile; inspect with `python -m pstats out.prof`) or
+`--pyinstrument` (if installed) prints a call tree after the run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import cProfile
+import json
+import re
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+AGG_DIR = Path(__file__).resolve().parents[1]
+if str(AGG_DIR) not in sys.path:
+    sys.path.insert(0, str(AGG_DIR))
+
+from compilation_detection import is_compilation  # noqa: E402
+from extract_key_info import extract_assignment_with_model, extract_preferred_json_object, safe_parse_json  # noqa: E402
+from extractors.non_assignment_detector import is_non_assignment  # noqa: E402
+from extractors.time_availability import extract_time_availability  # noqa: E402
+from hard_validator import hard_validate  # noqa: E402
+from normalize import normalize_text  # noqa: E402
+from schema_validation import validate_parsed_assignment  # noqa: E402
+from signals_builder import build_signals  # noqa: E402
+from workers.extract_worker_enrich import enrich_payload  # noqa: E402
+from workers.extract_worker_types import WorkerToggles  # noqa: E402
+from workers.validation_pipeline import validate_schema  # noqa: E402
+
+try:
+    from services.row_builder import build_assignment_row  # type: ignore  # noqa: E402
+except Exception:
+    # Imported as `TutorDexAggregator.*` from repo root (e.g., unit tests).
+    from TutorDexAggregator.services.row_builder import build_assignment_row  # type: ignore  # noqa: E402
+
+DEFAULT_EXAMPLES_DIR = AGG_DIR / "message_examples"
+DEFAULT_BASELINE = AGG_DIR / "utilities" / "benchmarks" / "pipeline_baseline.json"
+
+STAGES = (
+    "normalize",
+    "non_assignment",
+    "compilation",
+    "llm_parse",
+    "enrich",
+    "time_availability",
+    "hard_validate",
+    "signals",
+    "schema_validate",
+    "build_row",
+)
+
+_EXAMPLE_RE = re.compile(r"^Example\s+\d+:\s*$", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class BenchCase:
+    source: str
+    raw_text: str
+    llm_output: str
+
+
+def _toggles(*, enable_postal_code_estimated: bool = False) -> WorkerToggles:
+    return WorkerToggles(
+        enable_broadcast=False,
+        enable_dms=False,
+        materialize_assignments=False,
+        max_attempts=1,
+        backoff_base_s=0.0,
+        backoff_max_s=0.0,
+        stale_processing_seconds=0,
+        use_normalized_text_for_llm=False,
+        hard_validate_mode="enforce",
+        enable_deterministic_signals=True,
+        use_deterministic_time=True,
+        # Postal estimation calls OneMap over HTTP; off unless explicitly requested.
+        enable_postal_code_estimated=bool(enable_postal_code_estimated),
+    )
+
+
+def parse_examples_file(path: Path) -> List[BenchCase]:
+    """Split a `message_examples/*.txt` file into (raw post, recorded JSON) cases, skipping empty templates."""
+    text = path.read_text(encoding="utf-8", errors="ignore")
+    out: List[BenchCase] = []
+    for block in _EXAMPLE_RE.split(text)[1:]:
+        if "JSON:" not in block:
+            continue
+        raw_part, json_part = block.split("JSON:", 1)
+        raw = raw_part.strip()
+        if raw.startswith("Raw:"):
+            raw = raw[len("Raw:"):].strip()
+        llm_output = json_part.strip()
+        if not raw or not llm_output:
+            continue
+        out.append(BenchCase(source=path.name, raw_text=raw, llm_output=llm_output))
+    return out
+
+
+def load_corpus(examples_dir: Path = DEFAULT_EXAMPLES_DIR, *, llm_output_file: Optional[Path] = None) -> List[BenchCase]:
+    cases: List[BenchCase] = []
+    for path in sorted(Path(examples_dir).glob("*.txt")):
+        cases.extend(parse_examples_file(path))
+    if llm_output_file is not None:
+        fixed = Path(llm_output_file).read_text(encoding="utf-8")
+        cases = [BenchCase(source=c.source, raw_text=c.raw_text, llm_output=fixed) for c in cases]
+    return cases
+
+
+def _parse_llm_output(text: str) -> Dict[str, Any]:
+    # Mirrors the post-response handling in `extract_key_info.extract_assignment_with_model`.
+    candidate = extract_preferred_json_object(text.strip().strip("```")).replace("\\_", "_")
+    parsed = safe_parse_json(candidate)
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * (pct / 100.0)
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(samples: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    out: Dict[str, Dict[str, float]] = {}
+    for stage, values in samples.items():
+        if not values:
+            continue
+        vs = sorted(values)
+        total = sum(vs)
+        out[stage] = {
+            "n": len(vs),
+            "total_s": round(total, 6),
+            "ops_per_s": round(len(vs) / total, 2) if total > 0 else 0.0,
+            "p50_ms": round(_percentile(vs, 50) * 1000.0, 4),
+            "p95_ms": round(_percentile(vs, 95) * 1000.0, 4),
+            "p99_ms": round(_percentile(vs, 99) * 1000.0, 4),
+            "max_ms": round(vs[-1] * 1000.0, 4),
+        }
+    return out
+
+
+def _run_case(case: BenchCase, toggles: WorkerToggles, samples: Dict[str, List[float]], use_llm_mock: bool) -> None:
+    def timed(stage: str, fn: Callable[[], Any]) -> Any:
+        t0 = time.perf_counter()
+        result = fn()
+        samples.setdefault(stage, []).append(time.perf_counter() - t0)
+        return result
+
+    raw_text = case.raw_text
+    normalized_text = timed("normalize", lambda: normalize_text(raw_text))
+    timed("non_assignment", lambda: is_non_assignment(raw_text))
+    timed("compilation", lambda: is_compilation(raw_text))
+
+    if use_llm_mock:
+        parsed = timed("llm_mocked", lambda: extract_assignment_with_model(raw_text, chat=f"t.me/{case.source}", cid="bench") or {})
+    else:
+        parsed = timed("llm_parse", lambda: _parse_llm_output(case.llm_output))
+
+    payload: Dict[str, Any] = {
+        "cid": "bench",
+        "channel_link": "t.me/benchmark",
+        "channel_title": case.source,
+        "message_id": 1,
+        "raw_text": raw_text,
+        "parsed": dict(parsed),
+    }
+    norm_meta = {"chars": len(normalized_text)}
+    timed(
+        "enrich",
+        lambda: enrich_payload(payload=payload, raw_text=raw_text, normalized_text=normalized_text, norm_meta=norm_meta, toggles=toggles),
+    )
+    timed("time_availability", lambda: extract_time_availability(raw_text=raw_text, normalized_text=normalized_text))
+    timed("hard_validate", lambda: hard_validate(dict(parsed), raw_text=raw_text, normalized_text=normalized_text))
+    timed("signals", lambda: build_signals(parsed=payload.get("parsed") or {}, raw_text=raw_text, normalized_text=normalized_text))
+    timed("schema_validate", lambda: validate_schema(payload.get("parsed") or {}, validate_parsed_assignment))
+    timed("build_row", lambda: build_assignment_row(payload, geocode_func=None))
+
+
+def run_benchmark(
+    cases: List[BenchCase],
+    *,
+    repeat: int = 5,
+    warmup: int = 1,
+    toggles: Optional[WorkerToggles] = None,
+    use_llm_mock: bool = False,
+) -> Dict[str, Any]:
+    """
+    Replay `cases` through the pipeline `repeat` times (after `warmup` untimed passes).
+
+    Returns:
+        {"cases": n, "repeat": r, "stages": {stage: {n, total_s, ops_per_s, p50_ms, p95_ms, p99_ms, max_ms}}}
+    """
+    toggles = toggles or _toggles()
+    scratch: Dict[str, List[float]] = {}
+    for _ in range(max(0, int(warmup))):
+        for case in cases:
+            _run_case(case, toggles, scratch, use_llm_mock)
+
+    samples: Dict[str, List[float]] = {}
+    t0 = time.perf_counter()
+    for _ in range(max(1, int(repeat))):
+        for case in cases:
+            _run_case(case, toggles, samples, use_llm_mock)
+    wall_s = time.perf_counter() - t0
+
+    posts = len(cases) * max(1, int(repeat))
+    return {
+        "cases": len(cases),
+        "repeat": max(1, int(repeat)),
+        "wall_s": round(wall_s, 4),
+        "posts_per_s": round(posts / wall_s, 2) if wall_s > 0 else 0.0,
+        "stages": summarize(samples),
+    }
+
+
+def compare_to_baseline(result: Dict[str, Any], baseline: Dict[str, Any], *, tolerance: float = 0.5) -> List[str]:
+    """
+    Compare per-stage p50 latency against a stored baseline.
+
+    Returns:
+        Human-readable regression descriptions (empty when within tolerance)
+    """
+    regressions: List[str] = []
+    base_stages = baseline.get("stages") or {}
+    for stage, cur in (result.get("stages") or {}).items():
+        base = base_stages.get(stage)
+        if not isinstance(base, dict):
+            continue
+        base_p50 = float(base.get("p50_ms") or 0.0)
+        cur_p50 = float(cur.get("p50_ms") or 0.0)
+        if base_p50 <= 0:
+            continue
+        if cur_p50 > base_p50 * (1.0 + float(tolerance)):
+            regressions.append(f"{stage}: p50 {cur_p50:.4f}ms vs baseline {base_p50:.4f}ms (+{(cur_p50 / base_p50 - 1.0) * 100:.0f}%)")
+    return regressions
+
+
+def _print_table(result: Dict[str, Any]) -> None:
+    print(f"cases={result['cases']} repeat={result['repeat']} wall_s={result['wall_s']} posts_per_s={result['posts_per_s']}")
+    print(f"{'stage':<18} {'n':>6} {'ops/s':>10} {'p50_ms':>10} {'p95_ms':>10} {'p99_ms':>10} {'max_ms':>10}")
+    for stage, s in result["stages"].items():
+        print(
+            f"{stage:<18} {s['n']:>6} {s['ops_per_s']:>10.1f} {s['p50_ms']:>10.4f} {s['p95_ms']:>10.4f} {s['p99_ms']:>10.4f} {s['max_ms']:>10.4f}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmark for the deterministic extraction pipeline.")
+    parser.add_argument("--examples-dir", default=str(DEFAULT_EXAMPLES_DIR), help="Directory of message_examples/*.txt")
+    parser.add_argument("--llm-output-file", help="Use this recorded LLM output for every post instead of the per-example JSON")
+    parser.add_argument(
+        "--use-llm-mock",
+        action="store_true",
+        help="Time the full extract_assignment_with_model call (requires LLM_MOCK_OUTPUT_FILE) instead of parsing recorded outputs",
+    )
+    parser.add_argument("--enable-postal-code-estimated", action="store_true", help="Include OneMap postal estimation (network)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="Print the result JSON instead of a table")
+    parser.add_argument("--save-baseline", help="Write the result to this baseline file")
+    parser.add_argument("--compare", nargs="?", const=str(DEFAULT_BASELINE), help="Compare against a baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed p50 slowdown before failing (0.5 = +50%%)")
+    parser.add_argument("--profile", help="Write cProfile stats for the timed run to this file")
+    parser.add_argument("--pyinstrument", action="store_true", help="Print a pyinstrument call tree (if installed)")
+    args = parser.parse_args(argv)
+
+    if args.use_llm_mock:
+        from shared.config import load_aggregator_config
+
+        if not str(load_aggregator_config().llm_mock_output_file or "").strip():
+            raise SystemExit("--use-llm-mock requires LLM_MOCK_OUTPUT_FILE")
+
+    cases = load_corpus(Path(args.examples_dir), llm_output_file=Path(args.llm_output_file) if args.llm_output_file else None)
+    if not cases:
+        raise SystemExit(f"No examples found in {args.examples_dir}")
+
+    def _run() -> Dict[str, Any]:
+        return run_benchmark(
+            cases,
+            repeat=args.repeat,
+            warmup=args.warmup,
+            toggles=_toggles(enable_postal_code_estimated=args.enable_postal_code_estimated),
+            use_llm_mock=args.use_llm_mock,
+        )
+
+    profiler = None
+    if args.pyinstrument:
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise SystemExit("pyinstrument is not installed (pip install pyinstrument)")
+        profiler = Profiler()
+        profiler.start()
+        result = _run()
+        profiler.stop()
+    elif args.profile:
+        prof = cProfile.Profile()
+        result = prof.runcall(_run)
+        prof.dump_stats(args.profile)
+    else:
+        result = _run()
+
+    if args.json:
+        print(json.dumps(result, indent=2, sort_keys=True))
+    else:
+        _print_table(result)
+    if profiler is not None:
+        print(profiler.output_text(unicode=True, color=False))
+
+    if args.save_baseline:
+        path = Path(args.save_baseline)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(result, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"baseline written: {path}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare_to_baseline(result, baseline, tolerance=args.tolerance)
+        if regressions:
+            print("REGRESSIONS:")
+            for r in regressions:
+                print(f"  {r}")
+            return 1
+        print(f"no regressions vs {args.compare} (tolerance={args.tolerance})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
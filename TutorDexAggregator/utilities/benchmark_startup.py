@@ -0,0 +1,90 @@
+"""
+Cold-start benchmark for worker cache warm-up: source parsing vs prebuilt artifacts.
+
+Each run is a fresh interpreter that imports `prebuilt_artifacts` and calls
+`warm_worker_caches(build_missing=False)` - the same warm-up `bootstrap_worker` does - with
+`PREBUILT_ARTIFACTS_ENABLED` off ("source": parse GeoJSON/JSON/YAML) and on ("prebuilt": mmap the
+`.npy` artifacts and the JSON taxonomy index). Artifacts are (re)built once before timing.
+
+Usage:
+  python utilities/benchmark_startup.py --runs 7
+  python utilities/benchmark_startup.py --runs 7 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+AGG_DIR = Path(__file__).resolve().parents[1]
+if str(AGG_DIR) not in sys.path:
+    sys.path.insert(0, str(AGG_DIR))
+
+MODES = {"source": "0", "prebuilt": "1"}
+
+_CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {agg_dir!r})
+import prebuilt_artifacts
+import_ms = (time.perf_counter() - t0) * 1000.0
+out = prebuilt_artifacts.warm_worker_caches(build_missing=False)
+out["import_ms"] = round(import_ms, 2)
+out["process_ms"] = round((time.perf_counter() - t0) * 1000.0, 2)
+print(json.dumps(out))
+"""
+
+
+def run_once(mode: str) -> Dict[str, Any]:
+    env = dict(os.environ)
+    env["PREBUILT_ARTIFACTS_ENABLED"] = MODES[mode]
+    proc = subprocess.run(
+        [sys.executable, "-c", _CHILD.format(agg_dir=str(AGG_DIR))],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def summarize(samples: List[Dict[str, Any]]) -> Dict[str, float]:
+    keys = sorted({k for s in samples for k, v in s.items() if k.endswith("_ms") and isinstance(v, (int, float))})
+    return {k: round(statistics.median(float(s.get(k) or 0.0) for s in samples), 2) for k in keys}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for worker cache warm-up.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per mode")
+    parser.add_argument("--json", action="store_true", help="Print the result JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    import prebuilt_artifacts as pa
+
+    build = pa.build_artifacts(only_stale=True)
+    result: Dict[str, Any] = {"runs": int(args.runs), "artifacts": build, "modes": {}}
+    for mode in MODES:
+        samples = [run_once(mode) for _ in range(max(1, int(args.runs)))]
+        result["modes"][mode] = summarize(samples)
+
+    if args.json:
+        print(json.dumps(result, indent=2, sort_keys=True))
+        return 0
+
+    src, pre = result["modes"]["source"], result["modes"]["prebuilt"]
+    print(f"{'step (median ms)':<24} {'source':>10} {'prebuilt':>10} {'speedup':>8}")
+    for key in sorted(set(src) | set(pre)):
+        a, b = src.get(key, 0.0), pre.get(key, 0.0)
+        speedup = f"{a / b:.1f}x" if b > 0 else "-"
+        print(f"{key:<24} {a:>10.2f} {b:>10.2f} {speedup:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,112 @@
+"""
+Microbenchmark for `extractors/time_availability.extract_time_availability`.
+
+Times the extractor alone (text is normalized up front) over the `message_examples/` corpus plus a
+time-heavy synthetic set, and reports per-message latency. `--against FILE` loads another copy of the
+module (e.g. a previous revision) and times it on the same inputs, checking both produce identical output:
+
+  git show HEAD~1:TutorDexAggregator/extractors/time_availability.py > /tmp/time_availability_before.py
+  python utilities/benchmark_time_availability.py --against /tmp/time_availability_before.py --repeat 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+AGG_DIR = Path(__file__).resolve().parents[1]
+if str(AGG_DIR) not in sys.path:
+    sys.path.insert(0, str(AGG_DIR))
+
+from extractors.time_availability import extract_time_availability  # noqa: E402
+from normalize import normalize_text  # noqa: E402
+from utilities.benchmark_pipeline import DEFAULT_EXAMPLES_DIR, load_corpus, summarize  # noqa: E402
+
+Extractor = Callable[..., Tuple[Dict[str, Any], Dict[str, Any]]]
+
+# Schedule-style posts: many lines and clauses, so the per-line/per-clause work dominates.
+SYNTHETIC: List[str] = [
+    "Timing:\nMon / Wed / Fri - after 4pm\nSat 10am-12pm | Sun 2pm to 4pm\nWeekdays evening, TBC",
+    "Available: Tues & Thurs 730pm onwards / Sat morning / Sun 1300-1500\nNo Sunday before 3pm",
+    "Preferred timings\nMonday, Wednesday\n7pm to 9pm\nWeekends flexible, tutor to propose all available timings",
+    "Mon-Fri 7pm, Sat 10am - 12pm, Sun 12:00-14:00 and 15:00 to 16:30, not Sat night",
+]
+
+
+def _load_module(path: Path) -> Extractor:
+    spec = importlib.util.spec_from_file_location("time_availability_against", str(path))
+    if spec is None or spec.loader is None:
+        raise SystemExit(f"cannot load {path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module  # dataclasses resolve annotations through sys.modules
+    spec.loader.exec_module(module)
+    return module.extract_time_availability
+
+
+def load_inputs(examples_dir: Path = DEFAULT_EXAMPLES_DIR) -> List[Tuple[str, str]]:
+    raws = [c.raw_text for c in load_corpus(examples_dir)] + list(SYNTHETIC)
+    return [(raw, normalize_text(raw)) for raw in raws]
+
+
+def time_extractor(fn: Extractor, inputs: List[Tuple[str, str]], *, repeat: int, warmup: int = 1) -> Dict[str, float]:
+    for _ in range(max(0, warmup)):
+        for raw, norm in inputs:
+            fn(raw_text=raw, normalized_text=norm)
+    samples: List[float] = []
+    for _ in range(max(1, repeat)):
+        for raw, norm in inputs:
+            t0 = time.perf_counter()
+            fn(raw_text=raw, normalized_text=norm)
+            samples.append(time.perf_counter() - t0)
+    return summarize({"time_availability": samples})["time_availability"]
+
+
+def _outputs(fn: Extractor, inputs: List[Tuple[str, str]]) -> List[str]:
+    return [json.dumps(fn(raw_text=raw, normalized_text=norm), sort_keys=True) for raw, norm in inputs]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Per-message latency of extract_time_availability.")
+    parser.add_argument("--examples-dir", default=str(DEFAULT_EXAMPLES_DIR), help="Directory of message_examples/*.txt")
+    parser.add_argument("--against", help="Path to another time_availability.py to compare with (e.g. the previous revision)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="Print the result JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    inputs = load_inputs(Path(args.examples_dir))
+    if not inputs:
+        raise SystemExit(f"No examples found in {args.examples_dir}")
+
+    impls: Dict[str, Extractor] = {}
+    if args.against:
+        impls["against"] = _load_module(Path(args.against))
+    impls["current"] = extract_time_availability
+
+    result: Dict[str, Any] = {"messages": len(inputs), "repeat": args.repeat, "impls": {}}
+    for name, fn in impls.items():
+        result["impls"][name] = time_extractor(fn, inputs, repeat=args.repeat, warmup=args.warmup)
+    if "against" in impls:
+        result["identical_output"] = _outputs(impls["against"], inputs) == _outputs(impls["current"], inputs)
+        before, after = result["impls"]["against"]["p50_ms"], result["impls"]["current"]["p50_ms"]
+        result["p50_speedup"] = round(before / after, 2) if after > 0 else None
+
+    if args.json:
+        print(json.dumps(result, indent=2, sort_keys=True))
+    else:
+        print(f"messages={result['messages']} repeat={result['repeat']}")
+        print(f"{'impl':<10} {'ops/s':>10} {'p50_ms':>10} {'p95_ms':>10} {'p99_ms':>10} {'max_ms':>10}")
+        for name, s in result["impls"].items():
+            print(f"{name:<10} {s['ops_per_s']:>10.1f} {s['p50_ms']:>10.4f} {s['p95_ms']:>10.4f} {s['p99_ms']:>10.4f} {s['max_ms']:>10.4f}")
+        if "against" in impls:
+            print(f"p50 speedup: {result['p50_speedup']}x  identical output: {result['identical_output']}")
+    return 0 if result.get("identical_output", True) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,136 @@
+"""
+Microbenchmark for tutor-type label normalization (`shared/taxonomy/tutor_types.normalize_label`).
+
+Unknown-heavy by construction: the inputs are the 1-4 word phrases `extractors/tutor_types.extract_tutor_types`
+feeds to `normalize_label` for every `message_examples/` post (~90% of them match nothing). Reports:
+- normalize_cold: one call per distinct phrase with an empty memo (the fuzzy/substring fallbacks run every time)
+- normalize_stream: every phrase in corpus order, memo carried across posts (what a worker sees)
+- extract_per_msg: `extract_tutor_types` per post
+
+`--against FILE` times another copy of the module (e.g. a previous revision) on the same inputs and checks
+both return identical results:
+
+  git show HEAD~1:shared/taxonomy/tutor_types.py > /tmp/tutor_types_before.py
+  python utilities/benchmark_tutor_types.py --against /tmp/tutor_types_before.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, List, Optional
+
+AGG_DIR = Path(__file__).resolve().parents[1]
+if str(AGG_DIR) not in sys.path:
+    sys.path.insert(0, str(AGG_DIR))
+
+import extractors.tutor_types as extractor  # noqa: E402
+from shared.taxonomy import tutor_types as taxonomy  # noqa: E402
+from utilities.benchmark_pipeline import DEFAULT_EXAMPLES_DIR, load_corpus, summarize  # noqa: E402
+
+_WORD_RE = re.compile(r"[A-Za-z0-9\-\/]+")
+
+
+def _load_module(path: Path) -> ModuleType:
+    spec = importlib.util.spec_from_file_location("tutor_types_against", str(path))
+    if spec is None or spec.loader is None:
+        raise SystemExit(f"cannot load {path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    module._TAXONOMY_FILE = taxonomy._TAXONOMY_FILE  # a copy outside the repo has no tutor_types.yaml next to it
+    return module
+
+
+def phrases_for(text: str) -> List[str]:
+    words = _WORD_RE.findall(text)
+    return [" ".join(words[i : j + 1]) for i in range(len(words)) for j in range(i, min(len(words), i + 4))]
+
+
+def _reset_memo(module: ModuleType) -> None:
+    index = getattr(module, "_fuzzy_index", None)
+    if index is not None:
+        module._ensure_loaded()
+        index().memo.clear()
+
+
+def bench_module(module: ModuleType, posts: List[str], *, repeat: int) -> Dict[str, Dict[str, float]]:
+    module._ensure_loaded()
+    stream = [p for text in posts for p in phrases_for(text)]
+    distinct = sorted(set(stream))
+    samples: Dict[str, List[float]] = {"normalize_cold": [], "normalize_stream": [], "extract_per_msg": []}
+    original = extractor.normalize_label
+    extractor.normalize_label = module.normalize_label
+    try:
+        for _ in range(max(1, repeat)):
+            _reset_memo(module)
+            for p in distinct:
+                t0 = time.perf_counter()
+                module.normalize_label(p)
+                samples["normalize_cold"].append(time.perf_counter() - t0)
+            _reset_memo(module)
+            for p in stream:
+                t0 = time.perf_counter()
+                module.normalize_label(p)
+                samples["normalize_stream"].append(time.perf_counter() - t0)
+            _reset_memo(module)
+            for text in posts:
+                t0 = time.perf_counter()
+                extractor.extract_tutor_types(text=text)
+                samples["extract_per_msg"].append(time.perf_counter() - t0)
+    finally:
+        extractor.normalize_label = original
+    return summarize(samples)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Latency of tutor-type label normalization on unknown-heavy input.")
+    parser.add_argument("--examples-dir", default=str(DEFAULT_EXAMPLES_DIR), help="Directory of message_examples/*.txt")
+    parser.add_argument("--against", help="Path to another shared/taxonomy/tutor_types.py to compare with")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Print the result JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    posts = [c.raw_text for c in load_corpus(Path(args.examples_dir))]
+    if not posts:
+        raise SystemExit(f"No examples found in {args.examples_dir}")
+
+    modules: Dict[str, ModuleType] = {}
+    if args.against:
+        modules["against"] = _load_module(Path(args.against))
+    modules["current"] = taxonomy
+
+    distinct = sorted({p for text in posts for p in phrases_for(text)})
+    result: Dict[str, Any] = {
+        "posts": len(posts),
+        "distinct_phrases": len(distinct),
+        "unknown_share": round(sum(1 for p in distinct if taxonomy.normalize_label(p)[0] == "unknown") / max(1, len(distinct)), 3),
+        "repeat": args.repeat,
+        "impls": {name: bench_module(m, posts, repeat=args.repeat) for name, m in modules.items()},
+    }
+    if "against" in modules:
+        result["identical_output"] = all(modules["against"].normalize_label(p) == taxonomy.normalize_label(p) for p in distinct)
+
+    if args.json:
+        print(json.dumps(result, indent=2, sort_keys=True))
+    else:
+        print(f"posts={result['posts']} distinct_phrases={result['distinct_phrases']} unknown_share={result['unknown_share']} repeat={args.repeat}")
+        print(f"{'impl':<10} {'stage':<18} {'n':>7} {'ops/s':>11} {'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9} {'total_s':>9}")
+        for name, stages in result["impls"].items():
+            for stage, s in stages.items():
+                print(
+                    f"{name:<10} {stage:<18} {s['n']:>7} {s['ops_per_s']:>11.1f} {s['p50_ms']:>9.4f} {s['p95_ms']:>9.4f} {s['p99_ms']:>9.4f} {s['total_s']:>9.3f}"
+                )
+        if "against" in modules:
+            print(f"identical output: {result['identical_output']}")
+    return 0 if result.get("identical_output", True) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
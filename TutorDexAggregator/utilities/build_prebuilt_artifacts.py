@@ -0,0 +1,48 @@
+"""
+Build the prebuilt geo/taxonomy artifacts loaded at worker startup (see `prebuilt_artifacts.py`).
+
+Each artifact records the sha256 of its source file; workers ignore stale artifacts and rebuild
+them at startup when the artifacts directory is writable, so running this is optional but keeps
+the first worker start fast (e.g. after updating `data/*.json` or `tutor_types.yaml`).
+
+Usage:
+  python utilities/build_prebuilt_artifacts.py                # rebuild everything
+  python utilities/build_prebuilt_artifacts.py --only-stale   # rebuild missing/stale artifacts only
+  python utilities/build_prebuilt_artifacts.py --check        # exit 1 if any artifact is missing/stale
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+AGG_DIR = Path(__file__).resolve().parents[1]
+if str(AGG_DIR) not in sys.path:
+    sys.path.insert(0, str(AGG_DIR))
+
+import prebuilt_artifacts as pa  # noqa: E402
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build prebuilt geo/taxonomy artifacts for worker startup.")
+    parser.add_argument("--out-dir", help="Output directory (default: PREBUILT_ARTIFACTS_DIR or data/prebuilt)")
+    parser.add_argument("--only-stale", action="store_true", help="Skip artifacts whose source hash still matches")
+    parser.add_argument("--check", action="store_true", help="Report staleness without building; exit 1 if anything is stale")
+    args = parser.parse_args(argv)
+
+    out_dir = Path(args.out_dir) if args.out_dir else pa.artifacts_dir()
+    if args.check:
+        stale = pa.is_stale(out_dir)
+        print(json.dumps({"out_dir": str(out_dir), "stale": stale}, indent=2))
+        return 1 if any(stale.values()) else 0
+
+    results = pa.build_artifacts(out_dir, only_stale=args.only_stale)
+    print(json.dumps({"out_dir": str(out_dir), "results": results}, indent=2))
+    return 0 if all(not v.startswith("skipped:") for v in results.values()) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,383 @@
+"""
+Recompute deterministic enrichment for historical extractions on all CPU cores (NO LLM calls).
+
+Use case:
+- You changed deterministic code (time availability, hard validator, signals: subjects/levels/academic
+  requests/tutor types, taxonomy) and want existing `ok` extractions and their assignments to reflect it
+  without re-running the LLM (Mode 3/4 re-extracts everything through the model).
+
+How it works:
+- Streams `telegram_extractions` (status=ok, one pipeline version, optional raw message_date window) in
+  keyset-paginated pages, each row joined with its raw message text.
+- Fans rows out across a process pool in chunks. Each worker re-runs `enrich_payload` on the stored
+  `canonical_json` (the same deterministic steps the extraction worker runs after the LLM) and
+  `build_assignment_row` to derive the assignment columns.
+- Writes results back a page at a time:
+  - extractions: `finalize_telegram_extractions` RPC (canonical_json + merged meta); per-row PATCH if missing
+  - assignments: `apply_assignment_deterministic_fields` RPC (signals/taxonomy/time/tutor-type columns)
+- Reports rows/sec as it goes.
+
+Safety:
+- Does NOT broadcast, DM, geocode via OneMap, or change job/assignment status.
+- `--dry-run` computes everything and writes nothing.
+
+Usage:
+  python utilities/recompute_deterministic.py --since 2026-07-01 --workers 8
+  python utilities/recompute_deterministic.py --pipeline-version 2026-01-02_det_time_v1 --no-assignments --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional
+
+import requests
+
+AGG_DIR = Path(__file__).resolve().parents[1]
+if str(AGG_DIR) not in sys.path:
+    sys.path.insert(0, str(AGG_DIR))
+
+from logging_setup import log_event, setup_logging  # noqa: E402
+from normalize import normalize_text  # noqa: E402
+from workers.extract_worker_enrich import enrich_payload  # noqa: E402
+from workers.extract_worker_store import ExtractionStatusWriter  # noqa: E402
+from workers.extract_worker_types import VersionInfo, WorkerToggles  # noqa: E402
+from workers.supabase_operations import build_headers, call_rpc  # noqa: E402
+from workers.utils import build_message_link, utc_now_iso  # noqa: E402
+
+try:
+    from services.row_builder import build_assignment_row  # type: ignore  # noqa: E402
+except Exception:
+    # Imported as `TutorDexAggregator.*` from repo root (e.g., unit tests).
+    from TutorDexAggregator.services.row_builder import build_assignment_row  # type: ignore  # noqa: E402
+
+from shared.config import load_aggregator_config  # noqa: E402
+
+logger = logging.getLogger("recompute_deterministic")
+
+# Assignment columns derived only from raw text + canonical_json by deterministic code.
+DETERMINISTIC_ASSIGNMENT_FIELDS = (
+    "time_availability_note",
+    "time_availability_explicit",
+    "time_availability_estimated",
+    "tutor_types",
+    "rate_breakdown",
+    "signals_subjects",
+    "signals_levels",
+    "signals_specific_student_levels",
+    "signals_streams",
+    "signals_academic_requests",
+    "signals_confidence_flags",
+    "subjects_canonical",
+    "subjects_general",
+    "canonicalization_version",
+    "parse_quality_score",
+    "canonical_json",
+)
+
+_SELECT = (
+    "id,channel_link,message_id,canonical_json,meta,"
+    "raw:telegram_messages_raw!inner(raw_text,channel_id,message_date,edit_date,is_forward,deleted_at)"
+)
+
+
+def recompute_row(row: Dict[str, Any], toggles: WorkerToggles) -> Dict[str, Any]:
+    """
+    Re-run deterministic enrichment for one extraction row.
+
+    Returns:
+        {"id", "ok": True, "canonical_json", "meta_patch", "assignment"} or {"id", "ok": False, "skipped"|"error"}
+    """
+    extraction_id = row.get("id")
+    raw = row.get("raw") if isinstance(row.get("raw"), dict) else {}
+    raw_text = str(raw.get("raw_text") or "").strip()
+    parsed = row.get("canonical_json")
+    if not raw_text or raw.get("deleted_at"):
+        return {"id": extraction_id, "ok": False, "skipped": "no_raw_text"}
+    if not isinstance(parsed, dict):
+        return {"id": extraction_id, "ok": False, "skipped": "no_canonical_json"}
+
+    try:
+        channel_link = str(row.get("channel_link") or "").strip()
+        message_id = str(row.get("message_id") or "").strip()
+        normalized_text = normalize_text(raw_text)
+        payload: Dict[str, Any] = {
+            "cid": f"recompute:{channel_link}:{message_id}",
+            "channel_link": channel_link,
+            "channel_id": raw.get("channel_id"),
+            "message_id": message_id,
+            "message_link": build_message_link(channel_link, message_id),
+            "date": raw.get("message_date"),
+            "source_last_seen": raw.get("edit_date") or raw.get("message_date"),
+            "raw_text": raw_text,
+            "parsed": dict(parsed),
+        }
+        enrich_payload(
+            payload=payload,
+            raw_text=raw_text,
+            normalized_text=normalized_text,
+            norm_meta={"chars": len(normalized_text), "preview": normalized_text[:200]},
+            toggles=toggles,
+        )
+        meta = payload.get("meta") or {}
+        assignment_row = build_assignment_row(payload, geocode_func=None)
+        return {
+            "id": extraction_id,
+            "ok": True,
+            "canonical_json": payload.get("parsed"),
+            "meta_patch": {
+                "time_deterministic": meta.get("time_deterministic"),
+                "hard_validation": meta.get("hard_validation"),
+                "signals": meta.get("signals"),
+                "deterministic_recomputed_at": utc_now_iso(),
+            },
+            "assignment": {
+                "external_id": assignment_row.get("external_id"),
+                "channel_id": None if raw.get("channel_id") is None else str(raw.get("channel_id")),
+                "message_id": message_id or None,
+                "fields": {k: assignment_row[k] for k in DETERMINISTIC_ASSIGNMENT_FIELDS if k in assignment_row},
+            },
+        }
+    except Exception as e:
+        return {"id": extraction_id, "ok": False, "error": str(e)}
+
+
+def recompute_chunk(rows: List[Dict[str, Any]], toggles: WorkerToggles) -> List[Dict[str, Any]]:
+    return [recompute_row(r, toggles) for r in rows]
+
+
+def _chunks(rows: List[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    for i in range(0, len(rows), max(1, size)):
+        yield rows[i:i + max(1, size)]
+
+
+def run_pool(
+    pages: Iterable[List[Dict[str, Any]]],
+    *,
+    toggles: WorkerToggles,
+    sink: Callable[[List[Dict[str, Any]]], None],
+    workers: int,
+    chunk_size: int = 50,
+) -> None:
+    """
+    Recompute every row from `pages` and hand results to `sink` one chunk at a time.
+
+    Pages are pulled lazily, so fetching the next page overlaps with compute. At most `2 * workers`
+    chunks are in flight; results reach `sink` in input order. `workers <= 1` runs inline.
+    """
+    if workers <= 1:
+        for page in pages:
+            for chunk in _chunks(page, chunk_size):
+                sink(recompute_chunk(chunk, toggles))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight: Deque[Future] = deque()
+        for page in pages:
+            for chunk in _chunks(page, chunk_size):
+                in_flight.append(pool.submit(recompute_chunk, chunk, toggles))
+                while len(in_flight) >= 2 * workers:
+                    sink(in_flight.popleft().result())
+        while in_flight:
+            sink(in_flight.popleft().result())
+
+
+def iter_extraction_pages(
+    url: str,
+    key: str,
+    *,
+    pipeline_version: str,
+    since: Optional[str],
+    until: Optional[str],
+    page_size: int,
+    max_rows: Optional[int] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Keyset-paginate `ok` extractions (by id) with their raw message embedded."""
+    session = requests.Session()
+    headers = build_headers(key)
+    last_id = 0
+    fetched = 0
+    while True:
+        limit = int(page_size)
+        if max_rows is not None:
+            limit = min(limit, int(max_rows) - fetched)
+            if limit <= 0:
+                return
+        params = [
+            ("select", _SELECT),
+            ("status", "eq.ok"),
+            ("pipeline_version", f"eq.{pipeline_version}"),
+            ("canonical_json", "not.is.null"),
+            ("id", f"gt.{last_id}"),
+            ("order", "id.asc"),
+            ("limit", str(limit)),
+        ]
+        if since:
+            params.append(("raw.message_date", f"gte.{since}"))
+        if until:
+            params.append(("raw.message_date", f"lt.{until}"))
+        resp = session.get(f"{url}/telegram_extractions", params=params, headers=headers, timeout=60)
+        if resp.status_code >= 400:
+            raise RuntimeError(f"fetch_failed status={resp.status_code} body={resp.text[:400]}")
+        rows = resp.json()
+        if not isinstance(rows, list) or not rows:
+            return
+        fetched += len(rows)
+        last_id = int(rows[-1]["id"])
+        yield rows
+        if len(rows) < limit:
+            return
+
+
+class BulkWriter:
+    """Collects recompute results and applies them with one RPC per table per flush."""
+
+    def __init__(self, url: str, key: str, *, version: VersionInfo, assignments: bool, dry_run: bool, flush_rows: int = 500):
+        self.url = url
+        self.key = key
+        self.version = version
+        self.assignments = bool(assignments)
+        self.dry_run = bool(dry_run)
+        self.flush_rows = max(1, int(flush_rows))
+        self.extractions = ExtractionStatusWriter(url, key, version=version)
+        self._assignment_rows: List[Dict[str, Any]] = []
+        self.counts = {"scanned": 0, "ok": 0, "skipped": 0, "failed": 0, "assignments_updated": 0}
+        self._assignments_rpc_available = True
+
+    def __call__(self, results: List[Dict[str, Any]]) -> None:
+        for r in results:
+            self.counts["scanned"] += 1
+            if r.get("ok"):
+                self.counts["ok"] += 1
+            elif r.get("skipped"):
+                self.counts["skipped"] += 1
+                continue
+            else:
+                self.counts["failed"] += 1
+                log_event(logger, logging.WARNING, "recompute_row_failed", extraction_id=r.get("id"), error=r.get("error"))
+                continue
+            if self.dry_run:
+                continue
+            self.extractions.add(r["id"], status="ok", canonical_json=r.get("canonical_json"), meta_patch=r.get("meta_patch"))
+            if self.assignments and (r.get("assignment") or {}).get("external_id"):
+                self._assignment_rows.append(r["assignment"])
+        if self.extractions.pending() >= self.flush_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.dry_run:
+            return
+        self.extractions.flush()
+        rows, self._assignment_rows = self._assignment_rows, []
+        if not rows or not self._assignments_rpc_available:
+            return
+        try:
+            res = call_rpc(
+                self.url,
+                self.key,
+                "apply_assignment_deterministic_fields",
+                {"p_rows": rows},
+                timeout=120,
+                pipeline_version=self.version.pipeline_version,
+                schema_version=self.version.schema_version,
+            )
+            if isinstance(res, dict):
+                self.counts["assignments_updated"] += int(res.get("count") or 0)
+        except RuntimeError as e:
+            if "status=404" in str(e):
+                log_event(logger, logging.WARNING, "apply_assignment_deterministic_fields_missing")
+                self._assignments_rpc_available = False
+                return
+            raise
+
+
+def _toggles_from_config(cfg: Any) -> WorkerToggles:
+    return WorkerToggles(
+        enable_broadcast=False,
+        enable_dms=False,
+        materialize_assignments=False,
+        max_attempts=1,
+        backoff_base_s=0.0,
+        backoff_max_s=0.0,
+        stale_processing_seconds=0,
+        use_normalized_text_for_llm=bool(cfg.use_normalized_text_for_llm),
+        hard_validate_mode=str(cfg.hard_validate_mode or "report"),
+        enable_deterministic_signals=bool(cfg.enable_deterministic_signals),
+        use_deterministic_time=bool(cfg.use_deterministic_time),
+        # OneMap estimation is network-bound; keep previously estimated postal codes as stored.
+        enable_postal_code_estimated=False,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Recompute deterministic enrichment for historical extractions (multi-core, no LLM)")
+    p.add_argument("--pipeline-version", help="Extraction pipeline version (default: EXTRACTION_PIPELINE_VERSION)")
+    p.add_argument("--since", help="Raw message_date lower bound (ISO, inclusive)")
+    p.add_argument("--until", help="Raw message_date upper bound (ISO, exclusive)")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: CPU count; 1 = inline)")
+    p.add_argument("--page-size", type=int, default=1000, help="Rows fetched per request")
+    p.add_argument("--chunk-size", type=int, default=50, help="Rows per worker task")
+    p.add_argument("--max-rows", type=int, help="Stop after this many rows")
+    p.add_argument("--no-assignments", action="store_true", help="Only update telegram_extractions")
+    p.add_argument("--dry-run", action="store_true", help="Compute but do not write")
+    args = p.parse_args(argv)
+
+    setup_logging()
+    cfg = load_aggregator_config()
+    url = str(cfg.supabase_rest_url or "").rstrip("/")
+    key = str(cfg.supabase_auth_key or "")
+    if not (cfg.supabase_enabled and url and key):
+        raise SystemExit("Supabase not enabled/misconfigured. Check SUPABASE_* settings in .env.")
+
+    pv = str(args.pipeline_version or cfg.extraction_pipeline_version).strip()
+    version = VersionInfo(pipeline_version=pv, schema_version=str(cfg.schema_version or ""))
+    writer = BulkWriter(url, key, version=version, assignments=not args.no_assignments, dry_run=args.dry_run, flush_rows=args.page_size)
+    pages = iter_extraction_pages(
+        url, key, pipeline_version=pv, since=args.since, until=args.until, page_size=args.page_size, max_rows=args.max_rows
+    )
+
+    t0 = time.perf_counter()
+    last_report = [t0]
+
+    def _sink(results: List[Dict[str, Any]]) -> None:
+        writer(results)
+        now = time.perf_counter()
+        if now - last_report[0] >= 10.0:
+            last_report[0] = now
+            log_event(
+                logger,
+                logging.INFO,
+                "recompute_progress",
+                rows_per_s=round(writer.counts["scanned"] / max(1e-9, now - t0), 1),
+                **writer.counts,
+            )
+
+    log_event(logger, logging.INFO, "recompute_start", pipeline_version=pv, since=args.since, until=args.until, workers=args.workers)
+    run_pool(pages, toggles=_toggles_from_config(cfg), sink=_sink, workers=int(args.workers), chunk_size=int(args.chunk_size))
+    writer.flush()
+
+    elapsed = time.perf_counter() - t0
+    summary = {
+        "ok": True,
+        "pipeline_version": pv,
+        "workers": int(args.workers),
+        "elapsed_s": round(elapsed, 2),
+        "rows_per_s": round(writer.counts["scanned"] / max(1e-9, elapsed), 1),
+        "dry_run": bool(args.dry_run),
+        **writer.counts,
+    }
+    log_event(logger, logging.INFO, "recompute_done", **summary)
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
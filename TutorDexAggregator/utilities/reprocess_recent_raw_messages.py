@@ -10,6 +10,9 @@ Source of truth:
 
 Safety:
 - Does NOT broadcast and does NOT DM. It only extracts + persists to Supabase.
+
+Only deterministic code changed (no prompt/model change)? Use `utilities/recompute_deterministic.py`
+instead: it skips the LLM and recomputes history on all cores.
 """
 
 from pathlib import Path
@@ -0,0 +1,154 @@
+"""
+Seed the shared geocode cache (Redis) and the offline postal gazetteer from coordinates already
+stored on assignments.
+
+Why:
+- Every assignment row with `postal_lat/postal_lon` is a postal code we already paid a Nominatim call for.
+- Loading those answers up front means restarts, new workers and the backend hit the cache instead of
+  re-geocoding (Nominatim allows ~1 request/second).
+
+The code a row's coords belong to is picked the way `services/row_builder.py` geocodes:
+`postal_code[0]`, or `postal_code_estimated[0]` when `postal_coords_estimated` is set.
+
+Usage:
+  python utilities/seed_geocode_cache.py
+  python utilities/seed_geocode_cache.py --gazetteer ../shared/data/sg_postal_gazetteer.csv --no-redis
+  python utilities/seed_geocode_cache.py --max-rows 5000 --dry-run
+
+Env:
+  SUPABASE_* (same as supabase_persist)
+  GEOCODE_CACHE_REDIS_URL=redis://... (Redis to seed; skipped if unset)
+  GEOCODE_GAZETTEER_PATH=... (optional; default shared/data/sg_postal_gazetteer.csv)
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from shared.config import load_aggregator_config
+from shared.geocoding_cache import DEFAULT_GAZETTEER_PATH, POSTAL_COORDS, GeocodeCache, load_gazetteer, write_gazetteer
+
+HERE = Path(__file__).resolve().parent
+PARENT = HERE.parent
+if str(PARENT) not in sys.path:
+    sys.path.insert(0, str(PARENT))
+
+from logging_setup import log_event, setup_logging  # noqa: E402
+from supabase_persist import SupabaseRestClient, load_config_from_env, _normalize_sg_postal_code  # noqa: E402
+
+setup_logging()
+logger = logging.getLogger("seed_geocode_cache")
+
+PAGE_SIZE = 1000
+
+
+def _first(value: Any) -> Any:
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+
+def postal_coords_from_row(row: Dict[str, Any]) -> Optional[Tuple[str, Tuple[float, float]]]:
+    """(postal_code, (lat, lon)) for the code this row's coords were geocoded from, or None."""
+    lat, lon = row.get("postal_lat"), row.get("postal_lon")
+    if lat is None or lon is None:
+        return None
+    source = row.get("postal_code_estimated") if row.get("postal_coords_estimated") else row.get("postal_code")
+    pc = _normalize_sg_postal_code(_first(source))
+    if not pc:
+        return None
+    try:
+        return pc, (float(lat), float(lon))
+    except (TypeError, ValueError):
+        return None
+
+
+def collect_postal_coords(rows: Iterable[Dict[str, Any]]) -> Dict[str, Tuple[float, float]]:
+    """Latest answer per postal code; rows geocoded from an explicit postal code win over estimated ones."""
+    out: Dict[str, Tuple[float, float]] = {}
+    explicit: set = set()
+    for row in rows:
+        hit = postal_coords_from_row(row)
+        if hit is None:
+            continue
+        pc, coords = hit
+        is_explicit = not row.get("postal_coords_estimated")
+        if pc in explicit and not is_explicit:
+            continue
+        out[pc] = coords
+        if is_explicit:
+            explicit.add(pc)
+    return out
+
+
+def iter_rows(client: SupabaseRestClient, *, table: str, max_rows: int) -> Iterator[Dict[str, Any]]:
+    last_id = 0
+    seen = 0
+    while seen < max_rows:
+        limit = min(PAGE_SIZE, max_rows - seen)
+        query = (
+            f"{table}"
+            "?select=id,postal_code,postal_code_estimated,postal_lat,postal_lon,postal_coords_estimated"
+            "&postal_lat=not.is.null&postal_lon=not.is.null"
+            f"&id=gt.{int(last_id)}"
+            "&order=id.asc"
+            f"&limit={int(limit)}"
+        )
+        resp = client.get(query, timeout=30)
+        if resp.status_code >= 400:
+            raise RuntimeError(f"fetch_failed status={resp.status_code} body={resp.text[:400]}")
+        rows: List[Dict[str, Any]] = resp.json() or []
+        if not rows:
+            return
+        for row in rows:
+            yield row
+        seen += len(rows)
+        last_id = int(rows[-1].get("id") or last_id)
+        if len(rows) < limit:
+            return
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Seed the geocode cache and postal gazetteer from assignment coordinates")
+    p.add_argument("--gazetteer", type=str, default=None, help="Gazetteer CSV to merge into (default: GEOCODE_GAZETTEER_PATH)")
+    p.add_argument("--no-gazetteer", action="store_true", help="Do not write the gazetteer CSV")
+    p.add_argument("--no-redis", action="store_true", help="Do not seed Redis")
+    p.add_argument("--max-rows", type=int, default=200000, help="Max assignment rows to scan")
+    p.add_argument("--dry-run", action="store_true", help="Report counts without writing")
+    args = p.parse_args()
+
+    cfg = load_config_from_env()
+    if not cfg.enabled:
+        raise SystemExit(
+            "SUPABASE is disabled/misconfigured (set SUPABASE_ENABLED, SUPABASE_SERVICE_ROLE_KEY, and one of SUPABASE_URL_HOST / SUPABASE_URL_DOCKER / SUPABASE_URL)."
+        )
+    client = SupabaseRestClient(cfg)
+    table = cfg.assignments_table or "assignments"
+
+    table_coords = collect_postal_coords(iter_rows(client, table=table, max_rows=max(1, int(args.max_rows))))
+    log_event(logger, logging.INFO, "seed_geocode_collected", postal_codes=len(table_coords), dry_run=bool(args.dry_run))
+    if args.dry_run:
+        return
+
+    agg_cfg = load_aggregator_config()
+    if not args.no_gazetteer:
+        path = Path(args.gazetteer or str(agg_cfg.geocode_gazetteer_path or "").strip() or DEFAULT_GAZETTEER_PATH)
+        merged = load_gazetteer(path)
+        before = len(merged)
+        merged.update(table_coords)
+        write_gazetteer(path, merged)
+        log_event(logger, logging.INFO, "seed_geocode_gazetteer_written", path=str(path), before=before, after=len(merged))
+
+    if not args.no_redis:
+        cache = GeocodeCache.from_config(agg_cfg)
+        if cache.redis_url is None:
+            log_event(logger, logging.WARNING, "seed_geocode_redis_skipped", reason="GEOCODE_CACHE_REDIS_URL not set")
+            return
+        written = cache.seed(POSTAL_COORDS, ((pc, list(coords)) for pc, coords in table_coords.items()))
+        log_event(logger, logging.INFO, "seed_geocode_redis_written", count=written)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,8 @@ This package contains the extraction worker and supporting modules.
 
 from workers.job_manager import (
     claim_jobs,
+    claim_jobs_with_payload,
+    finalize_job_statuses,
     get_job_attempt,
     mark_job_status,
     merge_meta,
@@ -19,7 +21,9 @@ from workers.supabase_operations import (
     get_one,
     get_oldest_created_age_seconds,
     get_queue_counts,
+    get_queue_stats,
     patch_table,
+    try_acquire_lease,
 )
 from workers.triage_reporter import (
     get_thread_id_for_category,
@@ -76,6 +80,8 @@ from workers.side_effects import (
 __all__ = [
     # job_manager
     "claim_jobs",
+    "claim_jobs_with_payload",
+    "finalize_job_statuses",
     "get_job_attempt",
     "mark_job_status",
     "merge_meta",
@@ -88,7 +94,9 @@ __all__ = [
     "get_one",
     "get_oldest_created_age_seconds",
     "get_queue_counts",
+    "get_queue_stats",
     "patch_table",
+    "try_acquire_lease",
     # triage_reporter
     "get_thread_id_for_category",
     "get_triage_config",
@@ -4,9 +4,10 @@ import logging
 from typing import Any, Tuple
 
 from circuit_breaker import CircuitBreaker
-from logging_setup import bind_log_context, setup_logging
+from logging_setup import bind_log_context, log_event, setup_logging
 from observability_metrics import set_version_metrics
 from otel import setup_otel
+from prebuilt_artifacts import warm_worker_caches
 from sentry_init import setup_sentry
 from shared.config import load_aggregator_config
 
@@ -35,5 +36,9 @@ def bootstrap_worker() -> Tuple[Any, logging.Logger, VersionInfo, CircuitBreaker
         timeout_seconds=int(cfg.llm_circuit_breaker_timeout_seconds),
     )
 
+    # Load geo/taxonomy data (from prebuilt artifacts when fresh) before the first claim, so the
+    # first job does not pay for parsing and regex compilation.
+    log_event(logger, logging.INFO, "worker_caches_warmed", **warm_worker_caches())
+
     return cfg, logger, VersionInfo(v.pipeline_version, v.schema_version), llm_circuit_breaker
 
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import contextvars
 import json
 import logging
 import time
-from typing import Any, Callable, Dict, List, Optional, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 from compilation_message_handler import (
     order_verified_identifiers,
@@ -24,10 +26,41 @@ from workers.extract_worker_store import mark_extraction
 from workers.extract_worker_triage import try_report_triage_message
 from workers.extract_worker_types import VersionInfo, WorkerToggles
 from workers.side_effects import side_effect_suppression_reason
-from workers.llm_processor import extract_with_llm
+from workers.llm_processor import DEFAULT_LLM_MAX_INFLIGHT, extract_with_llm, llm_inflight_slots
 from workers.utils import build_message_link, sha256_hash, utc_now_iso
 from workers.validation_pipeline import validate_schema
 
+DEFAULT_SEGMENT_CONCURRENCY = 4
+
+
+def _segment_parts(seg: Any) -> Optional[Tuple[Any, str]]:
+    # Backward/forward compatibility:
+    # - older splitters may return (identifier, text) tuples
+    # - current splitter returns dict segments (identifier_verbatim/text/etc.)
+    if isinstance(seg, dict):
+        return seg.get("identifier_verbatim") or seg.get("identifier_normalized"), str(seg.get("text") or "")
+    if isinstance(seg, (list, tuple)) and len(seg) == 2:
+        return seg[0], str(seg[1] or "")
+    return None
+
+
+def segment_key(identifier_normalized: str, seg_text: str) -> str:
+    """Stable id for a segment across attempts; an edited segment text gets a new key and is re-extracted."""
+    return f"{identifier_normalized}:{sha256_hash(seg_text)[:16]}"
+
+
+def persisted_segments(existing_meta: Any) -> Dict[str, Dict[str, Any]]:
+    """Segment results from a previous attempt that persisted ok, keyed by `segment_key`."""
+    if not isinstance(existing_meta, dict):
+        return {}
+    comp = existing_meta.get("compilation")
+    segments = comp.get("segments") if isinstance(comp, dict) else None
+    out: Dict[str, Dict[str, Any]] = {}
+    for r in segments if isinstance(segments, list) else []:
+        if isinstance(r, dict) and r.get("ok") and r.get("segment_key"):
+            out[str(r["segment_key"])] = r
+    return out
+
 
 def process_compilation_confirmed(
     *,
@@ -58,38 +91,29 @@ def process_compilation_confirmed(
 ) -> str:
     ordered = order_verified_identifiers(raw_message=raw_text, verified=list(compilation_audit.get("verified") or []))
     segments = split_compilation_message(raw_message=raw_text, identifiers=ordered)
-    results: List[Dict[str, Any]] = []
-    any_failed = False
-    any_requeueable_persist_fail = False
-
-    for seg in segments:
-        seg_code_verbatim: Any = None
-        seg_text: str = ""
-
-        # Backward/forward compatibility:
-        # - older splitters may return (identifier, text) tuples
-        # - current splitter returns dict segments (identifier_verbatim/text/etc.)
-        if isinstance(seg, dict):
-            seg_code_verbatim = seg.get("identifier_verbatim") or seg.get("identifier_normalized")
-            seg_text = str(seg.get("text") or "")
-        elif isinstance(seg, (list, tuple)) and len(seg) == 2:
-            seg_code_verbatim, seg_text_any = seg
-            seg_text = str(seg_text_any or "")
-        else:
-            continue
+    llm_slots = llm_inflight_slots(int(getattr(cfg, "llm_max_inflight", None) or DEFAULT_LLM_MAX_INFLIGHT))
 
+    def _process_segment(seg_code_verbatim: Any, seg_text: str, seg_key: str) -> Dict[str, Any]:
         seg_code_norm = str(seg_code_verbatim or "").strip().upper()
         normalized_seg_text = normalize_text(seg_text)
+        base: Dict[str, Any] = {
+            "segment_key": seg_key,
+            "attempt": int(attempt),
+            "identifier_verbatim": seg_code_verbatim,
+            "identifier_normalized": seg_code_norm,
+            "segment_chars": len(seg_text),
+        }
 
         llm_input = normalized_seg_text if bool(toggles.use_normalized_text_for_llm) else seg_text
-        parsed, llm_err, lat, llm_error_payload = extract_with_llm(
-            llm_input,
-            channel_link,
-            cid=f"{cid}:seg:{seg_code_norm}",
-            circuit_breaker=circuit_breaker,
-            extract_func=extract_assignment_with_model,
-            metrics=llm_metrics(version),
-        )
+        with llm_slots:
+            parsed, llm_err, lat, llm_error_payload = extract_with_llm(
+                llm_input,
+                channel_link,
+                cid=f"{cid}:seg:{seg_code_norm}",
+                circuit_breaker=circuit_breaker,
+                extract_func=extract_assignment_with_model,
+                metrics=llm_metrics(version),
+            )
         try:
             worker_job_stage_latency_seconds.labels(stage="llm", pipeline_version=version.pipeline_version, schema_version=version.schema_version).observe(
                 float(lat)
@@ -99,7 +123,6 @@ def process_compilation_confirmed(
             pass
 
         if llm_err or not isinstance(parsed, dict):
-            any_failed = True
             try:
                 worker_parse_failure_total.labels(
                     channel=channel_link,
@@ -119,17 +142,7 @@ def process_compilation_confirmed(
                 stage="compilation_llm",
                 extracted_codes=[seg_code_norm] if seg_code_norm else None,
             )
-            results.append(
-                {
-                    "ok": False,
-                    "identifier_verbatim": seg_code_verbatim,
-                    "identifier_normalized": seg_code_norm,
-                    "segment_chars": len(seg_text),
-                    "llm_error": llm_err,
-                    "llm_error_payload": llm_error_payload,
-                }
-            )
-            continue
+            return {**base, "ok": False, "retryable": True, "llm_error": llm_err, "llm_error_payload": llm_error_payload}
 
         if seg_code_norm:
             parsed_code = parsed.get("assignment_code")
@@ -164,10 +177,16 @@ def process_compilation_confirmed(
             },
             toggles=toggles,
         )
+        enrich_meta = {
+            "llm_input": "normalized" if bool(toggles.use_normalized_text_for_llm) else "raw",
+            "postal_code_estimated": postal_estimated_meta,
+            "time_deterministic": time_meta,
+            "hard_validation": hard_meta,
+            "signals": signals_meta,
+        }
 
         ok_schema, schema_errors = validate_schema(payload.get("parsed") or {}, validate_parsed_assignment)
         if not ok_schema:
-            any_failed = True
             try:
                 worker_parse_failure_total.labels(
                     channel=channel_link,
@@ -188,22 +207,9 @@ def process_compilation_confirmed(
                 stage="compilation_validation",
                 extracted_codes=[seg_code_norm] if seg_code_norm else None,
             )
-            results.append(
-                {
-                    "ok": False,
-                    "identifier_verbatim": seg_code_verbatim,
-                    "identifier_normalized": seg_code_norm,
-                    "segment_chars": len(seg_text),
-                    "validation_errors": schema_errors,
-                    "llm_input": "normalized" if bool(toggles.use_normalized_text_for_llm) else "raw",
-                    "postal_code_estimated": postal_estimated_meta,
-                    "time_deterministic": time_meta,
-                    "hard_validation": hard_meta,
-                    "signals": signals_meta,
-                }
-            )
-            continue
+            return {**base, "ok": False, "retryable": False, "validation_errors": schema_errors, **enrich_meta}
 
+        # Persist (and fan out) as soon as this segment is ready, independent of its siblings.
         try:
             worker_supabase_requests_total.labels(operation="persist", pipeline_version=version.pipeline_version, schema_version=version.schema_version).inc()
         except Exception:
@@ -249,38 +255,81 @@ def process_compilation_confirmed(
             except Exception as e:
                 dm_res = {"ok": False, "error": str(e)}
 
-        if (not ok_persist) and (attempt + 1 < int(toggles.max_attempts or 0)):
-            any_requeueable_persist_fail = True
+        return {
+            **base,
+            "ok": ok_persist,
+            "retryable": not ok_persist,
+            "persist": persist_res,
+            "broadcast": broadcast_res,
+            "dm": dm_res,
+            **enrich_meta,
+        }
 
-        results.append(
-            {
-                "ok": ok_persist,
-                "identifier_verbatim": seg_code_verbatim,
-                "identifier_normalized": seg_code_norm,
-                "segment_chars": len(seg_text),
-                "persist": persist_res,
-                "broadcast": broadcast_res,
-                "dm": dm_res,
-                "llm_input": "normalized" if bool(toggles.use_normalized_text_for_llm) else "raw",
-                "postal_code_estimated": postal_estimated_meta,
-                "time_deterministic": time_meta,
-                "hard_validation": hard_meta,
-                "signals": signals_meta,
-            }
-        )
+    # Segments that persisted on an earlier attempt are carried over, not re-extracted (no duplicate LLM calls,
+    # broadcasts or DMs on a requeue).
+    previous = persisted_segments(existing_meta)
+    results: List[Optional[Dict[str, Any]]] = []
+    pending: List[Tuple[int, Any, str, str]] = []
+    for seg in segments:
+        parts = _segment_parts(seg)
+        if parts is None:
+            continue
+        seg_code_verbatim, seg_text = parts
+        seg_key = segment_key(str(seg_code_verbatim or "").strip().upper(), seg_text)
+        if seg_key in previous:
+            results.append(previous[seg_key])
+        else:
+            pending.append((len(results), seg_code_verbatim, seg_text, seg_key))
+            results.append(None)
+
+    concurrency = max(1, int(getattr(cfg, "compilation_segment_concurrency", None) or DEFAULT_SEGMENT_CONCURRENCY))
+    workers = min(concurrency, len(pending))
+    t_segments0 = time.perf_counter()
+    if workers <= 1:
+        for idx, seg_code_verbatim, seg_text, seg_key in pending:
+            results[idx] = _process_segment(seg_code_verbatim, seg_text, seg_key)
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="compilation_segment") as pool:
+            # Each task runs in a copy of the job's context so log lines keep the cid/channel binding.
+            futures = [(item, pool.submit(contextvars.copy_context().run, _process_segment, *item[1:])) for item in pending]
+            for (idx, seg_code_verbatim, seg_text, seg_key), fut in futures:
+                try:
+                    results[idx] = fut.result()
+                except Exception as e:
+                    results[idx] = {
+                        "segment_key": seg_key,
+                        "attempt": int(attempt),
+                        "identifier_verbatim": seg_code_verbatim,
+                        "identifier_normalized": str(seg_code_verbatim or "").strip().upper(),
+                        "segment_chars": len(seg_text),
+                        "ok": False,
+                        "retryable": True,
+                        "error": f"{type(e).__name__}: {e}",
+                    }
+    try:
+        worker_job_stage_latency_seconds.labels(
+            stage="compilation_segments", pipeline_version=version.pipeline_version, schema_version=version.schema_version
+        ).observe(max(0.0, time.perf_counter() - t_segments0))
+    except Exception:
+        # Metrics must never break runtime
+        pass
+
+    final: List[Dict[str, Any]] = [r for r in results if r is not None]
+    any_failed = any(not r.get("ok") for r in final)
+    any_retryable = any((not r.get("ok")) and r.get("retryable") for r in final)
 
-    if any_requeueable_persist_fail:
+    if any_retryable and (attempt + 1 < int(toggles.max_attempts or 0)):
         meta_patch = {
             "attempt": int(attempt) + 1,
-            "reason": "compilation_persist_failed",
-            "compilation": {"triggers": list(comp_details or []), "identifiers": compilation_audit, "segments": results},
+            "reason": "compilation_segments_retry",
+            "compilation": {"triggers": list(comp_details or []), "identifiers": compilation_audit, "segments": final},
         }
         mark_extraction(
             url,
             key,
             extraction_id,
             status="pending",
-            error={"error": "persist_failed", "details": {"compilation_segments": results}},
+            error={"error": "compilation_segments_failed", "details": {"compilation_segments": final}},
             meta_patch=with_prompt(meta_patch),
             existing_meta=existing_meta,
             llm_model=llm_model,
@@ -288,12 +337,12 @@ def process_compilation_confirmed(
         )
         return "requeued"
 
-    status = "ok" if (segments and not any_failed) else "failed"
+    status = "ok" if (final and not any_failed) else "failed"
     meta = {
         "ts": utc_now_iso(),
         "reason": "compilation_processed",
         "compilation_details": list(comp_details or []),
-        "compilation": {"identifiers": compilation_audit, "segments": results},
+        "compilation": {"identifiers": compilation_audit, "segments": final},
         "normalization": norm_meta,
     }
     mark_extraction(url, key, extraction_id, status=status, meta_patch=with_prompt(meta), existing_meta=existing_meta, llm_model=llm_model, version=version)
@@ -304,7 +353,7 @@ def process_compilation_confirmed(
             kind="extraction_error",
             raw=raw,
             channel_link=channel_link,
-            summary=f"compilation_failed: {json.dumps(results, ensure_ascii=False)[:500]}",
+            summary=f"compilation_failed: {json.dumps(final, ensure_ascii=False)[:500]}",
             stage="compilation",
         )
     return status
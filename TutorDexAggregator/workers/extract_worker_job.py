@@ -5,7 +5,6 @@ import time
 import traceback
 from typing import Any, Dict
 
-from compilation_detection import is_compilation
 from compilation_message_handler import confirm_compilation_identifiers
 from extract_key_info import get_examples_meta, get_system_prompt_meta
 from logging_setup import bind_log_context, log_event
@@ -16,7 +15,9 @@ from observability_metrics import (
 )
 from supabase_persist import mark_assignment_closed
 from workers.extract_worker_compilation import process_compilation_confirmed
+from workers.extract_worker_prefilter import REASON_DUPLICATE_TEXT, prefilter_message
 from workers.extract_worker_standard import process_standard_message
+from workers.extract_worker_status_refresh import is_status_refresh, process_status_refresh
 from workers.extract_worker_store import channel_info_cached, mark_extraction
 from workers.extract_worker_triage import try_report_triage_message
 from workers.extract_worker_types import VersionInfo, WorkerToggles
@@ -57,6 +58,9 @@ def work_one(
 
     def _with_prompt(meta_patch: Dict[str, Any]) -> Dict[str, Any]:
         out = dict(meta_patch)
+        if is_status_refresh(existing_meta):
+            # The job went down the full path (fallback, skip or failure): it is no longer a status refresh.
+            out.update({"refresh": None, "status_refresh": None})
         if prompt_meta is not None:
             out["prompt"] = prompt_meta
         if examples_meta is not None:
@@ -116,8 +120,14 @@ def work_one(
             schema_version=version.schema_version,
         ):
             t_load0 = time.perf_counter()
+            # Jobs from `claim_telegram_extractions_with_payload` carry `channel`/`raw`; older claims need lookups.
+            if "channel" in job and channel_link not in channel_cache:
+                channel_cache[channel_link] = job.get("channel") if isinstance(job.get("channel"), dict) else {}
             ch_info = channel_info_cached(channel_cache=channel_cache, url=url, key=key, channel_link=channel_link, version=version)
-            raw = load_raw_message(url, key, raw_id, pipeline_version=version.pipeline_version, schema_version=version.schema_version)
+            if "raw" in job:
+                raw = job.get("raw") if isinstance(job.get("raw"), dict) else None
+            else:
+                raw = load_raw_message(url, key, raw_id, pipeline_version=version.pipeline_version, schema_version=version.schema_version)
             try:
                 worker_job_stage_latency_seconds.labels(stage="load_raw", pipeline_version=version.pipeline_version, schema_version=version.schema_version).observe(
                     max(0.0, time.perf_counter() - t_load0)
@@ -208,6 +218,22 @@ def work_one(
                 )
                 return "skipped"
 
+            if is_status_refresh(existing_meta):
+                refreshed = process_status_refresh(
+                    logger=logger,
+                    version=version,
+                    url=url,
+                    key=key,
+                    extraction_id=extraction_id,
+                    existing_meta=existing_meta,
+                    channel_link=channel_link,
+                    raw=raw,
+                    attempt=attempt,
+                    max_attempts=int(toggles.max_attempts or 0),
+                )
+                if refreshed is not None:
+                    return refreshed
+
             raw_text = str(raw.get("raw_text") or "").strip()
             normalized_text = normalize_text(raw_text)
             norm_meta = {
@@ -216,7 +242,55 @@ def work_one(
                 "preview": normalized_text[:200] if normalized_text else "",
             }
 
-            is_comp_suspected, comp_details = is_compilation(raw_text)
+            prefilter = prefilter_message(
+                cfg=cfg,
+                version=version,
+                raw_text=raw_text,
+                normalized_text=normalized_text,
+                sha256=norm_meta["sha256"],
+                extraction_id=extraction_id,
+            )
+            try:
+                worker_job_stage_latency_seconds.labels(stage="prefilter", pipeline_version=version.pipeline_version, schema_version=version.schema_version).observe(
+                    float(prefilter.details.get("ms") or 0.0) / 1000.0
+                )
+            except Exception:
+                # Metrics must never break runtime
+                pass
+            if prefilter.skip:
+                skip_meta: Dict[str, Any] = {
+                    "reason": prefilter.reason,
+                    "prefilter": prefilter.meta(),
+                    "ts": utc_now_iso(),
+                    "normalization": norm_meta,
+                }
+                if "non_assignment_detection" in prefilter.details:
+                    skip_meta["non_assignment_detection"] = prefilter.details["non_assignment_detection"]
+                mark_extraction(
+                    url,
+                    key,
+                    extraction_id,
+                    status="skipped",
+                    meta_patch=_with_prompt(skip_meta),
+                    existing_meta=existing_meta,
+                    llm_model=llm_model,
+                    version=version,
+                )
+                # Repeats of an already-reported text are not re-sent to the triage chat.
+                if prefilter.reason != REASON_DUPLICATE_TEXT:
+                    _, non_type, non_details = prefilter.non_assignment
+                    try_report_triage_message(
+                        cfg=cfg,
+                        logger=logger,
+                        kind="non_assignment",
+                        raw=raw,
+                        channel_link=channel_link,
+                        summary=f"non_assignment: {non_type} - {non_details}" if non_type else f"{prefilter.reason}: {prefilter.details}",
+                        stage="pre_extraction_filter",
+                    )
+                return "skipped"
+
+            is_comp_suspected, comp_details = prefilter.compilation
             if is_comp_suspected:
                 compilation_audit = confirm_compilation_identifiers(raw_message=raw_text, cid=cid, channel=channel_link)
 
@@ -321,6 +395,7 @@ def work_one(
                 with_prompt=_with_prompt,
                 broadcast_assignments=broadcast_assignments,
                 send_dms=send_dms,
+                prefilter=prefilter,
             )
 
     try:
@@ -10,22 +10,23 @@ import requests
 from logging_setup import log_event
 from observability_http import start_observability_http_server
 from observability_metrics import (
-    queue_failed,
-    queue_ok,
-    queue_oldest_pending_age_seconds,
-    queue_oldest_processing_age_seconds,
-    queue_pending,
-    queue_processing,
+    worker_idle_wakeups_total,
     worker_job_latency_seconds,
     worker_jobs_processed_total,
     worker_requeued_stale_jobs_total,
 )
+try:
+    from services.job_wakeup import JobWakeup  # type: ignore
+except Exception:
+    # Imported as `TutorDexAggregator.*` from repo root (e.g., unit tests).
+    from TutorDexAggregator.services.job_wakeup import JobWakeup  # type: ignore
 from workers.extract_worker_bootstrap import bootstrap_worker
 from workers.extract_worker_job import work_one
-from workers.extract_worker_store import supabase_cfg
+from workers.extract_worker_store import ExtractionStatusWriter, set_status_writer, supabase_cfg
 from workers.extract_worker_types import WorkerToggles
-from workers.job_manager import claim_jobs, requeue_stale_jobs
-from workers.supabase_operations import build_headers, get_oldest_created_age_seconds, get_queue_counts
+from workers.job_manager import claim_jobs, claim_jobs_with_payload, requeue_stale_jobs
+from workers.queue_stats import QueueStatsCollector
+from workers.supabase_operations import build_headers
 from shared.config import validate_environment_integrity
 
 
@@ -66,6 +67,14 @@ def _resolve_side_effect_toggles(cfg: Any) -> tuple[bool, bool]:
     return enable_broadcast, enable_dms
 
 
+def _flush_status_writer(writer: ExtractionStatusWriter, logger: logging.Logger) -> None:
+    try:
+        writer.flush()
+    except Exception:
+        # Unflushed jobs stay `processing` and are picked up again by the stale requeue.
+        logger.warning("status_flush_failed pending=%s", writer.pending(), exc_info=True)
+
+
 def _import_side_effects() -> tuple[Any, Any]:
     try:
         import broadcast_assignments
@@ -179,6 +188,23 @@ def main() -> None:
     metrics_interval_s = 15.0
 
     channel_cache: Dict[str, Dict[str, Any]] = {}
+    claim_with_payload = True
+    queue_stats = QueueStatsCollector(
+        url,
+        key,
+        mode=str(getattr(cfg, "extraction_queue_stats_mode", None) or "elected").strip().lower(),
+        interval_s=metrics_interval_s,
+        terminal_max_age_seconds=int(getattr(cfg, "extraction_queue_stats_terminal_max_age_s", None) or 300),
+    )
+
+    wakeup = JobWakeup.from_config(cfg, pipeline_version)
+    safety_poll_s = float(getattr(cfg, "extraction_worker_safety_poll_s", None) or 30.0)
+
+    # Job status transitions are buffered per claimed batch and written with one RPC call; a slow batch flushes
+    # early so finished jobs are never old enough for the stale requeue.
+    stale_s = float(toggles.stale_processing_seconds or 0)
+    status_writer = ExtractionStatusWriter(url, key, version=version, max_age_s=min(60.0, stale_s / 4) if stale_s > 0 else 60.0)
+    set_status_writer(status_writer)
 
     try:
         while True:
@@ -203,25 +229,34 @@ def main() -> None:
 
             if (now - last_metrics) > metrics_interval_s:
                 try:
-                    counts = get_queue_counts(url, key, ["pending", "processing", "ok", "failed"], pipeline_version=pv)
-                    queue_pending.labels(pipeline_version=pv, schema_version=sv).set(float(counts.get("pending") or 0))
-                    queue_processing.labels(pipeline_version=pv, schema_version=sv).set(float(counts.get("processing") or 0))
-                    queue_ok.labels(pipeline_version=pv, schema_version=sv).set(float(counts.get("ok") or 0))
-                    queue_failed.labels(pipeline_version=pv, schema_version=sv).set(float(counts.get("failed") or 0))
-                    oldest_pending = get_oldest_created_age_seconds(url, key, "pending", pipeline_version=pv)
-                    oldest_processing = get_oldest_created_age_seconds(url, key, "processing", pipeline_version=pv)
-                    queue_oldest_pending_age_seconds.labels(pipeline_version=pv, schema_version=sv).set(float(oldest_pending or 0.0))
-                    queue_oldest_processing_age_seconds.labels(pipeline_version=pv, schema_version=sv).set(float(oldest_processing or 0.0))
+                    queue_stats.collect(pv, sv)
                 except Exception:
                     logger.debug("queue_metrics_update_failed", exc_info=True)
                 last_metrics = now
 
-            jobs = claim_jobs(url, key, pipeline_version=pipeline_version, limit=int(max(1, claim_batch_size)), schema_version=sv)
+            jobs = None
+            if claim_with_payload:
+                jobs = claim_jobs_with_payload(
+                    url, key, pipeline_version=pipeline_version, limit=int(max(1, claim_batch_size)), schema_version=sv
+                )
+                if jobs is None:
+                    # Older schema without the payload RPC: claim bare rows and load raw/channel per job.
+                    claim_with_payload = False
+            if jobs is None:
+                jobs = claim_jobs(url, key, pipeline_version=pipeline_version, limit=int(max(1, claim_batch_size)), schema_version=sv)
             if not jobs:
                 if oneshot:
                     log_event(logger, logging.INFO, "worker_oneshot_done", processed=processed, pipeline_version=pipeline_version)
                     return
-                time.sleep(max(0.25, float(idle_sleep_s)))
+                if wakeup is not None:
+                    reason = wakeup.wait(max(float(idle_sleep_s), safety_poll_s), fallback_sleep_s=max(0.25, float(idle_sleep_s)))
+                else:
+                    time.sleep(max(0.25, float(idle_sleep_s)))
+                    reason = "sleep"
+                try:
+                    worker_idle_wakeups_total.labels(reason=reason, pipeline_version=pv, schema_version=sv).inc()
+                except Exception:
+                    pass
                 continue
 
             log_event(logger, logging.INFO, "claimed_jobs", count=len(jobs), pipeline_version=pipeline_version)
@@ -275,6 +310,7 @@ def main() -> None:
                         pass
                     logger.warning("job_error extraction_id=%s dt_ms=%s error=%s", extraction_id, dt_ms, str(e))
                 if max_jobs and processed >= max_jobs:
+                    _flush_status_writer(status_writer, logger)
                     log_event(
                         logger,
                         logging.INFO,
@@ -284,9 +320,15 @@ def main() -> None:
                         pipeline_version=pipeline_version,
                     )
                     return
+            _flush_status_writer(status_writer, logger)
     except KeyboardInterrupt:
         log_event(logger, logging.INFO, "worker_interrupted")
         return
     except Exception as e:
         log_event(logger, logging.WARNING, "worker_loop_error", error=str(e))
         time.sleep(2.0)
+    finally:
+        _flush_status_writer(status_writer, logger)
+        set_status_writer(None)
+        if wakeup is not None:
+            wakeup.close()
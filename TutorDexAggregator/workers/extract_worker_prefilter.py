@@ -0,0 +1,242 @@
+"""
+Deterministic pre-LLM prefilter for the extraction worker.
+
+Runs the cheap checks once per job, over the text `work_one` already normalized, before any model call:
+
+1. duplicate_text: the same normalized text was rejected recently (in-process memo keyed by its sha256)
+2. compilation: `compilation_detection.is_compilation` (routes to the compilation path; never a skip here)
+3. non_assignment: `extractors.non_assignment_detector.is_non_assignment`
+4. too_short: fewer than `PREFILTER_MIN_CHARS` characters
+5. non_latin_script: mostly non-Latin letters (the prompt and extractors are English-only)
+
+Checks 1, 4 and 5 only run when `PREFILTER_ENABLED` is on. A non-assignment verdict on a suspected compilation
+does not short-circuit: the compilation path decides first and hands the verdict to the standard path if it
+downgrades, which is the order the worker has always used.
+
+Every decision is counted in `worker_prefilter_decisions_total`; every skip adds the recent mean LLM latency to
+`worker_prefilter_saved_llm_seconds_total`.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from compilation_detection import is_compilation
+from extractors.non_assignment_detector import MessageType, detection_meta, is_non_assignment
+from observability_metrics import worker_prefilter_decisions_total, worker_prefilter_saved_llm_seconds_total
+from workers.extract_worker_types import VersionInfo
+
+REASON_DUPLICATE_TEXT = "duplicate_text"
+REASON_TOO_SHORT = "too_short"
+REASON_NON_LATIN_SCRIPT = "non_latin_script"
+REASON_NON_ASSIGNMENT = "non_assignment"
+
+DEFAULT_MIN_CHARS = 30
+DEFAULT_MIN_LATIN_RATIO = 0.5
+DEFAULT_DUPLICATE_TTL_S = 6 * 3600
+DEFAULT_LLM_SECONDS_ESTIMATE = 8.0
+
+# Below this many letters the script ratio is too noisy to act on (codes, rates and emoji dominate).
+_SCRIPT_MIN_LETTERS = 20
+_REJECTED_MAX = 4096
+_LLM_EWMA_ALPHA = 0.2
+
+NonAssignmentVerdict = Tuple[bool, Optional[MessageType], str]
+
+
+@dataclass(frozen=True)
+class PrefilterDecision:
+    skip: bool
+    reason: Optional[str]
+    non_assignment: NonAssignmentVerdict
+    compilation: Tuple[bool, List[str]]
+    details: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def route(self) -> str:
+        if self.skip:
+            return "skip"
+        return "compilation" if self.compilation[0] else "standard"
+
+    def meta(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"route": self.route, "reason": self.reason}
+        out.update(self.details)
+        return out
+
+
+class _RejectedTexts:
+    """Bounded sha256 -> rejection memo; entries expire after `ttl_s`."""
+
+    def __init__(self, max_items: int = _REJECTED_MAX) -> None:
+        self.max_items = int(max_items)
+        self._items: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sha: str, *, ttl_s: float, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        now = time.time() if now is None else now
+        with self._lock:
+            item = self._items.get(sha)
+            if item is None:
+                return None
+            if ttl_s <= 0 or now - float(item["at"]) > ttl_s:
+                self._items.pop(sha, None)
+                return None
+            return item
+
+    def put(self, sha: str, *, reason: str, extraction_id: Any, now: Optional[float] = None) -> None:
+        with self._lock:
+            if sha in self._items:
+                return
+            self._items[sha] = {"reason": reason, "extraction_id": extraction_id, "at": time.time() if now is None else now}
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+_rejected = _RejectedTexts()
+_llm_lock = threading.Lock()
+_llm_seconds_ewma: Optional[float] = None
+
+
+def reset_state() -> None:
+    """Forget remembered rejections and observed LLM latency (tests, benchmarks)."""
+    global _llm_seconds_ewma
+    _rejected.clear()
+    with _llm_lock:
+        _llm_seconds_ewma = None
+
+
+def observe_llm_seconds(seconds: float) -> None:
+    """Feed one observed extraction LLM latency into the saved-seconds estimate."""
+    global _llm_seconds_ewma
+    try:
+        s = float(seconds)
+    except Exception:
+        return
+    if s <= 0:
+        return
+    with _llm_lock:
+        _llm_seconds_ewma = s if _llm_seconds_ewma is None else (1 - _LLM_EWMA_ALPHA) * _llm_seconds_ewma + _LLM_EWMA_ALPHA * s
+
+
+def llm_seconds_estimate(cfg: Any = None) -> float:
+    with _llm_lock:
+        if _llm_seconds_ewma is not None:
+            return _llm_seconds_ewma
+    return float(getattr(cfg, "prefilter_llm_seconds_estimate", None) or DEFAULT_LLM_SECONDS_ESTIMATE)
+
+
+def _latin_ratio(text: str) -> Tuple[float, int]:
+    letters = 0
+    latin = 0
+    for ch in text:
+        if ch.isalpha():
+            letters += 1
+            if ch.isascii():
+                latin += 1
+    return (latin / letters if letters else 1.0), letters
+
+
+def _count_decision(version: Optional[VersionInfo], decision: str, reason: str) -> None:
+    if version is None:
+        return
+    try:
+        worker_prefilter_decisions_total.labels(
+            decision=decision,
+            reason=reason,
+            pipeline_version=version.pipeline_version,
+            schema_version=version.schema_version,
+        ).inc()
+    except Exception:
+        # Metrics must never break runtime
+        pass
+
+
+def record_rejection(
+    *,
+    cfg: Any,
+    version: Optional[VersionInfo],
+    sha256: str,
+    reason: str,
+    extraction_id: Any,
+) -> None:
+    """
+    Remember a terminal rejection of `sha256` and count the LLM time it saved.
+
+    Called for prefilter skips and for non-assignment skips the standard path makes after a compilation downgrade.
+    """
+    if sha256:
+        _rejected.put(sha256, reason=reason, extraction_id=extraction_id)
+    if version is None:
+        return
+    try:
+        worker_prefilter_saved_llm_seconds_total.labels(
+            reason=reason,
+            pipeline_version=version.pipeline_version,
+            schema_version=version.schema_version,
+        ).inc(llm_seconds_estimate(cfg))
+    except Exception:
+        # Metrics must never break runtime
+        pass
+
+
+def prefilter_message(
+    *,
+    cfg: Any,
+    version: Optional[VersionInfo],
+    raw_text: str,
+    normalized_text: str,
+    sha256: str,
+    extraction_id: Any = None,
+) -> PrefilterDecision:
+    t0 = time.perf_counter()
+    enabled = bool(getattr(cfg, "prefilter_enabled", True))
+    reason: Optional[str] = None
+    details: Dict[str, Any] = {}
+
+    ttl_s = float(getattr(cfg, "prefilter_duplicate_ttl_s", DEFAULT_DUPLICATE_TTL_S) or 0)
+    seen = _rejected.get(sha256, ttl_s=ttl_s) if enabled and sha256 else None
+    if seen is not None:
+        reason = REASON_DUPLICATE_TEXT
+        details["duplicate_of"] = {"reason": seen["reason"], "extraction_id": seen["extraction_id"]}
+        non_verdict: NonAssignmentVerdict = (False, None, "")
+        comp: Tuple[bool, List[str]] = (False, [])
+    else:
+        comp_suspected, comp_details = is_compilation(raw_text)
+        comp = (bool(comp_suspected), list(comp_details or []))
+        non_verdict = is_non_assignment(normalized_text)
+        if non_verdict[0]:
+            details["non_assignment_detection"] = detection_meta(*non_verdict)
+            if not comp[0]:
+                reason = REASON_NON_ASSIGNMENT
+
+    if enabled and reason is None:
+        min_chars = int(getattr(cfg, "prefilter_min_chars", DEFAULT_MIN_CHARS) or 0)
+        min_latin = float(getattr(cfg, "prefilter_min_latin_ratio", DEFAULT_MIN_LATIN_RATIO) or 0)
+        ratio, letters = _latin_ratio(normalized_text)
+        if len(normalized_text) < min_chars:
+            reason = REASON_TOO_SHORT
+            details["chars"] = len(normalized_text)
+            details["min_chars"] = min_chars
+        elif letters >= _SCRIPT_MIN_LETTERS and ratio < min_latin:
+            reason = REASON_NON_LATIN_SCRIPT
+            details["latin_ratio"] = round(ratio, 3)
+            details["min_latin_ratio"] = min_latin
+
+    details["ms"] = round((time.perf_counter() - t0) * 1000.0, 3)
+    decision = PrefilterDecision(skip=reason is not None, reason=reason, non_assignment=non_verdict, compilation=comp, details=details)
+    if decision.skip:
+        _count_decision(version, "skip", str(reason))
+        # A duplicate keeps the first rejection's memo entry (and its TTL) rather than extending it.
+        memo_sha = "" if reason == REASON_DUPLICATE_TEXT else sha256
+        record_rejection(cfg=cfg, version=version, sha256=memo_sha, reason=str(reason), extraction_id=extraction_id)
+    else:
+        _count_decision(version, "pass", decision.route)
+    return decision
@@ -13,11 +13,12 @@ from observability_metrics import (
 from schema_validation import validate_parsed_assignment
 from workers.extract_worker_enrich import enrich_payload
 from workers.extract_worker_metrics import llm_metrics
+from workers.extract_worker_prefilter import PrefilterDecision, observe_llm_seconds, record_rejection
 from workers.extract_worker_standard_persist import persist_and_finalize
 from workers.extract_worker_store import mark_extraction
 from workers.extract_worker_triage import try_report_triage_message
 from workers.extract_worker_types import VersionInfo, WorkerToggles
-from workers.llm_processor import extract_with_llm
+from workers.llm_processor import DEFAULT_LLM_MAX_INFLIGHT, extract_with_llm, llm_inflight_slots
 from workers.utils import build_message_link, utc_now_iso
 from workers.validation_pipeline import validate_schema
 
@@ -45,8 +46,11 @@ def process_standard_message(
     with_prompt: Callable[[Dict[str, Any]], Dict[str, Any]],
     broadcast_assignments: Any,
     send_dms: Any,
+    prefilter: Optional[PrefilterDecision] = None,
 ) -> str:
-    is_non, non_type, non_details = is_non_assignment(raw_text)
+    # The prefilter already ran the detector; only suspected compilations that were downgraded reach here with a
+    # positive verdict.
+    is_non, non_type, non_details = prefilter.non_assignment if prefilter is not None else is_non_assignment(raw_text)
     if is_non:
         non_meta = detection_meta(is_non, non_type, non_details)
         mark_extraction(
@@ -66,6 +70,7 @@ def process_standard_message(
             llm_model=llm_model,
             version=version,
         )
+        record_rejection(cfg=cfg, version=version, sha256=str(norm_meta.get("sha256") or ""), reason="non_assignment", extraction_id=extraction_id)
         try_report_triage_message(
             cfg=cfg,
             logger=logger,
@@ -78,14 +83,17 @@ def process_standard_message(
         return "skipped"
 
     llm_input = normalized_text if bool(toggles.use_normalized_text_for_llm) else raw_text
-    parsed, llm_err, llm_latency, llm_error_payload = extract_with_llm(
-        llm_input,
-        channel_link,
-        cid=cid,
-        circuit_breaker=circuit_breaker,
-        extract_func=extract_assignment_with_model,
-        metrics=llm_metrics(version),
-    )
+    with llm_inflight_slots(int(getattr(cfg, "llm_max_inflight", None) or DEFAULT_LLM_MAX_INFLIGHT)):
+        parsed, llm_err, llm_latency, llm_error_payload = extract_with_llm(
+            llm_input,
+            channel_link,
+            cid=cid,
+            circuit_breaker=circuit_breaker,
+            extract_func=extract_assignment_with_model,
+            metrics=llm_metrics(version),
+        )
+    if not llm_err:
+        observe_llm_seconds(llm_latency)
     try:
         worker_job_stage_latency_seconds.labels(stage="llm", pipeline_version=version.pipeline_version, schema_version=version.schema_version).observe(
             float(llm_latency)
@@ -0,0 +1,126 @@
+"""
+Cheap path for status-only edits.
+
+`enqueue_telegram_extractions_fingerprinted` re-queues an edit with `meta.refresh = "status_only"` when only status
+markers changed since the last successful extraction (see `content_fingerprint.py`). Instead of a new LLM call, the
+worker reads the status off the edited text and applies it to the assignments sourced from that message.
+`canonical_json` and `llm_model` are left as they were.
+
+- a closing marker closes the open ones
+- closed ones are reopened only when the marker is gone and the previous refresh of this message is what closed
+  them (`meta.status_refresh.status`), or when an allowlisted agency's status rules say "open"; assignments closed
+  by expiry or by hand stay closed
+- anything else settles the job without touching assignments
+
+Compilation posts fall back to full extraction: one marker cannot say which of their assignments it refers to.
+The caller then clears `meta.refresh` when it records the full extraction.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Optional
+
+import requests
+
+from content_fingerprint import edit_status
+from logging_setup import log_event
+from observability_metrics import worker_status_refresh_total
+from workers.extract_worker_store import mark_extraction
+from workers.extract_worker_types import VersionInfo
+from workers.supabase_operations import patch_table
+from workers.utils import utc_now_iso
+
+REFRESH_STATUS_ONLY = "status_only"
+
+
+def is_status_refresh(existing_meta: Any) -> bool:
+    return isinstance(existing_meta, dict) and existing_meta.get("refresh") == REFRESH_STATUS_ONLY
+
+
+def _count(version: VersionInfo, outcome: str) -> None:
+    try:
+        worker_status_refresh_total.labels(outcome=outcome, pipeline_version=version.pipeline_version, schema_version=version.schema_version).inc()
+    except Exception:
+        # Metrics must never break runtime
+        pass
+
+
+def process_status_refresh(
+    *,
+    logger: logging.Logger,
+    version: VersionInfo,
+    url: str,
+    key: str,
+    extraction_id: Any,
+    existing_meta: Any,
+    channel_link: str,
+    raw: Dict[str, Any],
+    attempt: int = 0,
+    max_attempts: int = 0,
+) -> Optional[str]:
+    """
+    Returns the job outcome, or None to continue with the full extraction.
+
+    A failed PATCH re-queues the job (still a status refresh) while `attempt + 1 < max_attempts`, like a failed persist.
+    """
+    channel_id = str(raw.get("channel_id") or "").strip()
+    message_id = str(raw.get("message_id") or "").strip()
+    if (isinstance(existing_meta, dict) and existing_meta.get("compilation")) or not channel_id or not message_id:
+        log_event(logger, logging.INFO, "status_refresh_fallback", channel=channel_link, message_id=message_id)
+        return None
+
+    status = edit_status(raw.get("raw_text"), channel_link=channel_link)
+    prior = existing_meta.get("status_refresh") if isinstance(existing_meta, dict) else None
+    if status is None and isinstance(prior, dict) and prior.get("status") == "closed":
+        # The closing marker this path acted on was edited away.
+        status = "open"
+    if status is None:
+        _count(version, "unchanged")
+        mark_extraction(url, key, extraction_id, status="ok", meta_patch={"refresh": None}, existing_meta=existing_meta, version=version)
+        return "ok"
+
+    previous = "open" if status == "closed" else "closed"
+    where = (
+        f"channel_id=eq.{requests.utils.quote(channel_id, safe='')}"
+        f"&message_id=eq.{requests.utils.quote(message_id, safe='')}"
+        f"&status=eq.{previous}"
+    )
+    ok = patch_table(
+        url,
+        key,
+        "assignments",
+        where,
+        {"status": status, "last_seen": utc_now_iso()},
+        timeout=20,
+        pipeline_version=version.pipeline_version,
+        schema_version=version.schema_version,
+    )
+    log_event(logger, logging.INFO if ok else logging.WARNING, "status_refresh_result", channel=channel_link, message_id=message_id, status=status, ok=ok)
+    if not ok:
+        # Nothing was applied, so `status_refresh` keeps describing the last change that was.
+        requeue = attempt + 1 < int(max_attempts or 0)
+        _count(version, "requeued" if requeue else "failed")
+        mark_extraction(
+            url,
+            key,
+            extraction_id,
+            status="pending" if requeue else "failed",
+            error={"error": "status_refresh_failed", "status": status},
+            meta_patch={"attempt": attempt + 1},
+            existing_meta=existing_meta,
+            version=version,
+        )
+        return "requeued" if requeue else "failed"
+
+    _count(version, "closed" if status == "closed" else "reopened")
+    mark_extraction(
+        url,
+        key,
+        extraction_id,
+        status="ok",
+        meta_patch={"refresh": None, "status_refresh": {"status": status, "ts": utc_now_iso()}},
+        existing_meta=existing_meta,
+        version=version,
+    )
+    return "ok"
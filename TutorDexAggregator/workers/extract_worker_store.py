@@ -1,15 +1,20 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional, Tuple
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 import requests
 
 from workers.extract_worker_types import VersionInfo
-from workers.job_manager import merge_meta
+from workers.job_manager import finalize_job_statuses, merge_meta
 from workers.message_processor import load_channel_info
 from workers.supabase_operations import patch_table
 from workers.utils import utc_now_iso
 
+logger = logging.getLogger("extract_worker_store")
+
 
 def supabase_cfg(cfg: Any) -> Tuple[str, str]:
     url = getattr(cfg, "supabase_rest_url", None)
@@ -38,6 +43,135 @@ def channel_info_cached(
     return {}
 
 
+class ExtractionStatusWriter:
+    """
+    Collects job status transitions and applies them in bulk.
+
+    While installed via `set_status_writer`, `mark_extraction` queues transitions here instead of
+    PATCHing each row. `flush()` (called by the worker loop after each claimed batch and on shutdown)
+    sends them through the `finalize_telegram_extractions` RPC, which merges `meta_patch` server-side.
+    Schemas without that RPC fall back to the per-row PATCH path.
+
+    A finished job stays `processing` in the database until its transition is flushed, so `add()` also flushes once
+    the oldest queued transition is `max_age_s` old; keep that well below the stale-requeue window or a long batch
+    lets `requeue_stale_extractions` re-queue jobs that are already done.
+    """
+
+    def __init__(self, url: str, key: str, *, version: VersionInfo, max_age_s: float = 60.0):
+        self.url = url
+        self.key = key
+        self.version = version
+        self.max_age_s = max(0.0, float(max_age_s))
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._oldest: Optional[float] = None
+        self._lock = threading.Lock()
+        self._rpc_available = True
+
+    def add(
+        self,
+        extraction_id: Any,
+        *,
+        status: str,
+        canonical_json: Any = None,
+        error: Any = None,
+        meta_patch: Optional[Dict[str, Any]] = None,
+        existing_meta: Any = None,
+        llm_model: Optional[str] = None,
+    ) -> None:
+        with self._lock:
+            entry = self._pending.setdefault(str(extraction_id), {"id": extraction_id, "existing_meta": existing_meta})
+            # Repeated transitions for one job: the last status wins, meta patches accumulate.
+            entry["status"] = status
+            if canonical_json is not None:
+                entry["canonical_json"] = canonical_json
+            if error is not None:
+                entry["error"] = error
+            if llm_model:
+                entry["llm_model"] = llm_model
+            if meta_patch is not None:
+                merged = dict(entry.get("meta_patch") or {})
+                merged.update(meta_patch)
+                entry["meta_patch"] = merged
+            now = time.monotonic()
+            if self._oldest is None:
+                self._oldest = now
+            due = now - self._oldest >= self.max_age_s
+        if due:
+            self.flush()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """
+        Apply all queued transitions.
+
+        Returns:
+            Number of transitions written
+        """
+        with self._lock:
+            entries = list(self._pending.values())
+            self._pending.clear()
+            self._oldest = None
+        if not entries:
+            return 0
+
+        if self._rpc_available:
+            updates: List[Dict[str, Any]] = []
+            for e in entries:
+                u = {k: v for k, v in e.items() if k != "existing_meta"}
+                try:
+                    u["id"] = int(u["id"])
+                except (TypeError, ValueError):
+                    pass
+                updates.append(u)
+            try:
+                n = finalize_job_statuses(
+                    self.url,
+                    self.key,
+                    updates,
+                    pipeline_version=self.version.pipeline_version,
+                    schema_version=self.version.schema_version,
+                )
+                if n is not None:
+                    return len(entries)
+                logger.info("finalize_telegram_extractions missing; using per-row status updates")
+                self._rpc_available = False
+            except Exception as e:
+                logger.warning("finalize_telegram_extractions failed; retrying per row error=%s", e)
+
+        written = 0
+        for e in entries:
+            try:
+                _patch_extraction(
+                    self.url,
+                    self.key,
+                    e["id"],
+                    status=e["status"],
+                    version=self.version,
+                    canonical_json=e.get("canonical_json"),
+                    error=e.get("error"),
+                    meta_patch=e.get("meta_patch"),
+                    existing_meta=e.get("existing_meta"),
+                    llm_model=e.get("llm_model"),
+                )
+                written += 1
+            except Exception as ex:
+                # Left `processing`; the stale requeue picks it up again.
+                logger.warning("status_update_failed extraction_id=%s status=%s error=%s", e["id"], e["status"], ex)
+        return written
+
+
+_STATUS_WRITER: Optional[ExtractionStatusWriter] = None
+
+
+def set_status_writer(writer: Optional[ExtractionStatusWriter]) -> None:
+    """Route `mark_extraction` through `writer` (None restores immediate per-row updates)."""
+    global _STATUS_WRITER
+    _STATUS_WRITER = writer
+
+
 def mark_extraction(
     url: str,
     key: str,
@@ -50,6 +184,45 @@ def mark_extraction(
     meta_patch: Optional[Dict[str, Any]] = None,
     existing_meta: Any = None,
     llm_model: Optional[str] = None,
+) -> None:
+    writer = _STATUS_WRITER
+    if writer is not None and extraction_id is not None:
+        writer.add(
+            extraction_id,
+            status=status,
+            canonical_json=canonical_json,
+            error=error,
+            meta_patch=meta_patch,
+            existing_meta=existing_meta,
+            llm_model=llm_model,
+        )
+        return
+    _patch_extraction(
+        url,
+        key,
+        extraction_id,
+        status=status,
+        version=version,
+        canonical_json=canonical_json,
+        error=error,
+        meta_patch=meta_patch,
+        existing_meta=existing_meta,
+        llm_model=llm_model,
+    )
+
+
+def _patch_extraction(
+    url: str,
+    key: str,
+    extraction_id: Any,
+    *,
+    status: str,
+    version: VersionInfo,
+    canonical_json: Any = None,
+    error: Any = None,
+    meta_patch: Optional[Dict[str, Any]] = None,
+    existing_meta: Any = None,
+    llm_model: Optional[str] = None,
 ) -> None:
     body: Dict[str, Any] = {"status": status, "updated_at": utc_now_iso()}
     if canonical_json is not None:
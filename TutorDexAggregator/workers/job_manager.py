@@ -52,6 +52,53 @@ def claim_jobs(
     return jobs
 
 
+def claim_jobs_with_payload(
+    url: str,
+    key: str,
+    pipeline_version: str,
+    limit: int,
+    schema_version: str = ""
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Claim pending extraction jobs joined with their raw message and channel metadata.
+
+    Each job carries `raw` (raw message fields, or None if missing) and `channel`
+    (channel_link/channel_id/title, or None if unknown), so the worker needs no
+    per-job lookups.
+
+    Args:
+        url: Supabase base URL
+        key: Supabase API key
+        pipeline_version: Pipeline version to claim jobs for
+        limit: Maximum number of jobs to claim
+        schema_version: For metrics labeling
+
+    Returns:
+        List of claimed job records, or None if the RPC is not installed
+        (callers should fall back to `claim_jobs`)
+    """
+    try:
+        jobs = call_rpc(
+            url,
+            key,
+            "claim_telegram_extractions_with_payload",
+            {"p_pipeline_version": pipeline_version, "p_limit": int(max(1, limit))},
+            timeout=30,
+            pipeline_version=pipeline_version,
+            schema_version=schema_version
+        )
+    except RuntimeError as e:
+        if "status=404" in str(e):
+            logger.info("claim_telegram_extractions_with_payload missing; using claim_telegram_extractions")
+            return None
+        raise
+
+    if not isinstance(jobs, list):
+        return []
+
+    return jobs
+
+
 def mark_job_status(
     url: str,
     key: str,
@@ -107,6 +154,53 @@ def mark_job_status(
     )
 
 
+def finalize_job_statuses(
+    url: str,
+    key: str,
+    updates: List[Dict[str, Any]],
+    pipeline_version: str = "",
+    schema_version: str = ""
+) -> Optional[int]:
+    """
+    Apply a batch of job status transitions with one `finalize_telegram_extractions` RPC call.
+
+    Each update is `{"id", "status"}` plus optional `meta_patch` (merged server-side into the
+    current meta), `error`, `canonical_json` and `llm_model`; absent keys leave columns unchanged.
+
+    Args:
+        url: Supabase base URL
+        key: Supabase API key
+        updates: Status transitions (at most one per id)
+        pipeline_version: For metrics labeling
+        schema_version: For metrics labeling
+
+    Returns:
+        Number of rows updated, or None if the RPC is not installed
+
+    Raises:
+        RuntimeError: On other RPC errors
+    """
+    if not updates:
+        return 0
+    try:
+        result = call_rpc(
+            url,
+            key,
+            "finalize_telegram_extractions",
+            {"p_updates": updates},
+            timeout=30,
+            pipeline_version=pipeline_version,
+            schema_version=schema_version
+        )
+    except RuntimeError as e:
+        if "status=404" in str(e):
+            return None
+        raise
+    if isinstance(result, dict) and "count" in result:
+        return int(result["count"])
+    return 0
+
+
 def merge_meta(existing: Any, patch: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
     """
     Merge metadata patch with existing metadata.
@@ -6,6 +6,7 @@ Handles LLM extraction with circuit breaker protection and error classification.
 
 import logging
 import os
+import threading
 import time
 from typing import Any, Dict, Optional, Tuple
 
@@ -19,6 +20,27 @@ def get_llm_model_name() -> str:
     return (os.environ.get("LLM_MODEL_NAME") or "").strip() or "unknown"
 
 
+DEFAULT_LLM_MAX_INFLIGHT = 4
+
+_INFLIGHT_LOCK = threading.Lock()
+_INFLIGHT: Optional[Tuple[int, threading.BoundedSemaphore]] = None
+
+
+def llm_inflight_slots(limit: int) -> threading.BoundedSemaphore:
+    """
+    Process-wide semaphore bounding concurrent LLM calls (`LLM_MAX_INFLIGHT`).
+
+    Callers hold a slot around `extract_with_llm`. A new limit builds a fresh semaphore; holders of the old one
+    release it normally.
+    """
+    global _INFLIGHT
+    n = max(1, int(limit or 1))
+    with _INFLIGHT_LOCK:
+        if _INFLIGHT is None or _INFLIGHT[0] != n:
+            _INFLIGHT = (n, threading.BoundedSemaphore(n))
+        return _INFLIGHT[1]
+
+
 def classify_llm_error(err: Exception) -> str:
     """
     Classify LLM error for metrics and debugging.
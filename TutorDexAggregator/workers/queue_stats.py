@@ -0,0 +1,155 @@
+"""
+Extraction queue metrics collection.
+
+One worker per pipeline version is elected (via the `try_acquire_worker_lease` RPC) to refresh the
+`queue_*` gauges with a single `queue_stats` RPC call. Other workers clear their copies of those
+gauges so dashboards summing across workers don't double count or keep a stale series alive.
+
+Modes (`EXTRACTION_QUEUE_STATS_MODE`):
+- elected: default; only the lease holder collects
+- all: every worker collects (previous behavior)
+- off: no worker collects (e.g. a dedicated sidecar runs with mode=all)
+
+Databases without the 2026-10-18 queue stats migration fall back to the legacy per-status
+`count=exact` queries, and every worker collects.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import socket
+from typing import Any, Dict, Optional
+
+from observability_metrics import (
+    queue_failed,
+    queue_ok,
+    queue_oldest_pending_age_seconds,
+    queue_oldest_processing_age_seconds,
+    queue_pending,
+    queue_processing,
+)
+from workers.supabase_operations import (
+    get_oldest_created_age_seconds,
+    get_queue_counts,
+    get_queue_stats,
+    try_acquire_lease,
+)
+
+logger = logging.getLogger("queue_stats")
+
+QUEUE_STATS_MODES = ("elected", "all", "off")
+_QUEUE_GAUGES = (
+    queue_pending,
+    queue_processing,
+    queue_ok,
+    queue_failed,
+    queue_oldest_pending_age_seconds,
+    queue_oldest_processing_age_seconds,
+)
+
+
+def default_worker_identity() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class QueueStatsCollector:
+    """Refreshes queue gauges from one worker at a time."""
+
+    def __init__(
+        self,
+        url: str,
+        key: str,
+        *,
+        mode: str = "elected",
+        interval_s: float = 15.0,
+        terminal_max_age_seconds: int = 300,
+        owner: Optional[str] = None,
+    ):
+        self.url = url
+        self.key = key
+        self.mode = mode if mode in QUEUE_STATS_MODES else "elected"
+        self.interval_s = float(interval_s)
+        self.terminal_max_age_seconds = int(terminal_max_age_seconds)
+        self.owner = owner or default_worker_identity()
+        self._rpc_available = True
+        self._lease_available = True
+        self._published = False
+
+    def _is_leader(self, pv: str, sv: str) -> bool:
+        if self.mode == "all" or not self._lease_available:
+            return True
+        # Renewed every interval; expires after three missed renewals so a dead leader is replaced quickly.
+        held = try_acquire_lease(
+            self.url,
+            self.key,
+            f"queue_stats:{pv}",
+            self.owner,
+            int(max(1.0, self.interval_s * 3)),
+            pipeline_version=pv,
+            schema_version=sv,
+        )
+        if held is None:
+            logger.info("worker_lease_rpc_missing; every worker collects queue stats")
+            self._lease_available = False
+            return True
+        return bool(held)
+
+    def _fetch(self, pv: str, sv: str) -> Dict[str, Any]:
+        if self._rpc_available:
+            stats = get_queue_stats(
+                self.url,
+                self.key,
+                pv,
+                terminal_max_age_seconds=self.terminal_max_age_seconds,
+                schema_version=sv,
+            )
+            if stats is not None:
+                return stats
+            logger.info("queue_stats_rpc_missing; falling back to per-status counts")
+            self._rpc_available = False
+            self._lease_available = False
+
+        counts = get_queue_counts(self.url, self.key, ["pending", "processing", "ok", "failed"], pipeline_version=pv)
+        return {
+            **counts,
+            "oldest_pending_age_seconds": get_oldest_created_age_seconds(self.url, self.key, "pending", pipeline_version=pv),
+            "oldest_processing_age_seconds": get_oldest_created_age_seconds(self.url, self.key, "processing", pipeline_version=pv),
+        }
+
+    def _clear(self, pv: str, sv: str) -> None:
+        if not self._published:
+            return
+        for gauge in _QUEUE_GAUGES:
+            try:
+                gauge.remove(pv, sv)
+            except KeyError:
+                pass
+        self._published = False
+
+    def collect(self, pv: str, sv: str) -> bool:
+        """
+        Refresh the queue gauges if this worker is responsible for them.
+
+        Returns:
+            True if gauges were updated by this call
+        """
+        if self.mode == "off":
+            return False
+        if not self._is_leader(pv, sv):
+            self._clear(pv, sv)
+            return False
+
+        stats = self._fetch(pv, sv)
+        queue_pending.labels(pipeline_version=pv, schema_version=sv).set(float(stats.get("pending") or 0))
+        queue_processing.labels(pipeline_version=pv, schema_version=sv).set(float(stats.get("processing") or 0))
+        queue_ok.labels(pipeline_version=pv, schema_version=sv).set(float(stats.get("ok") or 0))
+        queue_failed.labels(pipeline_version=pv, schema_version=sv).set(float(stats.get("failed") or 0))
+        queue_oldest_pending_age_seconds.labels(pipeline_version=pv, schema_version=sv).set(
+            float(stats.get("oldest_pending_age_seconds") or 0.0)
+        )
+        queue_oldest_processing_age_seconds.labels(pipeline_version=pv, schema_version=sv).set(
+            float(stats.get("oldest_processing_age_seconds") or 0.0)
+        )
+        self._published = True
+        return True
@@ -334,6 +334,98 @@ def get_oldest_created_age_seconds(
         return None
 
 
+def get_queue_stats(
+    url: str,
+    key: str,
+    pipeline_version: str,
+    *,
+    terminal_max_age_seconds: int = 300,
+    schema_version: str = ""
+) -> Optional[Dict[str, Any]]:
+    """
+    Get all extraction queue counts and oldest ages with one `queue_stats` RPC call.
+
+    Terminal counts (ok/failed) are cached server-side and refreshed at most every
+    `terminal_max_age_seconds`.
+
+    Args:
+        url: Supabase base URL
+        key: Supabase API key
+        pipeline_version: Pipeline version to report on
+        terminal_max_age_seconds: Max staleness of the cached ok/failed counts
+        schema_version: For metrics labeling
+
+    Returns:
+        Dict with pending/processing/ok/failed counts and oldest_*_age_seconds, or None if the
+        RPC is not installed (callers should fall back to `get_queue_counts`)
+
+    Raises:
+        RuntimeError: On other RPC errors
+    """
+    try:
+        data = call_rpc(
+            url,
+            key,
+            "queue_stats",
+            {"p_pipeline_version": pipeline_version, "p_terminal_max_age_seconds": int(terminal_max_age_seconds)},
+            timeout=15,
+            pipeline_version=pipeline_version,
+            schema_version=schema_version
+        )
+    except RuntimeError as e:
+        if "status=404" in str(e):
+            return None
+        raise
+    if isinstance(data, list) and data and isinstance(data[0], dict):
+        data = data[0]
+    return data if isinstance(data, dict) else None
+
+
+def try_acquire_lease(
+    url: str,
+    key: str,
+    name: str,
+    owner: str,
+    ttl_seconds: int,
+    *,
+    pipeline_version: str = "",
+    schema_version: str = ""
+) -> Optional[bool]:
+    """
+    Acquire or renew a named worker lease via `try_acquire_worker_lease`.
+
+    Args:
+        url: Supabase base URL
+        key: Supabase API key
+        name: Lease name (e.g. "queue_stats:<pipeline_version>")
+        owner: Unique worker identity
+        ttl_seconds: Lease duration; renew before it expires
+        pipeline_version: For metrics labeling
+        schema_version: For metrics labeling
+
+    Returns:
+        True if this owner holds the lease, False if another owner does, None if the RPC is not installed
+
+    Raises:
+        RuntimeError: On other RPC errors
+    """
+    try:
+        result = call_rpc(
+            url,
+            key,
+            "try_acquire_worker_lease",
+            {"p_name": name, "p_owner": owner, "p_ttl_seconds": int(max(1, ttl_seconds))},
+            timeout=15,
+            pipeline_version=pipeline_version,
+            schema_version=schema_version
+        )
+    except RuntimeError as e:
+        if "status=404" in str(e):
+            return None
+        raise
+    return result is True
+
+
 def fetch_raw_message(
     url: str,
     key: str,
@@ -56,8 +56,19 @@ async def _startup_log() -> None:
             "app_env": getattr(cfg, "app_env", None),
             "supabase_enabled": sb.enabled(),
             "redis_prefix": getattr(getattr(store, "cfg", None), "prefix", None),
+            "read_model_enabled": _ctx.read_model is not None,
         },
     )
+    if _ctx.read_model is not None:
+        _ctx.read_model.start()
+    _ctx.analytics_service.start()
+
+
+@app.on_event("shutdown")
+async def _shutdown() -> None:
+    if _ctx.read_model is not None:
+        _ctx.read_model.stop()
+    _ctx.analytics_service.stop()
 
 
 @app.middleware("http")
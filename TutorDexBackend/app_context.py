@@ -10,12 +10,15 @@ from __future__ import annotations
 import logging
 from dataclasses import dataclass
 from functools import lru_cache
+from typing import Optional
 
 from TutorDexBackend.logging_setup import setup_logging
 from TutorDexBackend.otel import setup_otel
 from TutorDexBackend.redis_store import TutorStore
 from TutorDexBackend.sentry_init import setup_sentry
+from TutorDexBackend.services.analytics_buffer import AnalyticsEventBuffer
 from TutorDexBackend.services.analytics_service import AnalyticsService
+from TutorDexBackend.services.assignments_read_model import AssignmentsReadModel
 from TutorDexBackend.services.auth_service import AuthService
 from TutorDexBackend.services.cache_service import CacheService
 from TutorDexBackend.services.health_service import HealthService
@@ -35,6 +38,8 @@ class AppContext:
     cache_service: CacheService
     telegram_service: TelegramService
     analytics_service: AnalyticsService
+    # Optional in-process replacement for the listing/facet RPCs (None = always query Postgres).
+    read_model: Optional[AssignmentsReadModel] = None
 
 
 @lru_cache(maxsize=1)
@@ -52,7 +57,22 @@ def get_app_context() -> AppContext:
     health_service = HealthService(store, sb)
     cache_service = CacheService(store)
     telegram_service = TelegramService(store)
-    analytics_service = AnalyticsService(sb, store)
+    analytics_buffer = None
+    if int(getattr(cfg, "analytics_buffer_max_events", 0) or 0) > 0 and sb.enabled():
+        analytics_buffer = AnalyticsEventBuffer(
+            sb,
+            max_events=int(cfg.analytics_buffer_max_events),
+            batch_size=int(cfg.analytics_buffer_batch_size),
+            flush_interval_ms=int(cfg.analytics_buffer_flush_ms),
+        )
+    analytics_service = AnalyticsService(sb, store, buffer=analytics_buffer)
+    read_model = None
+    if bool(getattr(cfg, "assignments_read_model_enabled", False)) and sb.enabled():
+        read_model = AssignmentsReadModel(
+            sb,
+            poll_seconds=float(cfg.assignments_read_model_poll_seconds),
+            full_reload_seconds=float(cfg.assignments_read_model_full_reload_seconds),
+        )
 
     return AppContext(
         logger=logger,
@@ -64,5 +84,6 @@ def get_app_context() -> AppContext:
         cache_service=cache_service,
         telegram_service=telegram_service,
         analytics_service=analytics_service,
+        read_model=read_model,
     )
 
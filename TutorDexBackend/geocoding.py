@@ -1,11 +1,11 @@
 import logging
 import re
-from functools import lru_cache
 from typing import Optional, Tuple
 
 import requests
 
 from shared.config import load_backend_config
+from shared.geocoding_cache import POSTAL_COORDS, GeocodeUnavailable, geocode_cache
 
 logger = logging.getLogger("geocoding")
 _POSTAL_RE = re.compile(r"\b(\d{6})\b")
@@ -35,14 +35,16 @@ def normalize_sg_postal_code(value: Optional[str]) -> Optional[str]:
     return m.group(1) if m else None
 
 
-@lru_cache(maxsize=2048)
 def geocode_sg_postal_code(postal_code: str, *, timeout: int = 10) -> Optional[Tuple[float, float]]:
-    if _nominatim_disabled():
-        return None
+    """Postal code -> (lat, lon) via the cache shared with the aggregator, then Nominatim."""
     pc = normalize_sg_postal_code(postal_code)
     if not pc:
         return None
+    fetch = None if _nominatim_disabled() else (lambda: _nominatim_geocode(pc, timeout=timeout))
+    return geocode_cache(_CFG).get(POSTAL_COORDS, pc, fetch)
+
 
+def _nominatim_geocode(pc: str, *, timeout: int = 10) -> Optional[Tuple[float, float]]:
     url = "https://nominatim.openstreetmap.org/search"
     params = {"q": f"Singapore {pc}", "format": "jsonv2", "limit": 1, "countrycodes": "sg"}
     headers = {"User-Agent": str(_CFG.nominatim_user_agent or "TutorDexBackend/1.0")}
@@ -51,8 +53,11 @@ def geocode_sg_postal_code(postal_code: str, *, timeout: int = 10) -> Optional[T
         resp = requests.get(url, params=params, headers=headers, timeout=timeout)
     except Exception as e:
         logger.info("nominatim_failed postal_code=%s error=%s", pc, e)
-        return None
+        raise GeocodeUnavailable(str(e)) from e
 
+    if resp.status_code == 429 or resp.status_code >= 500:
+        logger.info("nominatim_status postal_code=%s status=%s", pc, resp.status_code)
+        raise GeocodeUnavailable(f"nominatim_status={resp.status_code}")
     if resp.status_code >= 400:
         logger.info("nominatim_status postal_code=%s status=%s", pc, resp.status_code)
         return None
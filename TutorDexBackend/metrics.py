@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Optional
 
-from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
 
 
 http_requests_total = Counter(
@@ -25,6 +25,51 @@ swallowed_exceptions_total = Counter(
     ["context", "exception_type"],
 )
 
+# Open-assignments read model (services/assignments_read_model.py)
+read_model_rows = Gauge(
+    "backend_read_model_rows",
+    "Open assignments held in the in-memory read model snapshot.",
+)
+
+read_model_syncs_total = Counter(
+    "backend_read_model_syncs_total",
+    "Read model sync attempts.",
+    ["kind", "result"],
+)
+
+read_model_last_sync_timestamp_seconds = Gauge(
+    "backend_read_model_last_sync_timestamp_seconds",
+    "Unix time of the last read model snapshot rebuild.",
+)
+
+# Buffered analytics event writer (services/analytics_buffer.py)
+analytics_events_enqueued_total = Counter(
+    "backend_analytics_events_enqueued_total",
+    "Analytics events accepted into the ingestion buffer.",
+)
+
+analytics_events_written_total = Counter(
+    "backend_analytics_events_written_total",
+    "Analytics events written to Supabase by the ingestion buffer.",
+)
+
+analytics_events_dropped_total = Counter(
+    "backend_analytics_events_dropped_total",
+    "Analytics events dropped by the ingestion buffer.",
+    ["reason"],
+)
+
+analytics_buffer_depth = Gauge(
+    "backend_analytics_buffer_depth",
+    "Analytics events waiting in the ingestion buffer.",
+)
+
+analytics_flush_latency_seconds = Histogram(
+    "backend_analytics_flush_latency_seconds",
+    "Time to resolve ids and bulk insert one analytics batch.",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10),
+)
+
 
 def observe_request(
     *,
@@ -23,25 +23,14 @@ async def track_click(request: Request, req: ClickTrackRequest) -> Dict[str, Any
 @router.post("/analytics/event")
 def analytics_event(request: Request, req: AnalyticsEventRequest, ctx: AppContext = Depends(get_app_context)) -> Dict[str, Any]:
     uid = ctx.auth_service.require_uid(request)
-    if not ctx.sb.enabled():
-        return {"ok": False, "skipped": True, "reason": "supabase_disabled"}
-
-    user_id = ctx.sb.upsert_user(firebase_uid=uid, email=None, name=None)
-    assignment_id = None
-    if req.assignment_external_id:
-        assignment_id = ctx.sb.resolve_assignment_id(
-            external_id=req.assignment_external_id,
-            agency_telegram_channel_name=req.agency_telegram_channel_name,
-        )
-
-    ctx.analytics_service.insert_analytics_event(
-        user_id=user_id,
-        assignment_id=assignment_id,
+    return ctx.analytics_service.record_event(
+        uid=uid,
         event_type=req.event_type,
+        assignment_external_id=req.assignment_external_id,
+        agency_telegram_channel_name=req.agency_telegram_channel_name,
         meta=req.meta
         or {
             "external_id": req.assignment_external_id,
             "agency_telegram_channel_name": req.agency_telegram_channel_name,
         },
     )
-    return {"ok": True}
@@ -3,10 +3,11 @@ from __future__ import annotations
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import Response
 
 from TutorDexBackend.models import AssignmentFacetsResponse, AssignmentListResponse
 from TutorDexBackend.app_context import AppContext, get_app_context
+from TutorDexBackend.utils.json_utils import dumps_json_bytes
 from TutorDexBackend.utils.request_utils import clean_optional_string
 
 router = APIRouter()
@@ -66,15 +67,9 @@ async def list_assignments(
             namespace="pubcache:assignments",
             extra_items=[("limit", str(lim))],
         )
-        cached = await ctx.cache_service.get_cached(cache_key)
+        cached = await ctx.cache_service.get_cached_body(cache_key)
         if cached:
-            return JSONResponse(
-                content=cached,
-                headers={
-                    "Cache-Control": f"public, max-age={int(cache_ttl_s)}",
-                    "X-Cache": "HIT",
-                },
-            )
+            return ctx.cache_service.build_body_response(request, cached, cache_ttl_s=int(cache_ttl_s), cache_status="HIT")
 
     tutor_lat: Optional[float] = None
     tutor_lon: Optional[float] = None
@@ -93,7 +88,8 @@ async def list_assignments(
     if sort_s == "distance" and (tutor_lat is None or tutor_lon is None):
         raise HTTPException(status_code=400, detail="postal_required_for_distance")
 
-    result = ctx.sb.list_open_assignments_v2(
+    listing = ctx.read_model or ctx.sb
+    result = listing.list_open_assignments_v2(
         limit=lim,
         sort=sort_s,
         tutor_lat=float(tutor_lat) if tutor_lat is not None else None,
@@ -152,16 +148,10 @@ async def list_assignments(
     ).model_dump()
 
     if cache_eligible and cache_key:
-        await ctx.cache_service.set_cached(cache_key, payload, ttl_s=int(cache_ttl_s))
-        return JSONResponse(
-            content=payload,
-            headers={
-                "Cache-Control": f"public, max-age={int(cache_ttl_s)}",
-                "X-Cache": "MISS",
-            },
-        )
+        entry = await ctx.cache_service.set_cached_body(cache_key, payload, ttl_s=int(cache_ttl_s))
+        return ctx.cache_service.build_body_response(request, entry, cache_ttl_s=int(cache_ttl_s), cache_status="MISS")
 
-    return JSONResponse(content=payload)
+    return Response(content=dumps_json_bytes(payload), media_type="application/json")
 
 
 @router.get("/assignments/facets", response_model=AssignmentFacetsResponse)
@@ -190,17 +180,12 @@ async def assignment_facets(
     cache_key = ""
     if is_anon and cache_ttl_s > 0:
         cache_key = ctx.cache_service.build_cache_key_for_request(request, namespace="pubcache:facets")
-        cached = await ctx.cache_service.get_cached(cache_key)
+        cached = await ctx.cache_service.get_cached_body(cache_key)
         if cached:
-            return JSONResponse(
-                content=cached,
-                headers={
-                    "Cache-Control": f"public, max-age={int(cache_ttl_s)}",
-                    "X-Cache": "HIT",
-                },
-            )
-
-    facets = ctx.sb.open_assignment_facets(
+            return ctx.cache_service.build_body_response(request, cached, cache_ttl_s=int(cache_ttl_s), cache_status="HIT")
+
+    listing = ctx.read_model or ctx.sb
+    facets = listing.open_assignment_facets(
         level=clean_optional_string(level),
         specific_student_level=clean_optional_string(specific_student_level),
         subject=clean_optional_string(subject),
@@ -216,12 +201,6 @@ async def assignment_facets(
 
     payload = AssignmentFacetsResponse(ok=True, facets=facets).model_dump()
     if cache_key and cache_ttl_s > 0:
-        await ctx.cache_service.set_cached(cache_key, payload, ttl_s=int(cache_ttl_s))
-        return JSONResponse(
-            content=payload,
-            headers={
-                "Cache-Control": f"public, max-age={int(cache_ttl_s)}",
-                "X-Cache": "MISS",
-            },
-        )
-    return JSONResponse(content=payload)
+        entry = await ctx.cache_service.set_cached_body(cache_key, payload, ttl_s=int(cache_ttl_s))
+        return ctx.cache_service.build_body_response(request, entry, cache_ttl_s=int(cache_ttl_s), cache_status="MISS")
+    return Response(content=dumps_json_bytes(payload), media_type="application/json")
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 
 from TutorDexBackend.geocoding import geocode_sg_postal_code, normalize_sg_postal_code
 from TutorDexBackend.models import MatchCountsRequest, TutorUpsert
 from TutorDexBackend.app_context import AppContext, get_app_context
-from TutorDexBackend.utils.database_utils import count_matching_assignments
+from TutorDexBackend.utils.database_utils import windowed_match_counts
 
 router = APIRouter()
 
@@ -54,7 +55,7 @@ def me_get_tutor(request: Request, ctx: AppContext = Depends(get_app_context)) -
 
 
 @router.post("/me/assignments/match-counts")
-def me_assignment_match_counts(request: Request, req: MatchCountsRequest, ctx: AppContext = Depends(get_app_context)) -> Dict[str, Any]:
+async def me_assignment_match_counts(request: Request, req: MatchCountsRequest, ctx: AppContext = Depends(get_app_context)) -> Response:
     _ = ctx.auth_service.require_uid(request)
     if not ctx.sb.enabled():
         raise HTTPException(status_code=503, detail="supabase_disabled")
@@ -72,26 +73,46 @@ def me_assignment_match_counts(request: Request, req: MatchCountsRequest, ctx: A
     if not levels and not specific_student_levels and not subjects_canonical and not subjects_general:
         raise HTTPException(status_code=400, detail="empty_preferences")
 
-    counts: Dict[str, Any] = {}
-    for d in (7, 14, 30):
-        c = count_matching_assignments(
-            ctx.sb,
-            days=d,
-            levels=levels,
-            specific_student_levels=specific_student_levels,
-            subjects_canonical=subjects_canonical,
-            subjects_general=subjects_general,
+    # Keyed by the preference filters (not the user): overlap matching ignores order and duplicates.
+    cache_ttl_s = ctx.cache_service.get_cache_ttl("match_counts")
+    cache_key = ""
+    if cache_ttl_s > 0:
+        filters = {
+            "levels": levels,
+            "specific_student_levels": specific_student_levels,
+            "subjects_canonical": subjects_canonical,
+            "subjects_general": subjects_general,
+        }
+        cache_key = ctx.cache_service.build_cache_key_for_request(
+            request,
+            namespace="matchcounts",
+            extra_items=[(name, v) for name, values in filters.items() for v in sorted(set(values))],
         )
-        if c is None:
-            raise HTTPException(status_code=500, detail="match_counts_failed")
-        counts[str(d)] = int(c)
+        cached = await ctx.cache_service.get_cached_body(cache_key)
+        if cached:
+            return ctx.cache_service.build_body_response(request, cached, cache_ttl_s=0, cache_status="HIT")
+
+    # Blocking PostgREST calls: keep them off the event loop.
+    windows = await asyncio.to_thread(
+        windowed_match_counts,
+        ctx.sb,
+        days=(7, 14, 30),
+        levels=levels,
+        specific_student_levels=specific_student_levels,
+        subjects_canonical=subjects_canonical,
+        subjects_general=subjects_general,
+    )
+    if windows is None:
+        raise HTTPException(status_code=500, detail="match_counts_failed")
 
-    return {
+    payload = {
         "ok": True,
-        "counts": counts,
+        "counts": {str(d): int(c) for d, c in windows.items()},
         "window_field": "published_at",
         "status_filter": "any",
     }
+    entry = await ctx.cache_service.set_cached_body(cache_key, payload, ttl_s=int(cache_ttl_s) if cache_key else 0)
+    return ctx.cache_service.build_body_response(request, entry, cache_ttl_s=0, cache_status="MISS" if cache_key else None)
 
 
 @router.put("/me/tutor")
@@ -0,0 +1,280 @@
+"""
+Buffered bulk writer for `analytics_events`.
+
+`/analytics/event` used to do three sequential PostgREST round-trips per UI event (user upsert,
+assignment id lookup, single-row insert). Events are now appended to a bounded in-memory queue and
+acknowledged immediately; a background thread resolves ids through small TTL caches and writes
+batches with one `return=minimal` insert every `batch_size` events or `flush_interval_ms`.
+
+Delivery is best-effort by design (analytics, not billing):
+- when the queue is full the oldest event is dropped (`reason="buffer_full"`)
+- a failed batch is retried up to `max_attempts` times, then dropped (`reason="insert_failed"`)
+- `stop()` drains the queue before returning (bounded by `shutdown_timeout_s`)
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+from TutorDexBackend.metrics import (
+    analytics_buffer_depth,
+    analytics_events_dropped_total,
+    analytics_events_enqueued_total,
+    analytics_events_written_total,
+    analytics_flush_latency_seconds,
+)
+from TutorDexBackend.supabase_store import SupabaseStore
+from shared.observability.exception_handler import swallow_exception
+
+logger = logging.getLogger("tutordex_backend")
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class _TTLCache(Generic[K, V]):
+    """Small LRU cache with per-entry TTL (not thread-safe; used from the flush thread only)."""
+
+    def __init__(self, *, max_entries: int, ttl_s: float):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_s = float(ttl_s)
+        self._data: "OrderedDict[K, Tuple[V, float]]" = OrderedDict()
+
+    def get(self, key: K) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return _MISSING
+        value, expires_at = item
+        if expires_at <= time.monotonic():
+            self._data.pop(key, None)
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V, *, ttl_s: Optional[float] = None) -> None:
+        self._data[key] = (value, time.monotonic() + float(self.ttl_s if ttl_s is None else ttl_s))
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+
+@dataclass
+class PendingEvent:
+    uid: str
+    event_type: str
+    event_time: str
+    assignment_external_id: Optional[str]
+    agency_telegram_channel_name: Optional[str]
+    meta: Optional[Dict[str, Any]]
+    attempts: int = 0
+
+
+class AnalyticsEventBuffer:
+    """Bounded in-memory queue of analytics events flushed to Supabase in bulk."""
+
+    def __init__(
+        self,
+        sb: SupabaseStore,
+        *,
+        max_events: int = 10000,
+        batch_size: int = 200,
+        flush_interval_ms: int = 1000,
+        max_attempts: int = 3,
+        id_cache_ttl_s: float = 3600.0,
+        negative_cache_ttl_s: float = 60.0,
+        id_cache_max_entries: int = 20000,
+        shutdown_timeout_s: float = 10.0,
+    ):
+        self.sb = sb
+        self.max_events = max(1, int(max_events))
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval_s = max(0.01, float(flush_interval_ms) / 1000.0)
+        self.max_attempts = max(1, int(max_attempts))
+        self.negative_cache_ttl_s = float(negative_cache_ttl_s)
+        self.shutdown_timeout_s = float(shutdown_timeout_s)
+
+        self._queue: Deque[PendingEvent] = deque()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._user_ids: _TTLCache[str, Optional[int]] = _TTLCache(max_entries=id_cache_max_entries, ttl_s=id_cache_ttl_s)
+        self._assignment_ids: _TTLCache[Tuple[str, str], Optional[int]] = _TTLCache(
+            max_entries=id_cache_max_entries, ttl_s=id_cache_ttl_s
+        )
+
+    # ------------------------------------------------------------------
+    # Producer side (request path)
+    # ------------------------------------------------------------------
+
+    def enqueue(
+        self,
+        *,
+        uid: str,
+        event_type: str,
+        assignment_external_id: Optional[str] = None,
+        agency_telegram_channel_name: Optional[str] = None,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Queue one event; never blocks on I/O. Drops the oldest queued event when full."""
+        event = PendingEvent(
+            uid=str(uid),
+            event_type=str(event_type).strip(),
+            event_time=datetime.now(timezone.utc).isoformat(),
+            assignment_external_id=(str(assignment_external_id).strip() or None) if assignment_external_id else None,
+            agency_telegram_channel_name=(str(agency_telegram_channel_name).strip() or None)
+            if agency_telegram_channel_name
+            else None,
+            meta=meta,
+        )
+        dropped = 0
+        with self._cond:
+            while len(self._queue) >= self.max_events:
+                self._queue.popleft()
+                dropped += 1
+            self._queue.append(event)
+            depth = len(self._queue)
+            if depth >= self.batch_size:
+                self._cond.notify()
+        analytics_events_enqueued_total.inc()
+        if dropped:
+            analytics_events_dropped_total.labels(reason="buffer_full").inc(dropped)
+        analytics_buffer_depth.set(depth)
+
+    def depth(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        if self._thread is not None or not self.sb.enabled():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="analytics-event-buffer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flush thread after draining queued events (best-effort, bounded by shutdown_timeout_s)."""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify()
+        t = self._thread
+        if t is not None:
+            t.join(timeout=self.shutdown_timeout_s)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            with self._cond:
+                if len(self._queue) < self.batch_size and not self._stop.is_set():
+                    self._cond.wait(self.flush_interval_s)
+            try:
+                self.flush_once()
+            except Exception as e:
+                swallow_exception(e, context="analytics_buffer_flush", extra={"module": __name__})
+        deadline = time.monotonic() + self.shutdown_timeout_s
+        while self.depth() and time.monotonic() < deadline:
+            try:
+                if self.flush_once() == 0:
+                    break
+            except Exception as e:
+                swallow_exception(e, context="analytics_buffer_flush", extra={"module": __name__})
+                break
+
+    # ------------------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------------------
+
+    def _take_batch(self) -> List[PendingEvent]:
+        with self._cond:
+            n = min(self.batch_size, len(self._queue))
+            batch = [self._queue.popleft() for _ in range(n)]
+            analytics_buffer_depth.set(len(self._queue))
+        return batch
+
+    def _requeue(self, batch: List[PendingEvent]) -> None:
+        retry = [e for e in batch if e.attempts < self.max_attempts]
+        failed = len(batch) - len(retry)
+        dropped = 0
+        with self._cond:
+            for e in reversed(retry):
+                if len(self._queue) >= self.max_events:
+                    dropped += 1
+                    continue
+                self._queue.appendleft(e)
+            analytics_buffer_depth.set(len(self._queue))
+        if failed:
+            analytics_events_dropped_total.labels(reason="insert_failed").inc(failed)
+        if dropped:
+            analytics_events_dropped_total.labels(reason="buffer_full").inc(dropped)
+
+    def flush_once(self) -> int:
+        """
+        Write up to one batch of queued events.
+
+        Returns:
+            Number of events taken from the queue (written or requeued/dropped)
+        """
+        batch = self._take_batch()
+        if not batch:
+            return 0
+
+        t0 = time.perf_counter()
+        rows = [self._build_row(e) for e in batch]
+        ok = self.sb.insert_events(rows)
+        analytics_flush_latency_seconds.observe(max(0.0, time.perf_counter() - t0))
+        if ok:
+            analytics_events_written_total.inc(len(rows))
+        else:
+            for e in batch:
+                e.attempts += 1
+            logger.warning("analytics_buffer_flush_failed events=%s", len(batch))
+            self._requeue(batch)
+        return len(batch)
+
+    def _build_row(self, e: PendingEvent) -> Dict[str, Any]:
+        # Bulk inserts need identical keys on every row.
+        return {
+            "event_type": e.event_type,
+            "event_time": e.event_time,
+            "user_id": self._resolve_user_id(e.uid),
+            "assignment_id": self._resolve_assignment_id(e.assignment_external_id, e.agency_telegram_channel_name),
+            "meta": e.meta or None,
+        }
+
+    def _resolve_user_id(self, uid: str) -> Optional[int]:
+        cached = self._user_ids.get(uid)
+        if cached is not _MISSING:
+            return cached
+        try:
+            user_id = self.sb.upsert_user(firebase_uid=uid, email=None, name=None)
+        except Exception as e:
+            swallow_exception(e, context="analytics_buffer_upsert_user", extra={"module": __name__})
+            user_id = None
+        self._user_ids.set(uid, user_id, ttl_s=None if user_id is not None else self.negative_cache_ttl_s)
+        return user_id
+
+    def _resolve_assignment_id(self, external_id: Optional[str], channel: Optional[str]) -> Optional[int]:
+        if not external_id:
+            return None
+        key = (external_id, channel or "")
+        cached = self._assignment_ids.get(key)
+        if cached is not _MISSING:
+            return cached
+        try:
+            assignment_id = self.sb.resolve_assignment_id(external_id=external_id, agency_telegram_channel_name=channel)
+        except Exception as e:
+            swallow_exception(e, context="analytics_buffer_resolve_assignment", extra={"module": __name__})
+            assignment_id = None
+        self._assignment_ids.set(
+            key, assignment_id, ttl_s=None if assignment_id is not None else self.negative_cache_ttl_s
+        )
+        return assignment_id
@@ -8,6 +8,7 @@ import asyncio
 import logging
 from typing import Any, Dict, Optional
 from TutorDexBackend.redis_store import TutorStore
+from TutorDexBackend.services.analytics_buffer import AnalyticsEventBuffer
 from TutorDexBackend.supabase_store import SupabaseStore
 from TutorDexBackend.utils.request_utils import get_client_ip, hash_ip
 from TutorDexBackend.utils.config_utils import get_env_int, get_redis_prefix
@@ -27,9 +28,69 @@ _CLICK_COOLDOWN_LOCK = asyncio.Lock()
 class AnalyticsService:
     """Analytics events and click tracking."""
 
-    def __init__(self, sb: SupabaseStore, store: TutorStore):
+    def __init__(self, sb: SupabaseStore, store: TutorStore, buffer: Optional[AnalyticsEventBuffer] = None):
         self.sb = sb
         self.store = store
+        # When set, events are acked immediately and written in bulk by a background thread.
+        self.buffer = buffer
+
+    def start(self) -> None:
+        """Start the background event writer (no-op without a buffer)."""
+        if self.buffer is not None:
+            self.buffer.start()
+
+    def stop(self) -> None:
+        """Flush queued events and stop the background writer (no-op without a buffer)."""
+        if self.buffer is not None:
+            self.buffer.stop()
+
+    def record_event(
+        self,
+        *,
+        uid: str,
+        event_type: str,
+        assignment_external_id: Optional[str],
+        agency_telegram_channel_name: Optional[str],
+        meta: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """
+        Record a UI analytics event for a Firebase user.
+
+        Buffered when an ingestion buffer is configured (ids are resolved at flush time);
+        otherwise resolves ids and inserts synchronously.
+
+        Args:
+            uid: Firebase UID
+            event_type: Event type string
+            assignment_external_id: Optional assignment external ID
+            agency_telegram_channel_name: Optional agency channel (disambiguates external IDs)
+            meta: Optional metadata dict
+
+        Returns:
+            Response payload for the route
+        """
+        if not self.sb.enabled():
+            return {"ok": False, "skipped": True, "reason": "supabase_disabled"}
+
+        if self.buffer is not None:
+            self.buffer.enqueue(
+                uid=uid,
+                event_type=event_type,
+                assignment_external_id=assignment_external_id,
+                agency_telegram_channel_name=agency_telegram_channel_name,
+                meta=meta,
+            )
+            return {"ok": True, "queued": True}
+
+        user_id = self.sb.upsert_user(firebase_uid=uid, email=None, name=None)
+        assignment_id = None
+        if assignment_external_id:
+            assignment_id = self.sb.resolve_assignment_id(
+                external_id=assignment_external_id,
+                agency_telegram_channel_name=agency_telegram_channel_name,
+            )
+        self.insert_analytics_event(user_id=user_id, assignment_id=assignment_id, event_type=event_type, meta=meta)
+        return {"ok": True}
 
     async def check_click_cooldown(self, request: Request, external_id: str) -> bool:
         """
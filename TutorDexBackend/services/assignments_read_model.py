@@ -0,0 +1,681 @@
+"""
+In-memory open-assignments read model.
+
+Keeps a columnar snapshot of `assignments` rows with `status='open'` and answers the website
+listing/facet queries in-process, mirroring the semantics of the `list_open_assignments_v2` and
+`open_assignment_facets` RPCs (see `TutorDexAggregator/supabase sqls/supabase_schema_full.sql`).
+
+The snapshot is loaded once in a background thread and kept fresh by polling the `updated_at`
+cursor (migration `2026-10-18_assignments_updated_at.sql`). On schemas without that column it
+polls `last_seen` instead and relies on periodic full reloads to observe closures.
+
+Until the first load completes (or when syncing has been failing for too long), every call is
+delegated to `SupabaseStore`, so callers can use this object as a drop-in for the RPC wrappers.
+"""
+import logging
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from TutorDexBackend.metrics import read_model_last_sync_timestamp_seconds, read_model_rows, read_model_syncs_total
+from TutorDexBackend.supabase_store import SupabaseStore, fill_agency_display_name, map_facet_agencies
+from shared.supabase_client import coerce_rows
+from shared.observability.exception_handler import swallow_exception
+
+logger = logging.getLogger("tutordex_backend")
+
+# Columns returned by `list_open_assignments_v2` (before the computed distance columns).
+_LIST_COLUMNS: Tuple[str, ...] = (
+    "id",
+    "external_id",
+    "message_link",
+    "agency_display_name",
+    "agency_telegram_channel_name",
+    "learning_mode",
+    "assignment_code",
+    "academic_display_text",
+    "address",
+    "postal_code",
+    "postal_code_estimated",
+    "nearest_mrt",
+    "region",
+    "nearest_mrt_computed",
+    "nearest_mrt_computed_line",
+    "nearest_mrt_computed_distance_m",
+    "lesson_schedule",
+    "start_date",
+    "time_availability_note",
+    "rate_min",
+    "rate_max",
+    "rate_raw_text",
+    "tutor_types",
+    "rate_breakdown",
+    "signals_subjects",
+    "signals_levels",
+    "signals_specific_student_levels",
+    "subjects_canonical",
+    "subjects_general",
+    "canonicalization_version",
+    "status",
+    "created_at",
+    "published_at",
+    "source_last_seen",
+    "last_seen",
+    "freshness_tier",
+)
+# Needed for filtering/sorting but not part of the listing payload.
+_FILTER_COLUMNS: Tuple[str, ...] = ("postal_lat", "postal_lon", "postal_coords_estimated", "is_primary_in_group")
+
+_REGION_ALIASES = {
+    "north": "North",
+    "east": "East",
+    "west": "West",
+    "central": "Central",
+    "north-east": "North-East",
+    "northeast": "North-East",
+}
+
+_NO_DISTANCE_SORT_KEY = 1e9
+_EARTH_RADIUS_KM = 6371.0
+_CURSOR_OVERLAP_S = 5.0
+_LOC_CACHE_MAX = 256
+# Sorts last under "desc" ordering; stays negatable without int64 overflow.
+_MISSING_TS = int(np.iinfo(np.int64).min) + 1
+
+
+def _parse_ts_us(value: Any) -> Optional[int]:
+    """Parse a PostgREST timestamptz string into integer microseconds since epoch (UTC)."""
+    s = str(value or "").strip()
+    if not s:
+        return None
+    try:
+        dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    delta = dt - datetime(1970, 1, 1, tzinfo=timezone.utc)
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _btrim(value: str) -> str:
+    # Postgres `btrim(x)` only strips spaces.
+    return value.strip(" ")
+
+
+def _text_values(value: Any) -> List[str]:
+    if not isinstance(value, list):
+        return []
+    return [v for v in value if isinstance(v, str)]
+
+
+def _tutor_type_values(value: Any) -> List[str]:
+    if not isinstance(value, list):
+        return []
+    out: List[str] = []
+    for item in value:
+        if isinstance(item, dict) and isinstance(item.get("canonical"), str):
+            out.append(item["canonical"])
+    return out
+
+
+def _loc_text(row: Dict[str, Any]) -> str:
+    # lower(concat_ws(' ', nullif(array_to_string(address, ' '), ''), ...))
+    parts: List[str] = []
+    for col in ("address", "postal_code", "postal_code_estimated", "nearest_mrt"):
+        arr = row.get(col)
+        if isinstance(arr, list):
+            joined = " ".join(str(x) for x in arr if x is not None)
+            if joined:
+                parts.append(joined)
+    return " ".join(parts).lower()
+
+
+def _like_contains(pattern: str) -> Callable[[str], bool]:
+    """Matcher equivalent to SQL `text LIKE '%' || pattern || '%'`."""
+    if not any(c in pattern for c in "%_\\"):
+        return lambda s: pattern in s
+    out: List[str] = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\" and i + 1 < len(pattern):
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+            continue
+        out.append(".*" if c == "%" else "." if c == "_" else re.escape(c))
+        i += 1
+    rx = re.compile("".join(out), re.DOTALL)
+    return lambda s: rx.search(s) is not None
+
+
+def _build_postings(values_per_row: Iterable[Iterable[str]]) -> Dict[str, np.ndarray]:
+    buckets: Dict[str, List[int]] = {}
+    for i, values in enumerate(values_per_row):
+        for v in set(values):
+            buckets.setdefault(v, []).append(i)
+    return {k: np.asarray(v, dtype=np.int64) for k, v in buckets.items()}
+
+
+class _Snapshot:
+    """Immutable columnar view over the open assignments (rebuilt on every change)."""
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        n = len(rows)
+        self.n = n
+        self.ids = np.fromiter((int(r["id"]) for r in rows), dtype=np.int64, count=n)
+
+        sort_ts: List[int] = []
+        last_seen: List[int] = []
+        for r in rows:
+            # coalesce(published_at, created_at, last_seen)
+            ts = None
+            for col in ("published_at", "created_at", "last_seen"):
+                ts = _parse_ts_us(r.get(col))
+                if ts is not None:
+                    break
+            ls = _parse_ts_us(r.get("last_seen"))
+            sort_ts.append(ts if ts is not None else _MISSING_TS)
+            last_seen.append(ls if ls is not None else _MISSING_TS)
+        self.sort_ts = np.asarray(sort_ts, dtype=np.int64)
+        self.last_seen = np.asarray(last_seen, dtype=np.int64)
+
+        self.lat = np.asarray([r["postal_lat"] if r.get("postal_lat") is not None else np.nan for r in rows], dtype=np.float64)
+        self.lon = np.asarray([r["postal_lon"] if r.get("postal_lon") is not None else np.nan for r in rows], dtype=np.float64)
+        self.rate_min = np.asarray([r["rate_min"] if r.get("rate_min") is not None else np.nan for r in rows], dtype=np.float64)
+        self.is_primary = np.asarray([r.get("is_primary_in_group") is True for r in rows], dtype=bool)
+
+        self.levels = _build_postings(_text_values(r.get("signals_levels")) for r in rows)
+        self.specific_levels = _build_postings(_text_values(r.get("signals_specific_student_levels")) for r in rows)
+        self.subjects = _build_postings(_text_values(r.get("signals_subjects")) for r in rows)
+        self.subjects_general = _build_postings(_text_values(r.get("subjects_general")) for r in rows)
+        self.subjects_canonical = _build_postings(_text_values(r.get("subjects_canonical")) for r in rows)
+        self.tutor_types = _build_postings(_tutor_type_values(r.get("tutor_types")) for r in rows)
+
+        agency_keys: List[List[str]] = []
+        agency_facet: List[List[str]] = []
+        learning_modes: List[List[str]] = []
+        for r in rows:
+            display = r.get("agency_display_name")
+            channel = r.get("agency_telegram_channel_name")
+            key = display if display is not None else channel
+            agency_keys.append([key] if isinstance(key, str) else [])
+            has_agency = (isinstance(display, str) and _btrim(display) != "") or (
+                isinstance(channel, str) and _btrim(channel) != ""
+            )
+            agency_facet.append([key] if has_agency and isinstance(key, str) else [])
+            lm = r.get("learning_mode")
+            learning_modes.append([lm] if isinstance(lm, str) else [])
+        self.agencies = _build_postings(agency_keys)
+        self.agency_facet = _build_postings(agency_facet)
+        self.learning_modes = _build_postings(learning_modes)
+
+        self.loc = [_loc_text(r) for r in rows]
+        self.region = [r.get("region") or "" for r in rows]
+        self.learning_mode_lower = [str(r.get("learning_mode") or "").lower() for r in rows]
+        self._loc_cache: Dict[str, np.ndarray] = {}
+
+        out_rows: List[Dict[str, Any]] = []
+        for r in rows:
+            out = {col: r.get(col) for col in _LIST_COLUMNS}
+            out["postal_coords_estimated"] = bool(r.get("postal_coords_estimated") or False)
+            fill_agency_display_name(out)
+            out_rows.append(out)
+        self.out_rows = out_rows
+
+    def _posting_mask(self, index: Dict[str, np.ndarray], value: str) -> np.ndarray:
+        mask = np.zeros(self.n, dtype=bool)
+        pos = index.get(value)
+        if pos is not None:
+            mask[pos] = True
+        return mask
+
+    def _location_mask(self, query: str) -> np.ndarray:
+        cached = self._loc_cache.get(query)
+        if cached is not None:
+            return cached
+        q = _btrim(query).lower()
+        region = _REGION_ALIASES.get(q.replace(" ", "").replace("_", "-"))
+        like = _like_contains(query.lower())
+        mask = np.fromiter(
+            (
+                (q == "online" and "online" in self.learning_mode_lower[i])
+                or (region is not None and self.region[i] == region)
+                or like(self.loc[i])
+                for i in range(self.n)
+            ),
+            dtype=bool,
+            count=self.n,
+        )
+        if len(self._loc_cache) >= _LOC_CACHE_MAX:
+            self._loc_cache.clear()
+        self._loc_cache[query] = mask
+        return mask
+
+    def filter_mask(
+        self,
+        *,
+        level: Optional[str],
+        specific_student_level: Optional[str],
+        subject: Optional[str],
+        subject_general: Optional[str],
+        subject_canonical: Optional[str],
+        agency_display_name: Optional[str],
+        learning_mode: Optional[str],
+        location_query: Optional[str],
+        min_rate: Optional[int],
+        tutor_type: Optional[str],
+    ) -> np.ndarray:
+        mask = np.ones(self.n, dtype=bool)
+        if level is not None:
+            mask &= self._posting_mask(self.levels, level)
+        if specific_student_level is not None:
+            mask &= self._posting_mask(self.specific_levels, specific_student_level)
+        if subject_general is not None:
+            mask &= self._posting_mask(self.subjects_general, subject_general)
+        if subject_canonical is not None:
+            mask &= self._posting_mask(self.subjects_canonical, subject_canonical)
+        if subject is not None:
+            any_subject = np.zeros(self.n, dtype=bool)
+            for token in (_btrim(t) for t in subject.split(",")):
+                if not token:
+                    continue
+                any_subject |= self._posting_mask(self.subjects, token)
+                any_subject |= self._posting_mask(self.subjects_canonical, token)
+                any_subject |= self._posting_mask(self.subjects_general, token)
+            mask &= any_subject
+        if agency_display_name is not None:
+            mask &= self._posting_mask(self.agencies, agency_display_name)
+        if learning_mode is not None:
+            mask &= self._posting_mask(self.learning_modes, learning_mode)
+        if location_query is not None and _btrim(location_query) != "":
+            mask &= self._location_mask(location_query)
+        if min_rate is not None:
+            with np.errstate(invalid="ignore"):
+                mask &= self.rate_min >= float(min_rate)
+        if tutor_type is not None:
+            mask &= self._posting_mask(self.tutor_types, tutor_type)
+        return mask
+
+    def distances_km(self, idx: np.ndarray, tutor_lat: float, tutor_lon: float) -> np.ndarray:
+        lat = self.lat[idx]
+        lon = self.lon[idx]
+        t_lat = np.radians(tutor_lat)
+        a = np.sin(np.radians((lat - tutor_lat) / 2.0)) ** 2 + np.cos(t_lat) * np.cos(np.radians(lat)) * (
+            np.sin(np.radians((lon - tutor_lon) / 2.0)) ** 2
+        )
+        return 2.0 * _EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+    def facet(self, index: Dict[str, np.ndarray], mask: np.ndarray, *, skip_blank: bool = True) -> List[Dict[str, Any]]:
+        counts: List[Tuple[str, int]] = []
+        for value, pos in index.items():
+            if skip_blank and _btrim(value) == "":
+                continue
+            c = int(np.count_nonzero(mask[pos]))
+            if c:
+                counts.append((value, c))
+        counts.sort(key=lambda vc: (-vc[1], vc[0]))
+        return [{"value": v, "count": c} for v, c in counts]
+
+
+class AssignmentsReadModel:
+    """Background-synced, in-process replacement for the open-assignments listing/facet RPCs."""
+
+    def __init__(
+        self,
+        sb: SupabaseStore,
+        *,
+        poll_seconds: float = 5.0,
+        full_reload_seconds: float = 900.0,
+        page_size: int = 1000,
+    ):
+        self.sb = sb
+        self.poll_seconds = max(0.5, float(poll_seconds))
+        self.full_reload_seconds = max(self.poll_seconds, float(full_reload_seconds))
+        self.stale_after_seconds = max(30.0, self.poll_seconds * 6)
+        self.page_size = max(1, int(page_size))
+
+        self._rows: Dict[int, Dict[str, Any]] = {}
+        self._snapshot: Optional[_Snapshot] = None
+        self._cursor_column = "updated_at"
+        self._cursor: Optional[str] = None
+        self._last_full_reload = 0.0
+        self._last_sync_ok = 0.0
+        self._sync_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def enabled(self) -> bool:
+        return self.sb.enabled()
+
+    def ready(self) -> bool:
+        """True when a snapshot exists and the last successful sync is recent enough to trust."""
+        if self._snapshot is None:
+            return False
+        return (time.monotonic() - self._last_sync_ok) <= self.stale_after_seconds
+
+    def start(self) -> None:
+        if self._thread is not None or not self.sb.enabled():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="assignments-read-model", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        t = self._thread
+        if t is not None:
+            t.join(timeout=5)
+        self._thread = None
+
+    def _run(self) -> None:
+        delay = 0.0
+        while not self._stop.wait(delay):
+            delay = self.poll_seconds
+            try:
+                if self._snapshot is None or (time.monotonic() - self._last_full_reload) >= self.full_reload_seconds:
+                    self.full_reload()
+                else:
+                    self.poll_once()
+            except Exception as e:
+                swallow_exception(e, context="read_model_sync", extra={"module": __name__})
+
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+
+    def _select_columns(self) -> str:
+        cols = list(_LIST_COLUMNS) + list(_FILTER_COLUMNS)
+        if self._cursor_column not in cols:
+            cols.append(self._cursor_column)
+        return ",".join(cols)
+
+    def _get_rows(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        resp = self.sb.client.get(f"assignments?select={self._select_columns()}&{query}", timeout=30)  # type: ignore[union-attr]
+        if resp.status_code == 400 and self._cursor_column == "updated_at" and "updated_at" in (resp.text or ""):
+            # Schema predates `2026-10-18_assignments_updated_at.sql`; fall back to `last_seen`.
+            logger.warning("read_model_updated_at_missing falling back to last_seen cursor")
+            self._cursor_column = "last_seen"
+            self._cursor = None
+            return None
+        if resp.status_code >= 400:
+            logger.warning("read_model_fetch_failed status=%s body=%s", resp.status_code, (resp.text or "")[:300])
+            return None
+        return coerce_rows(resp)
+
+    def full_reload(self) -> bool:
+        """Reload every open assignment and reset the incremental cursor."""
+        with self._sync_lock:
+            ok = self._full_reload_locked()
+        read_model_syncs_total.labels(kind="full", result="ok" if ok else "error").inc()
+        return ok
+
+    def _full_reload_locked(self) -> bool:
+        if not self.sb.enabled():
+            return False
+        # Take the cursor before paging so changes made during the load are replayed by the next poll.
+        cursor_col = self._cursor_column
+        head = self._get_rows(f"order={cursor_col}.desc&limit=1")
+        if head is None:
+            if self._cursor_column != cursor_col:
+                return self._full_reload_locked()
+            return False
+        cursor = head[0].get(self._cursor_column) if head else None
+
+        rows: Dict[int, Dict[str, Any]] = {}
+        last_id = 0
+        while True:
+            page = self._get_rows(f"status=eq.open&id=gt.{last_id}&order=id.asc&limit={self.page_size}")
+            if page is None:
+                return False
+            for r in page:
+                try:
+                    rows[int(r["id"])] = r
+                except Exception:
+                    continue
+            if len(page) < self.page_size:
+                break
+            last_id = int(page[-1]["id"])
+
+        self._rows = rows
+        self._cursor = cursor
+        self._rebuild()
+        now = time.monotonic()
+        self._last_full_reload = now
+        self._last_sync_ok = now
+        logger.info("read_model_full_reload rows=%s cursor_column=%s", len(rows), self._cursor_column)
+        return True
+
+    def poll_once(self) -> bool:
+        """Apply rows changed since the cursor (inserts, bumps, status changes)."""
+        with self._sync_lock:
+            ok = self._poll_locked()
+        read_model_syncs_total.labels(kind="incremental", result="ok" if ok else "error").inc()
+        return ok
+
+    def _poll_locked(self) -> bool:
+        if self._cursor is None:
+            return self._full_reload_locked()
+        cursor_dt = datetime.fromisoformat(str(self._cursor).replace("Z", "+00:00"))
+        since = (cursor_dt - timedelta(seconds=_CURSOR_OVERLAP_S)).isoformat()
+        since_q = since.replace("+", "%2B")
+
+        changed: List[Dict[str, Any]] = []
+        offset = 0
+        while True:
+            page = self._get_rows(
+                f"{self._cursor_column}=gte.{since_q}&order={self._cursor_column}.asc,id.asc"
+                f"&limit={self.page_size}&offset={offset}"
+            )
+            if page is None:
+                return False
+            changed.extend(page)
+            if len(page) < self.page_size:
+                break
+            offset += len(page)
+
+        if self.apply_rows(changed):
+            self._rebuild()
+        newest_us = _parse_ts_us(self._cursor) or 0
+        for r in changed:
+            ts = _parse_ts_us(r.get(self._cursor_column))
+            if ts is not None and ts > newest_us:
+                newest_us = ts
+                self._cursor = r.get(self._cursor_column)
+        self._last_sync_ok = time.monotonic()
+        return True
+
+    def apply_rows(self, rows: Iterable[Dict[str, Any]]) -> bool:
+        """Upsert open rows and drop non-open ones; returns True when anything changed."""
+        changed = False
+        for r in rows:
+            try:
+                rid = int(r["id"])
+            except Exception:
+                continue
+            if r.get("status") == "open":
+                if self._rows.get(rid) != r:
+                    self._rows[rid] = r
+                    changed = True
+            elif self._rows.pop(rid, None) is not None:
+                changed = True
+        return changed
+
+    def load_rows(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Replace the snapshot with the given rows (used for warm starts and tests)."""
+        with self._sync_lock:
+            self._rows = {}
+            self.apply_rows(rows)
+            self._rebuild()
+            self._last_sync_ok = time.monotonic()
+
+    def _rebuild(self) -> None:
+        rows = sorted(self._rows.values(), key=lambda r: int(r["id"]))
+        self._snapshot = _Snapshot(rows)
+        read_model_rows.set(len(rows))
+        read_model_last_sync_timestamp_seconds.set(time.time())
+
+    # ------------------------------------------------------------------
+    # Queries (same signatures/return shapes as SupabaseStore)
+    # ------------------------------------------------------------------
+
+    def list_open_assignments_v2(
+        self,
+        *,
+        limit: int = 50,
+        sort: str = "newest",
+        tutor_lat: Optional[float] = None,
+        tutor_lon: Optional[float] = None,
+        cursor_last_seen: Optional[str] = None,
+        cursor_id: Optional[int] = None,
+        cursor_distance_km: Optional[float] = None,
+        level: Optional[str] = None,
+        specific_student_level: Optional[str] = None,
+        subject: Optional[str] = None,
+        subject_general: Optional[str] = None,
+        subject_canonical: Optional[str] = None,
+        agency_display_name: Optional[str] = None,
+        learning_mode: Optional[str] = None,
+        location_query: Optional[str] = None,
+        min_rate: Optional[int] = None,
+        show_duplicates: bool = True,
+        tutor_type: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Local equivalent of `SupabaseStore.list_open_assignments_v2` (delegates when not ready)."""
+        kwargs = dict(
+            limit=limit,
+            sort=sort,
+            tutor_lat=tutor_lat,
+            tutor_lon=tutor_lon,
+            cursor_last_seen=cursor_last_seen,
+            cursor_id=cursor_id,
+            cursor_distance_km=cursor_distance_km,
+            level=level,
+            specific_student_level=specific_student_level,
+            subject=subject,
+            subject_general=subject_general,
+            subject_canonical=subject_canonical,
+            agency_display_name=agency_display_name,
+            learning_mode=learning_mode,
+            location_query=location_query,
+            min_rate=min_rate,
+            show_duplicates=show_duplicates,
+            tutor_type=tutor_type,
+        )
+        snap = self._snapshot
+        if snap is None or not self.ready():
+            return self.sb.list_open_assignments_v2(**kwargs)
+
+        cursor_ts: Optional[int] = None
+        if cursor_last_seen is not None:
+            cursor_ts = _parse_ts_us(cursor_last_seen)
+            if cursor_ts is None:
+                # Let Postgres produce the canonical error for malformed cursors.
+                return self.sb.list_open_assignments_v2(**kwargs)
+
+        mask = snap.filter_mask(
+            level=level,
+            specific_student_level=specific_student_level,
+            subject=subject,
+            subject_general=subject_general,
+            subject_canonical=subject_canonical,
+            agency_display_name=agency_display_name,
+            learning_mode=learning_mode,
+            location_query=location_query,
+            min_rate=min_rate,
+            tutor_type=tutor_type,
+        )
+        if not show_duplicates:
+            mask &= snap.is_primary
+        idx = np.flatnonzero(mask)
+
+        if tutor_lat is not None and tutor_lon is not None:
+            dist = snap.distances_km(idx, float(tutor_lat), float(tutor_lon))
+        else:
+            dist = np.full(idx.shape[0], np.nan)
+        key = np.where(np.isnan(dist), _NO_DISTANCE_SORT_KEY, dist)
+        ids = snap.ids[idx]
+        last_seen = snap.last_seen[idx]
+
+        if str(sort or "newest").strip().lower() != "distance":
+            ts = snap.sort_ts[idx]
+            if cursor_ts is not None:
+                keep = ts < cursor_ts
+                if cursor_id is not None:
+                    keep |= (ts == cursor_ts) & (ids < int(cursor_id))
+                idx, dist, key, ids, ts = idx[keep], dist[keep], key[keep], ids[keep], ts[keep]
+            order = np.lexsort((-ids, -ts))
+        else:
+            if cursor_distance_km is not None:
+                cd = float(cursor_distance_km)
+                keep = key > cd
+                if cursor_ts is not None:
+                    keep |= (key == cd) & (last_seen < cursor_ts)
+                    if cursor_id is not None:
+                        keep |= (key == cd) & (last_seen == cursor_ts) & (ids < int(cursor_id))
+                idx, dist, key, ids, last_seen = idx[keep], dist[keep], key[keep], ids[keep], last_seen[keep]
+            order = np.lexsort((-ids, -last_seen, key))
+
+        lim = max(1, min(int(limit), 200))
+        items: List[Dict[str, Any]] = []
+        for j in order[:lim]:
+            row = dict(snap.out_rows[int(idx[j])])
+            d = float(dist[j])
+            row["distance_km"] = None if np.isnan(d) else d
+            row["distance_sort_key"] = float(key[j])
+            items.append(row)
+        return {"items": items, "total": int(idx.shape[0])}
+
+    def open_assignment_facets(
+        self,
+        *,
+        level: Optional[str] = None,
+        specific_student_level: Optional[str] = None,
+        subject: Optional[str] = None,
+        subject_general: Optional[str] = None,
+        subject_canonical: Optional[str] = None,
+        agency_display_name: Optional[str] = None,
+        learning_mode: Optional[str] = None,
+        location_query: Optional[str] = None,
+        tutor_type: Optional[str] = None,
+        min_rate: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Local equivalent of `SupabaseStore.open_assignment_facets` (delegates when not ready)."""
+        kwargs = dict(
+            level=level,
+            specific_student_level=specific_student_level,
+            subject=subject,
+            subject_general=subject_general,
+            subject_canonical=subject_canonical,
+            agency_display_name=agency_display_name,
+            learning_mode=learning_mode,
+            location_query=location_query,
+            tutor_type=tutor_type,
+            min_rate=min_rate,
+        )
+        snap = self._snapshot
+        if snap is None or not self.ready():
+            return self.sb.open_assignment_facets(**kwargs)
+
+        mask = snap.filter_mask(**kwargs)
+        facets: Dict[str, Any] = {
+            "total": int(np.count_nonzero(mask)),
+            "levels": snap.facet(snap.levels, mask),
+            "specific_levels": snap.facet(snap.specific_levels, mask),
+            "subjects": snap.facet(snap.subjects, mask),
+            "subjects_general": snap.facet(snap.subjects_general, mask),
+            "subjects_canonical": snap.facet(snap.subjects_canonical, mask),
+            "agencies": snap.facet(snap.agency_facet, mask, skip_blank=False),
+            "learning_modes": snap.facet(snap.learning_modes, mask),
+            "tutor_types": snap.facet(snap.tutor_types, mask),
+        }
+        map_facet_agencies(facets)
+        return facets
@@ -4,12 +4,13 @@ Caching and rate limiting service.
 Handles public endpoint rate limiting and response caching.
 """
 import time
-import json
 import asyncio
 import logging
-from typing import Any, Dict, List, Tuple, Optional
-from fastapi import HTTPException, Request
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple, Optional, Union
+from fastapi import HTTPException, Request, Response
 from TutorDexBackend.redis_store import TutorStore
+from TutorDexBackend.utils.json_utils import compute_etag, dumps_json_bytes, etag_matches
 from TutorDexBackend.utils.request_utils import get_client_ip, hash_ip, build_cache_key
 from TutorDexBackend.utils.config_utils import (
     get_redis_prefix,
@@ -18,11 +19,21 @@ from TutorDexBackend.utils.config_utils import (
     get_public_cache_ttl_assignments_s,
     get_public_cache_ttl_facets_s,
     get_public_assignments_limit_cap,
+    get_match_counts_cache_ttl_s,
 )
 from shared.observability.exception_handler import swallow_exception
 
 logger = logging.getLogger("tutordex_backend")
 
+
+@dataclass(frozen=True)
+class CachedBody:
+    """Pre-encoded JSON response body and its ETag."""
+
+    body: bytes
+    etag: str
+
+
 # Module-level state for fallback when Redis unavailable.
 # NOTE: These dictionaries are intentionally module-level (shared across service instances)
 # to provide consistent rate limiting behavior even when Redis is down. This matches the
@@ -30,10 +41,24 @@ logger = logging.getLogger("tutordex_backend")
 _RATE_LIMIT_LOCAL: Dict[str, Tuple[int, float]] = {}
 _RATE_LIMIT_LOCK = asyncio.Lock()
 
-_PUBLIC_CACHE_LOCAL: Dict[str, Tuple[str, float]] = {}
+_PUBLIC_CACHE_LOCAL: Dict[str, Tuple[CachedBody, float]] = {}
 _PUBLIC_CACHE_LOCK = asyncio.Lock()
 
 
+def _pack_cache_entry(entry: CachedBody) -> bytes:
+    # Stored as `<etag>\n<json body>`; compact JSON never contains a raw newline.
+    return entry.etag.encode("ascii") + b"\n" + entry.body
+
+
+def _unpack_cache_entry(raw: Union[bytes, str]) -> Optional[CachedBody]:
+    # The shared Redis client uses decode_responses=True, so values usually come back as str.
+    data = raw.encode("utf-8") if isinstance(raw, str) else bytes(raw)
+    etag, sep, body = data.partition(b"\n")
+    if not sep or not body or not etag.startswith(b'"'):
+        return None
+    return CachedBody(body=body, etag=etag.decode("ascii"))
+
+
 class CacheService:
     """Rate limiting and caching for public endpoints."""
 
@@ -88,62 +113,97 @@ class CacheService:
             if int(n) > int(rpm):
                 raise HTTPException(status_code=429, detail="rate_limited")
 
-    async def get_cached(self, key: str) -> Optional[Dict[str, Any]]:
+    async def get_cached_body(self, key: str) -> Optional[CachedBody]:
         """
-        Get cached response if available.
+        Get cached pre-encoded response body if available.
 
         Args:
             key: Cache key
 
         Returns:
-            Cached response dict or None if not found/expired
+            CachedBody (encoded JSON bytes + ETag) or None if not found/expired
         """
         try:
             raw = self.store.r.get(key)
             if raw:
-                return json.loads(raw)
+                entry = _unpack_cache_entry(raw)
+                if entry is not None:
+                    return entry
         except Exception as e:
             swallow_exception(e, context="cache_redis_get", extra={"module": __name__})
 
         now = time.time()
         async with _PUBLIC_CACHE_LOCK:
-            raw, exp = _PUBLIC_CACHE_LOCAL.get(key, ("", 0.0))
-            if raw and float(exp) > now:
-                try:
-                    return json.loads(raw)
-                except Exception as e:
-                    swallow_exception(e, context="cache_local_json_parse", extra={"module": __name__})
-                    return None
+            entry, exp = _PUBLIC_CACHE_LOCAL.get(key, (None, 0.0))
+            if entry is not None and float(exp) > now:
+                return entry
             if float(exp) <= now:
                 _PUBLIC_CACHE_LOCAL.pop(key, None)
         return None
 
-    async def set_cached(self, key: str, payload: Dict[str, Any], ttl_s: int) -> None:
+    async def set_cached_body(self, key: str, payload: Dict[str, Any], ttl_s: int) -> CachedBody:
         """
-        Set cached response.
+        Encode payload once and cache the bytes.
+
+        The encoded body is returned even when caching is disabled so callers can
+        serve exactly the bytes (and ETag) that later hits will serve.
 
         Args:
             key: Cache key
-            payload: Response payload to cache
+            payload: Response payload to encode and cache
             ttl_s: Time to live in seconds
+
+        Returns:
+            CachedBody for the encoded payload
         """
+        body = dumps_json_bytes(payload)
+        entry = CachedBody(body=body, etag=compute_etag(body))
         if ttl_s <= 0:
-            return
-        raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+            return entry
         try:
-            self.store.r.setex(key, int(ttl_s), raw)
-            return
+            self.store.r.setex(key, int(ttl_s), _pack_cache_entry(entry))
+            return entry
         except Exception:
             pass
 
         now = time.time()
         async with _PUBLIC_CACHE_LOCK:
-            _PUBLIC_CACHE_LOCAL[key] = (raw, now + float(ttl_s))
+            _PUBLIC_CACHE_LOCAL[key] = (entry, now + float(ttl_s))
             # Clean up expired entries if cache gets too large
             if len(_PUBLIC_CACHE_LOCAL) > 2000:
                 for k, (_, exp) in list(_PUBLIC_CACHE_LOCAL.items())[:500]:
                     if float(exp) <= now:
                         _PUBLIC_CACHE_LOCAL.pop(k, None)
+        return entry
+
+    @staticmethod
+    def build_body_response(
+        request: Request,
+        entry: CachedBody,
+        *,
+        cache_ttl_s: int,
+        cache_status: Optional[str] = None,
+    ) -> Response:
+        """
+        Build a response for a pre-encoded body, honoring If-None-Match.
+
+        Args:
+            request: FastAPI request object
+            entry: Encoded body + ETag
+            cache_ttl_s: max-age for public caching (0 disables the Cache-Control header)
+            cache_status: Optional X-Cache header value ("HIT"/"MISS")
+
+        Returns:
+            304 Not Modified when the client's ETag matches, otherwise a 200 JSON response
+        """
+        headers = {"ETag": entry.etag}
+        if cache_ttl_s > 0:
+            headers["Cache-Control"] = f"public, max-age={int(cache_ttl_s)}"
+        if cache_status:
+            headers["X-Cache"] = cache_status
+        if etag_matches(request.headers.get("if-none-match"), entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
 
     def is_anonymous(self, request: Request) -> bool:
         """
@@ -197,7 +257,7 @@ class CacheService:
         Get cache TTL for endpoint.
 
         Args:
-            endpoint: "assignments" or "facets"
+            endpoint: "assignments", "facets" or "match_counts"
 
         Returns:
             TTL in seconds
@@ -206,6 +266,8 @@ class CacheService:
             return get_public_cache_ttl_assignments_s()
         elif endpoint == "facets":
             return get_public_cache_ttl_facets_s()
+        elif endpoint == "match_counts":
+            return get_match_counts_cache_ttl_s()
         return 0
 
     @staticmethod
@@ -1,6 +1,6 @@
 import logging
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import requests
 
@@ -16,6 +16,34 @@ def _utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def fill_agency_display_name(row: Dict[str, Any]) -> None:
+    """Fall back to the Telegram channel name when a listing row has no agency display name."""
+    if not isinstance(row, dict) or row.get("agency_display_name"):
+        return
+    raw = row.get("agency_telegram_channel_name")
+    if raw:
+        row["agency_display_name"] = str(raw)
+
+
+def map_facet_agencies(facets: Dict[str, Any]) -> None:
+    """Replace raw channel handles/links in the `agencies` facet with registry display names (in place)."""
+    try:
+        agencies = facets.get("agencies") if isinstance(facets, dict) else None
+        if isinstance(agencies, list):
+            new_ag = []
+            for a in agencies:
+                if isinstance(a, dict) and "value" in a:
+                    val = a.get("value")
+                    if isinstance(val, str) and ("t.me/" in val or val.startswith("@")):
+                        mapped = get_agency_display_name(str(val))
+                        if mapped and mapped != "Agency":
+                            a["value"] = mapped
+                new_ag.append(a)
+            facets["agencies"] = new_ag
+    except Exception:
+        pass
+
+
 def load_supabase_config() -> SupabaseConfig:
     cfg = load_backend_config()
     url = cfg.supabase_rest_url
@@ -28,6 +56,8 @@ class SupabaseStore:
     def __init__(self, cfg: Optional[SupabaseConfig] = None):
         self.cfg = cfg or load_supabase_config()
         self.client = SupabaseClient(self.cfg) if self.cfg.enabled else None
+        # Flipped off when `public.open_assignment_facet_counts()` is not installed (migration not applied yet).
+        self._facet_counts_rpc_available = True
 
     def enabled(self) -> bool:
         return bool(self.client)
@@ -145,6 +175,24 @@ class SupabaseStore:
             return False
         return resp.status_code < 400
 
+    def insert_events(self, rows: List[Dict[str, Any]]) -> bool:
+        """
+        Bulk insert pre-built `analytics_events` rows (identical keys on every row) with `return=minimal`.
+        """
+        if not self.client:
+            return False
+        if not rows:
+            return True
+        try:
+            resp = self.client.post("analytics_events", rows, timeout=20, prefer="return=minimal")
+        except Exception as e:
+            logger.warning("Supabase bulk event insert failed rows=%s error=%s", len(rows), e)
+            return False
+        if resp.status_code >= 400:
+            logger.warning("Supabase bulk event insert status=%s body=%s", resp.status_code, resp.text[:500])
+            return False
+        return True
+
     def resolve_assignment_id(
         self,
         *,
@@ -353,11 +401,7 @@ class SupabaseStore:
         for r in rows:
             r.pop("total_count", None)
             try:
-                display_raw = r.get("agency_display_name") if isinstance(r, dict) else None
-                if not display_raw:
-                    raw = r.get("agency_telegram_channel_name") if isinstance(r, dict) else None
-                    if raw:
-                        r["agency_display_name"] = str(raw)
+                fill_agency_display_name(r)
             except Exception as e:
                 swallow_exception(e, context="supabase_agency_display_extraction_v2", extra={"module": __name__})
 
@@ -380,10 +424,36 @@ class SupabaseStore:
         """
         RPC wrapper for `public.open_assignment_facets` (must be installed in DB).
         Returns a JSON object with keys like: total, levels, subjects, agencies, learning_modes.
+
+        Unfiltered calls read the incrementally maintained counters via
+        `public.open_assignment_facet_counts()` and fall back to the aggregating RPC when unavailable.
         """
         if not self.client:
             return None
 
+        # The RPC treats a blank location query as "no filter"; every other param filters when present.
+        unfiltered = (
+            all(
+                v is None
+                for v in (
+                    level,
+                    specific_student_level,
+                    subject,
+                    subject_general,
+                    subject_canonical,
+                    agency_display_name,
+                    learning_mode,
+                    tutor_type,
+                    min_rate,
+                )
+            )
+            and not (location_query or "").strip()
+        )
+        if unfiltered and self._facet_counts_rpc_available:
+            counted = self._open_assignment_facet_counts()
+            if counted is not None:
+                return counted
+
         payload: Dict[str, Any] = {
             "p_level": level,
             "p_specific_student_level": specific_student_level,
@@ -415,42 +485,41 @@ class SupabaseStore:
 
         # PostgREST may return a JSON object or a list containing it.
         if isinstance(data, dict):
-            try:
-                agencies = data.get("agencies") if isinstance(data, dict) else None
-                if isinstance(agencies, list):
-                    new_ag = []
-                    for a in agencies:
-                        if isinstance(a, dict) and "value" in a:
-                            val = a.get("value")
-                            if isinstance(val, str) and ("t.me/" in val or val.startswith("@")):
-                                mapped = get_agency_display_name(str(val))
-                                if mapped and mapped != "Agency":
-                                    a["value"] = mapped
-                        new_ag.append(a)
-                    data["agencies"] = new_ag
-            except Exception:
-                pass
+            map_facet_agencies(data)
             return data
         if isinstance(data, list) and data and isinstance(data[0], dict):
-            try:
-                first = data[0]
-                agencies = first.get("agencies") if isinstance(first, dict) else None
-                if isinstance(agencies, list):
-                    new_ag = []
-                    for a in agencies:
-                        if isinstance(a, dict) and "value" in a:
-                            val = a.get("value")
-                            if isinstance(val, str) and ("t.me/" in val or val.startswith("@")):
-                                mapped = get_agency_display_name(str(val))
-                                if mapped and mapped != "Agency":
-                                    a["value"] = mapped
-                        new_ag.append(a)
-                    first["agencies"] = new_ag
-            except Exception:
-                pass
+            map_facet_agencies(data[0])
             return data[0]
         return None
 
+    def _open_assignment_facet_counts(self) -> Optional[Dict[str, Any]]:
+        """Read the unfiltered facets from `public.open_assignment_facet_counts()` (constant-time)."""
+        try:
+            resp = self.client.post("rpc/open_assignment_facet_counts", {}, timeout=10)
+        except Exception as e:
+            logger.warning("Supabase open_assignment_facet_counts rpc failed error=%s", e)
+            return None
+        if resp.status_code == 404:
+            logger.warning("Supabase open_assignment_facet_counts rpc missing; using open_assignment_facets")
+            self._facet_counts_rpc_available = False
+            return None
+        if resp.status_code >= 300:
+            logger.warning("Supabase open_assignment_facet_counts rpc status=%s body=%s", resp.status_code, resp.text[:500])
+            return None
+
+        try:
+            data = resp.json()
+        except Exception as e:
+            swallow_exception(e, context="supabase_facet_counts_json_parse", extra={"module": __name__})
+            return None
+
+        if isinstance(data, list) and data and isinstance(data[0], dict):
+            data = data[0]
+        if not isinstance(data, dict):
+            return None
+        map_facet_agencies(data)
+        return data
+
     def upsert_broadcast_message(
         self,
         *,
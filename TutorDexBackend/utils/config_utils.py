@@ -93,6 +93,11 @@ def get_public_cache_ttl_facets_s() -> int:
     return max(0, int(_CFG.public_cache_ttl_facets_seconds))
 
 
+def get_match_counts_cache_ttl_s() -> int:
+    """Get cache TTL in seconds for /me/assignments/match-counts results."""
+    return max(0, int(_CFG.match_counts_cache_ttl_seconds))
+
+
 def get_bot_token_for_edits() -> str:
     """Get Telegram bot token for edits/callbacks."""
     return (str(_CFG.tracking_edit_bot_token or "") or str(_CFG.group_bot_token or "")).strip()
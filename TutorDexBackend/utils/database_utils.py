@@ -5,7 +5,7 @@ PostgreSQL and Supabase query helper functions extracted from app.py.
 """
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import TYPE_CHECKING, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
 from urllib.parse import quote as _url_quote
 
 if TYPE_CHECKING:
@@ -129,3 +129,89 @@ def count_matching_assignments(
         return None
 
     return extract_count_from_header(resp.headers.get("content-range"))
+
+
+def windowed_match_counts(
+    supabase_store: "SupabaseStore",
+    *,
+    days: Sequence[int],
+    levels: List[str],
+    specific_student_levels: List[str],
+    subjects_canonical: List[str],
+    subjects_general: List[str],
+) -> Optional[Dict[int, int]]:
+    """
+    Count matching assignments for several time windows with one query.
+
+    Calls `public.assignment_match_count_histogram` for the widest window and derives
+    every window from the per-day histogram. Falls back to one `count_matching_assignments`
+    call per window when the RPC is not installed.
+
+    Args:
+        supabase_store: SupabaseStore instance with enabled() and client attribute
+        days: Window sizes in days (e.g. (7, 14, 30))
+        levels: Level filters
+        specific_student_levels: Specific level filters
+        subjects_canonical: Canonical subject filters
+        subjects_general: General subject filters
+
+    Returns:
+        Mapping of window size to count, or None on error
+    """
+    if not supabase_store or not supabase_store.enabled() or not supabase_store.client:
+        return None
+    windows = sorted({int(d) for d in days if int(d) > 0})
+    if not windows:
+        return {}
+
+    filters = {
+        "levels": levels,
+        "specific_student_levels": specific_student_levels,
+        "subjects_canonical": subjects_canonical,
+        "subjects_general": subjects_general,
+    }
+    payload: Dict[str, Any] = {"p_max_days": windows[-1]}
+    for name, values in filters.items():
+        cleaned = [str(v).strip() for v in (values or []) if str(v or "").strip()]
+        if cleaned:
+            payload[f"p_{name}"] = cleaned
+
+    try:
+        resp = supabase_store.client.post("rpc/assignment_match_count_histogram", payload, timeout=20)
+    except Exception:
+        return None
+
+    if resp.status_code == 404:
+        logger.warning("match_counts_histogram_rpc_missing; falling back to per-window counts")
+        out: Dict[int, int] = {}
+        for d in windows:
+            c = count_matching_assignments(supabase_store, days=d, **filters)
+            if c is None:
+                return None
+            out[d] = int(c)
+        return out
+
+    if resp.status_code >= 300:
+        logger.warning(
+            "match_counts_histogram_failed status=%s body=%s",
+            resp.status_code,
+            resp.text[:300]
+        )
+        return None
+
+    try:
+        data = resp.json()
+    except Exception:
+        return None
+    if isinstance(data, list) and data and isinstance(data[0], dict):
+        data = data[0]
+    if not isinstance(data, dict) or not isinstance(data.get("buckets"), list):
+        return None
+
+    histogram: Dict[int, int] = {}
+    for bucket in data["buckets"]:
+        try:
+            histogram[int(bucket["age_days"])] = int(bucket["count"])
+        except Exception:
+            return None
+    return {d: sum(c for age, c in histogram.items() if age <= d) for d in windows}
@@ -0,0 +1,73 @@
+"""
+JSON encoding utilities.
+
+Fast bytes-level JSON encoding for hot response paths (public listings, cache bodies).
+"""
+import hashlib
+import json
+from typing import Any, Optional
+
+try:
+    import orjson as _orjson
+except ImportError:  # pragma: no cover
+    _orjson = None
+
+
+def dumps_json_bytes(payload: Any) -> bytes:
+    """
+    Serialize payload to compact UTF-8 JSON bytes.
+
+    Uses orjson when installed and falls back to the stdlib encoder for payloads orjson
+    rejects (e.g. integers wider than 64 bits) or when orjson is unavailable.
+
+    Args:
+        payload: JSON-serializable value
+
+    Returns:
+        Encoded JSON bytes (no whitespace, non-ASCII kept as UTF-8)
+    """
+    if _orjson is not None:
+        try:
+            return _orjson.dumps(payload)
+        except TypeError:
+            pass
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def compute_etag(body: bytes) -> str:
+    """
+    Compute a strong ETag for a response body.
+
+    Args:
+        body: Encoded response bytes
+
+    Returns:
+        Quoted ETag header value (e.g. '"3f2a..."')
+    """
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag (weak comparison, RFC 9110).
+
+    Args:
+        if_none_match: Raw If-None-Match header value
+        etag: Current quoted ETag
+
+    Returns:
+        True if the client copy is still current (respond 304)
+    """
+    s = (if_none_match or "").strip()
+    if not s or not etag:
+        return False
+    if s == "*":
+        return True
+    want = etag[2:] if etag.startswith("W/") else etag
+    for part in s.split(","):
+        tag = part.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == want:
+            return True
+    return False
@@ -109,11 +109,19 @@ class AggregatorConfig(BaseSettings):
     extraction_max_attempts: int = Field(default=3, validation_alias=AliasChoices("EXTRACTION_MAX_ATTEMPTS"))
     extraction_worker_batch_size: int = Field(default=10, validation_alias=AliasChoices("EXTRACTION_WORKER_BATCH_SIZE", "EXTRACTION_WORKER_BATCH"))
     extraction_worker_idle_s: float = Field(default=2.0, validation_alias=AliasChoices("EXTRACTION_WORKER_IDLE_S"))
+    # Push wakeups (services/job_wakeup.py): the collector publishes on enqueue and idle workers block on
+    # the channel, polling only every EXTRACTION_WORKER_SAFETY_POLL_S. Unset URL keeps plain idle polling.
+    extraction_wakeup_redis_url: Optional[str] = Field(default=None, validation_alias=AliasChoices("EXTRACTION_WAKEUP_REDIS_URL"))
+    extraction_wakeup_prefix: str = Field(default="tutordex:", validation_alias=AliasChoices("EXTRACTION_WAKEUP_PREFIX"))
+    extraction_worker_safety_poll_s: float = Field(default=30.0, validation_alias=AliasChoices("EXTRACTION_WORKER_SAFETY_POLL_S"))
     extraction_worker_max_jobs: int = Field(default=0, validation_alias=AliasChoices("EXTRACTION_WORKER_MAX_JOBS"))
     extraction_worker_oneshot: bool = Field(default=False, validation_alias=AliasChoices("EXTRACTION_WORKER_ONESHOT"))
     extraction_backoff_base_s: float = Field(default=1.5, validation_alias=AliasChoices("EXTRACTION_BACKOFF_BASE_S"))
     extraction_backoff_max_s: float = Field(default=60.0, validation_alias=AliasChoices("EXTRACTION_BACKOFF_MAX_S"))
     extraction_stale_processing_seconds: int = Field(default=900, validation_alias=AliasChoices("EXTRACTION_STALE_PROCESSING_SECONDS"))
+    # Queue gauges: elected (one worker via lease) | all | off (see workers/queue_stats.py)
+    extraction_queue_stats_mode: str = Field(default="elected", validation_alias=AliasChoices("EXTRACTION_QUEUE_STATS_MODE"))
+    extraction_queue_stats_terminal_max_age_s: int = Field(default=300, validation_alias=AliasChoices("EXTRACTION_QUEUE_STATS_TERMINAL_MAX_AGE_S"))
 
     # Compilation detection thresholds (heuristics)
     compilation_distinct_codes: int = Field(default=2, validation_alias=AliasChoices("COMPILATION_DISTINCT_CODES", "COMPILATION_CODE_HITS"))
@@ -122,6 +130,14 @@ class AggregatorConfig(BaseSettings):
     compilation_url_hits: int = Field(default=2, validation_alias=AliasChoices("COMPILATION_URL_HITS"))
     compilation_block_count: int = Field(default=5, validation_alias=AliasChoices("COMPILATION_BLOCK_COUNT"))
     compilation_apply_now_hits: int = Field(default=2, validation_alias=AliasChoices("COMPILATION_APPLY_NOW_HITS"))
+    compilation_segment_concurrency: int = Field(default=4, validation_alias=AliasChoices("COMPILATION_SEGMENT_CONCURRENCY"))
+
+    # Deterministic pre-LLM prefilter (workers/extract_worker_prefilter.py)
+    prefilter_enabled: bool = Field(default=True, validation_alias=AliasChoices("PREFILTER_ENABLED"))
+    prefilter_min_chars: int = Field(default=30, validation_alias=AliasChoices("PREFILTER_MIN_CHARS"))
+    prefilter_min_latin_ratio: float = Field(default=0.5, validation_alias=AliasChoices("PREFILTER_MIN_LATIN_RATIO"))
+    prefilter_duplicate_ttl_s: int = Field(default=21600, validation_alias=AliasChoices("PREFILTER_DUPLICATE_TTL_S"))
+    prefilter_llm_seconds_estimate: float = Field(default=8.0, validation_alias=AliasChoices("PREFILTER_LLM_SECONDS_ESTIMATE"))
 
     enable_broadcast: bool = Field(default=False, validation_alias=AliasChoices("ENABLE_BROADCAST", "EXTRACTION_WORKER_BROADCAST"))
     enable_dms: bool = Field(default=False, validation_alias=AliasChoices("ENABLE_DMS", "EXTRACTION_WORKER_DMS"))
@@ -145,9 +161,18 @@ class AggregatorConfig(BaseSettings):
     # LLM configuration
     # -------------------------
     llm_api_url: str = Field(default="http://localhost:1234", validation_alias=AliasChoices("LLM_API_URL"))
+    # Endpoint pool (llm_endpoint_pool.py): comma-separated base URLs; falls back to LLM_API_URL when empty.
+    llm_api_urls: Optional[str] = Field(default=None, validation_alias=AliasChoices("LLM_API_URLS"))
+    llm_endpoint_max_inflight: int = Field(default=4, validation_alias=AliasChoices("LLM_ENDPOINT_MAX_INFLIGHT"))
+    llm_endpoint_eject_after_failures: int = Field(default=2, validation_alias=AliasChoices("LLM_ENDPOINT_EJECT_AFTER_FAILURES"))
+    llm_endpoint_eject_seconds: float = Field(default=30.0, validation_alias=AliasChoices("LLM_ENDPOINT_EJECT_SECONDS"))
+    llm_endpoint_probe_interval_seconds: float = Field(default=15.0, validation_alias=AliasChoices("LLM_ENDPOINT_PROBE_INTERVAL_SECONDS"))
+    llm_endpoint_probe_path: str = Field(default="/v1/models", validation_alias=AliasChoices("LLM_ENDPOINT_PROBE_PATH"))
     llm_model_name: str = Field(default="lfm2-8b-a1b", validation_alias=AliasChoices("LLM_MODEL_NAME"))
     llm_timeout_seconds: int = Field(default=200, validation_alias=AliasChoices("LLM_TIMEOUT_SECONDS"))
     llm_max_tokens: int = Field(default=6144, validation_alias=AliasChoices("LLM_MAX_TOKENS"))
+    llm_output_constraint: str = Field(default="off", validation_alias=AliasChoices("LLM_OUTPUT_CONSTRAINT"))
+    llm_stream: bool = Field(default=False, validation_alias=AliasChoices("LLM_STREAM"))
     llm_system_prompt_file: Optional[str] = Field(default=None, validation_alias=AliasChoices("LLM_SYSTEM_PROMPT_FILE"))
     llm_system_prompt_text: Optional[str] = Field(default=None, validation_alias=AliasChoices("LLM_SYSTEM_PROMPT_TEXT"))
     llm_include_examples: bool = Field(default=False, validation_alias=AliasChoices("LLM_INCLUDE_EXAMPLES"))
@@ -157,6 +182,8 @@ class AggregatorConfig(BaseSettings):
     llm_assignment_code_extractor_mock_file: Optional[str] = Field(default=None, validation_alias=AliasChoices("LLM_ASSIGNMENT_CODE_EXTRACTOR_MOCK_FILE"))
     llm_circuit_breaker_threshold: int = Field(default=5, validation_alias=AliasChoices("LLM_CIRCUIT_BREAKER_THRESHOLD"))
     llm_circuit_breaker_timeout_seconds: int = Field(default=60, validation_alias=AliasChoices("LLM_CIRCUIT_BREAKER_TIMEOUT_SECONDS"))
+    # Concurrent LLM calls per worker process (compilation segments run in parallel; standard jobs take one slot).
+    llm_max_inflight: int = Field(default=4, validation_alias=AliasChoices("LLM_MAX_INFLIGHT"))
 
     # -------------------------
     # Telegram collector/bots
@@ -250,6 +277,27 @@ class AggregatorConfig(BaseSettings):
     recovery_backfill_max_attempts: int = Field(default=5, validation_alias=AliasChoices("RECOVERY_BACKFILL_MAX_ATTEMPTS"))
     recovery_backfill_base_backoff_seconds: float = Field(default=2.0, validation_alias=AliasChoices("RECOVERY_BACKFILL_BASE_BACKOFF_SECONDS"))
 
+    # -------------------------
+    # Collector spool (collection/spool.py)
+    # -------------------------
+    collector_spool_path: str = Field(default="state/collector_spool.sqlite3", validation_alias=AliasChoices("COLLECTOR_SPOOL_PATH"))
+    collector_spool_batch_size: int = Field(default=200, validation_alias=AliasChoices("COLLECTOR_SPOOL_BATCH_SIZE"))
+    collector_spool_max_backoff_seconds: float = Field(default=60.0, validation_alias=AliasChoices("COLLECTOR_SPOOL_MAX_BACKOFF_SECONDS"))
+
+    # -------------------------
+    # Collector deletes (collection/deletes.py)
+    # -------------------------
+    collector_delete_flush_seconds: float = Field(default=1.0, validation_alias=AliasChoices("COLLECTOR_DELETE_FLUSH_SECONDS"))
+    collector_delete_batch_size: int = Field(default=500, validation_alias=AliasChoices("COLLECTOR_DELETE_BATCH_SIZE"))
+
+    # -------------------------
+    # Collector backfill scheduler (collection/backfill_scheduler.py)
+    # -------------------------
+    backfill_concurrency: int = Field(default=4, validation_alias=AliasChoices("BACKFILL_CONCURRENCY"))
+    backfill_slice_messages: int = Field(default=1000, validation_alias=AliasChoices("BACKFILL_SLICE_MESSAGES"))
+    backfill_checkpoint_interval_seconds: float = Field(default=5.0, validation_alias=AliasChoices("BACKFILL_CHECKPOINT_INTERVAL_SECONDS"))
+    backfill_flood_global_after_channels: int = Field(default=3, validation_alias=AliasChoices("BACKFILL_FLOOD_GLOBAL_AFTER_CHANNELS"))
+
     # -------------------------
     # Geocoding/Nominatim
     # -------------------------
@@ -257,6 +305,13 @@ class AggregatorConfig(BaseSettings):
     nominatim_user_agent: Optional[str] = Field(default=None, validation_alias=AliasChoices("NOMINATIM_USER_AGENT"))
     nominatim_retries: int = Field(default=3, validation_alias=AliasChoices("NOMINATIM_RETRIES"))
     nominatim_backoff_seconds: float = Field(default=1.0, validation_alias=AliasChoices("NOMINATIM_BACKOFF_SECONDS"))
+    # Shared geocode cache (shared/geocoding_cache.py)
+    geocode_cache_redis_url: Optional[str] = Field(default=None, validation_alias=AliasChoices("GEOCODE_CACHE_REDIS_URL"))
+    geocode_cache_prefix: str = Field(default="tutordex:", validation_alias=AliasChoices("GEOCODE_CACHE_PREFIX"))
+    geocode_gazetteer_path: Optional[str] = Field(default=None, validation_alias=AliasChoices("GEOCODE_GAZETTEER_PATH"))
+    geocode_negative_ttl_s: int = Field(default=86400, validation_alias=AliasChoices("GEOCODE_NEGATIVE_TTL_S"))
+    geocode_rate_limit_per_s: float = Field(default=1.0, validation_alias=AliasChoices("GEOCODE_RATE_LIMIT_PER_S"))
+    geocode_wait_s: float = Field(default=10.0, validation_alias=AliasChoices("GEOCODE_WAIT_S"))
 
     # -------------------------
     # Taxonomy/assets (paths)
@@ -266,6 +321,8 @@ class AggregatorConfig(BaseSettings):
     subject_taxonomy_debug: bool = Field(default=False, validation_alias=AliasChoices("SUBJECT_TAXONOMY_DEBUG"))
     region_geojson_path: Optional[str] = Field(default=None, validation_alias=AliasChoices("REGION_GEOJSON_PATH"))
     mrt_data_json_path: Optional[str] = Field(default=None, validation_alias=AliasChoices("MRT_DATA_JSON_PATH"))
+    prebuilt_artifacts_enabled: bool = Field(default=True, validation_alias=AliasChoices("PREBUILT_ARTIFACTS_ENABLED"))
+    prebuilt_artifacts_dir: Optional[str] = Field(default=None, validation_alias=AliasChoices("PREBUILT_ARTIFACTS_DIR"))
 
     # -------------------------
     # Misc toggles used by tools
@@ -368,6 +425,18 @@ class BackendConfig(BaseSettings):
     public_rpm_facets: int = Field(default=120, validation_alias=AliasChoices("PUBLIC_RPM_FACETS"))
     public_cache_ttl_assignments_seconds: int = Field(default=15, validation_alias=AliasChoices("PUBLIC_CACHE_TTL_ASSIGNMENTS_SECONDS"))
     public_cache_ttl_facets_seconds: int = Field(default=30, validation_alias=AliasChoices("PUBLIC_CACHE_TTL_FACETS_SECONDS"))
+    # Authenticated /me/assignments/match-counts results, keyed by a hash of the preference filters.
+    match_counts_cache_ttl_seconds: int = Field(default=60, validation_alias=AliasChoices("MATCH_COUNTS_CACHE_TTL_SECONDS"))
+
+    # Buffered analytics event writer (services/analytics_buffer.py); max_events=0 writes synchronously.
+    analytics_buffer_max_events: int = Field(default=10000, validation_alias=AliasChoices("ANALYTICS_BUFFER_MAX_EVENTS"))
+    analytics_buffer_batch_size: int = Field(default=200, validation_alias=AliasChoices("ANALYTICS_BUFFER_BATCH_SIZE"))
+    analytics_buffer_flush_ms: int = Field(default=1000, validation_alias=AliasChoices("ANALYTICS_BUFFER_FLUSH_MS"))
+
+    # In-memory open-assignments read model (services/assignments_read_model.py)
+    assignments_read_model_enabled: bool = Field(default=False, validation_alias=AliasChoices("ASSIGNMENTS_READ_MODEL_ENABLED"))
+    assignments_read_model_poll_seconds: float = Field(default=5.0, validation_alias=AliasChoices("ASSIGNMENTS_READ_MODEL_POLL_SECONDS"))
+    assignments_read_model_full_reload_seconds: int = Field(default=900, validation_alias=AliasChoices("ASSIGNMENTS_READ_MODEL_FULL_RELOAD_SECONDS"))
 
     # Click tracking cooldown (used by AnalyticsService)
     click_tracking_ip_cooldown_seconds: int = Field(default=10, validation_alias=AliasChoices("CLICK_TRACKING_IP_COOLDOWN_SECONDS"))
@@ -407,6 +476,13 @@ class BackendConfig(BaseSettings):
     # Nominatim (shared user agent override)
     disable_nominatim: bool = Field(default=False, validation_alias=AliasChoices("DISABLE_NOMINATIM"))
     nominatim_user_agent: Optional[str] = Field(default=None, validation_alias=AliasChoices("NOMINATIM_USER_AGENT"))
+    # Shared geocode cache (shared/geocoding_cache.py); defaults to REDIS_URL when unset
+    geocode_cache_redis_url: Optional[str] = Field(default=None, validation_alias=AliasChoices("GEOCODE_CACHE_REDIS_URL"))
+    geocode_cache_prefix: str = Field(default="tutordex:", validation_alias=AliasChoices("GEOCODE_CACHE_PREFIX"))
+    geocode_gazetteer_path: Optional[str] = Field(default=None, validation_alias=AliasChoices("GEOCODE_GAZETTEER_PATH"))
+    geocode_negative_ttl_s: int = Field(default=86400, validation_alias=AliasChoices("GEOCODE_NEGATIVE_TTL_S"))
+    geocode_rate_limit_per_s: float = Field(default=1.0, validation_alias=AliasChoices("GEOCODE_RATE_LIMIT_PER_S"))
+    geocode_wait_s: float = Field(default=10.0, validation_alias=AliasChoices("GEOCODE_WAIT_S"))
 
     @model_validator(mode="after")
     def _validate_supabase_required(self) -> "BackendConfig":
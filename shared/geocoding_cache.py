@@ -0,0 +1,380 @@
+"""
+Shared geocode cache for the aggregator and the backend.
+
+Nominatim lookups are slow, rate limited (usage policy: 1 request/second) and used to be memoized
+only in per-process `lru_cache`s that were lost on every restart. `GeocodeCache.get` resolves a key
+in this order:
+
+1. offline gazetteer: postal code -> (lat, lon) CSV (`GEOCODE_GAZETTEER_PATH`), loaded once per process
+2. in-process memo
+3. Redis (`{prefix}geocode:{namespace}:{key}`), shared by every worker and the backend; survives restarts
+4. `fetch()` (the remote geocoder), single-flight per key (threads and processes) and behind a
+   global rate limit; transient failures are retried here (`retries`, exponential `backoff_s` or the
+   server's Retry-After), each attempt taking its own rate slot, and only while the whole fetch fits in
+   half the single-flight lock TTL
+
+Fetched results are written back to Redis; "not found" answers are kept for
+`GEOCODE_NEGATIVE_TTL_S` so new buildings are retried eventually. Fetchers raise
+`GeocodeUnavailable` for transient failures (network errors, 429/5xx), which are never cached.
+Without Redis configured, the gazetteer, memo and an in-process rate limiter still apply.
+
+Seed Redis and the gazetteer from coordinates already stored on assignments with
+`TutorDexAggregator/utilities/seed_geocode_cache.py`.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger("geocoding_cache")
+
+# Namespaces: postal code -> [lat, lon]; cleaned free-form address -> estimated postal code.
+POSTAL_COORDS = "postal"
+ADDRESS_POSTAL = "address_postal"
+
+DEFAULT_GAZETTEER_PATH = Path(__file__).resolve().parent / "data" / "sg_postal_gazetteer.csv"
+
+_NOT_CACHED = object()
+
+
+class GeocodeUnavailable(Exception):
+    """The remote geocoder could not answer right now (do not cache); `retry_after` is the server's hint in seconds."""
+
+    def __init__(self, message: str = "", *, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _connect(redis_url: str) -> Any:
+    import redis  # optional for the aggregator; only needed when the shared cache is enabled
+
+    return redis.Redis.from_url(redis_url, decode_responses=True, socket_connect_timeout=2.0, socket_timeout=5.0)
+
+
+def load_gazetteer(path: Path) -> Dict[str, Tuple[float, float]]:
+    """Read a `postal_code,lat,lon` CSV (header optional). Missing file -> empty table."""
+    out: Dict[str, Tuple[float, float]] = {}
+    try:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.reader(f):
+                if len(row) < 3:
+                    continue
+                code = row[0].strip()
+                try:
+                    lat, lon = float(row[1]), float(row[2])
+                except ValueError:
+                    continue  # header
+                if len(code) == 6 and code.isdigit() and math.isfinite(lat) and math.isfinite(lon):
+                    out[code] = (lat, lon)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning("geocode_gazetteer_unreadable path=%s error=%s", path, e)
+    return out
+
+
+def write_gazetteer(path: Path, table: Dict[str, Tuple[float, float]]) -> int:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["postal_code", "lat", "lon"])
+        for code in sorted(table):
+            lat, lon = table[code]
+            w.writerow([code, repr(float(lat)), repr(float(lon))])
+    os.replace(tmp, path)
+    return len(table)
+
+
+class GeocodeCache:
+    def __init__(
+        self,
+        *,
+        redis_url: Optional[str] = None,
+        prefix: str = "tutordex:",
+        gazetteer_path: Optional[Path] = None,
+        negative_ttl_s: int = 86400,
+        rate_limit_per_s: float = 1.0,
+        wait_s: float = 10.0,
+        lock_ttl_s: int = 30,
+        memo_max: int = 4096,
+        reconnect_s: float = 30.0,
+        retries: int = 1,
+        backoff_s: float = 1.0,
+    ):
+        self.redis_url = str(redis_url or "").strip() or None
+        self.prefix = prefix
+        self.gazetteer_path = gazetteer_path
+        self.negative_ttl_s = int(negative_ttl_s)
+        self.rate_limit_per_s = float(rate_limit_per_s)
+        self.wait_s = float(wait_s)
+        self.lock_ttl_s = int(lock_ttl_s)
+        self.memo_max = int(memo_max)
+        self.reconnect_s = float(reconnect_s)
+        self.retries = max(1, min(int(retries), 6))
+        self.backoff_s = max(0.0, float(backoff_s))
+        self._client: Any = None
+        self._retry_at = 0.0
+        self._gazetteer: Optional[Dict[str, Tuple[float, float]]] = None
+        self._memo: Dict[Tuple[str, str], Any] = {}
+        self._inflight: Dict[Tuple[str, str], threading.Event] = {}
+        self._lock = threading.Lock()
+        self._rate_lock = threading.Lock()
+        self._next_local_slot = 0.0
+
+    @classmethod
+    def from_config(cls, cfg: Any) -> "GeocodeCache":
+        # The backend shares its own Redis by default; the aggregator opts in explicitly.
+        redis_url = getattr(cfg, "geocode_cache_redis_url", None) or getattr(cfg, "redis_url", None)
+        gazetteer = str(getattr(cfg, "geocode_gazetteer_path", None) or "").strip()
+        return cls(
+            redis_url=redis_url,
+            prefix=str(getattr(cfg, "geocode_cache_prefix", None) or "tutordex:"),
+            gazetteer_path=Path(gazetteer) if gazetteer else DEFAULT_GAZETTEER_PATH,
+            negative_ttl_s=int(getattr(cfg, "geocode_negative_ttl_s", 86400)),
+            rate_limit_per_s=float(getattr(cfg, "geocode_rate_limit_per_s", 1.0)),
+            wait_s=float(getattr(cfg, "geocode_wait_s", 10.0)),
+            retries=int(getattr(cfg, "nominatim_retries", 1) or 1),
+            backoff_s=float(getattr(cfg, "nominatim_backoff_seconds", 1.0) or 0.0),
+        )
+
+    # --------------------------
+    # Layers
+    # --------------------------
+
+    def gazetteer(self) -> Dict[str, Tuple[float, float]]:
+        if self._gazetteer is None:
+            self._gazetteer = load_gazetteer(self.gazetteer_path) if self.gazetteer_path else {}
+        return self._gazetteer
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}geocode:{namespace}:{key}"
+
+    def _redis(self) -> Any:
+        if self.redis_url is None:
+            return None
+        if self._client is None:
+            if time.monotonic() < self._retry_at:
+                return None
+            try:
+                self._client = _connect(self.redis_url)
+            except Exception as e:
+                self._fail("connect", e)
+                return None
+        return self._client
+
+    def _fail(self, op: str, e: Exception) -> None:
+        logger.warning("geocode_cache_%s_failed error=%s", op, e)
+        try:
+            if self._client is not None:
+                self._client.close()
+        except Exception:
+            pass
+        self._client = None
+        self._retry_at = time.monotonic() + self.reconnect_s
+
+    def _store_get(self, namespace: str, key: str) -> Any:
+        client = self._redis()
+        if client is None:
+            return _NOT_CACHED
+        try:
+            raw = client.get(self._key(namespace, key))
+        except Exception as e:
+            self._fail("get", e)
+            return _NOT_CACHED
+        if raw is None:
+            return _NOT_CACHED
+        try:
+            return _decode(namespace, json.loads(raw))
+        except Exception:
+            return _NOT_CACHED
+
+    def _store_put(self, namespace: str, key: str, value: Any) -> None:
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            ttl = None if value is not None else max(1, self.negative_ttl_s)
+            client.set(self._key(namespace, key), json.dumps(value), ex=ttl)
+        except Exception as e:
+            self._fail("set", e)
+
+    def _remember(self, mk: Tuple[str, str], value: Any) -> None:
+        with self._lock:
+            if len(self._memo) >= self.memo_max:
+                self._memo.clear()
+            self._memo[mk] = value
+
+    # --------------------------
+    # Rate limit + single flight
+    # --------------------------
+
+    def acquire_rate_slot(self) -> bool:
+        """Block until a remote call is allowed (global across processes when Redis is up). False if waiting exceeds `wait_s`."""
+        rate = self.rate_limit_per_s
+        if rate <= 0:
+            return True
+        deadline = time.monotonic() + self.wait_s
+        client = self._redis()
+        if client is not None:
+            try:
+                while True:
+                    # One call per 1/rate-second slot, claimed with SET NX by whichever process gets there first.
+                    slot = int(time.time() * rate)
+                    if client.set(f"{self.prefix}geocode:rate:{slot}", "1", nx=True, ex=max(1, math.ceil(2.0 / rate))):
+                        return True
+                    sleep_s = max(0.01, (slot + 1) / rate - time.time())
+                    if time.monotonic() + sleep_s > deadline:
+                        return False
+                    time.sleep(sleep_s)
+            except Exception as e:
+                self._fail("rate_limit", e)
+        with self._rate_lock:
+            now = time.monotonic()
+            at = max(now, self._next_local_slot)
+            if at > deadline:
+                return False
+            self._next_local_slot = at + 1.0 / rate
+        time.sleep(max(0.0, at - now))
+        return True
+
+    def _fetch_once(self, namespace: str, key: str, fetch: Callable[[], Any]) -> Any:
+        client = self._redis()
+        lock_key = f"{self.prefix}geocode:lock:{namespace}:{key}"
+        locked = False
+        if client is not None:
+            try:
+                locked = bool(client.set(lock_key, "1", nx=True, ex=max(1, self.lock_ttl_s)))
+            except Exception as e:
+                self._fail("lock", e)
+            if not locked and self._redis() is not None:
+                # Another process is fetching this key; wait for its answer instead of calling again.
+                deadline = time.monotonic() + self.wait_s
+                while time.monotonic() < deadline:
+                    time.sleep(0.2)
+                    hit = self._store_get(namespace, key)
+                    if hit is not _NOT_CACHED:
+                        return hit
+        try:
+            value = self._fetch_with_retries(fetch)
+            self._store_put(namespace, key, value)
+            return value
+        finally:
+            if locked:
+                try:
+                    client.delete(lock_key)
+                except Exception as e:
+                    self._fail("unlock", e)
+
+    def _fetch_with_retries(self, fetch: Callable[[], Any]) -> Any:
+        started = time.monotonic()
+        # Another attempt may wait `wait_s` for a rate slot; stop while the fetch still fits well inside the lock TTL.
+        budget_s = self.lock_ttl_s / 2.0
+        for attempt in range(self.retries):
+            if not self.acquire_rate_slot():
+                raise GeocodeUnavailable("rate_limited")
+            try:
+                return fetch()
+            except GeocodeUnavailable as e:
+                sleep_s = max(self.backoff_s * (2**attempt), float(e.retry_after or 0.0))
+                if attempt == self.retries - 1 or time.monotonic() - started + sleep_s + self.wait_s > budget_s:
+                    raise
+                logger.info("geocode_retry attempt=%s sleep_s=%.2f error=%s", attempt + 1, sleep_s, e)
+                time.sleep(sleep_s)
+        raise GeocodeUnavailable("retries_exhausted")
+
+    def get(self, namespace: str, key: str, fetch: Optional[Callable[[], Any]] = None) -> Any:
+        """
+        Cached value for `key`, calling `fetch()` on a miss.
+
+        `fetch=None` means remote lookups are disabled: only the gazetteer/memo/Redis are consulted
+        and nothing is cached. Returns None for "not found" and for transient failures.
+        """
+        key = str(key)
+        if namespace == POSTAL_COORDS:
+            hit = self.gazetteer().get(key)
+            if hit is not None:
+                return hit
+        mk = (namespace, key)
+        with self._lock:
+            if mk in self._memo:
+                return self._memo[mk]
+        stored = self._store_get(namespace, key)
+        if stored is not _NOT_CACHED:
+            self._remember(mk, stored)
+            return stored
+        if fetch is None:
+            return None
+
+        with self._lock:
+            event = self._inflight.get(mk)
+            leader = event is None
+            if leader:
+                event = self._inflight[mk] = threading.Event()
+        if not leader:
+            event.wait(self.wait_s)
+            with self._lock:
+                return self._memo.get(mk)
+        try:
+            value = self._fetch_once(namespace, key, fetch)
+            self._remember(mk, value)
+            return value
+        except GeocodeUnavailable as e:
+            logger.info("geocode_unavailable namespace=%s error=%s", namespace, e)
+            return None
+        finally:
+            with self._lock:
+                self._inflight.pop(mk, None)
+            event.set()
+
+    def seed(self, namespace: str, items: Iterable[Tuple[str, Any]], *, batch_size: int = 500) -> int:
+        """Write known answers straight into Redis (no TTL). Returns the number written."""
+        client = self._redis()
+        if client is None:
+            return 0
+        written = 0
+        pipe = client.pipeline(transaction=False)
+        pending = 0
+        for key, value in items:
+            pipe.set(self._key(namespace, str(key)), json.dumps(value))
+            pending += 1
+            if pending >= batch_size:
+                pipe.execute()
+                written += pending
+                pending = 0
+        if pending:
+            pipe.execute()
+            written += pending
+        return written
+
+
+def _decode(namespace: str, value: Any) -> Any:
+    if namespace == POSTAL_COORDS and isinstance(value, list) and len(value) == 2:
+        return (float(value[0]), float(value[1]))
+    return value
+
+
+_CACHE: Optional[GeocodeCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def geocode_cache(cfg: Any) -> GeocodeCache:
+    """Process-wide cache built from the first config it is called with."""
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = GeocodeCache.from_config(cfg)
+    return _CACHE
+
+
+def set_geocode_cache(cache: Optional[GeocodeCache]) -> None:
+    global _CACHE
+    _CACHE = cache
@@ -5,14 +5,25 @@ canonical tutor-type with a simple confidence score.
 """
 from __future__ import annotations
 
+import hashlib
+import json
 import os
 import re
-from difflib import get_close_matches
-from typing import Dict, Optional, Tuple
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
 
 _ROOT = os.path.join(os.path.dirname(__file__))
 _TAXONOMY_FILE = os.path.join(_ROOT, "tutor_types.yaml")
 
+# Bump when the layout written by `export_index` changes.
+INDEX_FORMAT_VERSION = 1
+
+# Fuzzy fallback: same cutoff `difflib.get_close_matches` was called with.
+_FUZZY_CUTOFF = 0.8
+_MEMO_MAX = 8192
+_TOKEN_SPLIT_RE = re.compile(r"[^a-z0-9]+")
+
 
 def _load_yaml(path: str) -> Dict:
     try:
@@ -52,13 +63,143 @@ def _ensure_loaded() -> None:
     # a single shared alias list in `tutor_types.yaml` to keep mappings
     # consistent at scale.
     _ALIASES_FLAT = aliases
+    _fuzzy_index()
+
+
+def taxonomy_sha256() -> str:
+    with open(_TAXONOMY_FILE, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def export_index(path: str) -> str:
+    """Write the parsed taxonomy and flat alias map to `path` as JSON; returns the source hash.
+
+    Loading this index (see `load_index`) skips PyYAML entirely, which dominates cold start.
+    """
+    _ensure_loaded()
+    digest = taxonomy_sha256()
+    payload = {
+        "format_version": INDEX_FORMAT_VERSION,
+        "source_sha256": digest,
+        "taxonomy": _TAXONOMY,
+        "aliases": _ALIASES_FLAT,
+    }
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, sort_keys=True)
+    os.replace(tmp, path)
+    return digest
+
+
+def load_index(path: str) -> bool:
+    """Install a prebuilt index from `export_index`. Returns False (and loads nothing) if missing or stale."""
+    global _TAXONOMY, _ALIASES_FLAT
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+    except Exception:
+        return False
+    if not isinstance(payload, dict) or payload.get("format_version") != INDEX_FORMAT_VERSION:
+        return False
+    if payload.get("source_sha256") != taxonomy_sha256():
+        return False
+    taxonomy, aliases = payload.get("taxonomy"), payload.get("aliases")
+    if not isinstance(taxonomy, dict) or not isinstance(aliases, dict):
+        return False
+    _TAXONOMY, _ALIASES_FLAT = taxonomy, aliases
+    _fuzzy_index()
+    return True
+
+
+def _trigrams(s: str) -> Counter:
+    # Padded so short aliases ("pt") still have q-grams and both ends count.
+    padded = f"\x00\x00{s}\x00\x00"
+    return Counter(padded[i : i + 3] for i in range(len(padded) - 2))
+
+
+class _FuzzyIndex:
+    """Trigram postings over the alias keys, plus a bounded memo of normalize results.
+
+    `close_match` returns what `get_close_matches(key, aliases, n=3, cutoff=0.8)[0]` returned, without
+    scoring every alias:
+    - aliases are bucketed by length, so difflib's `real_quick_ratio` bound picks the few lengths that can
+      reach the cutoff (most multi-word junk phrases are longer than any alias and stop here);
+    - ratio >= cutoff allows at most k = floor((1 - cutoff) * (|a| + |b|)) insertions/deletions, and strings
+      within k edits share at least max(|a|, |b|) + 2 - 3k padded trigrams (q-gram lemma); shared counts come
+      from the postings, and aliases below the bound are skipped;
+    - the survivors go through difflib's `quick_ratio` bound (shared characters) and `SequenceMatcher.ratio`,
+      ties broken by the larger alias like `nlargest`.
+    """
+
+    def __init__(self, aliases: Dict[str, str]):
+        self.aliases = aliases
+        self.keys: List[str] = list(aliases)
+        self.char_counts: List[Counter] = [Counter(k) for k in self.keys]
+        self.by_length: Dict[int, List[int]] = {}
+        self.grams: Dict[str, List[Tuple[int, int]]] = {}
+        for i, k in enumerate(self.keys):
+            self.by_length.setdefault(len(k), []).append(i)
+            for g, n in _trigrams(k).items():
+                self.grams.setdefault(g, []).append((i, n))
+        self.memo: Dict[str, Tuple[str, float]] = {}
+
+    def remember(self, key: str, value: Tuple[str, float]) -> None:
+        if len(self.memo) >= _MEMO_MAX:
+            self.memo.clear()
+        self.memo[key] = value
+
+    def close_match(self, key: str) -> Optional[str]:
+        lb = len(key)
+        lengths = [la for la in self.by_length if 2.0 * min(la, lb) / (la + lb) >= _FUZZY_CUTOFF]
+        if not lengths:
+            return None
+
+        shared_grams: Dict[int, int] = {}
+        for g, n in _trigrams(key).items():
+            for i, m in self.grams.get(g, ()):
+                shared_grams[i] = shared_grams.get(i, 0) + min(n, m)
+
+        key_chars: Optional[Counter] = None
+        matcher: Optional[SequenceMatcher] = None
+        best: Optional[Tuple[float, str]] = None
+        for la in lengths:
+            total = la + lb
+            need = max(la, lb) + 2 - 3 * int((1.0 - _FUZZY_CUTOFF) * total + 1e-9)
+            for i in self.by_length[la]:
+                if need > 0 and shared_grams.get(i, 0) < need:
+                    continue
+                if key_chars is None:
+                    key_chars = Counter(key)
+                shared = sum(min(n, key_chars[c]) for c, n in self.char_counts[i].items())
+                if 2.0 * shared / total < _FUZZY_CUTOFF:
+                    continue
+                a = self.keys[i]
+                if matcher is None:
+                    matcher = SequenceMatcher()
+                    matcher.set_seq2(key)
+                matcher.set_seq1(a)
+                score = matcher.ratio()
+                if score >= _FUZZY_CUTOFF and (best is None or (score, a) > best):
+                    best = (score, a)
+        return best[1] if best else None
+
+
+_FUZZY: Optional[_FuzzyIndex] = None
+
+
+def _fuzzy_index() -> _FuzzyIndex:
+    """Index for the current alias map; rebuilt whenever the taxonomy is (re)loaded."""
+    global _FUZZY
+    if _FUZZY is None or _FUZZY.aliases is not _ALIASES_FLAT:
+        _FUZZY = _FuzzyIndex(_ALIASES_FLAT or {})
+    return _FUZZY
 
 
 def normalize_label(label: str, agency: Optional[str] = None) -> Tuple[str, str, float]:
     """Normalize a raw label to (canonical, original, confidence).
 
     - Uses deterministic alias matches first.
-    - Falls back to fuzzy matching via difflib.
+    - Falls back to fuzzy matching (difflib ratio, via `_FuzzyIndex`).
     - Returns `unknown` canonical if no match.
     """
     if not label or not label.strip():
@@ -70,24 +211,33 @@ def normalize_label(label: str, agency: Optional[str] = None) -> Tuple[str, str,
     if key in _ALIASES_FLAT:
         return _ALIASES_FLAT[key], orig, 0.99
 
+    # The same phrases (mostly junk n-grams from `extract_tutor_types`) recur across messages.
+    index = _fuzzy_index()
+    hit = index.memo.get(key)
+    if hit is None:
+        hit = _match_label(key, index)
+        index.remember(key, hit)
+    return hit[0], orig, hit[1]
+
+
+def _match_label(key: str, index: _FuzzyIndex) -> Tuple[str, float]:
+    aliases = index.aliases
     # tokenized match: check each token and n-gram
-    tokens = re.split(r"[^a-z0-9]+", key)
-    tokens = [t for t in tokens if t]
-    for t in tokens:
-        if t in _ALIASES_FLAT:
-            return _ALIASES_FLAT[t], orig, 0.9
+    for t in _TOKEN_SPLIT_RE.split(key):
+        if t and t in aliases:
+            return aliases[t], 0.9
 
     # fuzzy match against alias keys
-    candidates = get_close_matches(key, list(_ALIASES_FLAT.keys()), n=3, cutoff=0.8)
-    if candidates:
-        return _ALIASES_FLAT[candidates[0]], orig, 0.75
+    candidate = index.close_match(key)
+    if candidate is not None:
+        return aliases[candidate], 0.75
 
     # try substring match against aliases
-    for a, canon in _ALIASES_FLAT.items():
+    for a, canon in aliases.items():
         if a in key or key in a:
-            return canon, orig, 0.7
+            return canon, 0.7
 
-    return "unknown", orig, 0.0
+    return "unknown", 0.0
 
 
 if __name__ == "__main__":
@@ -0,0 +1,105 @@
+"""
+Tests for the buffered bulk analytics event writer.
+"""
+
+from unittest.mock import MagicMock
+
+from TutorDexBackend.metrics import analytics_events_dropped_total
+from TutorDexBackend.services.analytics_buffer import AnalyticsEventBuffer
+from TutorDexBackend.services.analytics_service import AnalyticsService
+
+
+def _sb() -> MagicMock:
+    sb = MagicMock()
+    sb.enabled.return_value = True
+    sb.upsert_user.side_effect = lambda firebase_uid, email, name: {"u1": 11, "u2": 22}.get(firebase_uid)
+    sb.resolve_assignment_id.side_effect = lambda external_id, agency_telegram_channel_name: (
+        101 if external_id == "A1" else None
+    )
+    sb.insert_events.return_value = True
+    return sb
+
+
+def _dropped(reason: str) -> float:
+    return analytics_events_dropped_total.labels(reason=reason)._value.get()
+
+
+def test_flush_builds_uniform_rows_and_caches_lookups():
+    sb = _sb()
+    buf = AnalyticsEventBuffer(sb, batch_size=10)
+    buf.enqueue(uid="u1", event_type="view", assignment_external_id="A1", meta={"k": 1})
+    buf.enqueue(uid="u1", event_type="click", assignment_external_id="A1")
+    buf.enqueue(uid="u2", event_type="view", assignment_external_id="missing")
+    buf.enqueue(uid="u2", event_type="view", assignment_external_id="missing")
+
+    assert buf.flush_once() == 4
+
+    rows = sb.insert_events.call_args.args[0]
+    assert [(r["user_id"], r["assignment_id"], r["event_type"]) for r in rows] == [
+        (11, 101, "view"),
+        (11, 101, "click"),
+        (22, None, "view"),
+        (22, None, "view"),
+    ]
+    assert all(set(r) == {"event_type", "event_time", "user_id", "assignment_id", "meta"} for r in rows)
+    assert rows[0]["meta"] == {"k": 1} and rows[1]["meta"] is None
+    # One lookup per distinct key, including negative results.
+    assert sb.upsert_user.call_count == 2
+    assert sb.resolve_assignment_id.call_count == 2
+
+
+def test_full_buffer_drops_oldest():
+    sb = _sb()
+    buf = AnalyticsEventBuffer(sb, max_events=2, batch_size=10)
+    before = _dropped("buffer_full")
+
+    for i in range(3):
+        buf.enqueue(uid="u1", event_type=f"e{i}")
+
+    assert buf.depth() == 2
+    assert _dropped("buffer_full") - before == 1
+    buf.flush_once()
+    assert [r["event_type"] for r in sb.insert_events.call_args.args[0]] == ["e1", "e2"]
+
+
+def test_failed_batch_is_retried_then_dropped():
+    sb = _sb()
+    sb.insert_events.return_value = False
+    buf = AnalyticsEventBuffer(sb, batch_size=10, max_attempts=2)
+    before = _dropped("insert_failed")
+    buf.enqueue(uid="u1", event_type="view")
+
+    buf.flush_once()
+    assert buf.depth() == 1
+    buf.flush_once()
+    assert buf.depth() == 0
+    assert _dropped("insert_failed") - before == 1
+
+
+def test_stop_drains_queue():
+    sb = _sb()
+    buf = AnalyticsEventBuffer(sb, batch_size=2, flush_interval_ms=60000)
+    buf.start()
+    for i in range(5):
+        buf.enqueue(uid="u1", event_type=f"e{i}")
+    buf.stop()
+
+    written = [r["event_type"] for call in sb.insert_events.call_args_list for r in call.args[0]]
+    assert written == [f"e{i}" for i in range(5)]
+    assert buf.depth() == 0
+
+
+def test_service_acks_without_round_trips_when_buffered():
+    sb = _sb()
+    buf = AnalyticsEventBuffer(sb)
+    service = AnalyticsService(sb, MagicMock(), buffer=buf)
+
+    out = service.record_event(
+        uid="u1", event_type="view", assignment_external_id="A1", agency_telegram_channel_name=None, meta=None
+    )
+
+    assert out == {"ok": True, "queued": True}
+    assert buf.depth() == 1
+    sb.upsert_user.assert_not_called()
+    sb.resolve_assignment_id.assert_not_called()
+    sb.insert_events.assert_not_called()
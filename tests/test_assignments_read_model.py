@@ -0,0 +1,222 @@
+"""
+Tests for the in-memory open-assignments read model.
+
+The expected results follow the SQL semantics of `list_open_assignments_v2` and
+`open_assignment_facets` in `TutorDexAggregator/supabase sqls/supabase_schema_full.sql`.
+"""
+
+from typing import Any, Dict, List
+from unittest.mock import MagicMock
+
+from TutorDexBackend.services.assignments_read_model import AssignmentsReadModel
+
+
+def _row(id: int, **kw: Any) -> Dict[str, Any]:
+    base: Dict[str, Any] = {
+        "id": id,
+        "external_id": f"ext-{id}",
+        "status": "open",
+        "agency_display_name": None,
+        "agency_telegram_channel_name": "t.me/agency_a",
+        "learning_mode": "Face-to-Face",
+        "address": None,
+        "postal_code": None,
+        "postal_code_estimated": None,
+        "nearest_mrt": None,
+        "region": None,
+        "rate_min": None,
+        "tutor_types": None,
+        "signals_subjects": [],
+        "signals_levels": [],
+        "signals_specific_student_levels": [],
+        "subjects_canonical": [],
+        "subjects_general": [],
+        "created_at": f"2026-01-{id:02d}T00:00:00+00:00",
+        "published_at": None,
+        "last_seen": f"2026-02-{id:02d}T00:00:00+00:00",
+        "postal_lat": None,
+        "postal_lon": None,
+        "postal_coords_estimated": None,
+        "is_primary_in_group": True,
+    }
+    base.update(kw)
+    return base
+
+
+def _model(rows: List[Dict[str, Any]]) -> AssignmentsReadModel:
+    sb = MagicMock()
+    sb.enabled.return_value = True
+    rm = AssignmentsReadModel(sb)
+    rm.load_rows(rows)
+    return rm
+
+
+def _ids(result: Dict[str, Any]) -> List[int]:
+    return [r["id"] for r in result["items"]]
+
+
+def test_delegates_to_supabase_until_loaded():
+    sb = MagicMock()
+    sb.list_open_assignments_v2.return_value = {"items": [], "total": 0}
+    rm = AssignmentsReadModel(sb)
+
+    assert rm.ready() is False
+    assert rm.list_open_assignments_v2(limit=5, level="Primary") == {"items": [], "total": 0}
+    assert sb.list_open_assignments_v2.call_args.kwargs["level"] == "Primary"
+
+
+def test_newest_order_and_keyset_pagination():
+    rows = [_row(i) for i in range(1, 8)]
+    rows[2]["published_at"] = "2026-03-01T00:00:00+00:00"  # id=3 sorts first
+    rm = _model(rows)
+
+    seen: List[int] = []
+    cursor_ts, cursor_id = None, None
+    while True:
+        page = rm.list_open_assignments_v2(limit=3, cursor_last_seen=cursor_ts, cursor_id=cursor_id)
+        seen.extend(_ids(page))
+        if len(page["items"]) < 3:
+            break
+        last = page["items"][-1]
+        cursor_ts = last["published_at"] or last["created_at"]
+        cursor_id = last["id"]
+
+    assert seen == [3, 7, 6, 5, 4, 2, 1]
+    # Total counts rows remaining after the cursor, like `count(*) over()` on the paged CTE.
+    first = rm.list_open_assignments_v2(limit=2)
+    assert first["total"] == 7
+    assert rm.list_open_assignments_v2(limit=2, cursor_last_seen="2026-01-05T00:00:00Z", cursor_id=5)["total"] == 3
+
+
+def test_distance_sort_and_cursor():
+    rows = [
+        _row(1, postal_lat=1.3000, postal_lon=103.8000),
+        _row(2, postal_lat=1.3500, postal_lon=103.8500),
+        _row(3),  # no coordinates -> sort key 1e9
+        _row(4, postal_lat=1.3000, postal_lon=103.8000),  # tie with id=1, newer last_seen
+    ]
+    rm = _model(rows)
+
+    page = rm.list_open_assignments_v2(limit=2, sort="distance", tutor_lat=1.3, tutor_lon=103.8)
+    assert _ids(page) == [4, 1]
+    assert page["items"][0]["distance_km"] == 0.0
+    last = page["items"][-1]
+
+    page2 = rm.list_open_assignments_v2(
+        limit=2,
+        sort="distance",
+        tutor_lat=1.3,
+        tutor_lon=103.8,
+        cursor_distance_km=last["distance_sort_key"],
+        cursor_last_seen=last["last_seen"],
+        cursor_id=last["id"],
+    )
+    assert _ids(page2) == [2, 3]
+    assert page2["items"][1]["distance_km"] is None
+    assert page2["items"][1]["distance_sort_key"] == 1e9
+
+
+def test_filters_match_rpc_semantics():
+    rows = [
+        _row(1, signals_levels=["Primary"], signals_subjects=["Math"], region="North-East", rate_min=30),
+        _row(2, signals_levels=["Secondary"], subjects_canonical=["MATH.SEC"], learning_mode="Online", rate_min=None),
+        _row(3, address=["Blk 123 Ang Mo Kio Ave 3"], agency_display_name="Alpha Tutors", rate_min=50,
+             tutor_types=[{"canonical": "full-timer", "original": "FT"}]),
+        _row(4, is_primary_in_group=False, agency_display_name="", agency_telegram_channel_name="t.me/beta"),
+    ]
+    rm = _model(rows)
+
+    assert _ids(rm.list_open_assignments_v2(level="Primary")) == [1]
+    assert _ids(rm.list_open_assignments_v2(subject="Math, MATH.SEC")) == [2, 1]
+    assert _ids(rm.list_open_assignments_v2(subject=",")) == []
+    assert _ids(rm.list_open_assignments_v2(location_query="north east")) == [1]
+    assert _ids(rm.list_open_assignments_v2(location_query=" Online ")) == [2]
+    assert _ids(rm.list_open_assignments_v2(location_query="Ang Mo")) == [3]
+    assert _ids(rm.list_open_assignments_v2(location_query="ang_mo%ave")) == [3]
+    assert _ids(rm.list_open_assignments_v2(min_rate=40)) == [3]
+    assert _ids(rm.list_open_assignments_v2(tutor_type="full-timer")) == [3]
+    assert _ids(rm.list_open_assignments_v2(show_duplicates=False)) == [3, 2, 1]
+    # coalesce(agency_display_name, channel): an empty display name still wins.
+    assert _ids(rm.list_open_assignments_v2(agency_display_name="")) == [4]
+    assert _ids(rm.list_open_assignments_v2(agency_display_name="t.me/agency_a")) == [2, 1]
+
+
+def test_output_rows_are_projected_and_normalized():
+    rm = _model([_row(1, raw_text="should not leak", postal_coords_estimated=None)])
+    item = rm.list_open_assignments_v2()["items"][0]
+
+    assert "raw_text" not in item
+    assert "postal_lat" not in item
+    assert item["postal_coords_estimated"] is False
+    assert item["agency_display_name"] == "t.me/agency_a"
+    item["external_id"] = "mutated"
+    assert rm.list_open_assignments_v2()["items"][0]["external_id"] == "ext-1"
+
+
+def test_facets_counts_and_ordering():
+    rows = [
+        _row(1, signals_levels=["Primary", "Primary", " "], learning_mode="Online", agency_display_name="Alpha"),
+        _row(2, signals_levels=["Primary", "Secondary"], learning_mode="Online", agency_display_name="Beta"),
+        _row(3, signals_levels=["Secondary"], learning_mode=" ", agency_display_name="Beta",
+             tutor_types=[{"canonical": "full-timer"}, {"canonical": "full-timer"}]),
+        _row(4, signals_levels=["JC"], agency_display_name=None, agency_telegram_channel_name=None),
+    ]
+    rm = _model(rows)
+
+    facets = rm.open_assignment_facets()
+    assert facets["total"] == 4
+    assert facets["levels"] == [
+        {"value": "Primary", "count": 2},
+        {"value": "Secondary", "count": 2},
+        {"value": "JC", "count": 1},
+    ]
+    assert facets["learning_modes"] == [
+        {"value": "Online", "count": 2},
+        {"value": "Face-to-Face", "count": 1},
+    ]
+    assert facets["agencies"] == [{"value": "Beta", "count": 2}, {"value": "Alpha", "count": 1}]
+    assert facets["tutor_types"] == [{"value": "full-timer", "count": 1}]
+
+    filtered = rm.open_assignment_facets(level="Secondary")
+    assert filtered["total"] == 2
+    assert filtered["agencies"] == [{"value": "Beta", "count": 2}]
+
+
+def test_apply_rows_upserts_and_closes():
+    rm = _model([_row(1), _row(2)])
+
+    assert rm.apply_rows([_row(1, status="closed"), _row(3)]) is True
+    assert rm.apply_rows([_row(3)]) is False
+    rm._rebuild()
+
+    assert _ids(rm.list_open_assignments_v2()) == [3, 2]
+
+
+def test_full_reload_falls_back_to_last_seen_cursor():
+    calls: List[str] = []
+
+    def _get(path: str, timeout: int = 0):
+        calls.append(path)
+        resp = MagicMock()
+        if "updated_at" in path:
+            resp.status_code = 400
+            resp.text = '{"message":"column assignments.updated_at does not exist"}'
+            return resp
+        resp.status_code = 200
+        resp.text = ""
+        if "limit=1&" in path + "&" or path.endswith("limit=1"):
+            resp.json.return_value = [_row(2)]
+        else:
+            resp.json.return_value = [_row(1), _row(2)]
+        return resp
+
+    sb = MagicMock()
+    sb.enabled.return_value = True
+    sb.client.get.side_effect = _get
+    rm = AssignmentsReadModel(sb, page_size=1000)
+
+    assert rm.full_reload() is True
+    assert rm.ready() is True
+    assert rm._cursor_column == "last_seen"
+    assert rm._cursor == _row(2)["last_seen"]
+    assert _ids(rm.list_open_assignments_v2()) == [2, 1]
@@ -133,6 +133,18 @@ class TestAssignmentEndpoints:
         # Should fail without auth as it requires tutor location
         assert response.status_code in [400, 401]
 
+    def test_list_assignments_etag_not_modified(self, client: TestClient, mock_supabase):
+        """Anonymous listings carry an ETag and revalidate with 304."""
+        response = client.get("/assignments?limit=5")
+        assert response.status_code == 200
+        etag = response.headers.get("etag")
+        assert etag
+
+        response = client.get("/assignments?limit=5", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers.get("etag") == etag
+
     def test_assignments_facets(self, client: TestClient, mock_supabase):
         """Test assignment facets endpoint."""
         mock_supabase.open_assignment_facets.return_value = {
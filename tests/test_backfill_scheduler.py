@@ -0,0 +1,281 @@
+"""
+Tests for the concurrent backfill scheduler (`TutorDexAggregator/collection/backfill_scheduler.py`) driving the real
+`collection.backfill.backfill_channel` against an in-memory Telegram client and raw store.
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+from telethon.errors import FloodWaitError
+
+
+def _ensure_aggregator_sys_path() -> None:
+    agg_path = str(Path(__file__).resolve().parents[1] / "TutorDexAggregator")
+    if agg_path in sys.path:
+        sys.path.remove(agg_path)
+    sys.path.insert(0, agg_path)
+    loaded_logging_setup = sys.modules.get("logging_setup")
+    if loaded_logging_setup is not None and "TutorDexAggregator" not in str(getattr(loaded_logging_setup, "__file__", "")):
+        sys.modules.pop("logging_setup", None)
+
+
+_ensure_aggregator_sys_path()
+
+from collection import backfill_scheduler as bs  # noqa: E402
+from collection.backfill import backfill_channel, load_resume_state  # noqa: E402
+from collection.types import CollectorContext  # noqa: E402
+
+# The collection modules registered their Prometheus metrics via the bare `observability_metrics` import; make the
+# package path resolve to that same module so nothing imports (and registers) it a second time.
+sys.modules.setdefault("TutorDexAggregator.observability_metrics", sys.modules["observability_metrics"])
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class _Crash(BaseException):
+    """Stands in for the process dying mid-run."""
+
+
+class _FakeTelegram:
+    """`get_entity` + `iter_messages` over channels whose message ids are 1..n (newest first, like Telethon)."""
+
+    def __init__(self, sizes: Dict[str, int]):
+        self.sizes = dict(sizes)
+        # channel -> number of messages served before a one-off FloodWaitError (of `seconds`) is raised
+        self.floods: Dict[str, Tuple[int, int]] = {}
+        self.resolve_floods: List[int] = []
+        self.served: Dict[str, int] = {}
+        self.flood_sleep_threshold = 60
+
+    async def get_entity(self, ref: str) -> Any:
+        if self.resolve_floods:
+            raise FloodWaitError(None, capture=self.resolve_floods.pop(0))
+        name = ref.split("/")[-1]
+        return SimpleNamespace(id=abs(hash(name)) % 10_000, username=name, title=name.upper())
+
+    def iter_messages(self, entity: Any, *, reverse: bool, offset_date: Any, max_id: int):
+        assert reverse is False
+        name = entity.username
+        top = self.sizes[name] if not max_id else min(self.sizes[name], max_id - 1)
+        return self._iter(name, top)
+
+    async def _iter(self, name: str, top: int):
+        for mid in range(top, 0, -1):
+            await asyncio.sleep(0.001)
+            n = self.served.get(name, 0)
+            flood = self.floods.get(name)
+            if flood and n >= flood[0]:
+                del self.floods[name]
+                raise FloodWaitError(None, capture=flood[1])
+            self.served[name] = n + 1
+            yield SimpleNamespace(id=mid, date=T0 + timedelta(minutes=mid), message=f"{name} #{mid}")
+
+    def is_connected(self) -> bool:
+        return True
+
+    async def connect(self) -> None:
+        return None
+
+    async def disconnect(self) -> None:
+        return None
+
+
+class _FakeStore:
+    def __init__(self) -> None:
+        self.rows: Dict[Tuple[str, str], int] = {}
+        self.progress: Dict[str, Dict[str, Any]] = {}
+        self.latest: Dict[str, Optional[str]] = {}
+        self.crash_after_batches: Optional[int] = None
+        self.batches = 0
+        self.progress_at_crash: Dict[str, Dict[str, Any]] = {}
+        self.rows_at_crash: set = set()
+
+    def enabled(self) -> bool:
+        return True
+
+    def upsert_channel(self, **kwargs: Any) -> bool:
+        return True
+
+    def upsert_messages_batch(self, *, rows: List[Dict[str, Any]]) -> Tuple[int, int]:
+        self.batches += 1
+        if self.crash_after_batches is not None and self.batches > self.crash_after_batches:
+            self.progress_at_crash = {k: dict(v) for k, v in self.progress.items()}
+            self.rows_at_crash = set(self.rows)
+            raise _Crash()
+        for r in rows:
+            key = (r["channel_link"], r["message_id"])
+            self.rows[key] = self.rows.get(key, 0) + 1
+        return len(rows), len(rows)
+
+    def upsert_progress(self, *, run_id: int, channel_link: str, last_message_id: Optional[str], last_message_date_iso: Optional[str],
+                        scanned: int, inserted: int, updated: int, errors: int, done: Optional[bool] = None) -> bool:
+        self.progress[channel_link] = {
+            "channel_link": channel_link,
+            "last_message_id": last_message_id,
+            "last_message_date": last_message_date_iso,
+            "scanned_count": scanned,
+            "error_count": errors,
+            "done": bool(done),
+        }
+        return True
+
+    def list_progress(self, *, run_id: int) -> List[Dict[str, Any]]:
+        return list(self.progress.values())
+
+    def get_latest_message_cursor(self, *, channel_link: str) -> Tuple[Optional[str], Optional[str]]:
+        return self.latest.get(channel_link), None
+
+    def ids(self, channel: str) -> List[int]:
+        return sorted(int(mid) for (ch, mid) in self.rows if ch == f"t.me/{channel}")
+
+
+class _Tracker:
+    """Wraps `backfill_channel` to record each slice (channel, max_id, start time) and the peak concurrency."""
+
+    def __init__(self) -> None:
+        self.slices: List[Tuple[str, Optional[int], float]] = []
+        self.active = 0
+        self.peak = 0
+
+    async def __call__(self, **kwargs: Any) -> Any:
+        self.slices.append((kwargs["channel_ref"].split("/")[-1], kwargs["max_message_id"], time.monotonic()))
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            return await backfill_channel(**kwargs)
+        finally:
+            self.active -= 1
+
+
+def _ctx() -> CollectorContext:
+    cfg = SimpleNamespace(extraction_queue_enabled=False)
+    return CollectorContext(cfg=cfg, logger=logging.getLogger("test_backfill_scheduler"),
+                            version=SimpleNamespace(pipeline_version="test", schema_version="test"), here=Path("."))
+
+
+def _run(tg: _FakeTelegram, store: _FakeStore, states: List[bs.ChannelState], tracker: _Tracker, **kwargs: Any) -> List[bs.ChannelState]:
+    opts: Dict[str, Any] = {"batch_size": 20, "slice_messages": 50, "concurrency": 2, "checkpoint_interval_s": 0.05, "retry_delay_seconds": 0.0}
+    opts.update(kwargs)
+    scheduler = bs.BackfillScheduler(ctx=_ctx(), client=bs.SharedClient(tg), store=store, run_id=1, channels=states,
+                                     since=None, until=None, backfill_fn=tracker, **opts)
+    return asyncio.run(scheduler.run())
+
+
+def test_channels_run_concurrently_and_every_message_is_stored():
+    tg = _FakeTelegram({"a": 120, "b": 95, "c": 60, "d": 10})
+    store, tracker = _FakeStore(), _Tracker()
+    states = _run(tg, store, [bs.ChannelState(f"t.me/{c}") for c in "abcd"], tracker, concurrency=3)
+    assert tracker.peak == 3
+    assert tg.flood_sleep_threshold == 0
+    assert all(s.status == bs.DONE for s in states)
+    for ch, n in tg.sizes.items():
+        assert store.ids(ch) == list(range(1, n + 1))
+        assert store.progress[f"t.me/{ch}"]["done"] is True
+        assert store.progress[f"t.me/{ch}"]["scanned_count"] == n
+    assert set(store.rows.values()) == {1}
+    # Slices continue exactly where the previous one stopped (max_id is exclusive).
+    assert [m for ch, m, _ in tracker.slices if ch == "a"] == [None, 71, 21]
+
+
+def test_flood_wait_pauses_only_the_flooded_channel():
+    tg = _FakeTelegram({"a": 80, "b": 150, "c": 150})
+    tg.floods["a"] = (30, 1)
+    store, tracker = _FakeStore(), _Tracker()
+    gate = bs.FloodGate(global_after_channels=3)
+    states = _run(tg, store, [bs.ChannelState(f"t.me/{c}") for c in "abc"], tracker, gate=gate)
+    assert all(s.status == bs.DONE for s in states)
+    assert gate.global_pause_s() == 0
+    a_slices = [(m, t) for ch, m, t in tracker.slices if ch == "a"]
+    # The flood hit after 30 messages: one full batch (20) was checkpointed, so `a` resumes below message 61.
+    assert a_slices[1][0] == 61
+    paused_from, resumed_at = a_slices[0][1], a_slices[1][1]
+    assert resumed_at - paused_from >= 1.0
+    # The freed worker kept the other channels going during the pause.
+    assert any(ch == "c" and paused_from < t < resumed_at for ch, _, t in tracker.slices)
+    for ch, n in tg.sizes.items():
+        assert store.ids(ch) == list(range(1, n + 1))
+
+
+def test_flood_gate_escalates_to_global_pause():
+    now = [100.0]
+    gate = bs.FloodGate(global_after_channels=3, window_s=60, clock=lambda: now[0])
+    assert gate.flood("a", 30) == "channel"
+    assert gate.ready_at("a") == 130 and gate.ready_at("b") == 0
+    now[0] = 110
+    assert gate.flood("b", 5) == "channel"
+    assert gate.global_pause_s() == 0
+    assert gate.flood("c", 20) == "global"
+    assert gate.ready_at("b") == 130 and gate.ready_at("z") == 130
+    assert gate.global_pause_s() == 20
+    # Floods older than the window no longer count towards escalation; resolving a channel is always account-wide.
+    now[0] = 500
+    assert gate.flood("d", 5) == "channel"
+    assert gate.flood("e", 5, account_wide=True) == "global"
+
+
+def test_resolve_flood_pauses_all_workers():
+    tg = _FakeTelegram({"a": 10, "b": 10})
+    tg.resolve_floods = [1]
+    store, tracker = _FakeStore(), _Tracker()
+    t0 = time.monotonic()
+    states = _run(tg, store, [bs.ChannelState(f"t.me/{c}") for c in "ab"], tracker)
+    assert all(s.status == bs.DONE for s in states)
+    assert min(t for _, _, t in tracker.slices) - t0 >= 1.0
+
+
+def test_channels_lagging_furthest_go_first():
+    store = _FakeStore()
+    now = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    store.latest = {"t.me/fresh": (now - timedelta(hours=1)).isoformat(), "t.me/stale": (now - timedelta(days=10)).isoformat()}
+    states = [bs.ChannelState(c) for c in ("t.me/fresh", "t.me/stale", "t.me/never")]
+    for s in states:
+        s.lag_s = bs.channel_lag_seconds(store, s.channel_ref, now=now)
+    assert states[2].lag_s == float("inf")
+    tg, tracker = _FakeTelegram({"fresh": 60, "stale": 60, "never": 60}), _Tracker()
+    _run(tg, store, states, tracker, concurrency=1)
+    first_seen: List[str] = []
+    for ch, _, _ in tracker.slices:
+        if ch not in first_seen:
+            first_seen.append(ch)
+    assert first_seen == ["never", "stale", "fresh"]
+
+
+def test_resume_after_crash_is_exact():
+    sizes = {"a": 200, "b": 170, "c": 45}
+    store, tracker = _FakeStore(), _Tracker()
+    store.crash_after_batches = 9
+    with pytest.raises(_Crash):
+        _run(_FakeTelegram(sizes), store, [bs.ChannelState(f"t.me/{c}") for c in sizes], tracker)
+
+    # Only what was durable when the process died survives: the stored rows and the checkpoints written so far.
+    checkpoints = store.progress_at_crash
+    assert checkpoints
+    for link, cp in checkpoints.items():
+        stored = {int(mid) for (ch, mid) in store.rows_at_crash if ch == link}
+        cursor = int(cp["last_message_id"])
+        # A checkpoint never runs ahead of the data: every message from the newest down to it is stored.
+        assert set(range(cursor, sizes[link.split("/")[-1]] + 1)) <= stored
+    store.progress = checkpoints
+    store.crash_after_batches = None
+
+    states = load_resume_state(store, run_id=1, channels=[f"t.me/{c}" for c in sizes])
+    resumed = _Tracker()
+    _run(_FakeTelegram(sizes), store, [s for s in states if s.status != bs.DONE], resumed)
+    for s in states:
+        if s.status == bs.DONE:
+            continue
+        name = s.channel_ref.split("/")[-1]
+        first = next(m for ch, m, _ in resumed.slices if ch == name)
+        cp = checkpoints.get(s.channel_ref)
+        assert first == (int(cp["last_message_id"]) if cp else None)
+    for ch, n in sizes.items():
+        assert store.ids(ch) == list(range(1, n + 1))
+        assert store.progress[f"t.me/{ch}"]["done"] is True
+        assert store.progress[f"t.me/{ch}"]["scanned_count"] == n
@@ -4,11 +4,13 @@ Tests for cache service rate limiting and caching logic.
 These tests ensure the cache service works correctly with or without Redis available.
 """
 
+import json
 import pytest
 import time
 from unittest.mock import Mock
 from fastapi import HTTPException
-from TutorDexBackend.services.cache_service import CacheService
+from TutorDexBackend.services.cache_service import CacheService, CachedBody
+from TutorDexBackend.utils.json_utils import compute_etag
 
 
 class MockRedisStore:
@@ -163,6 +165,77 @@ class TestCacheServiceCaching:
         assert service.store is not None
 
 
+class TestCacheServiceBodyCache:
+    """Test pre-encoded body caching and ETag handling"""
+
+    @pytest.mark.asyncio
+    async def test_body_roundtrip_via_redis(self):
+        """Cached bytes come back unchanged with the same ETag"""
+        store = MockRedisStore(redis_available=True)
+        service = CacheService(store)
+
+        entry = await service.set_cached_body("k1", {"ok": True, "items": [{"id": 1, "name": "Ang Mo Kio – Blk 1"}]}, ttl_s=30)
+        cached = await service.get_cached_body("k1")
+
+        assert cached is not None
+        assert cached.body == entry.body
+        assert cached.etag == entry.etag
+        assert json.loads(cached.body) == {"ok": True, "items": [{"id": 1, "name": "Ang Mo Kio – Blk 1"}]}
+
+    @pytest.mark.asyncio
+    async def test_body_roundtrip_with_decoded_redis_values(self):
+        """Redis clients with decode_responses=True return str; entries must still parse"""
+        store = MockRedisStore(redis_available=True)
+        service = CacheService(store)
+
+        entry = await service.set_cached_body("k2", {"ok": True, "total": 3}, ttl_s=30)
+        store._data["k2"] = store._data["k2"].decode("utf-8")
+        cached = await service.get_cached_body("k2")
+
+        assert cached == entry
+
+    @pytest.mark.asyncio
+    async def test_body_fallback_when_redis_down(self):
+        """Local in-process cache serves bytes when Redis is unavailable"""
+        store = MockRedisStore(redis_available=False)
+        service = CacheService(store)
+
+        entry = await service.set_cached_body("k3-local", {"ok": True}, ttl_s=30)
+        cached = await service.get_cached_body("k3-local")
+
+        assert cached == entry
+
+    @pytest.mark.asyncio
+    async def test_zero_ttl_encodes_without_caching(self):
+        """ttl_s <= 0 still returns the encoded body but stores nothing"""
+        store = MockRedisStore(redis_available=True)
+        service = CacheService(store)
+
+        entry = await service.set_cached_body("k4", {"ok": True}, ttl_s=0)
+
+        assert json.loads(entry.body) == {"ok": True}
+        assert await service.get_cached_body("k4") is None
+
+    def test_build_body_response_honors_if_none_match(self):
+        """Matching If-None-Match yields 304 with no body; anything else yields 200"""
+        body = b'{"ok":true}'
+        entry = CachedBody(body=body, etag=compute_etag(body))
+
+        request = MockRequest()
+        request.headers = {"if-none-match": f'W/"stale", {entry.etag}'}
+        resp = CacheService.build_body_response(request, entry, cache_ttl_s=15, cache_status="HIT")
+        assert resp.status_code == 304
+        assert resp.body == b""
+        assert resp.headers["etag"] == entry.etag
+        assert resp.headers["x-cache"] == "HIT"
+
+        request.headers = {"if-none-match": '"stale"'}
+        resp = CacheService.build_body_response(request, entry, cache_ttl_s=15)
+        assert resp.status_code == 200
+        assert resp.body == body
+        assert resp.headers["cache-control"] == "public, max-age=15"
+
+
 class TestCacheServiceEdgeCases:
     """Test edge cases and error handling"""
 
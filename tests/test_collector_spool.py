@@ -0,0 +1,205 @@
+"""
+Tests for the collector's local write spool (`TutorDexAggregator/collection/spool.py`).
+
+A fake raw store stands in for Supabase: it can be switched "down" to simulate an outage and records every upsert
+and enqueue so ordering, dedupe and replay can be asserted.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+AGG_DIR = Path(__file__).resolve().parents[1] / "TutorDexAggregator"
+if str(AGG_DIR) in sys.path:
+    sys.path.remove(str(AGG_DIR))
+sys.path.insert(0, str(AGG_DIR))
+_loaded_logging_setup = sys.modules.get("logging_setup")
+if _loaded_logging_setup is not None and "TutorDexAggregator" not in str(getattr(_loaded_logging_setup, "__file__", "")):
+    sys.modules.pop("logging_setup", None)
+
+import collection.spool as spool_mod  # noqa: E402
+from collection.spool import ENQUEUE_FORCE, ENQUEUE_NORMAL, RawSpool, SpoolDrainer, collapse_batch  # noqa: E402
+
+CHANNEL = "t.me/agency"
+VERSION = SimpleNamespace(pipeline_version="test", schema_version="test")
+
+
+def _row(message_id: int, *, edit_date: str = "", text: str = "") -> Dict[str, Any]:
+    return {
+        "channel_link": CHANNEL,
+        "message_id": str(message_id),
+        "message_date": "2026-10-18T00:00:00+00:00",
+        "message_json": {"id": message_id},
+        "edit_date": edit_date or None,
+        "raw_text": text or f"m{message_id}",
+    }
+
+
+class _FakeStore:
+    def __init__(self) -> None:
+        self.down = False
+        self.enqueue_down = False
+        self.poison: set = set()
+        self.last_upsert_status = None
+        self.batches: List[List[Dict[str, Any]]] = []
+        self.enqueued: List[Tuple[str, List[str], bool]] = []
+
+    def enabled(self) -> bool:
+        return True
+
+    def upsert_messages_batch(self, *, rows: List[Dict[str, Any]]) -> Tuple[int, int]:
+        self.batches.append(list(rows))
+        if any(r["message_id"] in self.poison for r in rows):
+            self.last_upsert_status = 400
+            return len(rows), 0
+        self.last_upsert_status = 503 if self.down else 201
+        return len(rows), 0 if self.down else len(rows)
+
+
+def _drainer(spool: RawSpool, store: _FakeStore, monkeypatch, **kwargs: Any) -> SpoolDrainer:
+    def _enqueue(store_: Any, *, cfg: Any, channel_link: str, message_ids: List[str], force: bool, raise_on_error: bool = False) -> None:
+        assert raise_on_error
+        if store_.enqueue_down:
+            raise RuntimeError("enqueue rpc down")
+        store_.enqueued.append((channel_link, list(message_ids), force))
+
+    monkeypatch.setattr(spool_mod, "enqueue_extraction_jobs", _enqueue)
+    return SpoolDrainer(spool, store, cfg=None, version=VERSION, **kwargs)
+
+
+def test_outage_is_replayed_in_capture_order(tmp_path, monkeypatch):
+    spool = RawSpool(tmp_path / "spool.sqlite3")
+    store = _FakeStore()
+    drainer = _drainer(spool, store, monkeypatch, batch_size=4)
+    store.down = True
+    for i in range(1, 11):
+        assert spool.append(_row(i), enqueue=ENQUEUE_NORMAL)
+
+    async def run() -> None:
+        assert await drainer.drain_once() == -1
+        assert await drainer.drain_once() == -1
+        assert spool.stats()[0] == 10
+        store.down = False
+        while await drainer.drain_once() > 0:
+            pass
+
+    asyncio.run(run())
+    replayed = [row["message_id"] for batch in store.batches[2:] for row in batch]
+    assert replayed == [str(i) for i in range(1, 11)]
+    assert spool.stats() == (0, None)
+    assert [mid for _, ids, _ in store.enqueued for mid in ids] == [str(i) for i in range(1, 11)]
+
+
+def test_failed_push_halves_batch_and_keeps_records(tmp_path, monkeypatch):
+    spool = RawSpool(tmp_path / "spool.sqlite3")
+    store = _FakeStore()
+    drainer = _drainer(spool, store, monkeypatch, batch_size=8)
+    for i in range(20):
+        spool.append(_row(i))
+    store.down = True
+
+    async def run() -> None:
+        for _ in range(3):
+            await drainer.drain_once()
+        assert [len(b) for b in store.batches] == [8, 4, 2]
+        assert spool.stats()[0] == 20 and not store.enqueued
+        store.down = False
+        assert await drainer.drain_once() == 1
+        assert await drainer.drain_once() == 2
+
+    asyncio.run(run())
+    assert drainer.batch == 4
+
+
+def test_failed_enqueue_keeps_the_batch_spooled(tmp_path, monkeypatch):
+    spool = RawSpool(tmp_path / "spool.sqlite3")
+    store = _FakeStore()
+    drainer = _drainer(spool, store, monkeypatch, batch_size=4)
+    for i in range(1, 4):
+        spool.append(_row(i), enqueue=ENQUEUE_NORMAL)
+    store.enqueue_down = True
+
+    async def run() -> None:
+        assert await drainer.drain_once() == -1
+        assert spool.stats()[0] == 3 and not store.enqueued
+        store.enqueue_down = False
+        while await drainer.drain_once() > 0:
+            pass
+
+    asyncio.run(run())
+    assert spool.stats() == (0, None)
+    assert [mid for _, ids, _ in store.enqueued for mid in ids] == ["1", "2", "3"]
+
+
+def _dead_letters(spool: RawSpool) -> List[Tuple[str, str]]:
+    return spool._conn.execute("select message_id, reason from dead_letter order by seq").fetchall()
+
+
+def test_poison_record_is_dead_lettered_and_the_rest_drains(tmp_path, monkeypatch):
+    spool = RawSpool(tmp_path / "spool.sqlite3")
+    store = _FakeStore()
+    store.poison = {"3"}
+    drainer = _drainer(spool, store, monkeypatch, batch_size=4, dead_letter_after=2)
+    for i in range(1, 9):
+        spool.append(_row(i), enqueue=ENQUEUE_NORMAL)
+    bad = _row(9)
+    bad.pop("message_json")
+    spool.append(bad, enqueue=ENQUEUE_NORMAL)
+
+    async def run() -> None:
+        for _ in range(20):
+            if await drainer.drain_once() == 0:
+                break
+
+    asyncio.run(run())
+    assert spool.stats() == (0, None)
+    assert _dead_letters(spool) == [("3", "rejected"), ("9", "invalid_row")]
+    assert sorted(mid for _, ids, _ in store.enqueued for mid in ids) == sorted(str(i) for i in range(1, 9) if i != 3)
+
+
+def test_outage_never_dead_letters(tmp_path, monkeypatch):
+    spool = RawSpool(tmp_path / "spool.sqlite3")
+    store = _FakeStore()
+    store.down = True
+    drainer = _drainer(spool, store, monkeypatch, batch_size=1, dead_letter_after=1)
+    spool.append(_row(1))
+
+    async def run() -> None:
+        for _ in range(5):
+            assert await drainer.drain_once() == -1
+
+    asyncio.run(run())
+    assert spool.stats()[0] == 1 and not _dead_letters(spool)
+
+
+def test_dedupe_on_edit_date_and_collapse_to_latest(tmp_path):
+    spool = RawSpool(tmp_path / "spool.sqlite3")
+    assert spool.append(_row(1), enqueue=ENQUEUE_NORMAL)
+    assert not spool.append(_row(1), enqueue=ENQUEUE_NORMAL)
+    assert spool.append(_row(1, edit_date="2026-10-18T00:00:00+00:00", text="edited"), enqueue=ENQUEUE_FORCE)
+    assert not spool.append(_row(1, edit_date="2026-10-18T00:00:00+00:00", text="edited"), enqueue=ENQUEUE_FORCE)
+    assert spool.append(_row(2), enqueue=ENQUEUE_NORMAL)
+    assert spool.stats()[0] == 3
+
+    rows, jobs = collapse_batch(spool.peek(10))
+    assert [(r["message_id"], r["raw_text"]) for r in rows] == [("1", "edited"), ("2", "m2")]
+    assert jobs == {(CHANNEL, True): ["1"], (CHANNEL, False): ["2"]}
+
+
+def test_spool_survives_reopen(tmp_path):
+    path = tmp_path / "spool.sqlite3"
+    spool = RawSpool(path)
+    before = time.time()
+    for i in range(3):
+        spool.append(_row(i), enqueue=ENQUEUE_NORMAL)
+    spool.ack(spool.peek(1)[0].seq)
+    spool.close()
+
+    reopened = RawSpool(path)
+    depth, oldest = reopened.stats()
+    assert depth == 2 and oldest >= before
+    assert [r.message_id for r in reopened.peek(10)] == ["1", "2"]
+    assert not reopened.append(_row(1))
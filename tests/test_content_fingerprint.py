@@ -0,0 +1,207 @@
+"""
+Tests for content-fingerprint dedup of Telegram edits.
+
+Covers the fingerprints themselves (`TutorDexAggregator/content_fingerprint.py`), the raw store's use of
+`rpc/enqueue_telegram_extractions_fingerprinted` (with its fallbacks), and the worker's status-only refresh path.
+`test_rpc_against_postgres` runs `2026-10-18_raw_content_fingerprint.sql` when `TUTORDEX_TEST_DATABASE_URL` points at
+a disposable Postgres (inside a rolled-back transaction).
+"""
+
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+AGG_DIR = Path(__file__).resolve().parents[1] / "TutorDexAggregator"
+if str(AGG_DIR) in sys.path:
+    sys.path.remove(str(AGG_DIR))
+sys.path.insert(0, str(AGG_DIR))
+_loaded_logging_setup = sys.modules.get("logging_setup")
+if _loaded_logging_setup is not None and "TutorDexAggregator" not in str(getattr(_loaded_logging_setup, "__file__", "")):
+    sys.modules.pop("logging_setup", None)
+
+import supabase_raw_persist as srp  # noqa: E402
+import workers.extract_worker_status_refresh as refresh  # noqa: E402
+from content_fingerprint import content_fingerprints, edit_status  # noqa: E402
+
+MIGRATION = AGG_DIR / "supabase sqls" / "2026-10-18_raw_content_fingerprint.sql"
+CHANNEL = "t.me/agency"
+VERSION = SimpleNamespace(pipeline_version="test", schema_version="test")
+POST = "Job Code: 123\nLevel: Sec 3 Math\nRate: $40/hr\nLocation: Bishan"
+
+
+def test_cosmetic_edits_keep_the_content_hash():
+    content, body = content_fingerprints(POST)
+    for edited in ("🔥 " + POST + "\n\n  ", POST.replace("Rate", "💰 Rate"), POST + "\nBUMP!!", POST.replace("\n", "\n\n")):
+        assert content_fingerprints(edited) == (content, body)
+
+
+def test_status_edits_keep_only_the_body_hash():
+    content, body = content_fingerprints(POST)
+    for edited in ("TAKEN\n" + POST, "❌ TAKEN ❌\n" + POST, POST.replace("Job Code", "[Closed] Job Code"), POST + "\nStatus: ❌ Closed"):
+        new_content, new_body = content_fingerprints(edited)
+        assert new_content != content and new_body == body
+        assert edit_status(edited, channel_link=CHANNEL) == "closed"
+    assert edit_status(POST, channel_link=CHANNEL) is None
+    assert content_fingerprints(POST.replace("$40", "$45"))[1] != body
+
+
+def _resp(status_code: int, data: Any = None, text: str = "") -> SimpleNamespace:
+    return SimpleNamespace(status_code=status_code, text=text, json=lambda: data)
+
+
+class _Client:
+    def __init__(self, *, rpc: bool = True, columns: bool = True) -> None:
+        self.rpc = rpc
+        self.columns = columns
+        self.calls: List[tuple] = []
+
+    def post(self, path: str, body: Any, timeout: int = 0, prefer: Optional[str] = None) -> SimpleNamespace:
+        self.calls.append((path, body))
+        if path == "rpc/enqueue_telegram_extractions_fingerprinted":
+            if not self.rpc:
+                return _resp(404, {"code": "PGRST202"})
+            return _resp(200, {"enqueued": 1, "status_only": 1, "unchanged": 2})
+        if path == "rpc/enqueue_telegram_extractions":
+            return _resp(200, len(body["p_message_ids"]))
+        if not self.columns and any("content_hash" in r for r in body):
+            return _resp(400, text='{"code":"PGRST204","message":"Could not find the \'content_hash\' column"}')
+        return _resp(201)
+
+
+def _store(client: _Client) -> srp.SupabaseRawStore:
+    store = srp.SupabaseRawStore(srp.SupabaseRawConfig(url="http://supabase.test", key="k", enabled=False))
+    store.client = client
+    return store
+
+
+def test_enqueue_uses_fingerprint_rpc_and_falls_back_once():
+    store = _store(_Client())
+    assert store.enqueue_extractions(channel_link=CHANNEL, message_ids=["1", "2", "3", "4"], pipeline_version="pv", force=True) == 2
+
+    client = _Client(rpc=False)
+    store = _store(client)
+    assert store.enqueue_extractions(channel_link=CHANNEL, message_ids=["1", "2"], pipeline_version="pv", force=True) == 2
+    assert store.enqueue_extractions(channel_link=CHANNEL, message_ids=["3"], pipeline_version="pv") == 1
+    assert [c[0] for c in client.calls] == [
+        "rpc/enqueue_telegram_extractions_fingerprinted",
+        "rpc/enqueue_telegram_extractions",
+        "rpc/enqueue_telegram_extractions",
+    ]
+
+
+def test_raw_rows_carry_fingerprints_and_drop_them_on_old_schemas():
+    msg = SimpleNamespace(id=7, date="2026-10-18T00:00:00+00:00", raw_text=POST, edit_date=None)
+    row = srp.build_raw_row(channel_link=CHANNEL, channel_id="-100", msg=msg)
+    assert (row["content_hash"], row["body_hash"]) == content_fingerprints(POST)
+
+    client = _Client(columns=False)
+    store = _store(client)
+    assert store.upsert_messages_batch(rows=[row]) == (1, 1)
+    assert store.upsert_messages_batch(rows=[row]) == (1, 1)
+    sent = [body for path, body in client.calls]
+    assert "content_hash" in sent[0][0] and all("content_hash" not in b[0] for b in sent[1:])
+    assert len(sent) == 3
+
+
+def _refresh(monkeypatch, *, raw: Dict[str, Any], existing_meta: Dict[str, Any], patch_ok: bool = True, attempt: int = 0) -> tuple:
+    patches: List[tuple] = []
+    marks: List[Dict[str, Any]] = []
+    monkeypatch.setattr(refresh, "patch_table", lambda url, key, table, where, body, **kw: patches.append((table, where, body)) or patch_ok)
+    monkeypatch.setattr(refresh, "mark_extraction", lambda url, key, extraction_id, **kw: marks.append(kw))
+    out = refresh.process_status_refresh(
+        logger=refresh.logging.getLogger("test"),
+        version=VERSION,
+        url="http://supabase.test",
+        key="k",
+        extraction_id=1,
+        existing_meta=existing_meta,
+        channel_link=CHANNEL,
+        raw=raw,
+        attempt=attempt,
+        max_attempts=3,
+    )
+    return out, patches, marks
+
+
+def test_status_refresh_closes_without_llm(monkeypatch):
+    raw = {"channel_id": "-100", "message_id": "7", "raw_text": "TAKEN\n" + POST}
+    out, patches, marks = _refresh(monkeypatch, raw=raw, existing_meta={"refresh": "status_only"})
+    assert out == "ok"
+    assert patches[0][0] == "assignments" and patches[0][1] == "channel_id=eq.-100&message_id=eq.7&status=eq.open"
+    assert patches[0][2]["status"] == "closed"
+    assert marks[0]["status"] == "ok" and marks[0]["meta_patch"]["refresh"] is None
+    assert "canonical_json" not in marks[0]
+
+
+def test_failed_status_patch_requeues_without_recording_the_status(monkeypatch):
+    raw = {"channel_id": "-100", "message_id": "7", "raw_text": "TAKEN\n" + POST}
+    out, patches, marks = _refresh(monkeypatch, raw=raw, existing_meta={"refresh": "status_only"}, patch_ok=False)
+    assert out == "requeued" and marks[0]["status"] == "pending"
+    assert marks[0]["meta_patch"] == {"attempt": 1}
+
+    out, patches, marks = _refresh(monkeypatch, raw=raw, existing_meta={"refresh": "status_only", "attempt": 2}, patch_ok=False, attempt=2)
+    assert out == "failed" and marks[0]["status"] == "failed"
+    assert "status_refresh" not in marks[0]["meta_patch"]
+
+
+def test_status_refresh_reopens_only_what_it_closed(monkeypatch):
+    raw = {"channel_id": "-100", "message_id": "7", "raw_text": POST}
+    # Marker removed, but nothing says this path closed the assignment (expired or closed by hand): leave it.
+    out, patches, marks = _refresh(monkeypatch, raw=raw, existing_meta={"refresh": "status_only"})
+    assert out == "ok" and not patches
+    assert marks[0]["meta_patch"] == {"refresh": None}
+
+    out, patches, marks = _refresh(monkeypatch, raw=raw, existing_meta={"refresh": "status_only", "status_refresh": {"status": "closed"}})
+    assert out == "ok"
+    assert patches[0][1] == "channel_id=eq.-100&message_id=eq.7&status=eq.closed" and patches[0][2]["status"] == "open"
+
+
+def test_status_refresh_falls_back_for_compilations(monkeypatch):
+    raw = {"channel_id": "-100", "message_id": "7", "raw_text": POST}
+    out, patches, marks = _refresh(monkeypatch, raw=raw, existing_meta={"refresh": "status_only", "compilation": {"segments": []}})
+    assert out is None and not patches and not marks
+
+
+_SCHEMA = """
+create table if not exists public.telegram_messages_raw (
+  id bigserial primary key, channel_link text not null, message_id text not null, message_date timestamptz,
+  deleted_at timestamptz, unique (channel_link, message_id));
+create table if not exists public.telegram_extractions (
+  id bigserial primary key, raw_id bigint not null, pipeline_version text not null, status text not null,
+  channel_link text, message_id text, message_date timestamptz, meta jsonb,
+  created_at timestamptz, updated_at timestamptz, unique (raw_id, pipeline_version));
+"""
+
+
+def test_rpc_against_postgres():
+    dsn = os.environ.get("TUTORDEX_TEST_DATABASE_URL")
+    if not dsn:
+        pytest.skip("TUTORDEX_TEST_DATABASE_URL not set")
+    psycopg = pytest.importorskip("psycopg")
+    call = "select public.enqueue_telegram_extractions_fingerprinted('pv', %s, %s, %s)"
+    with psycopg.connect(dsn) as conn:
+        try:
+            with conn.cursor() as cur:
+                cur.execute(_SCHEMA)
+                cur.execute(MIGRATION.read_text(encoding="utf-8"))
+                cur.execute(
+                    "insert into public.telegram_messages_raw (channel_link, message_id, message_date, content_hash, body_hash) "
+                    "select %s, g::text, now(), 'c' || g, 'b' || g from generate_series(1, 3) g",
+                    (CHANNEL,),
+                )
+                cur.execute(call, (CHANNEL, ["1", "2", "3"], False))
+                assert cur.fetchone()[0] == {"enqueued": 3, "status_only": 0, "unchanged": 0}
+                cur.execute("update public.telegram_extractions set status = 'ok'")
+                # 1: no-op edit, 2: status-only edit, 3: real edit.
+                cur.execute("update public.telegram_messages_raw set content_hash = 'c2x' where message_id = '2'")
+                cur.execute("update public.telegram_messages_raw set content_hash = 'c3x', body_hash = 'b3x' where message_id = '3'")
+                cur.execute(call, (CHANNEL, ["1", "2", "3"], True))
+                assert cur.fetchone()[0] == {"enqueued": 1, "status_only": 1, "unchanged": 1}
+                cur.execute("select message_id, status, meta->>'refresh' from public.telegram_extractions order by message_id")
+                assert cur.fetchall() == [("1", "ok", None), ("2", "pending", "status_only"), ("3", "pending", None)]
+        finally:
+            conn.rollback()
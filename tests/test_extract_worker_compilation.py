@@ -0,0 +1,174 @@
+"""
+Tests for concurrent per-segment compilation extraction (`workers/extract_worker_compilation.py`).
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+
+AGG_DIR = Path(__file__).resolve().parents[1] / "TutorDexAggregator"
+if str(AGG_DIR) in sys.path:
+    sys.path.remove(str(AGG_DIR))
+sys.path.insert(0, str(AGG_DIR))
+
+import supabase_persist  # noqa: E402
+import workers.extract_worker_compilation as comp  # noqa: E402
+from workers.extract_worker_types import VersionInfo  # noqa: E402
+from workers.job_manager import merge_meta  # noqa: E402
+
+VERSION = VersionInfo("pv-test", "sv-test")
+CODES = ["A1", "B2", "C3", "D4"]
+
+
+class _Harness:
+    def __init__(self, monkeypatch, *, llm_delay_s: float = 0.05) -> None:
+        self.lock = threading.Lock()
+        self.inflight = 0
+        self.max_inflight = 0
+        self.llm_calls: List[str] = []
+        self.persisted: List[str] = []
+        self.marks: List[Dict[str, Any]] = []
+        self.fail_llm: set = set()
+        self.fail_persist: set = set()
+        self.llm_delay_s = llm_delay_s
+        self.llm_hooks: Dict[str, Any] = {}
+
+        monkeypatch.setattr(comp, "order_verified_identifiers", lambda raw_message, verified: list(verified))
+        monkeypatch.setattr(
+            comp,
+            "split_compilation_message",
+            lambda raw_message, identifiers: [{"identifier_verbatim": c, "text": f"Job {c}: Sec 3 Maths, $40/hr"} for c in identifiers],
+        )
+        monkeypatch.setattr(comp, "extract_with_llm", self._llm)
+        monkeypatch.setattr(comp, "enrich_payload", lambda **kw: (None, None, None, None))
+        monkeypatch.setattr(comp, "validate_schema", lambda parsed, fn: (True, []))
+        monkeypatch.setattr(comp, "try_report_triage_message", lambda **kw: None)
+        monkeypatch.setattr(comp, "side_effect_suppression_reason", lambda payload, meta: None)
+        monkeypatch.setattr(comp, "mark_extraction", lambda *a, **kw: self.marks.append(kw))
+        monkeypatch.setattr(supabase_persist, "persist_assignment_to_supabase", self._persist)
+
+    def _llm(self, text: str, channel: str, *, cid: str, **kw: Any):
+        code = cid.rsplit(":", 1)[-1]
+        with self.lock:
+            self.llm_calls.append(code)
+            self.inflight += 1
+            self.max_inflight = max(self.max_inflight, self.inflight)
+        try:
+            hook = self.llm_hooks.get(code)
+            if hook is not None:
+                hook()
+            time.sleep(self.llm_delay_s)
+        finally:
+            with self.lock:
+                self.inflight -= 1
+        if code in self.fail_llm:
+            return None, "llm_timeout", 0.01, {"error": "llm_timeout"}
+        return {"assignment_code": code}, None, 0.01, None
+
+    def _persist(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        code = payload["parsed"]["assignment_code"]
+        if code in self.fail_persist:
+            return {"ok": False, "error": "boom"}
+        with self.lock:
+            self.persisted.append(code)
+        return {"ok": True, "action": "inserted"}
+
+    def run(self, *, cfg: Any, attempt: int = 0, existing_meta: Any = None, max_attempts: int = 3) -> str:
+        toggles = SimpleNamespace(use_normalized_text_for_llm=False, materialize_assignments=True, enable_broadcast=False, enable_dms=False, max_attempts=max_attempts)
+        return comp.process_compilation_confirmed(
+            cfg=cfg,
+            logger=SimpleNamespace(),
+            version=VERSION,
+            toggles=toggles,
+            circuit_breaker=None,
+            url="http://sb",
+            key="k",
+            extraction_id=1,
+            existing_meta=existing_meta,
+            attempt=attempt,
+            llm_model=None,
+            channel_link="t.me/agency",
+            message_id="9",
+            raw_id=1,
+            cid="worker:t.me/agency:9:1",
+            raw={"message_id": 9},
+            ch_info={},
+            raw_text="compilation",
+            norm_meta={},
+            compilation_audit={"verified": list(CODES)},
+            comp_details=["Multiple distinct assignment codes"],
+            with_prompt=lambda m: m,
+            broadcast_assignments=None,
+            send_dms=None,
+        )
+
+
+def _cfg(concurrency: int = 4, inflight: int = 8) -> SimpleNamespace:
+    return SimpleNamespace(compilation_segment_concurrency=concurrency, llm_max_inflight=inflight)
+
+
+def test_segments_run_concurrently_and_keep_segment_order(monkeypatch):
+    h = _Harness(monkeypatch)
+    assert h.run(cfg=_cfg()) == "ok"
+    assert h.max_inflight == 4
+    assert sorted(h.persisted) == CODES
+    segments = h.marks[-1]["meta_patch"]["compilation"]["segments"]
+    assert [s["identifier_normalized"] for s in segments] == CODES
+    assert all(s["ok"] for s in segments)
+
+
+@pytest.mark.parametrize("concurrency,inflight,expected", [(1, 8, 1), (4, 2, 2)])
+def test_per_job_and_global_limits_bound_llm_calls(monkeypatch, concurrency, inflight, expected):
+    h = _Harness(monkeypatch)
+    assert h.run(cfg=_cfg(concurrency, inflight)) == "ok"
+    assert h.max_inflight == expected
+    assert len(h.llm_calls) == 4
+
+
+def test_segment_is_persisted_before_slower_siblings_finish(monkeypatch):
+    h = _Harness(monkeypatch, llm_delay_s=0.0)
+    a_persisted = threading.Event()
+    orig_persist = h._persist
+
+    def _persist(payload):
+        res = orig_persist(payload)
+        if payload["parsed"]["assignment_code"] == "A1":
+            a_persisted.set()
+        return res
+
+    monkeypatch.setattr(supabase_persist, "persist_assignment_to_supabase", _persist)
+    # B2's LLM call only returns once A1 is already stored.
+    h.llm_hooks["B2"] = lambda: a_persisted.wait(2) or pytest.fail("A1 not persisted while B2 was in flight")
+    assert h.run(cfg=_cfg()) == "ok"
+
+
+def test_partial_failure_retries_only_failed_segments(monkeypatch):
+    h = _Harness(monkeypatch)
+    h.fail_llm = {"B2"}
+    h.fail_persist = {"D4"}
+    assert h.run(cfg=_cfg(), attempt=0) == "requeued"
+    requeue = h.marks[-1]
+    assert requeue["status"] == "pending"
+    assert requeue["meta_patch"]["attempt"] == 1
+    assert sorted(h.persisted) == ["A1", "C3"]
+
+    meta = merge_meta(None, requeue["meta_patch"])
+    h.fail_llm, h.fail_persist = set(), set()
+    h.llm_calls.clear()
+    assert h.run(cfg=_cfg(), attempt=1, existing_meta=meta) == "ok"
+    assert sorted(h.llm_calls) == ["B2", "D4"]
+    assert sorted(h.persisted) == CODES
+    segments = h.marks[-1]["meta_patch"]["compilation"]["segments"]
+    assert [s["attempt"] for s in segments] == [0, 1, 0, 1]
+
+
+def test_last_attempt_marks_failed_instead_of_requeueing(monkeypatch):
+    h = _Harness(monkeypatch)
+    h.fail_llm = {"C3"}
+    assert h.run(cfg=_cfg(), attempt=2, max_attempts=3) == "failed"
+    assert h.marks[-1]["status"] == "failed"
@@ -77,6 +77,8 @@ def test_worker_oneshot_exits_when_no_jobs(monkeypatch, worker_main_module):
         return []
 
     monkeypatch.setattr(worker_main_module, "claim_jobs", _claim_jobs)
+    # Schema without `claim_telegram_extractions_with_payload`: falls back to the bare claim RPC.
+    monkeypatch.setattr(worker_main_module, "claim_jobs_with_payload", lambda *a, **k: None)
 
     # Ensure we don't sleep in oneshot mode.
     monkeypatch.setattr(worker_main_module.time, "sleep", lambda _: (_ for _ in ()).throw(AssertionError("sleep called")))
@@ -111,6 +113,7 @@ def test_worker_dependency_health_handler_uses_count_exact(monkeypatch, worker_m
     monkeypatch.setattr(worker_main_module, "bootstrap_worker", lambda: (cfg, logger, version, object()))
     monkeypatch.setattr(worker_main_module, "supabase_cfg", lambda _cfg: ("http://sb", "key"))
     monkeypatch.setattr(worker_main_module, "claim_jobs", lambda *a, **k: [])
+    monkeypatch.setattr(worker_main_module, "claim_jobs_with_payload", lambda *a, **k: [])
     monkeypatch.setattr(worker_main_module.time, "sleep", lambda _: None)
     monkeypatch.setattr(worker_main_module.time, "time", lambda: 0.0)
 
@@ -160,12 +163,6 @@ def test_worker_stops_after_max_jobs(monkeypatch, worker_main_module):
 
     # No-op metrics.
     for name in (
-        "queue_pending",
-        "queue_processing",
-        "queue_ok",
-        "queue_failed",
-        "queue_oldest_pending_age_seconds",
-        "queue_oldest_processing_age_seconds",
         "worker_job_latency_seconds",
         "worker_jobs_processed_total",
         "worker_requeued_stale_jobs_total",
@@ -173,15 +170,40 @@ def test_worker_stops_after_max_jobs(monkeypatch, worker_main_module):
         monkeypatch.setattr(worker_main_module, name, _NoopMetric())
 
     monkeypatch.setattr(worker_main_module, "requeue_stale_jobs", lambda *a, **k: 0)
-    monkeypatch.setattr(worker_main_module, "get_queue_counts", lambda *a, **k: {})
-    monkeypatch.setattr(worker_main_module, "get_oldest_created_age_seconds", lambda *a, **k: 0.0)
+    monkeypatch.setattr(
+        worker_main_module, "QueueStatsCollector", lambda *a, **k: SimpleNamespace(collect=lambda *a, **k: False)
+    )
 
     jobs = [{"id": 1, "raw_id": 2, "channel_link": "t.me/x", "message_id": 3}]
-    monkeypatch.setattr(worker_main_module, "claim_jobs", lambda *a, **k: list(jobs))
-    monkeypatch.setattr(worker_main_module, "work_one", lambda **kwargs: "ok")
+    monkeypatch.setattr(
+        worker_main_module, "claim_jobs", lambda *a, **k: (_ for _ in ()).throw(AssertionError("bare claim used"))
+    )
+    monkeypatch.setattr(worker_main_module, "claim_jobs_with_payload", lambda *a, **k: list(jobs))
+    seen = []
+    monkeypatch.setattr(worker_main_module, "work_one", lambda **kwargs: seen.append(kwargs["job"]) or "ok")
 
     worker_main_module.main()
 
+    assert seen == jobs
+
+
+def test_claim_jobs_with_payload_missing_rpc_returns_none(monkeypatch):
+    _ensure_aggregator_sys_path()
+    import importlib
+
+    job_manager = importlib.import_module("workers.job_manager")
+
+    def _call_rpc(*a: Any, **k: Any):
+        raise RuntimeError("Supabase RPC 'claim_telegram_extractions_with_payload' failed: status=404 body={}")
+
+    monkeypatch.setattr(job_manager, "call_rpc", _call_rpc)
+    assert job_manager.claim_jobs_with_payload("http://sb", "key", pipeline_version="pv", limit=5) is None
+
+    monkeypatch.setattr(job_manager, "call_rpc", lambda *a, **k: [{"id": 1, "raw": None, "channel": None}])
+    assert job_manager.claim_jobs_with_payload("http://sb", "key", pipeline_version="pv", limit=5) == [
+        {"id": 1, "raw": None, "channel": None}
+    ]
+
 
 def test_resolve_side_effect_toggles_respects_explicit_flags(worker_main_module):
     cfg = SimpleNamespace(
@@ -0,0 +1,183 @@
+"""
+Tests for the deterministic pre-LLM prefilter (`workers/extract_worker_prefilter.py`) and its wiring in `work_one`.
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+
+AGG_DIR = Path(__file__).resolve().parents[1] / "TutorDexAggregator"
+
+
+def _ensure_aggregator_sys_path() -> None:
+    agg_path = str(AGG_DIR)
+    if agg_path in sys.path:
+        sys.path.remove(agg_path)
+    sys.path.insert(0, agg_path)
+
+
+_ensure_aggregator_sys_path()
+
+import workers.extract_worker_prefilter as pf  # noqa: E402
+from normalize import normalize_text  # noqa: E402
+from workers.extract_worker_types import VersionInfo  # noqa: E402
+from workers.utils import sha256_hash  # noqa: E402
+
+VERSION = VersionInfo("pv-test", "sv-test")
+ASSIGNMENT = (
+    "Job ID: T1234\n"
+    "Level and Subject: Sec 3 E Maths\n"
+    "Location/Area: Tampines St 81 (520123)\n"
+    "Hourly Rate: $45-55/hr\n"
+    "Time: Mon/Wed after 7pm"
+)
+
+
+class _Counter:
+    def __init__(self) -> None:
+        self.values: Dict[tuple, float] = {}
+
+    def labels(self, **kw: Any) -> "_Counter":
+        self._key = tuple(sorted(kw.items()))
+        return self
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.values[self._key] = self.values.get(self._key, 0.0) + amount
+
+    def by(self, **kw: Any) -> float:
+        return sum(v for k, v in self.values.items() if all((name, val) in k for name, val in kw.items()))
+
+
+@pytest.fixture(autouse=True)
+def metrics(monkeypatch):
+    pf.reset_state()
+    decisions, saved = _Counter(), _Counter()
+    monkeypatch.setattr(pf, "worker_prefilter_decisions_total", decisions)
+    monkeypatch.setattr(pf, "worker_prefilter_saved_llm_seconds_total", saved)
+    yield SimpleNamespace(decisions=decisions, saved=saved)
+    pf.reset_state()
+
+
+def _cfg(**kw: Any) -> SimpleNamespace:
+    base = dict(prefilter_enabled=True, prefilter_min_chars=30, prefilter_min_latin_ratio=0.5, prefilter_duplicate_ttl_s=3600, prefilter_llm_seconds_estimate=5.0)
+    base.update(kw)
+    return SimpleNamespace(**base)
+
+
+def _run(raw: str, cfg: Any = None, extraction_id: Any = 1) -> "pf.PrefilterDecision":
+    norm = normalize_text(raw)
+    return pf.prefilter_message(cfg=cfg or _cfg(), version=VERSION, raw_text=raw, normalized_text=norm, sha256=sha256_hash(norm), extraction_id=extraction_id)
+
+
+@pytest.mark.parametrize(
+    "raw,reason",
+    [
+        ("Taken, thank you!", pf.REASON_TOO_SHORT),
+        ("补习老师招聘 中三数学 淡滨尼 每小时四十五元 周一周三晚上七点以后 请联系我们", pf.REASON_NON_LATIN_SCRIPT),
+        ("Calling all tutors! We have many job opportunities, follow our channel for new posts every day.", pf.REASON_NON_ASSIGNMENT),
+    ],
+)
+def test_obvious_non_assignments_are_skipped_with_reason(raw, reason, metrics):
+    decision = _run(raw)
+    assert decision.skip and decision.reason == reason
+    assert decision.meta()["route"] == "skip"
+    assert metrics.decisions.by(decision="skip", reason=reason) == 1
+    assert metrics.saved.by(reason=reason) == 5.0
+
+
+def test_real_assignment_passes_to_standard_route(metrics):
+    decision = _run(ASSIGNMENT)
+    assert not decision.skip and decision.route == "standard"
+    assert decision.non_assignment == (False, None, "")
+    assert metrics.decisions.by(decision="pass", reason="standard") == 1
+    assert metrics.saved.values == {}
+
+
+def test_corpus_assignments_are_never_skipped_by_the_new_checks():
+    import utilities.benchmark_pipeline as bench
+
+    for case in bench.load_corpus():
+        decision = _run(case.raw_text)
+        assert decision.reason in {None, pf.REASON_NON_ASSIGNMENT}, case.source
+
+
+def test_suspected_compilation_keeps_non_assignment_verdict_for_later(monkeypatch):
+    monkeypatch.setattr(pf, "is_compilation", lambda text: (True, ["Repeated 'apply now'"]))
+    decision = _run("Calling all tutors! Apply now for the new job opportunities listed below, updated daily.")
+    assert not decision.skip and decision.route == "compilation"
+    assert decision.non_assignment[0] is True
+    assert "non_assignment_detection" in decision.details
+
+
+def test_rejected_text_is_skipped_as_duplicate_until_ttl(monkeypatch, metrics):
+    now = [1000.0]
+    monkeypatch.setattr(pf.time, "time", lambda: now[0])
+    first = _run("Closed, thanks all!", extraction_id=7)
+    assert first.reason == pf.REASON_TOO_SHORT
+
+    again = _run("Closed,  thanks all!", extraction_id=8)
+    assert again.reason == pf.REASON_DUPLICATE_TEXT
+    assert again.details["duplicate_of"] == {"reason": pf.REASON_TOO_SHORT, "extraction_id": 7}
+
+    now[0] += 3601
+    assert _run("Closed, thanks all!", extraction_id=9).reason == pf.REASON_TOO_SHORT
+
+
+def test_disabled_prefilter_only_runs_the_existing_detectors():
+    cfg = _cfg(prefilter_enabled=False)
+    assert not _run("Taken, thank you!", cfg).skip
+    assert _run("Calling all tutors! We have many job opportunities, follow our channel for new posts every day.", cfg).reason == pf.REASON_NON_ASSIGNMENT
+
+
+def test_saved_seconds_track_observed_llm_latency(metrics):
+    assert pf.llm_seconds_estimate(_cfg()) == 5.0
+    pf.observe_llm_seconds(10.0)
+    pf.observe_llm_seconds(0)
+    assert pf.llm_seconds_estimate(_cfg()) == 10.0
+    pf.observe_llm_seconds(20.0)
+    assert pf.llm_seconds_estimate(_cfg()) == pytest.approx(12.0)
+    _run("Taken, thank you!")
+    assert metrics.saved.by(reason=pf.REASON_TOO_SHORT) == pytest.approx(12.0)
+
+
+def test_work_one_skips_before_any_model_call(monkeypatch):
+    import workers.extract_worker_job as job_mod
+
+    marked: List[Dict[str, Any]] = []
+    monkeypatch.setattr(job_mod, "get_prompt_metadata", lambda fn: None)
+    monkeypatch.setattr(job_mod, "get_examples_metadata", lambda fn, channel: None)
+    monkeypatch.setattr(job_mod, "channel_info_cached", lambda **kw: {})
+    monkeypatch.setattr(job_mod, "try_report_triage_message", lambda **kw: None)
+    monkeypatch.setattr(job_mod, "mark_extraction", lambda *a, **kw: marked.append(kw))
+
+    def _no_llm(*a: Any, **kw: Any) -> Any:
+        raise AssertionError("model path reached")
+
+    monkeypatch.setattr(job_mod, "confirm_compilation_identifiers", _no_llm)
+    monkeypatch.setattr(job_mod, "process_standard_message", _no_llm)
+
+    toggles = SimpleNamespace(max_attempts=3, backoff_base_s=0, backoff_max_s=0)
+    logger = SimpleNamespace(info=lambda *a, **k: None, debug=lambda *a, **k: None, log=lambda *a, **k: None, isEnabledFor=lambda *a: False)
+    job = {"id": 11, "channel_link": "t.me/agency", "message_id": "5", "channel": {}, "raw": {"message_id": 5, "raw_text": "FILLED"}}
+    status = job_mod.work_one(
+        cfg=_cfg(llm_model_name="m"),
+        logger=logger,
+        version=VERSION,
+        toggles=toggles,
+        circuit_breaker=None,
+        channel_cache={},
+        url="http://sb",
+        key="k",
+        job=job,
+        broadcast_assignments=None,
+        send_dms=None,
+    )
+    assert status == "skipped"
+    assert marked[0]["status"] == "skipped"
+    # Status-only posts keep the detector's reason code even though they are also short.
+    assert marked[0]["meta_patch"]["reason"] == pf.REASON_NON_ASSIGNMENT
+    assert marked[0]["meta_patch"]["non_assignment_detection"]["message_type"]
+    assert marked[0]["meta_patch"]["prefilter"]["route"] == "skip"
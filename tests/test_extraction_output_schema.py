@@ -0,0 +1,148 @@
+"""
+Tests for constrained decoding of extraction output (`TutorDexAggregator/extraction_output_schema.py`) and its use in
+`extract_key_info.extract_assignment_with_model`, against the mocked streaming server from
+`utilities/benchmark_constrained_decoding.py`.
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+AGG_DIR = Path(__file__).resolve().parents[1] / "TutorDexAggregator"
+
+
+def _ensure_aggregator_sys_path() -> None:
+    agg_path = str(AGG_DIR)
+    if agg_path in sys.path:
+        sys.path.remove(agg_path)
+    sys.path.insert(0, agg_path)
+
+
+_ensure_aggregator_sys_path()
+
+import extraction_output_schema as eos  # noqa: E402
+import utilities.benchmark_constrained_decoding as bench  # noqa: E402
+from utilities.benchmark_pipeline import load_corpus  # noqa: E402
+
+
+def test_schema_matches_prompt_output_block():
+    prompt = (AGG_DIR / "prompts" / "system_prompt_live.txt").read_text(encoding="utf-8")
+    block = prompt.split("OUTPUT SCHEMA (JSON)", 1)[1].split("KEY EXTRACTION RULES", 1)[0]
+    prompt_keys = re.findall(r'"(\w+)":', block)
+
+    def walk(schema):
+        for key, sub in schema.get("properties", {}).items():
+            yield key
+            yield from walk(sub)
+
+    assert list(walk(eos.ASSIGNMENT_OUTPUT_SCHEMA)) == prompt_keys
+
+
+def test_schema_max_tokens_fits_every_corpus_answer():
+    for case in load_corpus():
+        answer = bench._project(json.loads(case.llm_output), eos.ASSIGNMENT_OUTPUT_SCHEMA)
+        needed = len(bench.mock_tokens(json.dumps(answer, ensure_ascii=False, indent=2)))
+        budget = eos.schema_max_tokens(case.raw_text)
+        assert needed <= budget, case.source
+        assert budget < 6144
+
+
+def test_schema_max_tokens_respects_ceiling():
+    assert eos.schema_max_tokens("x" * 50_000, ceiling=300) == 300
+    assert eos.schema_max_tokens("short") < eos.schema_max_tokens("x" * 2000)
+
+
+def test_gbnf_defines_every_rule_it_references():
+    grammar = eos.schema_to_gbnf()
+    rules = {}
+    for line in grammar.strip().splitlines():
+        name, body = line.split(" ::= ", 1)
+        rules[name] = body
+    assert "root" in rules
+    for name, body in rules.items():
+        stripped = re.sub(r'"(?:[^"\\]|\\.)*"', " ", body)
+        stripped = re.sub(r"\[(?:[^\]\\]|\\.)*\]", " ", stripped)
+        stripped = re.sub(r"\{\d+(?:,\d+)?\}", " ", stripped)
+        for ref in re.findall(r"[a-z][a-z0-9-]*", stripped):
+            assert ref in rules, f"{name} references undefined rule {ref}"
+    assert '"\\"additional_remarks\\""' in rules["assignment"]
+    assert "char{0,1500}" in grammar
+
+
+@pytest.mark.parametrize("mode", ["json_schema", "gbnf"])
+def test_constraint_payload_shapes(mode):
+    payload = eos.constraint_payload(mode)
+    if mode == "json_schema":
+        assert payload["response_format"]["json_schema"]["schema"] is eos.ASSIGNMENT_OUTPUT_SCHEMA
+    else:
+        assert payload["grammar"].startswith("root ::= ")
+    assert eos.constraint_payload("off") == {}
+    assert eos.normalize_constraint_mode("GBNF") == "gbnf"
+    assert eos.normalize_constraint_mode("bogus") == "off"
+
+
+def test_json_object_stream_stops_at_top_level_close():
+    s = eos.JsonObjectStream()
+    pieces = ["Here you go:\n", '{"a": "brace } in', ' string", "b": {"c": 1}', "}", "\nAnything else?"]
+    closed = [s.feed(p) for p in pieces]
+    assert closed == [False, False, False, True, True]
+    assert json.loads(s.answer()[s.answer().index("{"):]) == {"a": "brace } in string", "b": {"c": 1}}
+
+
+def test_json_object_stream_skips_think_prelude():
+    s = eos.JsonObjectStream()
+    assert not s.feed("<thi")
+    assert not s.feed('nk>example {"x": 1} ')
+    assert not s.feed('</think>\n{"y": ')
+    assert s.feed("2}")
+    assert s.answer().endswith('{"y": 2}')
+
+
+@pytest.fixture(scope="module")
+def cases():
+    return load_corpus()[:16]
+
+
+def test_constrained_decoding_cuts_tokens_and_parse_failures(cases):
+    results = {(r["constraint"], r["stream"]): r for r in bench.run_benchmark(cases, defect_every=8)}
+    off = results[("off", False)]
+    assert off["parse_failure_rate"] == pytest.approx(2 / 16)
+    for mode in ("json_schema", "gbnf"):
+        for stream in (False, True):
+            r = results[(mode, stream)]
+            assert r["failures"] == 0 and r["parse_failure_rate"] == 0.0
+            assert r["tokens_per_extraction"] < off["tokens_per_extraction"] * 0.7
+    # Streaming stops reading after the object closes: the trailing chatter is never consumed.
+    assert results[("off", True)]["tokens_per_extraction"] < off["tokens_per_extraction"]
+    assert results[("off", True)]["early_stops"] == 14
+    assert results[("json_schema", True)]["early_stops"] == 16
+
+
+def test_requests_carry_constraint_and_tight_max_tokens(cases):
+    with bench.MockLLMServer(cases[:2]) as server:
+        bench.run_mode(server, cases[:2], constraint="gbnf", stream=False)
+        bench.run_mode(server, cases[:2], constraint="off", stream=False)
+    gbnf, off = server.requests[0], server.requests[-1]
+    assert "grammar" in gbnf and "grammar" not in off
+    assert gbnf["max_tokens"] == eos.schema_max_tokens(cases[0].raw_text, ceiling=off["max_tokens"])
+    assert gbnf["max_tokens"] < off["max_tokens"]
+
+
+def test_backend_without_schema_support_falls_back_once(cases):
+    with bench.MockLLMServer(cases[:4], defect_every=0, reject_constraints=True) as server:
+        r = bench.run_mode(server, cases[:4], constraint="json_schema", stream=False)
+    assert r["failures"] == 0
+    constrained = [p for p in server.requests if "response_format" in p]
+    # One rejected request, then the rest of the run goes out unconstrained with the normal budget.
+    assert len(constrained) == 1
+    assert len(server.requests) == 5
+
+
+def test_unrelated_rejection_fails_the_request_and_keeps_the_constraint(cases):
+    with bench.MockLLMServer(cases[:3], defect_every=0, reject_constraints=True, reject_message="maximum context length exceeded") as server:
+        r = bench.run_mode(server, cases[:3], constraint="json_schema", stream=False)
+    assert r["failures"] == 3
+    assert len(server.requests) == 3 and all("response_format" in p for p in server.requests)
@@ -0,0 +1,68 @@
+"""
+Tests for routing unfiltered facet requests to the incrementally maintained counters.
+
+See `TutorDexAggregator/supabase sqls/2026-10-18_open_assignment_facet_counts.sql`.
+"""
+
+from typing import Any, List
+from unittest.mock import MagicMock
+
+from shared.supabase_client import SupabaseConfig
+from TutorDexBackend.supabase_store import SupabaseStore
+
+
+def _resp(status_code: int, data: Any = None) -> MagicMock:
+    resp = MagicMock()
+    resp.status_code = status_code
+    resp.text = ""
+    resp.json.return_value = data
+    return resp
+
+
+def _store(*responses: MagicMock) -> SupabaseStore:
+    store = SupabaseStore(SupabaseConfig(url="http://supabase.test", key="k", enabled=False))
+    store.client = MagicMock()
+    store.client.post.side_effect = list(responses)
+    return store
+
+
+def _paths(store: SupabaseStore) -> List[str]:
+    return [c.args[0] for c in store.client.post.call_args_list]
+
+
+def test_unfiltered_facets_read_counters():
+    counters = {"total": 3, "levels": [], "agencies": [{"value": "t.me/someagency", "count": 3}]}
+    store = _store(_resp(200, counters))
+
+    facets = store.open_assignment_facets(location_query="  ")
+
+    assert _paths(store) == ["rpc/open_assignment_facet_counts"]
+    assert facets["total"] == 3
+
+
+def test_filtered_facets_use_aggregating_rpc():
+    store = _store(_resp(200, {"total": 1}))
+
+    assert store.open_assignment_facets(level="Primary") == {"total": 1}
+    assert _paths(store) == ["rpc/open_assignment_facets"]
+    assert store.client.post.call_args.args[1] == {"p_level": "Primary"}
+
+
+def test_missing_counters_rpc_falls_back_once():
+    store = _store(_resp(404), _resp(200, [{"total": 2}]), _resp(200, {"total": 2}))
+
+    assert store.open_assignment_facets() == {"total": 2}
+    assert store.open_assignment_facets() == {"total": 2}
+    assert _paths(store) == [
+        "rpc/open_assignment_facet_counts",
+        "rpc/open_assignment_facets",
+        "rpc/open_assignment_facets",
+    ]
+
+
+def test_transient_counters_error_falls_back_without_disabling():
+    store = _store(_resp(503), _resp(200, {"total": 5}), _resp(200, {"total": 5}))
+
+    assert store.open_assignment_facets() == {"total": 5}
+    assert store.open_assignment_facets() == {"total": 5}
+    assert _paths(store)[-1] == "rpc/open_assignment_facet_counts"
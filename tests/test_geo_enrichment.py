@@ -1,7 +1,9 @@
 import json
 import os
+import random
 import tempfile
 import unittest
+from pathlib import Path
 
 
 from TutorDexAggregator import geo_enrichment as geo
@@ -88,6 +90,136 @@ class TestGeoEnrichment(unittest.TestCase):
         self.assertTrue(res.meta.get("ok"))
 
 
+class TestRegionIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self._old_region = os.environ.get("REGION_GEOJSON_PATH")
+        self._old_prebuilt = os.environ.get("PREBUILT_ARTIFACTS_ENABLED")
+        os.environ["PREBUILT_ARTIFACTS_ENABLED"] = "0"
+        geo._load_regions.cache_clear()
+
+    def tearDown(self) -> None:
+        for key, old in (("REGION_GEOJSON_PATH", self._old_region), ("PREBUILT_ARTIFACTS_ENABLED", self._old_prebuilt)):
+            if old is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = old
+        geo._load_regions.cache_clear()
+
+    def test_matches_linear_scan_on_sweep(self):
+        os.environ["REGION_GEOJSON_PATH"] = str(Path(geo.__file__).resolve().parent / "data" / "2019_region_boundary.geojson")
+        regions, err = geo._load_regions()
+        self.assertIsNone(err)
+        index = geo._region_index()
+
+        rng = random.Random(7)
+        points = [(rng.uniform(index.x0 - 0.01, index.x1 + 0.01), rng.uniform(index.y0 - 0.01, index.y1 + 0.01)) for _ in range(300)]
+        verts = [pt for _, polys in regions for poly in polys for ring in poly for pt in ring]
+        for _ in range(100):
+            a, b = rng.choice(verts), rng.choice(verts)
+            # Exactly on vertices, on a vertex's latitude (ray through a vertex), and within float noise of one.
+            points += [(a[0], a[1]), ((a[0] + b[0]) / 2, a[1]), (a[0] + rng.uniform(-1e-9, 1e-9), a[1] + rng.uniform(-1e-9, 1e-9))]
+
+        for lon, lat in points:
+            self.assertEqual(index._lookup(lon, lat), geo._lookup_region_linear(regions, lon, lat), (lon, lat))
+        found = {geo._lookup_region_linear(regions, lon, lat) for lon, lat in points}
+        self.assertTrue({"Central", "East", "North", "North-East", "West", None} <= found)
+
+    def test_holes_and_file_order(self):
+        square = lambda x0, y0, x1, y1: [[x0, y0], [x1, y0], [x1, y1], [x0, y1], [x0, y0]]  # noqa: E731
+        geojson = {
+            "type": "FeatureCollection",
+            "features": [
+                # West: big square with a hole; East overlaps it and comes later, so West wins the overlap.
+                {"properties": {"Name": "kml_1"}, "geometry": {"type": "Polygon", "coordinates": [square(103.0, 1.0, 103.2, 1.2), square(103.05, 1.05, 103.1, 1.1)]}},
+                {"properties": {"Name": "kml_4"}, "geometry": {"type": "MultiPolygon", "coordinates": [[square(103.0, 1.0, 103.3, 1.3)]]}},
+            ],
+        }
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "regions.geojson")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(geojson, f)
+            os.environ["REGION_GEOJSON_PATH"] = path
+            geo._load_regions.cache_clear()
+            self.assertEqual(geo.lookup_region(lat=1.15, lon=103.15), ("West", None))
+            self.assertEqual(geo.lookup_region(lat=1.07, lon=103.07), ("East", None))
+            self.assertEqual(geo.lookup_region(lat=1.25, lon=103.25), ("East", None))
+            self.assertEqual(geo.lookup_region(lat=1.5, lon=103.25), (None, "region_not_found"))
+            # Memoized repeat lookups return the same answer.
+            self.assertEqual(geo.lookup_region(lat=1.07, lon=103.07), ("East", None))
+
+
+class TestNearestMrt(unittest.TestCase):
+    def setUp(self) -> None:
+        self._old = {k: os.environ.get(k) for k in ("MRT_DATA_JSON_PATH", "PREBUILT_ARTIFACTS_ENABLED")}
+        os.environ["PREBUILT_ARTIFACTS_ENABLED"] = "0"
+        self._tmpdir = tempfile.TemporaryDirectory()
+        geo._load_mrt_stations.cache_clear()
+
+    def tearDown(self) -> None:
+        for key, old in self._old.items():
+            if old is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = old
+        geo._load_mrt_stations.cache_clear()
+        self._tmpdir.cleanup()
+
+    def _use_stations(self, rows):
+        path = os.path.join(self._tmpdir.name, "mrt.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(rows, f)
+        os.environ["MRT_DATA_JSON_PATH"] = path
+        geo._load_mrt_stations.cache_clear()
+
+    @staticmethod
+    def _linear(stations, lat, lon):
+        best, best_d = None, float("inf")
+        for s in stations:
+            d = geo._haversine_m(lat, lon, s["latitude"], s["longitude"])
+            if d < best_d:
+                best, best_d = s, d
+        return best["name"], int(round(best_d))
+
+    def test_matches_linear_scan_on_dataset(self):
+        os.environ["MRT_DATA_JSON_PATH"] = str(Path(geo.__file__).resolve().parent / "data" / "mrt_data.json")
+        stations, err = geo._load_mrt_stations()
+        self.assertIsNone(err)
+        rng = random.Random(11)
+        points = [(rng.uniform(1.2, 1.48), rng.uniform(103.6, 104.05)) for _ in range(400)]
+        points += [(s["latitude"], s["longitude"]) for s in stations[:50]]
+
+        batch, err = geo.lookup_nearest_mrt_batch(points, k=3)
+        self.assertIsNone(err)
+        for (lat, lon), ranked in zip(points, batch):
+            expected = self._linear(stations, lat, lon)
+            single, _ = geo.lookup_nearest_mrt(lat=lat, lon=lon)
+            self.assertEqual((single["name"], single["distance_m"]), expected)
+            self.assertEqual((ranked[0]["name"], ranked[0]["distance_m"]), expected)
+            self.assertEqual(len(ranked), 3)
+            self.assertEqual([r["distance_m"] for r in ranked], sorted(r["distance_m"] for r in ranked))
+
+    def test_ties_keep_dataset_order_and_invalid_points_are_empty(self):
+        self._use_stations(
+            [
+                # Exactly equidistant from lon=103.75 (all values are exact binary fractions).
+                {"name": "West", "address": "W", "latitude": 1.3, "longitude": 103.5, "line": "EW"},
+                {"name": "East", "address": "E", "latitude": 1.3, "longitude": 104.0, "line": "NS"},
+                {"name": "Far", "address": "F", "latitude": 1.6, "longitude": 103.75, "line": "CC"},
+            ]
+        )
+        self.assertEqual(geo._haversine_m(1.3, 103.75, 1.3, 103.5), geo._haversine_m(1.3, 103.75, 1.3, 104.0))
+        mrt, err = geo.lookup_nearest_mrt(lat=1.3, lon=103.75)
+        self.assertIsNone(err)
+        self.assertEqual(mrt["name"], "West")
+
+        batch, err = geo.lookup_nearest_mrt_batch([(1.3, 103.75), (None, 103.8), ("1.3", "103.91")], k=5)
+        self.assertIsNone(err)
+        self.assertEqual([r["name"] for r in batch[0]], ["West", "East", "Far"])
+        self.assertEqual(batch[1], [])
+        self.assertEqual(batch[2][0]["name"], "East")
+        self.assertEqual(batch[2][0]["line"], "NS")
+
+
 if __name__ == "__main__":
     unittest.main()
 
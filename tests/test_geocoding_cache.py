@@ -0,0 +1,226 @@
+"""
+Tests for the shared geocode cache (`shared/geocoding_cache.py`).
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import pytest
+
+import shared.geocoding_cache as gc
+
+
+class _FakeRedis:
+    """In-process stand-in for the get/set/delete/pipeline subset of redis-py."""
+
+    def __init__(self) -> None:
+        self.data: Dict[str, Any] = {}
+        self.ttls: Dict[str, Optional[int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        return self.data.get(key)
+
+    def set(self, key: str, value: Any, ex: Optional[int] = None, nx: bool = False) -> bool:
+        with self._lock:
+            if nx and key in self.data:
+                return False
+            self.data[key] = value
+            self.ttls[key] = ex
+            return True
+
+    def delete(self, key: str) -> int:
+        return 1 if self.data.pop(key, None) is not None else 0
+
+    def pipeline(self, transaction: bool = True) -> "_FakePipeline":
+        return _FakePipeline(self)
+
+    def close(self) -> None:
+        pass
+
+
+class _FakePipeline:
+    def __init__(self, r: _FakeRedis) -> None:
+        self.r = r
+        self.ops = []
+
+    def set(self, key: str, value: Any) -> None:
+        self.ops.append((key, value))
+
+    def execute(self) -> None:
+        for key, value in self.ops:
+            self.r.set(key, value)
+        self.ops = []
+
+
+@pytest.fixture
+def redis(monkeypatch) -> _FakeRedis:
+    fake = _FakeRedis()
+    monkeypatch.setattr(gc, "_connect", lambda url: fake)
+    return fake
+
+
+def _cache(tmp_path, **kw) -> gc.GeocodeCache:
+    kw.setdefault("redis_url", "redis://fake")
+    kw.setdefault("rate_limit_per_s", 0)
+    return gc.GeocodeCache(gazetteer_path=tmp_path / "gazetteer.csv", **kw)
+
+
+def test_gazetteer_answers_without_fetch(tmp_path, redis):
+    gc.write_gazetteer(tmp_path / "gazetteer.csv", {"520123": (1.35, 103.94)})
+    cache = _cache(tmp_path)
+
+    def _fetch():
+        raise AssertionError("fetched despite gazetteer hit")
+
+    assert cache.get(gc.POSTAL_COORDS, "520123", _fetch) == (1.35, 103.94)
+    assert redis.data == {}
+
+
+def test_fetch_result_is_shared_through_redis(tmp_path, redis):
+    calls = []
+    first = _cache(tmp_path)
+    assert first.get(gc.POSTAL_COORDS, "640123", lambda: calls.append(1) or (1.34, 103.7)) == (1.34, 103.7)
+    assert first.get(gc.POSTAL_COORDS, "640123", lambda: calls.append(1) or (0.0, 0.0)) == (1.34, 103.7)
+
+    # A new process (fresh memo) reads the answer back from Redis.
+    second = _cache(tmp_path)
+    assert second.get(gc.POSTAL_COORDS, "640123") == (1.34, 103.7)
+    assert calls == [1]
+    assert redis.ttls["tutordex:geocode:postal:640123"] is None
+
+
+def test_not_found_is_cached_with_ttl_but_transient_failure_is_not(tmp_path, redis):
+    cache = _cache(tmp_path, negative_ttl_s=60)
+    assert cache.get(gc.ADDRESS_POSTAL, "nowhere", lambda: None) is None
+    assert redis.ttls["tutordex:geocode:address_postal:nowhere"] == 60
+
+    def _down():
+        raise gc.GeocodeUnavailable("status=503")
+
+    assert cache.get(gc.POSTAL_COORDS, "730001", _down) is None
+    assert "tutordex:geocode:postal:730001" not in redis.data
+    assert cache.get(gc.POSTAL_COORDS, "730001", lambda: (1.43, 103.79)) == (1.43, 103.79)
+
+
+def test_disabled_fetch_still_reads_cache(tmp_path, redis):
+    _cache(tmp_path).seed(gc.POSTAL_COORDS, [("310123", [1.33, 103.85])])
+    cache = _cache(tmp_path)
+    assert cache.get(gc.POSTAL_COORDS, "310123") == (1.33, 103.85)
+    assert cache.get(gc.POSTAL_COORDS, "310999") is None
+
+
+def test_concurrent_misses_fetch_once(tmp_path, redis):
+    cache = _cache(tmp_path)
+    calls = []
+    release = threading.Event()
+
+    def _fetch():
+        calls.append(1)
+        release.wait(2)
+        return (1.3, 103.8)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get(gc.POSTAL_COORDS, "560123", _fetch))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    release.set()
+    for t in threads:
+        t.join()
+    assert calls == [1]
+    assert results == [(1.3, 103.8)] * 8
+    assert not any(k.startswith("tutordex:geocode:lock:") for k in redis.data)
+
+
+def test_other_process_holding_the_lock_is_waited_for(tmp_path, redis, monkeypatch):
+    cache = _cache(tmp_path, wait_s=5)
+    redis.set("tutordex:geocode:lock:postal:600123", "1")
+
+    def _sleep(s):
+        # The other process finishes its fetch while we wait.
+        redis.set("tutordex:geocode:postal:600123", "[1.33, 103.74]")
+
+    monkeypatch.setattr(gc.time, "sleep", _sleep)
+
+    def _fetch():
+        raise AssertionError("fetched while another process held the lock")
+
+    assert cache.get(gc.POSTAL_COORDS, "600123", _fetch) == (1.33, 103.74)
+
+
+def test_local_rate_limiter_spaces_calls(tmp_path, monkeypatch):
+    cache = gc.GeocodeCache(rate_limit_per_s=2.0, wait_s=0.6)
+    slept = []
+    now = [100.0]
+    monkeypatch.setattr(gc.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(gc.time, "sleep", lambda s: slept.append(round(s, 3)))
+
+    assert [cache.acquire_rate_slot() for _ in range(3)] == [True, True, False]
+    assert slept == [0.0, 0.5]
+
+
+def test_transient_failures_retry_through_the_rate_limiter(tmp_path, redis, monkeypatch):
+    cache = _cache(tmp_path, retries=3, backoff_s=0.5, wait_s=1.0)
+    slots = []
+    slept = []
+    monkeypatch.setattr(cache, "acquire_rate_slot", lambda: slots.append(1) or True)
+    monkeypatch.setattr(gc.time, "sleep", lambda s: slept.append(s))
+    answers = iter([gc.GeocodeUnavailable("status=429", retry_after=2.0), gc.GeocodeUnavailable("status=503"), (1.3, 103.8)])
+
+    def _flaky():
+        a = next(answers)
+        if isinstance(a, Exception):
+            raise a
+        return a
+
+    assert cache.get(gc.POSTAL_COORDS, "730002", _flaky) == (1.3, 103.8)
+    assert len(slots) == 3
+    assert slept == [2.0, 1.0]
+
+
+def test_retries_stop_inside_the_lock_ttl(tmp_path, redis, monkeypatch):
+    cache = _cache(tmp_path, retries=5, backoff_s=1.0, wait_s=10.0, lock_ttl_s=30)
+    calls = []
+    monkeypatch.setattr(gc.time, "sleep", lambda s: None)
+
+    def _down():
+        calls.append(1)
+        raise gc.GeocodeUnavailable("status=503", retry_after=6.0)
+
+    assert cache.get(gc.POSTAL_COORDS, "730003", _down) is None
+    assert len(calls) == 1
+
+
+def test_module_cache_is_built_once(tmp_path):
+    class _Cfg:
+        geocode_cache_redis_url = None
+        geocode_gazetteer_path = str(tmp_path / "g.csv")
+
+    gc.set_geocode_cache(None)
+    try:
+        first = gc.geocode_cache(_Cfg())
+        assert gc.geocode_cache(object()) is first
+        assert first.gazetteer_path == tmp_path / "g.csv"
+    finally:
+        gc.set_geocode_cache(None)
+
+
+def test_seed_rows_map_coords_to_the_geocoded_code(monkeypatch):
+    import sys
+    from pathlib import Path
+
+    monkeypatch.syspath_prepend(str(Path(__file__).resolve().parents[1] / "TutorDexAggregator"))
+    loaded = sys.modules.get("logging_setup")
+    if loaded is not None and "TutorDexAggregator" not in str(getattr(loaded, "__file__", "")):
+        monkeypatch.delitem(sys.modules, "logging_setup")
+    import utilities.seed_geocode_cache as seed
+
+    rows = [
+        {"postal_code": ["520123"], "postal_lat": 1.0, "postal_lon": 103.0, "postal_coords_estimated": False},
+        {"postal_code_estimated": ["520123"], "postal_lat": 9.0, "postal_lon": 9.0, "postal_coords_estimated": True},
+        {"postal_code": None, "postal_code_estimated": ["640456", "640999"], "postal_lat": 1.3, "postal_lon": 103.7, "postal_coords_estimated": True},
+        {"postal_code": ["730001"], "postal_lat": None, "postal_lon": None},
+    ]
+    assert seed.collect_postal_coords(rows) == {"520123": (1.0, 103.0), "640456": (1.3, 103.7)}
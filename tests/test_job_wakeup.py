@@ -0,0 +1,131 @@
+"""
+Tests for push-based extraction job wakeups (`services/job_wakeup.py`).
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+
+
+def _ensure_aggregator_sys_path() -> None:
+    agg_path = str(Path(__file__).resolve().parents[1] / "TutorDexAggregator")
+    if agg_path in sys.path:
+        sys.path.remove(agg_path)
+    sys.path.insert(0, agg_path)
+
+
+_ensure_aggregator_sys_path()
+
+import TutorDexAggregator.services.job_wakeup as jw  # noqa: E402
+
+
+class _FakeRedis:
+    """In-process stand-in for the publish/subscribe subset of redis-py."""
+
+    def __init__(self) -> None:
+        self.channels: Dict[str, List[List[Dict[str, Any]]]] = {}
+        self.published: List[tuple] = []
+        self.down = False
+
+    def publish(self, channel: str, data: str) -> int:
+        if self.down:
+            raise ConnectionError("redis down")
+        self.published.append((channel, data))
+        for q in self.channels.get(channel, []):
+            q.append({"type": "message", "channel": channel, "data": data})
+        return len(self.channels.get(channel, []))
+
+    def pubsub(self, ignore_subscribe_messages: bool = False) -> "_FakePubSub":
+        return _FakePubSub(self)
+
+    def close(self) -> None:
+        pass
+
+
+class _FakePubSub:
+    def __init__(self, r: _FakeRedis) -> None:
+        self.r = r
+        self.queue: List[Dict[str, Any]] = []
+
+    def subscribe(self, channel: str) -> None:
+        self.r.channels.setdefault(channel, []).append(self.queue)
+
+    def get_message(self, timeout: float = 0.0):
+        if self.r.down:
+            raise ConnectionError("redis down")
+        return self.queue.pop(0) if self.queue else None
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def redis(monkeypatch) -> _FakeRedis:
+    fake = _FakeRedis()
+    monkeypatch.setattr(jw, "_connect", lambda url: fake)
+    monkeypatch.setattr(jw.time, "sleep", lambda s: None)
+    monkeypatch.setattr(jw, "_NOTIFIERS", {})
+    return fake
+
+
+def _cfg(**kw: Any) -> SimpleNamespace:
+    base = {"extraction_wakeup_redis_url": "redis://r:6379/0", "extraction_wakeup_prefix": "t:"}
+    base.update(kw)
+    return SimpleNamespace(**base)
+
+
+def test_disabled_without_url(redis: _FakeRedis):
+    assert jw.JobWakeup.from_config(SimpleNamespace(), "pv") is None
+    assert jw.notify_jobs_enqueued(SimpleNamespace(), "pv", 3) is False
+    assert redis.published == []
+
+
+def test_notify_wakes_subscribed_worker(redis: _FakeRedis):
+    worker = jw.JobWakeup.from_config(_cfg(), "pv")
+    assert worker.wait(0.01, fallback_sleep_s=1) == "timeout"
+
+    assert jw.notify_jobs_enqueued(_cfg(), "pv", 2) is True
+    assert jw.notify_jobs_enqueued(_cfg(), "pv", 1) is True
+    assert jw.notify_jobs_enqueued(_cfg(), "pv", 0) is False
+    assert redis.published == [("t:extraction_jobs:pv", "2"), ("t:extraction_jobs:pv", "1")]
+
+    # A burst collapses into one wakeup.
+    assert worker.wait(5, fallback_sleep_s=1) == "notified"
+    assert worker.wait(0.01, fallback_sleep_s=1) == "timeout"
+
+
+def test_other_pipeline_versions_do_not_wake(redis: _FakeRedis):
+    worker = jw.JobWakeup.from_config(_cfg(), "pv-a")
+    worker.wait(0.01, fallback_sleep_s=1)
+    jw.notify_jobs_enqueued(_cfg(), "pv-b", 5)
+    assert worker.wait(0.01, fallback_sleep_s=1) == "timeout"
+
+
+def test_redis_failure_falls_back_to_sleep(redis: _FakeRedis, monkeypatch):
+    slept: List[float] = []
+    monkeypatch.setattr(jw.time, "sleep", lambda s: slept.append(s))
+    worker = jw.JobWakeup.from_config(_cfg(), "pv")
+    redis.down = True
+
+    assert worker.wait(30, fallback_sleep_s=2.0) == "unavailable"
+    assert slept == [2.0]
+    assert jw.notify_jobs_enqueued(_cfg(), "pv", 1) is False
+    # Reconnects are rate limited; the next wait sleeps without touching Redis.
+    assert worker.wait(30, fallback_sleep_s=2.0) == "unavailable"
+
+
+def test_enqueue_extraction_jobs_notifies(redis: _FakeRedis, monkeypatch):
+    import collection.enqueue as enqueue
+
+    monkeypatch.setattr(enqueue, "notify_jobs_enqueued", jw.notify_jobs_enqueued)
+
+    class _Store:
+        def enqueue_extractions(self, **kw: Any) -> int:
+            return len(kw["message_ids"])
+
+    cfg = _cfg(extraction_queue_enabled=True, extraction_pipeline_version="pv")
+    enqueue.enqueue_extraction_jobs(_Store(), cfg=cfg, channel_link="t.me/x", message_ids=["1", "2"])
+    assert redis.published == [("t:extraction_jobs:pv", "2")]
@@ -0,0 +1,245 @@
+"""
+Tests for the health-aware LLM endpoint pool (`TutorDexAggregator/llm_endpoint_pool.py`) against local stub servers.
+"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List
+
+import pytest
+import requests
+
+AGG_DIR = Path(__file__).resolve().parents[1] / "TutorDexAggregator"
+if str(AGG_DIR) in sys.path:
+    sys.path.remove(str(AGG_DIR))
+sys.path.insert(0, str(AGG_DIR))
+
+import llm_endpoint_pool as pool_mod  # noqa: E402
+from llm_endpoint_pool import EndpointPool, NoEndpointAvailable  # noqa: E402
+
+
+class _Stub:
+    """OpenAI-ish stub: POST /v1/chat/completions and GET /v1/models, with switchable behaviour."""
+
+    def __init__(self) -> None:
+        self.status = 200
+        self.delay_s = 0.0
+        self.calls = 0
+        self.probes = 0
+        self.inflight = 0
+        self.max_inflight = 0
+        self.release = threading.Event()
+        self.release.set()
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):  # noqa: D401 - keep test output quiet
+                pass
+
+            def _send(self, status: int, body: dict) -> None:
+                raw = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def do_GET(self):
+                with stub.lock:
+                    stub.probes += 1
+                self._send(stub.status, {"data": []})
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                with stub.lock:
+                    stub.calls += 1
+                    stub.inflight += 1
+                    stub.max_inflight = max(stub.max_inflight, stub.inflight)
+                try:
+                    stub.release.wait(5)
+                    if stub.delay_s:
+                        time.sleep(stub.delay_s)
+                    self._send(stub.status, {"choices": [{"message": {"content": stub.url}}]})
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    with stub.lock:
+                        stub.inflight -= 1
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stubs():
+    made: List[_Stub] = []
+
+    def make(n: int) -> List[_Stub]:
+        out = [_Stub() for _ in range(n)]
+        made.extend(out)
+        return out
+
+    yield make
+    for s in made:
+        s.close()
+
+
+def _post(pool: EndpointPool, timeout: float = 5.0) -> requests.Response:
+    return pool.post("/v1/chat/completions", json={"model": "m", "messages": []}, timeout=timeout)
+
+
+def test_routes_to_least_outstanding_endpoint(stubs):
+    a, b = stubs(2)
+    pool = EndpointPool([a.url, b.url], max_inflight=4, probe_interval_s=0)
+    a.release.clear()
+    held = threading.Thread(target=_post, args=(pool,))
+    held.start()
+    deadline = time.time() + 2
+    while a.inflight == 0 and b.inflight == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    busy, idle = (a, b) if a.inflight else (b, a)
+    # With one request outstanding on the busy endpoint, the next ones go to the idle one.
+    for _ in range(3):
+        assert _post(pool).json()["choices"][0]["message"]["content"] == idle.url
+    a.release.set()
+    held.join(5)
+    assert busy.calls == 1 and idle.calls == 3
+
+
+def test_spreads_sequential_load_round_robin(stubs):
+    a, b, c = stubs(3)
+    pool = EndpointPool([a.url, b.url, c.url], probe_interval_s=0)
+    for _ in range(6):
+        assert _post(pool).status_code == 200
+    assert [a.calls, b.calls, c.calls] == [2, 2, 2]
+
+
+def test_5xx_is_retried_elsewhere_and_ejects_after_threshold(stubs):
+    bad, good = stubs(2)
+    bad.status = 503
+    pool = EndpointPool([bad.url, good.url], eject_after_failures=2, eject_s=60, probe_interval_s=0)
+    for _ in range(4):
+        assert _post(pool).status_code == 200
+    assert bad.calls == 2
+    snap = {s["url"]: s for s in pool.snapshot()}
+    assert snap[bad.url]["in_rotation"] is False
+    assert snap[good.url]["in_rotation"] is True
+
+
+def test_all_endpoints_5xx_returns_last_response(stubs):
+    a, b = stubs(2)
+    a.status = b.status = 500
+    pool = EndpointPool([a.url, b.url], probe_interval_s=0)
+    assert _post(pool).status_code == 500
+    assert a.calls == 1 and b.calls == 1
+
+
+def test_timeout_ejects_without_retry(stubs):
+    slow, fast = stubs(2)
+    slow.delay_s = 0.5
+    pool = EndpointPool([slow.url, fast.url], eject_after_failures=1, eject_s=60, probe_interval_s=0)
+    pool._rr = 0
+    with pytest.raises(requests.exceptions.Timeout):
+        _post(pool, timeout=0.2)
+    assert fast.calls == 0
+    assert _post(pool).json()["choices"][0]["message"]["content"] == fast.url
+    assert {s["url"]: s["in_rotation"] for s in pool.snapshot()}[slow.url] is False
+
+
+def test_connection_error_is_retried_on_another_endpoint(stubs):
+    (good,) = stubs(1)
+    dead = _Stub()
+    dead_url = dead.url
+    dead.close()
+    pool = EndpointPool([dead_url, good.url], probe_interval_s=0)
+    pool._rr = 0
+    assert _post(pool).status_code == 200
+    assert good.calls == 1
+
+
+def test_probes_eject_and_restore_endpoints(stubs):
+    a, b = stubs(2)
+    pool = EndpointPool([a.url, b.url], eject_s=60, probe_interval_s=0)
+    a.status = 500
+    assert pool.probe_once() == {a.url: False, b.url: True}
+    for _ in range(3):
+        _post(pool)
+    assert a.calls == 0
+    a.status = 200
+    assert pool.probe_once()[a.url] is True
+    _post(pool)
+    _post(pool)
+    assert a.calls == 1
+
+
+def test_background_probes_run_until_closed(stubs):
+    (a,) = stubs(1)
+    pool = EndpointPool([a.url], probe_interval_s=0.05)
+    pool.start_probes()
+    deadline = time.time() + 2
+    while a.probes < 2 and time.time() < deadline:
+        time.sleep(0.02)
+    pool.close()
+    assert a.probes >= 2
+    seen = a.probes
+    time.sleep(0.15)
+    assert a.probes <= seen + 1
+
+
+def test_per_endpoint_cap_queues_then_times_out(stubs):
+    a, b = stubs(2)
+    a.release.clear()
+    b.release.clear()
+    pool = EndpointPool([a.url, b.url], max_inflight=1, probe_interval_s=0)
+    results: List[int] = []
+    threads = [threading.Thread(target=lambda: results.append(_post(pool).status_code)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    time.sleep(0.3)
+    assert a.max_inflight == 1 and b.max_inflight == 1
+    assert pool._waiting == 2
+    a.release.set()
+    b.release.set()
+    for t in threads:
+        t.join(5)
+    assert results == [200, 200, 200, 200]
+    assert a.max_inflight == 1 and b.max_inflight == 1
+
+    solo = EndpointPool([a.url], max_inflight=1, probe_interval_s=0)
+    solo.endpoints[0].inflight = 1
+    with pytest.raises(NoEndpointAvailable):
+        _post(solo, timeout=0.1)
+
+
+def test_all_ejected_still_routes(stubs):
+    (a,) = stubs(1)
+    pool = EndpointPool([a.url], eject_s=60, probe_interval_s=0)
+    a.status = 500
+    pool.probe_once()
+    a.status = 200
+    assert _post(pool).status_code == 200
+    assert pool.snapshot()[0]["in_rotation"] is True
+
+
+def test_urls_come_from_config_list_with_single_url_fallback():
+    class Cfg:
+        llm_api_urls = " http://a:1/ , http://b:2 ,"
+        llm_api_url = "http://solo:3"
+
+    assert pool_mod.endpoint_urls(Cfg) == ["http://a:1/", "http://b:2"]
+    Cfg.llm_api_urls = ""
+    assert pool_mod.endpoint_urls(Cfg) == ["http://solo:3"]
+    pool = EndpointPool(["http://a:1/", "http://a:1"], probe_interval_s=0)
+    assert [e.url for e in pool.endpoints] == ["http://a:1"]
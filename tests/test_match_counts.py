@@ -0,0 +1,113 @@
+"""
+Tests for single-RPC windowed match counts (`/me/assignments/match-counts`).
+"""
+
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+from TutorDexBackend.utils.database_utils import windowed_match_counts
+
+
+def _resp(status_code: int, data: Any = None, headers: Any = None) -> MagicMock:
+    resp = MagicMock()
+    resp.status_code = status_code
+    resp.text = ""
+    resp.json.return_value = data
+    resp.headers = headers or {}
+    return resp
+
+
+def _sb(*post_responses: MagicMock) -> MagicMock:
+    sb = MagicMock()
+    sb.enabled.return_value = True
+    sb.client.post.side_effect = list(post_responses)
+    return sb
+
+
+def test_windows_derived_from_histogram():
+    histogram = {
+        "max_days": 30,
+        "buckets": [
+            {"age_days": 0, "count": 1},
+            {"age_days": 7, "count": 2},
+            {"age_days": 8, "count": 4},
+            {"age_days": 14, "count": 8},
+            {"age_days": 30, "count": 16},
+        ],
+    }
+    sb = _sb(_resp(200, histogram))
+
+    counts = windowed_match_counts(
+        sb,
+        days=(14, 7, 30),
+        levels=["Primary", " "],
+        specific_student_levels=[],
+        subjects_canonical=["MATH.PRI"],
+        subjects_general=[],
+    )
+
+    assert counts == {7: 3, 14: 15, 30: 31}
+    path, payload = sb.client.post.call_args.args[:2]
+    assert path == "rpc/assignment_match_count_histogram"
+    assert payload == {"p_max_days": 30, "p_levels": ["Primary"], "p_subjects_canonical": ["MATH.PRI"]}
+    sb.client.get.assert_not_called()
+
+
+def test_missing_rpc_falls_back_to_per_window_counts():
+    sb = _sb(_resp(404))
+    sb.client.get.side_effect = [
+        _resp(206, headers={"content-range": "*/3"}),
+        _resp(206, headers={"content-range": "*/5"}),
+    ]
+
+    counts = windowed_match_counts(
+        sb, days=(7, 14), levels=["Primary"], specific_student_levels=[], subjects_canonical=[], subjects_general=[]
+    )
+
+    assert counts == {7: 3, 14: 5}
+    assert sb.client.get.call_count == 2
+
+
+def test_rpc_error_returns_none():
+    sb = _sb(_resp(500))
+    assert windowed_match_counts(
+        sb, days=(7,), levels=["Primary"], specific_student_levels=[], subjects_canonical=[], subjects_general=[]
+    ) is None
+
+
+@patch("TutorDexBackend.services.auth_service.AuthService.require_uid", return_value="test_user_123")
+def test_route_caches_by_preference_hash(_mock_uid, client: TestClient, mock_redis, mock_supabase):
+    stored = {}
+    mock_redis.r.get.side_effect = lambda key: stored.get(key)
+    mock_redis.r.setex.side_effect = lambda key, ttl, value: stored.__setitem__(key, value)
+    mock_supabase.client.post.return_value = _resp(200, {"buckets": [{"age_days": 3, "count": 2}]})
+
+    first = client.post("/me/assignments/match-counts", json={"levels": ["Primary", "Secondary"]})
+    second = client.post("/me/assignments/match-counts", json={"levels": ["Secondary", "Primary", "Primary"]})
+
+    assert first.status_code == 200
+    assert first.json()["counts"] == {"7": 2, "14": 2, "30": 2}
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+    assert mock_supabase.client.post.call_count == 1
+
+
+@patch("TutorDexBackend.services.auth_service.AuthService.require_uid", return_value="test_user_123")
+def test_route_runs_the_rpc_off_the_event_loop(_mock_uid, client: TestClient, mock_supabase):
+    import asyncio
+
+    loops = []
+
+    def _post(*args: Any, **kwargs: Any) -> MagicMock:
+        try:
+            loops.append(asyncio.get_running_loop())
+        except RuntimeError:
+            loops.append(None)
+        return _resp(200, {"buckets": []})
+
+    mock_supabase.client.post.side_effect = _post
+    assert client.post("/me/assignments/match-counts", json={"levels": ["Primary"]}).status_code == 200
+    assert loops == [None]
@@ -0,0 +1,57 @@
+"""
+Smoke tests for the offline pipeline benchmark (`utilities/benchmark_pipeline.py`).
+
+Timings are not asserted here; regressions are checked by running the harness with `--compare`.
+"""
+
+import sys
+from pathlib import Path
+
+
+def _ensure_aggregator_sys_path() -> None:
+    agg_path = str(Path(__file__).resolve().parents[1] / "TutorDexAggregator")
+    if agg_path in sys.path:
+        sys.path.remove(agg_path)
+    sys.path.insert(0, agg_path)
+
+
+_ensure_aggregator_sys_path()
+
+import utilities.benchmark_pipeline as bench  # noqa: E402
+
+
+def test_corpus_splits_examples_and_skips_templates():
+    cases = bench.load_corpus()
+    assert len(cases) > 20
+    assert all(c.raw_text and c.llm_output.lstrip().startswith("{") for c in cases)
+    assert "general.txt" not in {c.source for c in cases}
+
+    sample = bench.parse_examples_file(bench.DEFAULT_EXAMPLES_DIR / "championtutorsg.txt")
+    assert sample[0].raw_text.startswith("👍NEW Tuition Assignment!")
+    assert bench._parse_llm_output(sample[0].llm_output)["assignment_code"] == "2713"
+
+
+def test_run_benchmark_reports_every_stage():
+    result = bench.run_benchmark(bench.load_corpus()[:3], repeat=1, warmup=0)
+    assert result["cases"] == 3
+    assert set(result["stages"]) == set(bench.STAGES)
+    for stats in result["stages"].values():
+        assert stats["n"] == 3
+        assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"] <= stats["max_ms"]
+
+
+def test_stored_baseline_covers_every_stage():
+    import json
+
+    baseline = json.loads(bench.DEFAULT_BASELINE.read_text(encoding="utf-8"))
+    assert set(baseline["stages"]) == set(bench.STAGES)
+
+
+def test_compare_flags_only_stages_beyond_tolerance():
+    baseline = {"stages": {"normalize": {"p50_ms": 1.0}, "enrich": {"p50_ms": 2.0}}}
+    result = {"stages": {"normalize": {"p50_ms": 1.4}, "enrich": {"p50_ms": 3.5}, "build_row": {"p50_ms": 9.0}}}
+
+    regressions = bench.compare_to_baseline(result, baseline, tolerance=0.5)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("enrich:")
+    assert bench.compare_to_baseline(result, baseline, tolerance=1.0) == []
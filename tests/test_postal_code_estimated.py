@@ -3,6 +3,7 @@ import unittest
 from unittest.mock import Mock, patch
 
 
+from shared.geocoding_cache import set_geocode_cache
 from TutorDexAggregator.extractors import postal_code_estimated as mod
 
 
@@ -10,14 +11,14 @@ class TestPostalCodeEstimated(unittest.TestCase):
     def setUp(self) -> None:
         self._old_disable = os.environ.get("DISABLE_NOMINATIM")
         os.environ["DISABLE_NOMINATIM"] = "0"
-        mod._estimate_postal_from_cleaned_address.cache_clear()
+        set_geocode_cache(None)
 
     def tearDown(self) -> None:
         if self._old_disable is None:
             os.environ.pop("DISABLE_NOMINATIM", None)
         else:
             os.environ["DISABLE_NOMINATIM"] = self._old_disable
-        mod._estimate_postal_from_cleaned_address.cache_clear()
+        set_geocode_cache(None)
 
     def test_skips_when_postal_code_present(self):
         with patch.object(mod.requests, "get") as get:
@@ -0,0 +1,115 @@
+"""
+Tests for prebuilt geo/taxonomy artifacts (`prebuilt_artifacts.py`).
+"""
+
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from TutorDexAggregator import geo_enrichment as geo
+from TutorDexAggregator import prebuilt_artifacts as pa
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "TutorDexAggregator" / "data"
+
+
+@pytest.fixture
+def sources(tmp_path, monkeypatch):
+    region_src = tmp_path / "regions.geojson"
+    mrt_src = tmp_path / "mrt.json"
+    shutil.copy(DATA_DIR / "2019_region_boundary.geojson", region_src)
+    shutil.copy(DATA_DIR / "mrt_data.json", mrt_src)
+    out_dir = tmp_path / "prebuilt"
+    monkeypatch.setenv("REGION_GEOJSON_PATH", str(region_src))
+    monkeypatch.setenv("MRT_DATA_JSON_PATH", str(mrt_src))
+    monkeypatch.setenv("PREBUILT_ARTIFACTS_DIR", str(out_dir))
+    monkeypatch.setenv("PREBUILT_ARTIFACTS_ENABLED", "1")
+    monkeypatch.setenv("GEO_ENRICHMENT_ENABLED", "1")
+    geo._load_regions.cache_clear()
+    geo._load_mrt_stations.cache_clear()
+    yield region_src, mrt_src, out_dir
+    geo._load_regions.cache_clear()
+    geo._load_mrt_stations.cache_clear()
+
+
+def test_round_trip_matches_source_parsing(sources):
+    region_src, mrt_src, out_dir = sources
+    results = pa.build_artifacts(out_dir)
+    assert results[pa.REGIONS] == "built" and results[pa.MRT_STATIONS] == "built"
+
+    regions = pa.load_regions(out_dir, source=region_src)
+    stations = pa.load_stations(out_dir, source=mrt_src)
+    assert regions.to_regions() == geo._parse_regions(region_src)[0]
+    assert stations.to_stations() == geo._parse_mrt_stations(mrt_src)[0]
+    assert pa.is_stale(out_dir) == {pa.REGIONS: False, pa.MRT_STATIONS: False, pa.TUTOR_TYPES_INDEX: False}
+
+
+def test_geo_lookups_use_artifacts_without_parsing(sources, monkeypatch):
+    region_src, mrt_src, out_dir = sources
+    points = [(1.29 + 0.02 * i, 103.65 + 0.03 * j) for i in range(8) for j in range(10)]
+    expected = [(geo.lookup_region(lat=la, lon=lo), geo.lookup_nearest_mrt(lat=la, lon=lo)) for la, lo in points]
+
+    pa.build_artifacts(out_dir)
+    geo._load_regions.cache_clear()
+    geo._load_mrt_stations.cache_clear()
+
+    def _no_parse(path):
+        raise AssertionError("source parsed despite fresh artifacts")
+
+    monkeypatch.setattr(geo, "_parse_regions", _no_parse)
+    monkeypatch.setattr(geo, "_parse_mrt_stations", _no_parse)
+    got = [(geo.lookup_region(lat=la, lon=lo), geo.lookup_nearest_mrt(lat=la, lon=lo)) for la, lo in points]
+    assert got == expected
+
+
+def test_stale_artifacts_are_ignored(sources):
+    region_src, mrt_src, out_dir = sources
+    pa.build_artifacts(out_dir)
+
+    data = json.loads(mrt_src.read_text(encoding="utf-8"))
+    mrt_src.write_text(json.dumps(data[:3]), encoding="utf-8")
+    assert pa.load_stations(out_dir, source=mrt_src) is None
+    assert pa.is_stale(out_dir)[pa.MRT_STATIONS] is True
+    stations, err = geo._load_mrt_stations()
+    assert err is None and len(stations) == 3
+
+    assert pa.build_artifacts(out_dir, only_stale=True) == {
+        pa.REGIONS: "fresh",
+        pa.MRT_STATIONS: "built",
+        pa.TUTOR_TYPES_INDEX: "fresh",
+    }
+    assert len(pa.load_stations(out_dir, source=mrt_src).names) == 3
+    # Arrays from the previous build are cleaned up.
+    assert len(list(out_dir.glob("mrt_stations-*.npy"))) == 1
+
+
+def test_tutor_types_index_round_trip(tmp_path, monkeypatch):
+    from shared.taxonomy import tutor_types as tt
+
+    path = tmp_path / "tt.json"
+    tt.export_index(str(path))
+    labels = ["PT", "full timer", "ex-moe", "fresh grad", "senior teacher", "unknown label"]
+    expected = [tt.normalize_label(s) for s in labels]
+
+    monkeypatch.setattr(tt, "_TAXONOMY", None)
+    monkeypatch.setattr(tt, "_ALIASES_FLAT", None)
+    assert tt.load_index(str(path)) is True
+    assert [tt.normalize_label(s) for s in labels] == expected
+
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    payload["source_sha256"] = "0" * 64
+    path.write_text(json.dumps(payload), encoding="utf-8")
+    monkeypatch.setattr(tt, "_TAXONOMY", None)
+    assert tt.load_index(str(path)) is False
+    assert tt._TAXONOMY is None
+
+
+def test_warm_worker_caches_builds_and_reports_timings(sources):
+    _, _, out_dir = sources
+    timings = pa.warm_worker_caches()
+    assert set(timings["build"].values()) == {"built"}
+    for key in ("regions_ms", "mrt_stations_ms", "tutor_types_ms", "subject_patterns_ms", "total_ms"):
+        assert key in timings
+    assert timings["tutor_types_prebuilt"] is True
+    assert pa.warm_worker_caches()["build"] == {}
@@ -0,0 +1,117 @@
+"""
+Tests for elected extraction queue stats collection (`workers/queue_stats.py`).
+"""
+
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+
+def _ensure_aggregator_sys_path() -> None:
+    agg_path = str(Path(__file__).resolve().parents[1] / "TutorDexAggregator")
+    if agg_path in sys.path:
+        sys.path.remove(agg_path)
+    sys.path.insert(0, agg_path)
+
+
+_ensure_aggregator_sys_path()
+
+import workers.queue_stats as qs  # noqa: E402
+
+
+class _Gauge:
+    def __init__(self) -> None:
+        self.values: Dict[tuple, float] = {}
+        self._key: tuple = ()
+
+    def labels(self, *, pipeline_version: str, schema_version: str) -> "_Gauge":
+        self._key = (pipeline_version, schema_version)
+        return self
+
+    def set(self, value: float) -> None:
+        self.values[self._key] = value
+
+
+class _Db:
+    def __init__(self, *, lease_holder: str = "", rpc_installed: bool = True):
+        self.lease_holder = lease_holder
+        self.rpc_installed = rpc_installed
+        self.calls: List[str] = []
+
+    def try_acquire_lease(self, url: str, key: str, name: str, owner: str, ttl: int, **_: Any):
+        self.calls.append("lease")
+        if not self.rpc_installed:
+            return None
+        if not self.lease_holder:
+            self.lease_holder = owner
+        return self.lease_holder == owner
+
+    def get_queue_stats(self, url: str, key: str, pv: str, **_: Any):
+        self.calls.append("queue_stats")
+        if not self.rpc_installed:
+            return None
+        return {"pending": 4, "processing": 1, "ok": 1000, "failed": 7, "oldest_pending_age_seconds": 12.5}
+
+    def get_queue_counts(self, url: str, key: str, statuses: List[str], pipeline_version: str = "") -> Dict[str, int]:
+        self.calls.append("count")
+        return {"pending": 2, "processing": 0, "ok": 9, "failed": 1}
+
+    def get_oldest_created_age_seconds(self, url: str, key: str, status: str, pipeline_version: str = ""):
+        self.calls.append("oldest")
+        return None
+
+
+@pytest.fixture
+def db(monkeypatch) -> _Db:
+    fake = _Db()
+    for name in ("try_acquire_lease", "get_queue_stats", "get_queue_counts", "get_oldest_created_age_seconds"):
+        monkeypatch.setattr(qs, name, getattr(fake, name))
+    for name in ("queue_pending", "queue_processing", "queue_ok", "queue_failed",
+                 "queue_oldest_pending_age_seconds", "queue_oldest_processing_age_seconds"):
+        monkeypatch.setattr(qs, name, _Gauge())
+    monkeypatch.setattr(qs, "_QUEUE_GAUGES", ())
+    return fake
+
+
+def test_leader_collects_with_single_rpc(db: _Db):
+    c = qs.QueueStatsCollector("u", "k", owner="w1")
+
+    assert c.collect("pv-a", "sv") is True
+    assert db.calls == ["lease", "queue_stats"]
+    assert qs.queue_pending.values[("pv-a", "sv")] == 4
+    assert qs.queue_ok.values[("pv-a", "sv")] == 1000
+    assert qs.queue_oldest_pending_age_seconds.values[("pv-a", "sv")] == 12.5
+
+
+def test_non_leader_skips_and_clears_its_series(db: _Db):
+    leader = qs.QueueStatsCollector("u", "k", owner="w1")
+    follower = qs.QueueStatsCollector("u", "k", owner="w2", mode="all")
+    assert follower.collect("pv-b", "sv") is True
+
+    follower.mode = "elected"
+    assert leader.collect("pv-b", "sv") is True
+    db.calls.clear()
+    assert follower.collect("pv-b", "sv") is False
+    assert db.calls == ["lease"]
+    assert follower._published is False
+
+
+def test_missing_rpcs_fall_back_to_legacy_counts(db: _Db):
+    db.rpc_installed = False
+    c = qs.QueueStatsCollector("u", "k", owner="w1")
+
+    assert c.collect("pv-c", "sv") is True
+    assert db.calls == ["lease", "queue_stats", "count", "oldest", "oldest"]
+    assert qs.queue_pending.values[("pv-c", "sv")] == 2
+
+    db.calls.clear()
+    assert c.collect("pv-c", "sv") is True
+    assert db.calls == ["count", "oldest", "oldest"]
+
+
+def test_off_mode_does_nothing(db: _Db):
+    c = qs.QueueStatsCollector("u", "k", mode="off")
+    assert c.collect("pv-d", "sv") is False
+    assert db.calls == []
@@ -0,0 +1,222 @@
+"""
+Tests for bulk deletion marking of raw Telegram messages.
+
+See `TutorDexAggregator/supabase sqls/2026-10-18_mark_raw_messages_deleted.sql`. The PostgREST stub below applies the
+RPC's semantics to in-memory tables; `test_rpc_against_postgres` runs the real SQL when `TUTORDEX_TEST_DATABASE_URL`
+points at a disposable Postgres (everything happens inside a rolled-back transaction).
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+AGG_DIR = Path(__file__).resolve().parents[1] / "TutorDexAggregator"
+if str(AGG_DIR) in sys.path:
+    sys.path.remove(str(AGG_DIR))
+sys.path.insert(0, str(AGG_DIR))
+_loaded_logging_setup = sys.modules.get("logging_setup")
+if _loaded_logging_setup is not None and "TutorDexAggregator" not in str(getattr(_loaded_logging_setup, "__file__", "")):
+    sys.modules.pop("logging_setup", None)
+
+import supabase_raw_persist as srp  # noqa: E402
+from collection.deletes import DeleteCoalescer  # noqa: E402
+from collection.spool import RawSpool  # noqa: E402
+
+MIGRATION = AGG_DIR / "supabase sqls" / "2026-10-18_mark_raw_messages_deleted.sql"
+CHANNEL = "t.me/agency"
+
+
+def _resp(status_code: int, data: Any = None) -> SimpleNamespace:
+    return SimpleNamespace(status_code=status_code, text="", json=lambda: data)
+
+
+class _PostgrestStub:
+    """`rpc/mark_raw_messages_deleted` over in-memory `telegram_messages_raw` / `assignments` rows."""
+
+    def __init__(self, *, rpc: bool = True) -> None:
+        self.rpc = rpc
+        self.raw = {(CHANNEL, str(i)): {"channel_id": "-100", "deleted_at": None} for i in range(1, 11)}
+        self.assignments = [
+            {"id": 1, "channel_id": "-100", "message_id": "3", "status": "open"},
+            {"id": 2, "channel_id": "-100", "message_id": "4", "status": "expired"},
+            # Source moved to a later repost (message 9), so deleting message 5 must not close it.
+            {"id": 3, "channel_id": "-100", "message_id": "9", "status": "open"},
+        ]
+        self.posts: List[Dict[str, Any]] = []
+        self.patches: List[str] = []
+
+    def post(self, path: str, body: Any, timeout: int = 0, prefer: Optional[str] = None) -> SimpleNamespace:
+        self.posts.append(body)
+        if path != "rpc/mark_raw_messages_deleted" or not self.rpc:
+            return _resp(404, {"code": "PGRST202"})
+        ids = {str(x).strip() for x in body["p_message_ids"] if str(x).strip()}
+        targets = [(body["p_channel_link"], mid) for mid in ids if (body["p_channel_link"], mid) in self.raw]
+        marked = 0
+        for key in targets:
+            if self.raw[key]["deleted_at"] is None:
+                self.raw[key]["deleted_at"] = body["p_deleted_at"]
+                marked += 1
+        sources = {(self.raw[k]["channel_id"], k[1]) for k in targets}
+        closed = 0
+        for a in self.assignments:
+            if (a["channel_id"], a["message_id"]) in sources and a["status"] == "open":
+                a["status"] = "closed"
+                closed += 1
+        return _resp(200, {"requested": len(ids), "marked": marked, "closed": closed})
+
+    def patch(self, path: str, body: Any, timeout: int = 0, prefer: Optional[str] = None) -> SimpleNamespace:
+        self.patches.append(path)
+        return _resp(204)
+
+
+def _store(stub: _PostgrestStub) -> srp.SupabaseRawStore:
+    store = srp.SupabaseRawStore(srp.SupabaseRawConfig(url="http://supabase.test", key="k", enabled=False))
+    store.client = stub
+    return store
+
+
+def test_bulk_marking_cascades_and_is_idempotent(monkeypatch):
+    monkeypatch.setattr(srp, "DELETE_RPC_CHUNK", 4)
+    stub = _PostgrestStub()
+    store = _store(stub)
+
+    first = store.mark_deleted(channel_link=CHANNEL, message_ids=["3", "4", "5", " 5", "", "99"], deleted_at_iso="2026-10-18T00:00:00+00:00")
+    assert first == {"requested": 4, "marked": 3, "closed": 1, "failed": 0}
+    assert [a["status"] for a in stub.assignments] == ["closed", "expired", "open"]
+    assert stub.posts[0]["p_message_ids"] == ["3", "4", "5", "99"]
+
+    again = store.mark_deleted(channel_link=CHANNEL, message_ids=["5", "4", "3"], deleted_at_iso="2026-10-19T00:00:00+00:00")
+    assert again == {"requested": 3, "marked": 0, "closed": 0, "failed": 0}
+    assert stub.raw[(CHANNEL, "3")]["deleted_at"] == "2026-10-18T00:00:00+00:00"
+    assert not stub.patches
+
+
+def test_large_purge_is_chunked(monkeypatch):
+    monkeypatch.setattr(srp, "DELETE_RPC_CHUNK", 4)
+    stub = _PostgrestStub()
+    res = _store(stub).mark_deleted(channel_link=CHANNEL, message_ids=[str(i) for i in range(1, 11)])
+    assert [len(p["p_message_ids"]) for p in stub.posts] == [4, 4, 2]
+    assert res["marked"] == 10 and res["closed"] == 2
+
+
+def test_missing_rpc_falls_back_to_guarded_patches_once():
+    stub = _PostgrestStub(rpc=False)
+    store = _store(stub)
+    assert store.mark_deleted(channel_link=CHANNEL, message_ids=["1", "2"])["marked"] == 2
+    assert store.mark_deleted(channel_link=CHANNEL, message_ids=["3"])["marked"] == 1
+    assert len(stub.posts) == 1
+    assert len(stub.patches) == 3
+    assert all(p.endswith("&deleted_at=is.null") for p in stub.patches)
+
+
+class _RecordingStore:
+    def __init__(self, fail_first: bool = False) -> None:
+        self.calls: List[tuple] = []
+        self.fail_first = fail_first
+
+    def mark_deleted(self, *, channel_link: str, message_ids: List[str]) -> Dict[str, int]:
+        self.calls.append((channel_link, list(message_ids)))
+        if self.fail_first and len(self.calls) == 1:
+            raise RuntimeError("supabase down")
+        return {"requested": len(message_ids), "marked": len(message_ids), "closed": 0, "failed": 0}
+
+
+def test_coalescer_merges_delete_events_per_channel():
+    store = _RecordingStore()
+
+    async def run() -> None:
+        deletes = DeleteCoalescer(store, flush_interval_s=60, max_pending=1000)
+        deletes.start()
+        for i in range(50):
+            deletes.add(CHANNEL, [i, i + 1])
+        deletes.add("t.me/other", ["7"])
+        await deletes.close()
+
+    asyncio.run(run())
+    assert sorted(c[0] for c in store.calls) == [CHANNEL, "t.me/other"]
+    assert sorted(next(ids for ch, ids in store.calls if ch == CHANNEL), key=int) == [str(i) for i in range(51)]
+
+
+def test_coalescer_flushes_early_when_full_and_retries_failures():
+    store = _RecordingStore(fail_first=True)
+
+    async def run() -> None:
+        deletes = DeleteCoalescer(store, flush_interval_s=60, max_pending=3)
+        deletes.start()
+        deletes.add(CHANNEL, ["1", "2", "3"])
+        for _ in range(100):
+            if store.calls:
+                break
+            await asyncio.sleep(0.01)
+        assert store.calls and deletes.pending() == 3
+        await deletes.close()
+
+    asyncio.run(run())
+    assert store.calls == [(CHANNEL, ["1", "2", "3"]), (CHANNEL, ["1", "2", "3"])]
+
+
+def test_deletes_wait_for_spooled_rows_and_park_at_shutdown(tmp_path):
+    spool = RawSpool(tmp_path / "spool.sqlite3")
+    spool.append({"channel_link": CHANNEL, "message_id": "2", "edit_date": None})
+    store = _RecordingStore()
+
+    async def run() -> None:
+        deletes = DeleteCoalescer(store, spool=spool, flush_interval_s=60)
+        deletes.add(CHANNEL, ["1", "2"])
+        assert (await deletes.flush())["held"] == 1
+        assert store.calls == [(CHANNEL, ["1"])] and deletes.pending() == 1
+        await deletes.close()
+        assert deletes.pending() == 0
+
+        # Next run: the row has been pushed, so the parked delete goes out.
+        spool.ack(spool.peek(1)[0].seq)
+        deletes = DeleteCoalescer(store, spool=spool, flush_interval_s=60)
+        deletes.start()
+        assert deletes.pending() == 1
+        await deletes.close()
+
+    asyncio.run(run())
+    assert store.calls == [(CHANNEL, ["1"]), (CHANNEL, ["2"])]
+    assert spool.take_parked_deletes() == {}
+
+
+_SCHEMA = """
+create table if not exists public.telegram_messages_raw (
+  id bigserial primary key, channel_link text not null, channel_id text, message_id text not null,
+  deleted_at timestamptz, last_seen_at timestamptz, unique (channel_link, message_id));
+create table if not exists public.assignments (
+  id bigserial primary key, channel_id text, message_id text, status text not null default 'open',
+  last_seen timestamptz not null default now());
+"""
+
+
+def test_rpc_against_postgres():
+    dsn = os.environ.get("TUTORDEX_TEST_DATABASE_URL")
+    if not dsn:
+        pytest.skip("TUTORDEX_TEST_DATABASE_URL not set")
+    psycopg = pytest.importorskip("psycopg")
+    with psycopg.connect(dsn) as conn:
+        try:
+            with conn.cursor() as cur:
+                cur.execute(_SCHEMA)
+                cur.execute(MIGRATION.read_text(encoding="utf-8"))
+                cur.execute(
+                    "insert into public.telegram_messages_raw (channel_link, channel_id, message_id) "
+                    "select %s, '-100', g::text from generate_series(1, 5) g",
+                    (CHANNEL,),
+                )
+                cur.execute("insert into public.assignments (channel_id, message_id, status) values ('-100', '2', 'open'), ('-100', '3', 'expired')")
+                call = "select public.mark_raw_messages_deleted(%s, %s, %s)"
+                cur.execute(call, (CHANNEL, ["2", "3", "3", "42"], "2026-10-18T00:00:00+00:00"))
+                assert cur.fetchone()[0] == {"requested": 3, "marked": 2, "closed": 1}
+                cur.execute(call, (CHANNEL, ["2", "3"], "2026-10-19T00:00:00+00:00"))
+                assert cur.fetchone()[0] == {"requested": 2, "marked": 0, "closed": 0}
+                cur.execute("select count(*) from public.telegram_messages_raw where deleted_at = '2026-10-18T00:00:00+00:00'")
+                assert cur.fetchone()[0] == 2
+        finally:
+            conn.rollback()
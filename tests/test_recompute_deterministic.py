@@ -0,0 +1,103 @@
+"""
+Tests for the multi-core deterministic recompute utility (`utilities/recompute_deterministic.py`).
+"""
+
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+def _ensure_aggregator_sys_path() -> None:
+    agg_path = str(Path(__file__).resolve().parents[1] / "TutorDexAggregator")
+    if agg_path in sys.path:
+        sys.path.remove(agg_path)
+    sys.path.insert(0, agg_path)
+
+
+_ensure_aggregator_sys_path()
+
+import utilities.recompute_deterministic as rd  # noqa: E402
+from workers.extract_worker_types import VersionInfo, WorkerToggles  # noqa: E402
+
+TOGGLES = WorkerToggles(
+    enable_broadcast=False,
+    enable_dms=False,
+    materialize_assignments=False,
+    max_attempts=1,
+    backoff_base_s=0.0,
+    backoff_max_s=0.0,
+    stale_processing_seconds=0,
+    use_normalized_text_for_llm=False,
+    hard_validate_mode="enforce",
+    enable_deterministic_signals=True,
+    use_deterministic_time=True,
+    enable_postal_code_estimated=False,
+)
+
+RAW = """Assignment code: 2713
+Level: Secondary 3
+Subject(s): E Maths, Physics
+Location: Clementi Ave 6 (123210)
+Time: Mon/Wed evening after 6pm
+Rate: $40-50/hr (part-time tutor)"""
+
+
+def _row(i: int, **kw: Any) -> Dict[str, Any]:
+    row = {
+        "id": i,
+        "channel_link": "t.me/sample",
+        "message_id": str(100 + i),
+        "canonical_json": {"assignment_code": f"A{i}", "academic_display_text": "Sec 3 E Maths, Physics"},
+        "meta": {},
+        "raw": {"raw_text": RAW, "channel_id": -1001, "message_date": "2026-10-01T00:00:00+00:00"},
+    }
+    row.update(kw)
+    return row
+
+
+def test_recompute_row_derives_extraction_and_assignment_updates():
+    res = rd.recompute_row(_row(1), TOGGLES)
+
+    assert res["ok"] is True
+    assert res["canonical_json"]["postal_code"] == ["123210"]
+    assert res["meta_patch"]["signals"]["ok"] is True
+    a = res["assignment"]
+    assert a == {**a, "external_id": "A1", "channel_id": "-1001", "message_id": "101"}
+    assert set(a["fields"]) <= set(rd.DETERMINISTIC_ASSIGNMENT_FIELDS)
+    assert a["fields"]["signals_subjects"]
+
+
+def test_recompute_row_skips_rows_without_inputs():
+    assert rd.recompute_row(_row(2, canonical_json=None), TOGGLES)["skipped"] == "no_canonical_json"
+    assert rd.recompute_row(_row(3, raw={"raw_text": ""}), TOGGLES)["skipped"] == "no_raw_text"
+
+
+def test_process_pool_matches_inline_and_keeps_order():
+    pages = [[_row(i) for i in range(1, 6)], [_row(i) for i in range(6, 9)]]
+
+    inline: List[Dict[str, Any]] = []
+    rd.run_pool(iter(pages), toggles=TOGGLES, sink=inline.extend, workers=1, chunk_size=2)
+    pooled: List[Dict[str, Any]] = []
+    rd.run_pool(iter(pages), toggles=TOGGLES, sink=pooled.extend, workers=2, chunk_size=2)
+
+    assert [r["id"] for r in pooled] == list(range(1, 9))
+    strip = lambda rs: [(r["id"], r["canonical_json"], r["assignment"]) for r in rs]  # noqa: E731
+    assert strip(pooled) == strip(inline)
+
+
+def test_bulk_writer_uses_one_rpc_per_table(monkeypatch):
+    calls: List[tuple] = []
+    monkeypatch.setattr(rd, "call_rpc", lambda url, key, fn, body, **_: calls.append((fn, body)) or {"count": len(body["p_rows"])})
+    import workers.extract_worker_store as store
+
+    monkeypatch.setattr(store, "finalize_job_statuses", lambda url, key, updates, **_: calls.append(("finalize", updates)) or len(updates))
+
+    w = rd.BulkWriter("u", "k", version=VersionInfo("pv", "sv"), assignments=True, dry_run=False, flush_rows=1000)
+    w(rd.recompute_chunk([_row(1), _row(2), _row(3, canonical_json=None)], TOGGLES))
+    assert calls == []
+    w.flush()
+
+    assert [c[0] for c in calls] == ["finalize", "apply_assignment_deterministic_fields"]
+    assert {u["id"] for u in calls[0][1]} == {1, 2}
+    assert all(u["status"] == "ok" for u in calls[0][1])
+    assert w.counts == {"scanned": 3, "ok": 2, "skipped": 1, "failed": 0, "assignments_updated": 2}
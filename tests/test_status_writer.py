@@ -0,0 +1,125 @@
+"""
+Tests for bulk extraction status finalization (`workers/extract_worker_store.ExtractionStatusWriter`).
+"""
+
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+
+def _ensure_aggregator_sys_path() -> None:
+    agg_path = str(Path(__file__).resolve().parents[1] / "TutorDexAggregator")
+    if agg_path in sys.path:
+        sys.path.remove(agg_path)
+    sys.path.insert(0, agg_path)
+
+
+_ensure_aggregator_sys_path()
+
+import workers.extract_worker_store as store  # noqa: E402
+import workers.job_manager as jm  # noqa: E402
+from workers.extract_worker_types import VersionInfo  # noqa: E402
+
+VERSION = VersionInfo(pipeline_version="pv", schema_version="sv")
+
+
+@pytest.fixture
+def calls(monkeypatch) -> Dict[str, List[Any]]:
+    recorded: Dict[str, List[Any]] = {"rpc": [], "patch": []}
+
+    def fake_finalize(url, key, updates, **_):
+        recorded["rpc"].append(updates)
+        return len(updates)
+
+    def fake_patch(url, key, table, where, body, **_):
+        recorded["patch"].append((where, body))
+        return True
+
+    monkeypatch.setattr(store, "finalize_job_statuses", fake_finalize)
+    monkeypatch.setattr(store, "patch_table", fake_patch)
+    yield recorded
+    store.set_status_writer(None)
+
+
+def test_coalesces_transitions_per_job(calls):
+    w = store.ExtractionStatusWriter("u", "k", version=VERSION)
+    w.add("1", status="pending", meta_patch={"a": 1, "next_retry_at": "t1"}, existing_meta={"attempt": 1})
+    w.add("1", status="ok", meta_patch={"next_retry_at": None, "b": 2}, canonical_json={"x": 1}, llm_model="m")
+    w.add("2", status="failed", error={"error": "boom"})
+
+    assert w.pending() == 2
+    assert w.flush() == 2
+    assert w.pending() == 0
+    assert calls["patch"] == []
+
+    (updates,) = calls["rpc"]
+    by_id = {u["id"]: u for u in updates}
+    assert by_id[1] == {
+        "id": 1,
+        "status": "ok",
+        "meta_patch": {"a": 1, "next_retry_at": None, "b": 2},
+        "canonical_json": {"x": 1},
+        "llm_model": "m",
+    }
+    assert by_id[2] == {"id": 2, "status": "failed", "error": {"error": "boom"}}
+    assert w.flush() == 0
+
+
+def test_missing_rpc_falls_back_to_row_patches(calls, monkeypatch):
+    monkeypatch.setattr(store, "finalize_job_statuses", lambda *a, **k: calls["rpc"].append(a) and None)
+    w = store.ExtractionStatusWriter("u", "k", version=VERSION)
+    w.add(7, status="ok", meta_patch={"b": 2}, existing_meta={"a": 1})
+
+    assert w.flush() == 1
+    (where, body) = calls["patch"][0]
+    assert where == "id=eq.7"
+    assert body["status"] == "ok"
+    assert body["meta"] == {"a": 1, "b": 2}
+
+    w.add(8, status="failed")
+    w.flush()
+    assert len(calls["rpc"]) == 1
+    assert len(calls["patch"]) == 2
+
+
+def test_mark_extraction_routes_through_active_writer(calls):
+    store.mark_extraction("u", "k", 5, status="skipped", version=VERSION)
+    assert len(calls["patch"]) == 1
+
+    w = store.ExtractionStatusWriter("u", "k", version=VERSION)
+    store.set_status_writer(w)
+    store.mark_extraction("u", "k", 6, status="skipped", version=VERSION, meta_patch={"reason": "x"})
+    assert len(calls["patch"]) == 1
+    assert w.pending() == 1
+
+    w.flush()
+    assert calls["rpc"] == [[{"id": 6, "status": "skipped", "meta_patch": {"reason": "x"}}]]
+
+
+def test_old_transitions_flush_before_the_stale_window(calls, monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(store.time, "monotonic", lambda: clock[0])
+    w = store.ExtractionStatusWriter("u", "k", version=VERSION, max_age_s=30)
+    w.add(1, status="ok")
+    clock[0] += 29
+    w.add(2, status="ok")
+    assert w.pending() == 2 and not calls["rpc"]
+
+    clock[0] += 1
+    w.add(3, status="skipped")
+    assert w.pending() == 0
+    assert [u["id"] for u in calls["rpc"][0]] == [1, 2, 3]
+
+
+def test_finalize_job_statuses_returns_none_on_404(monkeypatch):
+    def fake_rpc(*a, **k):
+        raise RuntimeError("rpc finalize_telegram_extractions failed status=404 body=...")
+
+    monkeypatch.setattr(jm, "call_rpc", fake_rpc)
+    assert jm.finalize_job_statuses("u", "k", [{"id": 1, "status": "ok"}]) is None
+    assert jm.finalize_job_statuses("u", "k", []) == 0
+
+    monkeypatch.setattr(jm, "call_rpc", lambda *a, **k: {"count": 3})
+    assert jm.finalize_job_statuses("u", "k", [{"id": 1, "status": "ok"}]) == 3
@@ -0,0 +1,102 @@
+"""
+Golden-output test for `extractors/time_availability.py`.
+
+Every post in `TutorDexAggregator/message_examples/` plus the edge cases below must produce exactly the
+stored `(time_availability, meta)` pair. Regenerate after an intended behaviour change with:
+
+  python tests/test_time_availability_golden.py --update
+"""
+
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+AGG_DIR = ROOT / "TutorDexAggregator"
+GOLDEN_PATH = Path(__file__).resolve().parent / "fixtures" / "time_availability_golden.json"
+
+if str(AGG_DIR) in sys.path:
+    sys.path.remove(str(AGG_DIR))
+sys.path.insert(0, str(AGG_DIR))
+
+from extractors.time_availability import extract_time_availability  # noqa: E402
+from normalize import normalize_text  # noqa: E402
+import utilities.benchmark_pipeline as bench  # noqa: E402
+
+EDGE_CASES: List[str] = [
+    "Timing: TUESDAY AT 7PM",
+    "MONDAY / THURSDAY / FRIDAY - AFTER 4PM",
+    "Mon | Wed 3pm-5pm | Fri 2:30 to 4:30pm",
+    "Mon-Fri 7pm, Sat 10am - 12pm",
+    "Fri-Mon evening",
+    "Tue-Mon-Fri 1930",
+    "Daily and weekdays after 7:30pm",
+    "Weekends only, no Sunday before 3pm",
+    "Available on weekdays",
+    "Availability:\nWed, Thu\n7pm to 9pm",
+    "Timing:\nSaturdays\nmorning or afternoon",
+    "Wed 1900-2100 / https://example.com/a / Thu 0930am to 1130am",
+    "Timing: TBC, tutor to propose all available timings",
+    "Sun 12:00-14:00 and 15:00 to 16:30, not Sat",
+    "Tues & Thurs 730pm onwards, flexible",
+    "every day except Wed from 8pm",
+    "Mon 25:00-26:00 / Tue 13pm / Wed 2460",
+    "sat 10 to 12pm\r\nsun 1-3pm",
+    "monday\n\n\ntimings: 5pm",
+    "Weds nights | Fris 6-8pm | weekend mornings to be discussed",
+    "Timing: tutors to propose all days, mon to be confirmed",
+    "6 to 8pm sun - satto wednesday / wednesdayto Mon-Fri",
+]
+
+
+def _corpus() -> List[Tuple[str, str]]:
+    out: List[Tuple[str, str]] = []
+    counts: Dict[str, int] = {}
+    for case in bench.load_corpus():
+        idx = counts[case.source] = counts.get(case.source, 0) + 1
+        out.append((f"{case.source}#{idx}", case.raw_text))
+    out.extend((f"edge#{i}", raw) for i, raw in enumerate(EDGE_CASES, start=1))
+    return out
+
+
+def _run(raw: str) -> Dict[str, object]:
+    ta, meta = extract_time_availability(raw_text=raw, normalized_text=normalize_text(raw))
+    # Round-trip through JSON so tuples/lists compare the same way as the stored file.
+    return json.loads(json.dumps({"time_availability": ta, "meta": meta}))
+
+
+def _load_golden() -> Dict[str, Dict[str, object]]:
+    return json.loads(GOLDEN_PATH.read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("case_id,raw", _corpus(), ids=[c[0] for c in _corpus()])
+def test_matches_golden(case_id, raw):
+    golden = _load_golden()
+    assert case_id in golden, f"missing golden output for {case_id}; regenerate with --update"
+    assert _run(raw) == golden[case_id]
+
+
+def test_golden_has_no_stale_cases():
+    assert set(_load_golden()) == {case_id for case_id, _ in _corpus()}
+
+
+def test_microbenchmark_compares_implementations(capsys):
+    import utilities.benchmark_time_availability as micro
+
+    module_path = AGG_DIR / "extractors" / "time_availability.py"
+    assert micro.main(["--against", str(module_path), "--repeat", "1", "--warmup", "0", "--json"]) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert result["identical_output"] is True
+    assert set(result["impls"]) == {"against", "current"}
+
+
+if __name__ == "__main__":
+    if "--update" not in sys.argv:
+        raise SystemExit("usage: python tests/test_time_availability_golden.py --update")
+    GOLDEN_PATH.parent.mkdir(parents=True, exist_ok=True)
+    data = {case_id: _run(raw) for case_id, raw in _corpus()}
+    GOLDEN_PATH.write_text(json.dumps(data, indent=1, ensure_ascii=False, sort_keys=True) + "\n", encoding="utf-8")
+    print(f"wrote {len(data)} cases to {GOLDEN_PATH}")
@@ -17,3 +17,75 @@ def test_extract_basic_labels():
     out = canonicalize(parsed)
     assert out.get("tutor_types") is None or isinstance(out.get("tutor_types"), list)
     assert out.get("rate_breakdown") is None or isinstance(out.get("rate_breakdown"), dict)
+
+
+def _reference_normalize(label):
+    """`normalize_label` as it was before the fuzzy index: a full `get_close_matches` sweep per call."""
+    import re
+    from difflib import get_close_matches
+
+    from shared.taxonomy import tutor_types as tt
+
+    tt._ensure_loaded()
+    aliases = tt._ALIASES_FLAT
+    if not label or not label.strip():
+        return "unknown", "", 0.0
+    orig = label.strip()
+    key = orig.lower()
+    if key in aliases:
+        return aliases[key], orig, 0.99
+    for t in [t for t in re.split(r"[^a-z0-9]+", key) if t]:
+        if t in aliases:
+            return aliases[t], orig, 0.9
+    candidates = get_close_matches(key, list(aliases.keys()), n=3, cutoff=0.8)
+    if candidates:
+        return aliases[candidates[0]], orig, 0.75
+    for a, canon in aliases.items():
+        if a in key or key in a:
+            return canon, orig, 0.7
+    return "unknown", orig, 0.0
+
+
+def _labels():
+    """Phrases `extract_tutor_types` feeds to `normalize_label` for the recorded posts, plus alias typos."""
+    import re
+    from pathlib import Path
+
+    from shared.taxonomy import tutor_types as tt
+
+    labels = set()
+    for path in sorted((Path(__file__).resolve().parents[1] / "TutorDexAggregator" / "message_examples").glob("*.txt")):
+        words = re.findall(r"[A-Za-z0-9\-\/]+", path.read_text(encoding="utf-8"))
+        for i in range(len(words)):
+            for j in range(i, min(len(words), i + 4)):
+                labels.add(" ".join(words[i : j + 1]))
+    tt._ensure_loaded()
+    for a in tt._ALIASES_FLAT:
+        for k in range(len(a)):
+            labels.add(a[:k] + a[k + 1 :])  # deletion
+            labels.add(a[:k] + "x" + a[k:])  # insertion
+            labels.add(a[:k] + "z" + a[k + 1 :])  # substitution
+        labels.add(f"{a} tutor")
+    return sorted(labels)
+
+
+def test_normalize_label_matches_difflib_sweep_on_corpus():
+    from shared.taxonomy import tutor_types as tt
+
+    labels = _labels()
+    assert len(labels) > 10000
+    for label in labels:
+        assert tt.normalize_label(label) == _reference_normalize(label), label
+
+
+def test_normalize_label_memo_is_bounded(monkeypatch):
+    from shared.taxonomy import tutor_types as tt
+
+    index = tt._fuzzy_index()
+    monkeypatch.setattr(tt, "_MEMO_MAX", 4)
+    index.memo.clear()
+    for label in ["zzz qqq", "ful timer", "Ful Timer ", "abc", "def", "ghi"]:
+        tt.normalize_label(label)
+        assert len(index.memo) <= 4
+    assert tt.normalize_label("Ful Timer") == ("full-timer", "Ful Timer", 0.75)
+    assert tt.normalize_label("zzz qqq") == ("unknown", "zzz qqq", 0.0)